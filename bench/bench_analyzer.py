@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Match data analysis benchmarks for the Coach Intelligence System
+
+Usage:
+    python -m bench.bench_analyzer [--count N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.match_data_analyzer import MatchDataAnalyzer  # noqa: E402
+from src.tools.match_data_fetcher import MatchDataFetcher  # noqa: E402
+
+
+def bench_analyzer(count=2000):
+    """
+    Analyze live matches and team form as the fetcher returns them
+
+    Returns:
+        dict: Benchmark name, number of analyses and analyses per second
+    """
+    fetcher = MatchDataFetcher()
+    # JSON strings, as the agent passes them from the fetcher to the analyzer
+    payloads = [fetcher.fetch_match_data(match_id=str(100000 + i)) for i in range(10)]
+    payloads += [fetcher.fetch_match_data(team_name=team)
+                 for team in ("Arsenal", "Liverpool", "Chelsea", "Everton", "Brentford")]
+    analyzer = MatchDataAnalyzer()
+
+    start = time.perf_counter()
+    for i in range(count):
+        analyzer.analyze_match_data(payloads[i % len(payloads)])
+    elapsed = time.perf_counter() - start
+
+    return {
+        "name": "match_analysis",
+        "count": count,
+        "seconds": elapsed,
+        "per_second": count / elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=2000,
+                        help="Number of analyses")
+    args = parser.parse_args()
+
+    result = bench_analyzer(args.count)
+    print(f"{result['name']}: {result['per_second']:.0f} analyses/s "
+          f"({result['count']} in {result['seconds']:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
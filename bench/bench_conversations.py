@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Conversation store benchmarks for the Coach Intelligence System
+
+Measures saving, listing and loading conversations with the
+ConversationManager as the number of saved conversations grows.
+
+Usage:
+    python -m bench.bench_conversations [--sizes 10,1000,100000] [--loads N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from bench.bench_load import percentile  # noqa: E402
+from src.utils import ConversationManager  # noqa: E402
+
+TURNS = [
+    ("Which formation should we use against a high press?",
+     "A 4-3-3 with a deep-lying playmaker gives you a passing option under pressure."),
+    ("How should the full-backs position themselves?",
+     "Keep one full-back narrow to form a back three in possession while the other pushes on."),
+    ("Plan a training session for this week",
+     "Warm-up rondos, then an 8v8 pressing game and finishing drills from cut-backs.")
+]
+
+
+def conversation(i):
+    """Six messages of a saved conversation"""
+    messages = []
+    for question, answer in TURNS:
+        messages.append({"role": "user", "content": f"{question} (session {i})"})
+        messages.append({"role": "assistant", "content": answer})
+    return messages
+
+
+def bench_conversations(n_conversations=1000, n_loads=200, seed=0):
+    """
+    Save conversations, then list them cold and warm and load some at random
+
+    Returns:
+        dict: Benchmark name, number of conversations, saves per second,
+            cold and warm list time and load latency
+    """
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = ConversationManager(storage_dir=tmp)
+        ids = []
+        start = time.perf_counter()
+        for i in range(n_conversations):
+            ids.append(manager.save_conversation(conversation(i), conversation_id=f"bench_{i:06d}"))
+        saved = time.perf_counter() - start
+
+        # A new manager reads every file on its first listing
+        manager = ConversationManager(storage_dir=tmp)
+        start = time.perf_counter()
+        manager.list_conversations()
+        list_cold = time.perf_counter() - start
+        start = time.perf_counter()
+        listed = len(manager.list_conversations())
+        list_warm = time.perf_counter() - start
+
+        latencies = []
+        for conversation_id in rng.choices(ids, k=n_loads):
+            start = time.perf_counter()
+            manager.load_conversation(conversation_id)
+            latencies.append(time.perf_counter() - start)
+
+    return {
+        "name": f"conversations_{n_conversations}",
+        "count": n_conversations,
+        "listed": listed,
+        "seconds": saved,
+        "per_second": n_conversations / saved,
+        "list_cold_ms": list_cold * 1000,
+        "list_warm_ms": list_warm * 1000,
+        "load_p50_ms": percentile(latencies, 50) * 1000,
+        "load_p95_ms": percentile(latencies, 95) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,1000,100000",
+                        help="Comma-separated numbers of saved conversations")
+    parser.add_argument("--loads", type=int, default=200,
+                        help="Number of conversations loaded at random")
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        result = bench_conversations(size, args.loads)
+        print(f"{result['name']:<24} {result['per_second']:8.0f} saves/s, list {result['list_cold_ms']:.1f} ms "
+              f"cold / {result['list_warm_ms']:.2f} ms warm, load p50 {result['load_p50_ms']:.2f} ms "
+              f"p95 {result['load_p95_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+"""
+Offline load test of the agent pipeline
+
+Runs chat turns through the coordinator, its delegated agents and their
+tools, then saves each conversation with the ConversationManager, as the UI
+does. The LLM is the local stand-in (COACH_LLM_PROVIDER=local), so the run
+needs no API key and the time left over after the simulated LLM latency is
+spent in our own code. Every worker is a separate session with its own
+agents; the conversation store is shared. Chart requests are left out, as
+rendering is measured by bench_visualization.
+
+Usage:
+    python -m bench.bench_load [--turns N] [--workers N] [--latency SPEC] [--trace PATH]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+QUESTIONS = [
+    "Which formation should we use against a high press?",
+    "Show me the stats for match 123456",
+    "How did our possession trend over the last matches?",
+    "Plan a training session to improve our pressing",
+    "What tactics work against a 3-5-2 with attacking wing-backs?",
+    "Search for the latest Premier League results",
+    "Analyze the performance of our midfield in the last game",
+    "Suggest a lineup for Saturday's match against Arsenal"
+]
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))] if ordered else 0.0
+
+
+def bench_pipeline(turns=200, workers=4, latency=None, trace=None, turns_per_conversation=5):
+    """
+    Measure chat turns per second through the whole pipeline
+
+    Args:
+        turns: Total chat turns
+        workers: Concurrent sessions
+        latency: LLM latency distribution, see llm_providers.parse_latency
+        trace: Recorded trace to replay instead of scripted tool calls
+        turns_per_conversation: Turns before a session starts a new conversation
+
+    Returns:
+        dict: Benchmark name, turns, turns per second, p50 and p95 turn latency,
+            and the time per turn spent outside the LLM
+    """
+    # The stand-in and a scheduler that does not throttle it, set before
+    # the first agent creates the shared scheduler
+    os.environ["COACH_LLM_PROVIDER"] = "local"
+    os.environ.pop("COACH_LLM_LATENCY", None)
+    os.environ.pop("COACH_LLM_TRACE", None)
+    if latency:
+        os.environ["COACH_LLM_LATENCY"] = latency
+    if trace:
+        os.environ["COACH_LLM_TRACE"] = trace
+    os.environ.setdefault("COACH_LLM_RPM", "1000000")
+    os.environ.setdefault("COACH_LLM_BURST", "1000")
+    os.environ.setdefault("COACH_LLM_CONCURRENCY", str(16 * workers))
+
+    from src.agents import (AnalysisAgent, CoordinatorAgent, DataRetrievalAgent,  # noqa: E402
+                            PlanningAgent, VisualizationAgent)
+    from src.agents.llm_scheduler import get_scheduler  # noqa: E402
+    from src.utils import ConversationManager  # noqa: E402
+
+    # The ReAct agents print every step; keep that out of the output
+    with contextlib.redirect_stdout(io.StringIO()), tempfile.TemporaryDirectory() as tmp:
+        manager = ConversationManager(storage_dir=tmp)
+        sessions = []
+        for _ in range(workers):
+            coordinator = CoordinatorAgent()
+            sub_agents = [DataRetrievalAgent(), AnalysisAgent(), PlanningAgent(), VisualizationAgent()]
+            coordinator.create(sub_agents=sub_agents)
+            sessions.append((coordinator, [coordinator] + sub_agents))
+
+        latencies = []
+        lock = threading.Lock()
+
+        def run_session(index):
+            coordinator, _ = sessions[index]
+            conversation_id = None
+            for turn in range(index, turns, workers):
+                if turn // workers % turns_per_conversation == 0:
+                    coordinator.reset_memory()
+                    conversation_id = None
+                start = time.perf_counter()
+                coordinator.chat(QUESTIONS[turn % len(QUESTIONS)])
+                history = [{"role": m.role.value, "content": m.content}
+                           for m in coordinator.agent.memory.get_all()]
+                conversation_id = manager.save_conversation(messages=history, conversation_id=conversation_id)
+                manager.save_memory(conversation_id, coordinator.memory_state())
+                coordinator.remember(conversation_id)
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run_session, range(workers)))
+        elapsed = time.perf_counter() - start
+        conversations = len(manager.list_conversations())
+
+    llm_calls = 0
+    llm_seconds = 0.0
+    routed = 0
+    for coordinator, agents in sessions:
+        routed += coordinator.router.stats["routed"]
+        for agent in agents:
+            stats = agent.llm.llm.stats
+            llm_calls += stats["calls"]
+            llm_seconds += stats["simulated_seconds"]
+
+    return {
+        "name": "pipeline_load",
+        "count": turns,
+        "workers": workers,
+        "seconds": elapsed,
+        "per_second": turns / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "llm_calls": llm_calls,
+        "routed": routed,
+        "conversations": conversations,
+        "non_llm_ms_per_turn": max(0.0, sum(latencies) - llm_seconds) / turns * 1000,
+        "scheduler_wait_seconds": sum(lane["wait_seconds"] for lane in get_scheduler().metrics()["lanes"].values())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200,
+                        help="Number of chat turns")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Number of concurrent sessions")
+    parser.add_argument("--latency", default=None,
+                        help="LLM latency, e.g. fixed:0.5, uniform:0.2,1.5 or lognormal:0.8,0.4")
+    parser.add_argument("--trace", default=None,
+                        help="Recorded trace to replay, see COACH_LLM_RECORD")
+    args = parser.parse_args()
+
+    result = bench_pipeline(args.turns, args.workers, args.latency, args.trace)
+    print(f"{result['name']}: {result['per_second']:.1f} turns/s with {result['workers']} workers, "
+          f"p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, "
+          f"{result['non_llm_ms_per_turn']:.1f} ms per turn outside the LLM "
+          f"({result['llm_calls']} LLM calls, {result['routed']} routed turns, "
+          f"{result['conversations']} conversations)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Match event visualization benchmarks for the Coach Intelligence System
+
+Usage:
+    python -m bench.bench_match_events [--matches N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data.synthetic import synthetic_season  # noqa: E402
+from src.visualization import VisualizationTool  # noqa: E402
+
+
+def bench_match_timelines(matches, max_workers=None):
+    """
+    Render one event timeline per match across the process pool
+
+    Returns:
+        dict: Benchmark name, number of charts and charts per second
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tool = VisualizationTool(output_dir=tmp)
+        jobs = [{"data": match, "visualization_type": "match_events", "preset": "preview"}
+                for match in matches]
+        try:
+            # Start the workers before timing
+            tool.visualize_many(jobs[:1], max_workers=max_workers)
+            start = time.perf_counter()
+            tool.visualize_many(jobs[1:], max_workers=max_workers)
+            elapsed = time.perf_counter() - start
+        finally:
+            tool.close()
+
+    return {
+        "name": "match_timelines_batch",
+        "count": len(jobs) - 1,
+        "seconds": elapsed,
+        "per_second": (len(jobs) - 1) / elapsed
+    }
+
+
+def bench_season_views(matches):
+    """
+    Render the season-wide timeline, momentum and shot charts
+
+    Returns:
+        dict: Benchmark name, number of matches covered and matches per second
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tool = VisualizationTool(output_dir=tmp)
+        start = time.perf_counter()
+        for view in ("timeline", "momentum", "shots"):
+            tool.visualize({"matches": matches, "view": view}, visualization_type="season",
+                           preset="preview")
+        elapsed = time.perf_counter() - start
+
+    return {
+        "name": "season_views",
+        "count": len(matches),
+        "seconds": elapsed,
+        "per_second": len(matches) / elapsed
+    }
+
+
+def bench_replay(match, step=1, max_workers=None):
+    """
+    Render an animated GIF replay of one match
+
+    Returns:
+        dict: Benchmark name, number of frames and frames per second
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tool = VisualizationTool(output_dir=tmp)
+        try:
+            start = time.perf_counter()
+            tool.animate_match(match, fmt="gif", step=step, max_workers=max_workers)
+            elapsed = time.perf_counter() - start
+        finally:
+            tool.close()
+
+    frames = 90 // step + 1
+    return {
+        "name": "match_replay_gif",
+        "count": frames,
+        "seconds": elapsed,
+        "per_second": frames / elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--matches", type=int, default=38,
+                        help="Number of matches in the synthetic season")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes")
+    args = parser.parse_args()
+
+    matches = synthetic_season(args.matches)
+    results = [
+        bench_match_timelines(matches, max_workers=args.workers),
+        bench_season_views(matches),
+        bench_replay(matches[0], max_workers=args.workers)
+    ]
+
+    for result in results:
+        print(f"{result['name']:<36} {result['per_second']:8.2f} items/s "
+              f"({result['count']} in {result['seconds']:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+"""
+Planning benchmarks for the Coach Intelligence System
+
+Usage:
+    python -m bench.bench_planning [--opponents N] [--sims N] [--workers N] [--squad N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.tactics_recommender import TacticsRecommender  # noqa: E402
+from src.tools.match_simulator import MatchSimulator  # noqa: E402
+from src.tools.lineup_optimizer import LineupOptimizer  # noqa: E402
+from src.tools.planning_tool import PlanningTool  # noqa: E402
+from src.tools.training_planner import TrainingPlanner, FOCUS_AREAS  # noqa: E402
+from src.data.synthetic import synthetic_squad  # noqa: E402
+
+LIVE_MATCH = {
+    "minute": 65,
+    "home_team": {"name": "Manchester United", "score": 2, "shots_on_target": 5,
+                  "cards": {"yellow": 2, "red": 0}},
+    "away_team": {"name": "Liverpool", "score": 1, "shots_on_target": 3,
+                  "cards": {"yellow": 1, "red": 0}}
+}
+
+
+def synthetic_league(n_teams=20, n_matches=10, seed=0):
+    """
+    Generate recent results for every team in a league
+
+    Returns:
+        dict: Team name -> list of matches in the MatchDataFetcher format
+    """
+    rng = np.random.default_rng(seed)
+    league = {}
+    for i in range(n_teams):
+        strength = rng.uniform(0.6, 2.2)
+        matches = []
+        for _ in range(n_matches):
+            scored, conceded = rng.poisson(strength), rng.poisson(2.8 - strength)
+            outcome = "W" if scored > conceded else "L" if scored < conceded else "D"
+            matches.append({"result": f"{outcome} {scored}-{conceded}",
+                            "possession": int(np.clip(rng.normal(35 + 10 * strength, 5), 25, 75))})
+        league[f"Team {i}"] = matches
+    return league
+
+
+def bench_rank_league(n_opponents=20, repeat=200):
+    """
+    Pick a formation and a tactic against every opponent in a league
+
+    Returns:
+        dict: Benchmark name, number of opponents and milliseconds per league
+    """
+    recommender = TacticsRecommender()
+    league = synthetic_league(n_opponents + 1)
+    team_matches = league.pop("Team 0")
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        recommender.rank_league("formation", league, team_matches)
+        recommender.rank_league("tactics", league, team_matches)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    return {
+        "name": "rank_league",
+        "count": n_opponents,
+        "seconds": elapsed,
+        "ms_per_league": elapsed * 1000
+    }
+
+
+def bench_match_simulation(n_sims=50000, max_workers=None):
+    """
+    Simulate every in-game option for a live match
+
+    Returns:
+        dict: Benchmark name, number of simulations and seconds per query
+    """
+    simulator = MatchSimulator(max_workers=max_workers)
+    try:
+        # Start the workers before timing
+        simulator.simulate(LIVE_MATCH, n_sims=n_sims)
+        start = time.perf_counter()
+        result = simulator.simulate(LIVE_MATCH, n_sims=n_sims)
+        elapsed = time.perf_counter() - start
+    finally:
+        simulator.close()
+
+    count = n_sims * len(result["scenarios"])
+    return {
+        "name": "match_simulation",
+        "count": count,
+        "seconds": elapsed,
+        "per_second": count / elapsed
+    }
+
+
+def bench_lineup(n_players=30, repeat=20):
+    """
+    Pick the best eleven and bench for every PlanningTool formation
+
+    Returns:
+        dict: Benchmark name, squad size and milliseconds per squad
+    """
+    optimizer = LineupOptimizer()
+    squad = synthetic_squad(n_players)
+    formations = list(PlanningTool().formations)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        optimizer.optimize(squad, formations)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    return {
+        "name": "lineup_all_formations",
+        "count": n_players,
+        "seconds": elapsed,
+        "ms_per_squad": elapsed * 1000
+    }
+
+
+def bench_training_week(n_squads=4, seed=0):
+    """
+    Plan a five-day week for several squads, then answer the same request again
+
+    Returns:
+        dict: Benchmark name, number of sessions and milliseconds for the
+            solve and for the cached answer
+    """
+    rng = np.random.default_rng(seed)
+    days = ["Mon", "Tue", "Wed", "Thu", "Fri"]
+    request = {
+        "squads": [{
+            "name": f"Squad {i + 1}",
+            "weekly_load": 2000,
+            "sessions": {day: {"duration": 90, "players": int(rng.integers(14, 24)),
+                               "focus": list(rng.choice(FOCUS_AREAS, 2, replace=False))}
+                         for day in days}
+        } for i in range(n_squads)],
+        "shared_equipment": {"mannequins": 1, "mini_goals": 2}
+    }
+    planner = TrainingPlanner()
+
+    start = time.perf_counter()
+    planner.plan_week(request)
+    solved = time.perf_counter() - start
+    start = time.perf_counter()
+    planner.plan_week(request)
+    cached = time.perf_counter() - start
+
+    return {
+        "name": "training_week",
+        "count": n_squads * len(days),
+        "seconds": solved,
+        "ms_solve": solved * 1000,
+        "ms_cached": cached * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--opponents", type=int, default=19,
+                        help="Number of opponents in the league")
+    parser.add_argument("--sims", type=int, default=50000,
+                        help="Number of simulations per option")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes")
+    parser.add_argument("--squad", type=int, default=30,
+                        help="Number of players in the squad")
+    args = parser.parse_args()
+
+    result = bench_rank_league(args.opponents)
+    print(f"{result['name']}: {result['count']} opponents in {result['ms_per_league']:.2f} ms")
+
+    result = bench_match_simulation(args.sims, args.workers)
+    print(f"{result['name']}: {result['count']} simulations in {result['seconds'] * 1000:.1f} ms "
+          f"({result['per_second']:.0f}/s)")
+
+    result = bench_lineup(args.squad)
+    print(f"{result['name']}: {result['count']} players in {result['ms_per_squad']:.2f} ms")
+
+    result = bench_training_week()
+    print(f"{result['name']}: {result['count']} sessions in {result['ms_solve']:.1f} ms "
+          f"({result['ms_cached']:.2f} ms cached)")
+
+
+if __name__ == "__main__":
+    main()
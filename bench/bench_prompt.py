@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Prompt size benchmarks for the Coach Intelligence System
+
+Compares the system header sent on every ReAct step with the stock
+llama-index formatter and with the prompt assembler. The tools are those the
+coordinator held before delegation, so planning_tool appears twice; the RAG
+tool is left out because building its index needs the embedding API.
+
+Usage:
+    python -m bench.bench_prompt [--steps N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from llama_index.core.agent.react.formatter import ReActChatFormatter  # noqa: E402
+from llama_index.core.llms import ChatMessage, MessageRole  # noqa: E402
+
+from src.agents.coordinator_agent import SYSTEM_PROMPT, PARALLEL_PROMPT  # noqa: E402
+from src.agents.prompt_assembly import PromptAssembler, token_report  # noqa: E402
+from src.tools.match_data_analyzer import MatchDataAnalyzer  # noqa: E402
+from src.tools.match_data_fetcher import MatchDataFetcher  # noqa: E402
+from src.tools.planning_tool import PlanningTool  # noqa: E402
+from src.tools.search_tool import SearchTool  # noqa: E402
+from src.visualization import VisualizationTool  # noqa: E402
+
+
+def coordinator_tools():
+    """Tools of the data retrieval, analysis, planning and visualization agents"""
+    return [SearchTool().tool, MatchDataFetcher().tool, MatchDataAnalyzer().tool,
+            PlanningTool().tool, PlanningTool().tool, VisualizationTool().tool]
+
+
+def bench_prompt_prefix(steps=1000):
+    """
+    Measure the per-step system header and the time to format a step
+
+    Returns:
+        dict: Benchmark name, number of steps, header tokens before and after,
+            and microseconds per formatted step for each formatter
+    """
+    tools = coordinator_tools()
+    system_prompt = SYSTEM_PROMPT + PARALLEL_PROMPT
+    report = token_report(tools, system_prompt)
+    history = [ChatMessage(role=MessageRole.USER, content="Which formation against a high press?")]
+
+    timings = {}
+    for name, formatter in (("stock", ReActChatFormatter.from_defaults(context=system_prompt)),
+                            ("assembled", PromptAssembler.from_system_prompt(system_prompt))):
+        start = time.perf_counter()
+        for _ in range(steps):
+            formatter.format(tools, history)
+        timings[name] = (time.perf_counter() - start) / steps
+
+    return {
+        "name": "prompt_prefix",
+        "count": steps,
+        "tokens_before": report["before"],
+        "tokens_after": report["after"],
+        "saved_per_step": report["saved_per_step"],
+        "us_per_step_before": timings["stock"] * 1e6,
+        "us_per_step_after": timings["assembled"] * 1e6
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=1000,
+                        help="Number of ReAct steps to format")
+    args = parser.parse_args()
+
+    result = bench_prompt_prefix(args.steps)
+    print(f"{result['name']}: {result['tokens_before']} -> {result['tokens_after']} tokens per step "
+          f"({result['saved_per_step']} saved); formatting {result['us_per_step_before']:.0f} -> "
+          f"{result['us_per_step_after']:.0f} us per step")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Coaching document retrieval benchmarks for the Coach Intelligence System
+
+Indexes a synthetic document collection with the RAG tool and measures
+retrieval. Embeddings come from llama-index's MockEmbedding, so the numbers
+cover document loading, chunking, the vector store and retrieval, but not the
+embedding API.
+
+Usage:
+    python -m bench.bench_rag [--docs N] [--queries N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from llama_index.core.embeddings import MockEmbedding  # noqa: E402
+
+from bench.bench_load import percentile  # noqa: E402
+from src.tools.rag_tool import RAGTool  # noqa: E402
+
+TOPICS = ["pressing", "counter-attack", "set pieces", "build-up play", "wing play",
+          "defensive shape", "transitions", "goalkeeping", "fitness", "youth development"]
+QUERIES = ["How do we press high?", "Which formation suits wing-backs?", "Corner routines",
+           "Defending against counter-attacks", "Role of a defensive midfielder"]
+
+
+def synthetic_docs(path, n_docs=200, paragraphs=20, seed=0):
+    """Write coaching notes of about 1,500 words each to a directory"""
+    rng = np.random.default_rng(seed)
+    for i in range(n_docs):
+        topic = TOPICS[i % len(TOPICS)]
+        text = "\n\n".join(
+            f"Session {j + 1} on {topic}: the {TOPICS[rng.integers(len(TOPICS))]} drill runs "
+            f"{rng.integers(5, 30)} minutes with {rng.integers(6, 22)} players. " * 5
+            for j in range(paragraphs))
+        with open(os.path.join(path, f"notes_{i:05d}.txt"), "w") as f:
+            f.write(text)
+
+
+def bench_rag(n_docs=200, n_queries=100):
+    """
+    Measure building the document index and the latency of queries
+
+    Returns:
+        list: Result dicts for indexing (documents per second) and querying
+            (queries per second, p50 and p95 latency)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic_docs(tmp, n_docs)
+        start = time.perf_counter()
+        # Index errors are printed; a failed index shows up as a missing retriever
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            tool = RAGTool(docs_path=tmp, embed_model=MockEmbedding(embed_dim=768))
+        indexed = time.perf_counter() - start
+        if tool.retriever is None:
+            raise RuntimeError(output.getvalue().strip()[:500] or "Building the document index failed")
+
+        latencies = []
+        for i in range(n_queries):
+            start = time.perf_counter()
+            tool.retrieve_data(QUERIES[i % len(QUERIES)])
+            latencies.append(time.perf_counter() - start)
+
+    return [
+        {
+            "name": "rag_index",
+            "count": n_docs,
+            "seconds": indexed,
+            "per_second": n_docs / indexed
+        },
+        {
+            "name": "rag_query",
+            "count": n_queries,
+            "seconds": sum(latencies),
+            "per_second": n_queries / sum(latencies),
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000
+        }
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=200,
+                        help="Number of documents to index")
+    parser.add_argument("--queries", type=int, default=100,
+                        help="Number of queries")
+    args = parser.parse_args()
+
+    index, query = bench_rag(args.docs, args.queries)
+    print(f"{index['name']}: {index['count']} documents in {index['seconds']:.2f}s "
+          f"({index['per_second']:.1f}/s)")
+    print(f"{query['name']}: {query['per_second']:.1f} queries/s, p50 {query['p50_ms']:.2f} ms, "
+          f"p95 {query['p95_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+Visualization benchmarks for the Coach Intelligence System
+
+Usage:
+    python -m bench.bench_visualization [--count N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from src.visualization import VisualizationTool  # noqa: E402
+from src.visualization.visualization_tool import new_figure  # noqa: E402
+from src.visualization.pitch_template import get_pitch_template  # noqa: E402
+
+FORMATIONS = ["4-4-2", "4-3-3", "3-5-2", "5-3-2", "4-2-3-1"]
+
+
+def bench_formation_diagrams(count=25, use_pitch_cache=True):
+    """
+    Render formation diagrams and measure throughput
+
+    Returns:
+        dict: Benchmark name, number of diagrams and diagrams per second
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tool = VisualizationTool(use_pitch_cache=use_pitch_cache, output_dir=tmp)
+        # Warm-up render so the pitch template is cached before timing
+        tool.visualize("4-4-2", title="Warm-up")
+
+        start = time.perf_counter()
+        for i in range(count):
+            # Unique titles keep every request out of the render cache
+            tool.visualize(FORMATIONS[i % len(FORMATIONS)], title=f"Diagram {i}")
+        elapsed = time.perf_counter() - start
+
+    return {
+        "name": "formation_diagrams" + ("_cached_pitch" if use_pitch_cache else "_vector_pitch"),
+        "count": count,
+        "seconds": elapsed,
+        "per_second": count / elapsed
+    }
+
+
+def bench_render_cache(count=200, preset=None):
+    """
+    Measure repeated requests for the same charts, served from the render cache
+
+    Returns:
+        dict: Benchmark name, number of requests and requests per second
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tool = VisualizationTool(output_dir=tmp)
+        for formation in FORMATIONS:
+            tool.visualize(formation, preset=preset)
+
+        start = time.perf_counter()
+        for i in range(count):
+            tool.visualize(FORMATIONS[i % len(FORMATIONS)], preset=preset)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "name": "render_cache_hits" + (f"_{preset}" if preset else ""),
+        "count": count,
+        "seconds": elapsed,
+        "per_second": count / elapsed
+    }
+
+
+def bench_plotly_specs(count=200):
+    """
+    Measure building formation diagrams as Plotly specs for the browser
+
+    Returns:
+        dict: Benchmark name, number of specs and specs per second
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tool = VisualizationTool(output_dir=tmp, backend="plotly")
+        start = time.perf_counter()
+        for i in range(count):
+            tool.visualize(FORMATIONS[i % len(FORMATIONS)], title=f"Diagram {i}")
+        elapsed = time.perf_counter() - start
+
+    return {
+        "name": "formation_plotly_specs",
+        "count": count,
+        "seconds": elapsed,
+        "per_second": count / elapsed
+    }
+
+
+def bench_formation_render_only(count=50, use_pitch_cache=True, dpi=300):
+    """
+    Measure diagram rendering alone, excluding image encoding and disk writes
+
+    Returns:
+        dict: Benchmark name, number of diagrams and diagrams per second
+    """
+    tool = VisualizationTool(use_pitch_cache=use_pitch_cache)
+    layouts = [tool._formation_players(f) for f in FORMATIONS]
+
+    def render(i):
+        players, notes = layouts[i % len(layouts)]
+        if use_pitch_cache:
+            get_pitch_template((10, 7), dpi, "classic").render(players, "Formation")
+            return
+
+        fig, ax = new_figure(figsize=(10, 7))
+        fig.set_dpi(dpi)
+        tool._draw_pitch(ax)
+        for x, y, label, color in players:
+            tool._draw_player(ax, x, y, label, color)
+        ax.set_title("Formation", fontsize=16)
+        ax.axis('off')
+        fig.canvas.draw()
+        fig.clear()
+
+    render(0)
+    start = time.perf_counter()
+    for i in range(count):
+        render(i)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "name": "formation_render" + ("_cached_pitch" if use_pitch_cache else "_vector_pitch"),
+        "count": count,
+        "seconds": elapsed,
+        "per_second": count / elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=25,
+                        help="Number of diagrams per run")
+    args = parser.parse_args()
+
+    results = []
+    for use_cache in (False, True):
+        results.append(bench_formation_render_only(args.count * 2, use_pitch_cache=use_cache))
+    for use_cache in (False, True):
+        results.append(bench_formation_diagrams(args.count, use_pitch_cache=use_cache))
+    results.append(bench_render_cache(args.count * 8))
+    results.append(bench_plotly_specs(args.count * 8))
+
+    for result in results:
+        print(f"{result['name']:<36} {result['per_second']:8.2f} diagrams/s "
+              f"({result['count']} in {result['seconds']:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""
+Run the benchmark suite and store the results as JSON
+
+Each run writes bench/results/<timestamp>_<commit>.json with the results of
+every benchmark and the commit, Python version and machine it ran on, so
+runs on different commits can be compared:
+
+    python -m bench.run_suite --compare bench/results/<baseline>.json
+
+A benchmark that fails is recorded with its error and the others still run.
+
+Usage:
+    python -m bench.run_suite [--only NAME,...] [--quick] [--output PATH] [--compare PATH]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import traceback
+
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from bench import (bench_analyzer, bench_conversations, bench_load, bench_match_events,  # noqa: E402
+                   bench_planning, bench_prompt, bench_rag, bench_visualization)
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Version of the results file format; bump when the layout changes
+RESULTS_VERSION = 1
+
+# Result fields where a lower value is better, e.g. p95_ms or ms_per_squad;
+# for all others higher is better
+LOWER_IS_BETTER = re.compile(r"(^|_)(ms|us|seconds|tokens|calls)(_|$)")
+
+# Result fields describing the workload rather than measuring it
+SETTINGS = ("count", "workers")
+
+
+def _conversations(quick):
+    sizes = (10, 1000) if quick else (10, 1000, 100000)
+    return [bench_conversations.bench_conversations(size) for size in sizes]
+
+
+def _visualization(quick):
+    count = 5 if quick else 25
+    return [bench_visualization.bench_formation_diagrams(count),
+            bench_visualization.bench_render_cache(count * 8)]
+
+
+def _match_events(quick):
+    matches = bench_match_events.synthetic_season(10 if quick else 38)
+    return [bench_match_events.bench_match_timelines(matches),
+            bench_match_events.bench_season_views(matches)]
+
+
+def _planning(quick):
+    return [bench_planning.bench_rank_league(),
+            bench_planning.bench_match_simulation(5000 if quick else 50000),
+            bench_planning.bench_lineup(),
+            bench_planning.bench_training_week()]
+
+
+# Benchmarks by name, each taking the quick flag and returning result dicts
+SUITES = {
+    "rag": lambda quick: bench_rag.bench_rag(50 if quick else 200, 50 if quick else 200),
+    "conversations": _conversations,
+    "analyzer": lambda quick: [bench_analyzer.bench_analyzer(500 if quick else 5000)],
+    "visualization": _visualization,
+    "match_events": _match_events,
+    "planning": _planning,
+    "prompt": lambda quick: [bench_prompt.bench_prompt_prefix(100 if quick else 1000)],
+    "pipeline": lambda quick: [bench_load.bench_pipeline(50 if quick else 500, workers=4)]
+}
+
+
+def git_commit():
+    """Short hash of HEAD, with "-dirty" if the tree has changes, or None outside git"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(names=None, quick=False):
+    """
+    Run benchmarks and collect their results
+
+    Args:
+        names: Names in SUITES to run; all of them by default
+        quick: Smaller workloads, for a fast check
+
+    Returns:
+        dict: Run metadata and the result dicts of every benchmark
+    """
+    names = names or list(SUITES)
+    unknown = [name for name in names if name not in SUITES]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}. Use any of {', '.join(SUITES)}")
+
+    run = {
+        "version": RESULTS_VERSION,
+        "commit": git_commit(),
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "quick": quick,
+        "results": [],
+        "errors": {}
+    }
+    for name in names:
+        print(f"Running {name}...", file=sys.stderr)
+        start = time.perf_counter()
+        try:
+            for result in SUITES[name](quick):
+                run["results"].append({"suite": name, **result})
+        except Exception as e:
+            run["errors"][name] = f"{type(e).__name__}: {str(e)}"
+            traceback.print_exc()
+        print(f"  {name} took {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return run
+
+
+def save_run(run, path=None):
+    """Write a run to path, or to RESULTS_DIR named by time and commit; return the path"""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = run["created_at"].replace(":", "").replace("-", "")
+        path = os.path.join(RESULTS_DIR, f"{stamp}_{run['commit'] or 'nogit'}.json")
+    with open(path, "w") as f:
+        json.dump(run, f, indent=2)
+    return path
+
+
+def compare(baseline, run):
+    """
+    Relative change of every numeric result field present in both runs
+
+    Returns:
+        list: (benchmark name, field, baseline value, new value, change in
+            percent, True if the change is an improvement)
+    """
+    before = {result["name"]: result for result in baseline["results"]}
+    rows = []
+    for result in run["results"]:
+        old = before.get(result["name"])
+        if old is None:
+            continue
+        for field, value in result.items():
+            previous = old.get(field)
+            if field in SETTINGS or isinstance(value, bool) or not isinstance(value, (int, float)) \
+                    or not isinstance(previous, (int, float)) or not previous:
+                continue
+            change = (value - previous) / abs(previous) * 100
+            lower = bool(LOWER_IS_BETTER.search(field))
+            rows.append((result["name"], field, previous, value, change, (change < 0) == lower))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default=None,
+                        help=f"Comma-separated benchmarks to run, of {', '.join(SUITES)}")
+    parser.add_argument("--quick", action="store_true",
+                        help="Run smaller workloads")
+    parser.add_argument("--output", default=None,
+                        help="Results file; defaults to bench/results/<timestamp>_<commit>.json")
+    parser.add_argument("--compare", default=None,
+                        help="Results file of an earlier run to compare with")
+    args = parser.parse_args()
+
+    run = run_suite(args.only.split(",") if args.only else None, quick=args.quick)
+    path = save_run(run, args.output)
+
+    for result in run["results"]:
+        summary = ", ".join(f"{key} {value:.4g}" if isinstance(value, float) else f"{key} {value}"
+                            for key, value in result.items() if key not in ("name", "suite"))
+        print(f"{result['name']:<32} {summary}")
+    for name, error in run["errors"].items():
+        print(f"{name:<32} FAILED: {error[:200]}")
+    print(f"Results written to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {baseline.get('commit')} ({baseline.get('created_at')}):")
+        for name, field, previous, value, change, better in compare(baseline, run):
+            verdict = "" if abs(change) < 1 else "better" if better else "worse"
+            print(f"{name:<32} {field:<20} {previous:>12.4g} -> {value:<12.4g} {change:+7.1f}% {verdict}")
+
+    return 1 if run["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,8 +3,10 @@ from ..tools.match_data_analyzer import MatchDataAnalyzer
 
 
 class AnalysisAgent(BaseAgent):
-    def __init__(self):
-        super().__init__()
+    model_tier = "fast"
+
+    def __init__(self, model_tier=None):
+        super().__init__(model_tier)
         self.role = "Analysis Agent"
         self.goal = "Interpret data to provide actionable insights"
         self.system_prompt = """
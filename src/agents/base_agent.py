@@ -1,18 +1,46 @@
 import os
+import threading
 from typing import List, Optional
 from llama_index.core.agent import ReActAgent
-from llama_index.llms.gemini import Gemini
-from llama_index.core.tools import BaseTool
+from llama_index.core.tools import BaseTool, FunctionTool
 from llama_index.core.agent.types import BaseAgentWorker
+from .prompt_assembly import PromptAssembler
+from .llm_scheduler import ScheduledLLM
+from .llm_providers import create_llm
+from ..tracing import traced_tools
+
+# Models per tier; COACH_MODEL_FAST and COACH_MODEL_LARGE override them
+MODEL_TIERS = {
+    "fast": "models/gemini-2.0-flash",
+    "large": "models/gemini-2.5-pro-preview-03-25"
+}
+
+
+def model_for_tier(tier: str) -> str:
+    """Return the model name of a tier, honouring the COACH_MODEL_<TIER> variable"""
+    if tier not in MODEL_TIERS:
+        raise ValueError(f"Unknown model tier: {tier}. Use one of {', '.join(MODEL_TIERS)}")
+    return os.getenv(f"COACH_MODEL_{tier.upper()}", MODEL_TIERS[tier])
 
 
 class BaseAgent:
-    def __init__(self):
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        self.llm = Gemini(api_key=self.api_key,
-                          model_name="models/gemini-2.5-pro-preview-03-25")
+    # Retrieval and formatting agents override this with "fast"
+    model_tier = "large"
+
+    def __init__(self, model_tier: Optional[str] = None):
+        """
+        Args:
+            model_tier: "fast" or "large"; defaults to the agent's own tier
+        """
+        self.model_tier = model_tier or self.model_tier
+        self.model_name = model_for_tier(self.model_tier)
+        # Requests of every agent share one rate limit and priority queue;
+        # COACH_LLM_PROVIDER=local swaps Gemini for the offline stand-in
+        self.llm = ScheduledLLM(create_llm(self.model_name))
         self.system_prompt = "You are an AI assistant."
         self.tools = []
+        self.worker = None  # ReActAgent running delegated tasks
+        self._worker_lock = threading.Lock()
 
     def get_tools(self) -> List[BaseTool]:
         """
@@ -38,8 +66,45 @@ class BaseAgent:
             all_tools.extend(additional_tools)
 
         return ReActAgent.from_tools(
-            tools=all_tools,
+            tools=traced_tools(all_tools),
             llm=self.llm,
-            system_prompt=self.system_prompt,
+            react_chat_formatter=PromptAssembler.from_system_prompt(self.system_prompt),
             verbose=True
         )
+
+    @property
+    def name(self) -> str:
+        """Tool-friendly name of the agent, e.g. "planning_agent" """
+        return self.role.lower().replace(" ", "_")
+
+    def delegate(self, task: str) -> str:
+        """
+        Run a self-contained task on this agent and return its answer
+
+        Every task starts from an empty memory, so the coordinator must include
+        the data the task needs. Tasks for the same agent run one at a time.
+
+        Args:
+            task: The task, with any data it needs
+
+        Returns:
+            str: The agent's answer
+        """
+        with self._worker_lock:
+            if self.worker is None:
+                self.worker = self.create()
+            self.worker.reset()
+            try:
+                return str(self.worker.chat(task))
+            except Exception as e:
+                return f"Error from {self.role}: {str(e)}"
+
+    def as_tool(self) -> FunctionTool:
+        """Expose the agent as a tool the coordinator can delegate tasks to"""
+        tool_names = ", ".join(t.metadata.name for t in self.tools)
+        return FunctionTool.from_defaults(
+            name=self.name,
+            description=f"Delegate a task to the {self.role}: {self.goal}. It uses {tool_names}. "
+                        "Pass a complete, self-contained task including any data it needs.",
+            fn=self.delegate
+        )
@@ -1,23 +1,25 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Tuple
 from llama_index.core.tools import BaseTool
 from llama_index.core.agent import ReActAgent
 from llama_index.core.chat_engine.types import ChatMode
 from llama_index.core.chat_engine import SimpleChatEngine
 from llama_index.core.memory import ChatMemoryBuffer
 from .base_agent import BaseAgent
-from llama_index.core.llms import ChatMessage
+from .parallel_tools import ParallelToolRunner, PARALLEL_PROMPT
+from .intent_router import IntentRouter, LIVE_QUESTION
+from .summary_memory import SummarizingMemory
+from .prompt_assembly import PromptAssembler, token_report
+from .llm_scheduler import BACKGROUND, INTERACTIVE, LIVE, lane
+from ..tracing import get_tracer, span, traced_tools
+from llama_index.core.llms import ChatMessage, MessageRole
+from llama_index.core.chat_engine.types import AgentChatResponse
 import logging
+import time
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
-
-class CoordinatorAgent(BaseAgent):
-    def __init__(self):
-        super().__init__()
-        self.role = "Coordinator Agent"
-        self.goal = "Manage user interaction and orchestrate specialized tools"
-        self.agent = None  # To hold the ReActAgent instance
-        self.system_prompt = """
+SYSTEM_PROMPT = """
     You are the central coordinator for the Coach Intelligence System, acting as the primary interface for the user (a football coach).
     Your primary responsibilities are:
     1.  **Understand User Intent:** Accurately interpret the coach's requests, whether they relate to data retrieval, analysis, planning, or visualization.
@@ -29,60 +31,199 @@ class CoordinatorAgent(BaseAgent):
     Address the coach directly and professionally. Your goal is to provide seamless assistance, leveraging the specialized agents behind the scenes without exposing the internal mechanics unless necessary for clarification.
     """
 
-    def create(self, additional_tools: Optional[List[BaseTool]] = None) -> Any:
+# Conversations whose memory stays loaded, most recently used last
+MAX_WARM_CONVERSATIONS = 8
+
+DELEGATION_PROMPT = """
+    **Delegation:** The specialized agents are available as tools (data_retrieval_agent, analysis_agent, planning_agent, visualization_agent). Each one starts every task from scratch, so give it a complete task with all the data it needs, e.g. pass the fetched match data to the analysis_agent. Delegate independent tasks together so they run at the same time.
+    """
+
+
+class CoordinatorAgent(BaseAgent):
+    model_tier = "fast"
+
+    def __init__(self, model_tier=None):
+        super().__init__(model_tier)
+        self.role = "Coordinator Agent"
+        self.goal = "Manage user interaction and orchestrate specialized tools"
+        self.agent = None  # To hold the ReActAgent instance
+        self.parallel_runner = None  # Runs independent tool calls concurrently
+        self.router = None  # Answers single-tool requests without the LLM
+        self.memory = None  # Summary of older turns plus the recent ones
+        self.memories = OrderedDict()  # Warm memories by conversation ID
+        self.system_prompt = SYSTEM_PROMPT
+
+    def create(self, additional_tools: Optional[List[BaseTool]] = None, parallel: bool = True,
+               fast_path: bool = True, sub_agents: Optional[List[BaseAgent]] = None) -> Any:
         """
         Create and return a chat-enabled agent with context management
+
+        Args:
+            additional_tools: Tools the coordinator calls itself
+            sub_agents: Specialized agents the coordinator delegates tasks to;
+                each runs its own tools on its own model tier
+            parallel: Let the agent run independent tool calls concurrently in
+                one step, through the 'run_tools_parallel' tool
+            fast_path: Answer well-structured single-tool requests directly,
+                without the LLM
         """
         all_tools = self.tools.copy()
         if additional_tools:
             all_tools.extend(additional_tools)
 
+        # The router calls the specialized tools directly, delegated or not
+        routable = all_tools + [t for agent in sub_agents or [] for t in agent.get_tools()]
+        self.router = IntentRouter(traced_tools(routable)) if fast_path else None
+
+        # Every tool call, direct or delegated, is traced within the turn
+        all_tools = traced_tools(all_tools)
+        system_prompt = self.system_prompt
+        if sub_agents:
+            all_tools.extend(traced_tools((agent.as_tool() for agent in sub_agents), component="agent"))
+            system_prompt += DELEGATION_PROMPT
+        if parallel and len(all_tools) > 1:
+            self.parallel_runner = ParallelToolRunner(all_tools)
+            all_tools.extend(traced_tools([self.parallel_runner.tool]))
+            system_prompt += PARALLEL_PROMPT
+
         # Create and store the ReActAgent instance
-        # Let the agent manage its own memory by default
+        # Older turns are summarized so prompts stay within a token budget
+        self.memory = self._new_memory()
+        # The instructions and tool manifest form a static prompt prefix
+        report = token_report(all_tools, system_prompt)
+        logger.info(f"Coordinator prompt prefix: {report['after']} tokens per step, "
+                    f"down from {report['before']} ({report['tools']} tools, {report['unique_tools']} unique)")
         self.agent = ReActAgent.from_tools(
             tools=all_tools,
             llm=self.llm,
-            system_prompt=self.system_prompt,
+            memory=self.memory,
+            react_chat_formatter=PromptAssembler.from_system_prompt(system_prompt),
             verbose=True
         )
 
         return self  # Return the coordinator instance itself
 
+    def _new_memory(self) -> SummarizingMemory:
+        # Summaries wait behind the coach's questions
+        return SummarizingMemory.from_defaults(llm=self.llm.with_lane(BACKGROUND))
+
+    def _use_memory(self, memory: SummarizingMemory):
+        """Make a memory the one the agent reads and writes"""
+        self.memory = memory
+        self.agent.memory = memory
+
     def reset_memory(self):
-        """Reset the internal agent's state and memory"""
+        """Reset the internal agent's state and start with an empty memory"""
         logger.info("Resetting internal ReActAgent state.")
         if self.agent:
+            # Warm memories of other conversations are kept, not cleared
+            self._use_memory(self._new_memory())
             self.agent.reset()
         else:
             logger.warning("Attempted to reset agent before creation.")
 
-    def load_history(self, messages: List[Dict[str, str]]):
-        """Clear agent memory and load historical messages into the agent's memory"""
+    def remember(self, conversation_id: str):
+        """Keep the current memory warm under its conversation ID"""
+        if not self.memory or not conversation_id:
+            return
+        self.memories[conversation_id] = self.memory
+        self.memories.move_to_end(conversation_id)
+        while len(self.memories) > MAX_WARM_CONVERSATIONS:
+            evicted, _ = self.memories.popitem(last=False)
+            logger.debug(f"Evicted warm memory of conversation {evicted}")
+
+    def switch_conversation(self, conversation_id: str,
+                            load: Callable[[], Tuple[List[Dict[str, str]], Optional[Dict[str, Any]]]]) -> bool:
+        """
+        Make a conversation's memory current
+
+        A recently used conversation is switched to without touching its
+        history; any other one is loaded with load_history().
+
+        Args:
+            conversation_id: ID of the conversation
+            load: Returns (messages, memory_state) of the conversation; only
+                called when its memory is not warm
+
+        Returns:
+            bool: True if the memory was warm
+        """
+        if not self.agent:
+            logger.error("Agent not created, cannot switch conversation.")
+            return False
+
+        memory = self.memories.get(conversation_id)
+        if memory is not None:
+            # Clear finished tasks but not the memory, which another conversation owns
+            self.agent.state.reset()
+            self._use_memory(memory)
+            self.memories.move_to_end(conversation_id)
+            logger.info(f"Switched to warm memory of conversation {conversation_id}")
+            return True
+
+        messages, memory_state = load()
+        self.load_history(messages, memory_state)
+        self.remember(conversation_id)
+        return False
+
+    def load_history(self, messages: List[Dict[str, str]], memory_state: Optional[Dict[str, Any]] = None):
+        """
+        Load historical messages into a fresh agent memory
+
+        Args:
+            messages: The conversation, as dicts with 'role' and 'content'
+            memory_state: Summary state saved with the conversation, from
+                memory_state(); reused if it still matches the messages
+        """
         if not self.agent:
             logger.error("Agent not created, cannot load history.")
             return
 
         logger.info(
             f"Loading history into ReActAgent memory ({len(messages)} messages). Resetting agent first.")
-        self.agent.reset()  # Reset the agent's state
-
-        # Access the agent's internal memory buffer and load messages
-        agent_memory = self.agent.memory
-        for msg in messages:
-            logger.debug(
-                f"Loading message to agent memory: Role={msg['role']}, Content='{msg['content'][:50]}...'")
-            agent_memory.put(ChatMessage(
-                role=msg["role"],
-                content=msg["content"]
-            ))
+        self.reset_memory()
+
+        # Load the whole conversation into the agent's memory in one step
+        self.memory.restore([ChatMessage(role=msg["role"], content=msg["content"]) for msg in messages],
+                            memory_state)
         logger.info("History loading into agent memory complete.")
 
+    def memory_state(self) -> Optional[Dict[str, Any]]:
+        """Summary state of the conversation, to save alongside it"""
+        return self.memory.state() if self.memory else None
+
     def chat(self, message: str) -> Any:
-        """Process a chat message using the internal ReActAgent"""
+        """Process a chat message, directly when the router can, otherwise with the ReActAgent"""
         if not self.agent:
             raise RuntimeError(
                 "Agent has not been created. Call create() first.")
+
+        with span("coordinator.turn", "turn", message_chars=len(message)) as turn:
+            response = self._chat(message, turn)
+            turn.set(reply_chars=len(str(response)))
+        breakdown = get_tracer().breakdown(turn.trace_id)
+        logger.info(f"Turn took {turn.duration_ms:.0f} ms: " + ", ".join(
+            f"{component} {ms:.0f} ms" for component, ms in sorted(breakdown.items(), key=lambda c: -c[1])))
+        return response
+
+    def _chat(self, message, turn):
+        if self.router:
+            reply = self.router.handle(message)
+            if reply is not None:
+                turn.set(routed=True)
+                # Keep the turn in memory so follow-ups through the LLM see it
+                self.agent.memory.put(ChatMessage(role=MessageRole.USER, content=message))
+                self.agent.memory.put(ChatMessage(role=MessageRole.ASSISTANT, content=reply))
+                return AgentChatResponse(response=reply)
+
         logger.info(
             f"Coordinator routing message to internal ReActAgent: '{message}'")
         # We don't need to pass history explicitly, agent manages its own memory
-        return self.agent.chat(message)
+        start = time.perf_counter()
+        live = LIVE_QUESTION.search(message) is not None
+        turn.set(routed=False, lane=LIVE if live else INTERACTIVE)
+        with lane(LIVE if live else INTERACTIVE):
+            response = self.agent.chat(message)
+        if self.router:
+            self.router.record_llm_latency(time.perf_counter() - start)
+        return response
@@ -5,8 +5,10 @@ from ..tools.match_data_fetcher import MatchDataFetcher
 
 
 class DataRetrievalAgent(BaseAgent):
-    def __init__(self):
-        super().__init__()
+    model_tier = "fast"
+
+    def __init__(self, model_tier=None):
+        super().__init__(model_tier)
         self.role = "Data Retrieval Agent"
         self.goal = "Gather relevant data from various sources"
         self.system_prompt = """
@@ -0,0 +1,218 @@
+"""
+Fast-path intent router in front of the coordinator
+
+Many coach messages map onto a single tool call: "show me match 123456
+stats", "set piece plan for corners with tall players", "draw a 4-3-3". The
+router recognizes these with keyword rules, extracts the arguments (slots)
+and calls the tool directly, so the reply comes back without an LLM round
+trip. Anything ambiguous, multi-step or conversational falls through to the
+ReAct agent, as do questions about a live match state and planning requests
+that give the tool nothing to tailor its answer to.
+"""
+
+import logging
+import re
+import time
+from typing import Dict, List, Optional
+
+from llama_index.core.tools import BaseTool
+
+from ..formation_layout import parse_formation
+from ..tools.tactics_recommender import TacticsRecommender
+from ..tools.training_planner import focus_from_text
+
+logger = logging.getLogger(__name__)
+
+# Minimum confidence for a message to skip the LLM
+ROUTE_THRESHOLD = 0.75
+
+# A second reading at least this likely makes a message ambiguous
+AMBIGUOUS_CONFIDENCE = 0.5
+
+# Messages that need reasoning, several steps or earlier turns go to the LLM
+FALLTHROUGH = re.compile(
+    r"\b(and then|then|why|how come|explain|compare|versus|vs|analy[sz]e|analysis|"
+    r"instead|what about|it|that|this|them|those|previous|earlier|again|"
+    r"last (game|match|week|session|time)|what we did|you said)\b|\?.*\?")
+
+# Negated requests ("don't give me a formation") are not what the keywords say
+NEGATION = re.compile(r"\b(don'?t|do not|doesn'?t|not|no|never|without|rather than|skip)\b")
+
+# Questions about a match in progress, answered ahead of other LLM work; a
+# match minute ("70th minute", "after 60 minutes") but not a session length
+LIVE_QUESTION = re.compile(
+    r"\b(live|right now|half[- ]?time|in[- ]game|this match|at the break|"
+    r"\d{1,3}(st|nd|rd|th) min(ute)?|(in|after|at) (the )?\d{1,3}(st|nd|rd|th)? min(ute)?s?|we'?re (winning|losing|drawing|\d+-\d+ (up|down))|"
+    r"(sub|substitution|change) now)\b", re.IGNORECASE)
+
+# A score such as "0-1" or "2:2", but not a formation such as "4-4-2"
+SCORE = re.compile(r"(?<![\d-])\d{1,2}\s*[-:]\s*\d{1,2}(?![\d-])|\b(goals?|man) (up|down)\b")
+
+MATCH_ID = re.compile(r"\bmatch(?:\s+(?:id|number|no\.?))?\s*#?\s*(\d{4,})\b")
+SHAPE = re.compile(r"\b(\d(?:-\d){1,5})\b")
+TEAM = re.compile(r"\b(?:recent (?:matches|results|form)|last (?:matches|results|games)|form)"
+                  r"\s+(?:of|for)\s+([a-z][a-z .'-]+?)\s*$")
+
+VISUAL_VERBS = re.compile(r"\b(show|draw|visuali[sz]e|diagram|plot|display|picture)\b")
+FETCH_WORDS = re.compile(r"\b(show|get|fetch|give|stats|statistics|data|score|details|events)\b")
+PLAN_WORDS = re.compile(r"\b(plan|recommend|suggest|best|which|what|need|want|design|routine)\b")
+UPCOMING = re.compile(r"\b(upcoming|next|future)\s+(matches|fixtures|games)\b|\bfixtures\b")
+
+# Strategy types of PlanningTool and the words that identify them
+STRATEGY_KEYWORDS = [
+    ("set_piece", re.compile(r"\b(set[- ]pieces?|corners?|free[- ]kicks?|throw[- ]ins?)\b")),
+    ("training_session", re.compile(r"\b(training|drills?|session)\b")),
+    ("formation", re.compile(r"\b(formations?|shape|system)\b")),
+    ("tactics", re.compile(r"\b(tactics?|tactical|press(ing)?|counter[- ]attack(ing)?|possession|low block)\b"))
+]
+
+REPLY_TEMPLATES = {
+    "match_data": "Here is the data for match {match_id}:\n\n{output}",
+    "team_matches": "Here are the recent matches of {team_name}:\n\n{output}",
+    "upcoming_matches": "Here are the upcoming matches:\n\n{output}",
+    "planning": "{output}",
+    "formation_diagram": "{output}"
+}
+
+
+class IntentRouter:
+    """
+    Answer single-tool requests without the LLM
+
+    Example:
+        >>> router = IntentRouter(tools)
+        >>> router.handle("show me match 123456 stats")
+        'Here is the data for match 123456: ...'
+        >>> router.handle("analyze our last match and suggest a formation") is None
+        True
+    """
+
+    def __init__(self, tools: List[BaseTool], threshold: float = ROUTE_THRESHOLD):
+        """
+        Args:
+            tools: Available tools; routes whose tool is missing are disabled
+            threshold: Minimum confidence for a message to be routed
+        """
+        self.tools: Dict[str, BaseTool] = {t.metadata.name: t for t in tools}
+        self.threshold = threshold
+        self._recommender = TacticsRecommender()
+        self.stats = {"routed": 0, "fallthrough": 0, "routed_seconds": 0.0, "llm_seconds": 0.0}
+
+    def route(self, message: str) -> Optional[dict]:
+        """
+        Classify a message and extract the tool arguments
+
+        Returns:
+            dict: intent, tool, arguments and confidence of the best route, or
+                None when no route applies
+        """
+        text = message.strip().lower()
+        # A live match state needs the LLM with the live lane and the simulator
+        if not text or FALLTHROUGH.search(text) or NEGATION.search(text) \
+                or LIVE_QUESTION.search(text) or SCORE.search(text):
+            return None
+
+        candidates = [c for c in (self._match_data(text), self._formation_diagram(text),
+                                  self._planning(text, message))
+                      if c and c["tool"] in self.tools]
+        if not candidates:
+            return None
+        # Two plausible readings mean the message is ambiguous
+        if sum(1 for c in candidates if c["confidence"] >= AMBIGUOUS_CONFIDENCE) > 1:
+            return None
+        return max(candidates, key=lambda c: c["confidence"])
+
+    def handle(self, message: str) -> Optional[str]:
+        """
+        Answer a message directly if it can be routed with confidence
+
+        Returns:
+            str: The templated reply, or None to let the LLM handle the message
+        """
+        start = time.perf_counter()
+        decision = self.route(message)
+        if decision is None or decision["confidence"] < self.threshold:
+            self.stats["fallthrough"] += 1
+            logger.info(f"Router fallthrough to LLM: {decision['intent'] if decision else 'no intent'} "
+                        f"({decision['confidence'] if decision else 0:.2f})")
+            return None
+
+        try:
+            output = self.tools[decision["tool"]].call(**decision["arguments"]).content
+        except Exception as e:
+            logger.error(f"Routed call to {decision['tool']} failed, falling through: {str(e)}")
+            self.stats["fallthrough"] += 1
+            return None
+
+        elapsed = time.perf_counter() - start
+        self.stats["routed"] += 1
+        self.stats["routed_seconds"] += elapsed
+        logger.info(f"Routed '{message}' to {decision['tool']} as {decision['intent']} "
+                    f"({decision['confidence']:.2f}) in {elapsed * 1000:.1f} ms{self._saving_note(elapsed)}")
+        return REPLY_TEMPLATES[decision["intent"]].format(output=output, **decision["arguments"])
+
+    def record_llm_latency(self, seconds: float):
+        """Record how long a fallthrough message took through the LLM"""
+        self.stats["llm_seconds"] += seconds
+
+    def _saving_note(self, elapsed):
+        """Estimated saving against the average LLM turn, once one was measured"""
+        if not self.stats["fallthrough"] or not self.stats["llm_seconds"]:
+            return ""
+        average = self.stats["llm_seconds"] / self.stats["fallthrough"]
+        return f", about {average - elapsed:.1f} s faster than an LLM turn"
+
+    def _match_data(self, text):
+        match = MATCH_ID.search(text)
+        if match:
+            confidence = 0.9 if FETCH_WORDS.search(text) else 0.7
+            return {"intent": "match_data", "tool": "match_data_fetcher",
+                    "arguments": {"match_id": match.group(1)}, "confidence": confidence}
+
+        match = TEAM.search(text)
+        if match:
+            return {"intent": "team_matches", "tool": "match_data_fetcher",
+                    "arguments": {"team_name": match.group(1).strip().title()}, "confidence": 0.8}
+
+        if UPCOMING.search(text):
+            return {"intent": "upcoming_matches", "tool": "match_data_fetcher",
+                    "arguments": {}, "confidence": 0.8}
+        return None
+
+    def _formation_diagram(self, text):
+        if not VISUAL_VERBS.search(text):
+            return None
+        match = SHAPE.search(text)
+        if not match:
+            return None
+        try:
+            parse_formation(match.group(1))
+        except ValueError:
+            return None
+        return {"intent": "formation_diagram", "tool": "visualization_tool",
+                "arguments": {"data": {"formation": match.group(1)}, "visualization_type": "formation"},
+                "confidence": 0.9}
+
+    def _planning(self, text, message):
+        strategies = [name for name, pattern in STRATEGY_KEYWORDS if pattern.search(text)]
+        if not strategies:
+            return None
+        # Drawing a given shape is a diagram, not a recommendation
+        if "formation" in strategies and VISUAL_VERBS.search(text) and SHAPE.search(text):
+            return None
+        confidence = 0.5 + (0.3 if PLAN_WORDS.search(text) else 0.0)
+        # Set pieces and training name the request precisely; the others may overlap
+        if len(strategies) > 1 and strategies[0] not in ("set_piece", "training_session"):
+            confidence -= 0.3
+        # Without anything to tailor the plan to, the tool would return its
+        # generic recommendation; the LLM can ask or use the conversation
+        if strategies[0] == "training_session":
+            focus, minutes = focus_from_text(text)
+            specific = bool(focus or minutes)
+        else:
+            specific = bool(self._recommender.situation_vector(text).any())
+        if not specific:
+            confidence = min(confidence, AMBIGUOUS_CONFIDENCE)
+        return {"intent": "planning", "tool": "planning_tool",
+                "arguments": {"strategy_type": strategies[0], "team_situation": message.strip()},
+                "confidence": confidence}
@@ -0,0 +1,379 @@
+"""
+LLM providers for the agents
+
+create_llm() builds the model behind every agent. The provider is chosen with
+COACH_LLM_PROVIDER:
+
+    gemini  The Gemini API (default)
+    local   LocalLLM, a deterministic stand-in that needs no API key
+
+LocalLLM either replays a recorded ReAct trace (COACH_LLM_TRACE) or scripts
+one tool call per turn from the tools in the prompt, after a simulated
+latency (COACH_LLM_LATENCY). With it the coordinator, the tools and the
+conversation store can be load-tested offline, at no cost. Traces are recorded
+by running with COACH_LLM_RECORD set to the file to write.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.llms import (ChatMessage, ChatResponse, ChatResponseAsyncGen, ChatResponseGen,
+                                   CompletionResponse, CompletionResponseAsyncGen, CompletionResponseGen,
+                                   CustomLLM, LLM, LLMMetadata, MessageRole)
+from llama_index.core.llms.callbacks import llm_chat_callback, llm_completion_callback
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROVIDER = "gemini"
+
+# Version of the trace file format; bump when the layout changes
+TRACE_VERSION = 1
+
+# Tools the scripted stand-in calls for a question, first one present wins
+SCRIPT = (
+    (r"formation|tactic|press|plan|strateg|training|drill|lineup|line-up|opponent",
+     ("planning_agent", "planning_tool")),
+    (r"chart|plot|visuali[sz]|heat ?map|draw|diagram",
+     ("visualization_agent", "visualization_tool")),
+    (r"analy[sz]|stat|possession|xg|performance|trend",
+     ("analysis_agent", "match_data_analyzer")),
+    (r"match|score|result|fixture|game|search|news",
+     ("data_retrieval_agent", "match_data_fetcher", "search_tool")),
+)
+
+# Tools the script never picks on its own, as their input is not free text
+UNSCRIPTED_TOOLS = {"run_tools_parallel"}
+
+TOOL_LINE = re.compile(r"^> (\w+):.*?(?:\n  Args: (.*))?$", re.MULTILINE)
+
+
+def parse_latency(spec: Optional[str]) -> Callable[[random.Random], float]:
+    """
+    Parse a latency distribution, in seconds
+
+    Args:
+        spec: "fixed:0.5", "uniform:0.2,1.5" or "lognormal:MEDIAN,SIGMA";
+            empty for no latency
+
+    Returns:
+        A function drawing one latency from a random generator
+    """
+    if not spec:
+        return lambda rng: 0.0
+    kind, _, params = spec.partition(":")
+    try:
+        values = [float(v) for v in params.split(",")] if params else []
+        if kind == "fixed" and len(values) == 1:
+            return lambda rng: values[0]
+        if kind == "uniform" and len(values) == 2:
+            return lambda rng: rng.uniform(values[0], values[1])
+        if kind == "lognormal" and len(values) == 2:
+            mu = math.log(values[0])
+            return lambda rng: rng.lognormvariate(mu, values[1])
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid latency distribution: {spec}. "
+                     "Use fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA")
+
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    """Read the turns of a recorded trace file"""
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("version") != TRACE_VERSION:
+        raise ValueError(f"Trace {path} has version {data.get('version')}, expected {TRACE_VERSION}")
+    return data["turns"]
+
+
+def split_turn(messages: Sequence[ChatMessage]):
+    """
+    Split a ReAct prompt into its question and the observations since
+
+    Returns:
+        tuple: (system prompt, question, observations)
+    """
+    system = messages[0].content if messages and messages[0].role == MessageRole.SYSTEM else ""
+    question, observations = "", []
+    for message in messages:
+        content = message.content or ""
+        if content.startswith("Observation:"):
+            observations.append(content[len("Observation:"):].strip())
+        elif message.role == MessageRole.USER:
+            question, observations = content, []
+    return system, question, observations
+
+
+def required_text_args(args: str) -> List[str]:
+    """Required string or untyped arguments in a compact argument list, see compact_args"""
+    names = []
+    if not args or args == "none":
+        return names
+    for arg in args.split(", "):
+        name, _, kind = arg.partition(": ")
+        if name.isidentifier() and "=" not in arg and "(optional)" not in arg and kind in ("", "string"):
+            names.append(name)
+    return names
+
+
+def turn_key(question: str) -> str:
+    """Normalized question a trace turn is looked up by"""
+    return " ".join(question.lower().split())
+
+
+class LocalLLM(CustomLLM):
+    """
+    Deterministic local stand-in for the Gemini models
+
+    With a trace, each question replays the steps recorded for it, or for a
+    recorded question chosen by its hash. Without one, the first step calls a
+    tool picked by SCRIPT from those in the prompt, and the next step answers
+    with the observation. Answers are the same for the same question and seed.
+    """
+
+    model_name: str = Field(default="local", description="Name reported in the metadata")
+    latency: Optional[str] = Field(default=None, description="Latency distribution, see parse_latency")
+    seed: int = Field(default=0, description="Seed of the latency draws")
+    turns: List[Dict[str, Any]] = Field(default_factory=list, description="Recorded trace turns")
+
+    _draw: Any = PrivateAttr()
+    _rng: Any = PrivateAttr()
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _by_question: Dict[str, Dict[str, Any]] = PrivateAttr(default_factory=dict)
+    _stats: Dict[str, Any] = PrivateAttr(default_factory=lambda: {"calls": 0, "simulated_seconds": 0.0})
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._draw = parse_latency(self.latency)
+        self._rng = random.Random(self.seed)
+        self._by_question = {turn_key(turn["question"]): turn for turn in self.turns}
+
+    @classmethod
+    def from_env(cls, model_name: str = "local") -> "LocalLLM":
+        """Configure from COACH_LLM_TRACE, COACH_LLM_LATENCY and COACH_LLM_SEED"""
+        trace = os.getenv("COACH_LLM_TRACE")
+        return cls(model_name=model_name, latency=os.getenv("COACH_LLM_LATENCY"),
+                   seed=int(os.getenv("COACH_LLM_SEED", 0)), turns=load_trace(trace) if trace else [])
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "LocalLLM"
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(model_name=self.model_name, is_chat_model=True)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Number of calls and total simulated latency, in seconds"""
+        with self._lock:
+            return dict(self._stats)
+
+    def _wait(self):
+        with self._lock:
+            delay = max(0.0, self._draw(self._rng))
+            self._stats["calls"] += 1
+            self._stats["simulated_seconds"] += delay
+        if delay:
+            time.sleep(delay)
+
+    def respond(self, messages: Sequence[ChatMessage]) -> str:
+        """The next ReAct step for a prompt, without latency"""
+        system, question, observations = split_turn(messages)
+        if self.turns:
+            turn = self._by_question.get(turn_key(question))
+            if turn is None:
+                index = int(hashlib.sha1(turn_key(question).encode("utf-8")).hexdigest(), 16)
+                turn = self.turns[index % len(self.turns)]
+            steps = turn["steps"]
+            return steps[min(len(observations), len(steps) - 1)]
+
+        if observations:
+            result = " ".join(observations[-1].split())[:400]
+            return f"Thought: I can answer without using any more tools.\nAnswer: {result}"
+
+        tool, args = self._pick_tool(system, question)
+        if tool is None:
+            return f"Thought: I can answer without using any more tools.\nAnswer: Noted: {question}"
+        return (f"Thought: I need to use a tool to help me answer the question.\n"
+                f"Action: {tool}\nAction Input: {json.dumps({arg: question for arg in args})}")
+
+    def _pick_tool(self, system, question):
+        """Tool and its required text arguments for a question, from the tools in the prompt"""
+        tools = {name: required_text_args(args)
+                 for name, args in TOOL_LINE.findall(system) if name not in UNSCRIPTED_TOOLS}
+        if not tools:
+            return None, []
+        for pattern, candidates in SCRIPT:
+            if re.search(pattern, question, re.IGNORECASE):
+                for name in candidates:
+                    if name in tools:
+                        return name, tools[name]
+        name = next(iter(tools))
+        return name, tools[name]
+
+    @llm_chat_callback()
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        self._wait()
+        return ChatResponse(message=ChatMessage(role=MessageRole.ASSISTANT, content=self.respond(messages)))
+
+    @llm_chat_callback()
+    def stream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseGen:
+        response = self.chat(messages, **kwargs)
+
+        def gen() -> ChatResponseGen:
+            yield ChatResponse(message=response.message, delta=response.message.content)
+
+        return gen()
+
+    @llm_completion_callback()
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        # Completions are summaries: keep the last lines of the prompt
+        self._wait()
+        lines = [line for line in prompt.splitlines() if line.strip()]
+        return CompletionResponse(text="\n".join(lines[-5:])[:1000])
+
+    @llm_completion_callback()
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        response = self.complete(prompt, formatted=formatted, **kwargs)
+
+        def gen() -> CompletionResponseGen:
+            yield CompletionResponse(text=response.text, delta=response.text)
+
+        return gen()
+
+
+# Turns and lock of each trace file being recorded
+_recordings = {}
+_recordings_lock = threading.Lock()
+
+
+class TraceRecorder(LLM):
+    """
+    Record the ReAct steps of a real model to a trace file LocalLLM replays
+
+    Steps are grouped by question; the file is rewritten after every step.
+    """
+
+    llm: Any = Field(description="The recorded LLM")
+    path: str = Field(description="Trace file to write")
+
+    _turns: Dict[str, Dict[str, Any]] = PrivateAttr()
+    _lock: Any = PrivateAttr()
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        # Every agent's recorder writes to the same file
+        with _recordings_lock:
+            if self.path not in _recordings:
+                turns = load_trace(self.path) if os.path.exists(self.path) else []
+                _recordings[self.path] = ({turn_key(turn["question"]): turn for turn in turns},
+                                          threading.Lock())
+            self._turns, self._lock = _recordings[self.path]
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "TraceRecorder"
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return self.llm.metadata
+
+    def _record(self, messages, content):
+        _, question, observations = split_turn(messages)
+        with self._lock:
+            turn = self._turns.setdefault(turn_key(question), {"question": question, "steps": []})
+            # A new run of a recorded question starts it over
+            del turn["steps"][len(observations):]
+            turn["steps"].append(content)
+            with open(self.path, "w") as f:
+                json.dump({"version": TRACE_VERSION, "turns": list(self._turns.values())}, f, indent=2)
+
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        response = self.llm.chat(messages, **kwargs)
+        self._record(messages, response.message.content or "")
+        return response
+
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        return self.llm.complete(prompt, formatted=formatted, **kwargs)
+
+    def stream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseGen:
+        responses = self.llm.stream_chat(messages, **kwargs)
+
+        def gen() -> ChatResponseGen:
+            response = None
+            for response in responses:
+                yield response
+            # Each response of a chat stream holds the whole message so far
+            if response is not None:
+                self._record(messages, response.message.content or "")
+
+        return gen()
+
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        return self.llm.stream_complete(prompt, formatted=formatted, **kwargs)
+
+    async def achat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        return await asyncio.to_thread(self.chat, messages, **kwargs)
+
+    async def acomplete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        return await asyncio.to_thread(self.complete, prompt, formatted=formatted, **kwargs)
+
+    async def astream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseAsyncGen:
+        responses = await self.llm.astream_chat(messages, **kwargs)
+
+        async def gen() -> ChatResponseAsyncGen:
+            response = None
+            async for response in responses:
+                yield response
+            if response is not None:
+                # Writing the trace file blocks
+                await asyncio.to_thread(self._record, messages, response.message.content or "")
+
+        return gen()
+
+    async def astream_complete(self, prompt: str, formatted: bool = False,
+                               **kwargs: Any) -> CompletionResponseAsyncGen:
+        return await self.llm.astream_complete(prompt, formatted=formatted, **kwargs)
+
+
+def _gemini(model_name: str) -> LLM:
+    from llama_index.llms.gemini import Gemini
+    return Gemini(api_key=os.getenv("GEMINI_API_KEY"), model_name=model_name)
+
+
+PROVIDERS: Dict[str, Callable[[str], LLM]] = {
+    "gemini": _gemini,
+    "local": LocalLLM.from_env,
+}
+
+
+def create_llm(model_name: str, provider: Optional[str] = None) -> LLM:
+    """
+    Build the LLM for a model
+
+    Args:
+        model_name: Model to use, e.g. from model_for_tier()
+        provider: Name in PROVIDERS; defaults to COACH_LLM_PROVIDER, or gemini
+
+    Returns:
+        LLM: The model, recording to COACH_LLM_RECORD if it is set
+    """
+    provider = provider or os.getenv("COACH_LLM_PROVIDER", DEFAULT_PROVIDER)
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {provider}. Use one of {', '.join(PROVIDERS)}")
+    llm = PROVIDERS[provider](model_name)
+    record = os.getenv("COACH_LLM_RECORD")
+    if record:
+        logger.info(f"Recording LLM steps of {model_name} to {record}")
+        llm = TraceRecorder(llm=llm, path=record)
+    return llm
@@ -0,0 +1,510 @@
+"""
+Central scheduler for LLM requests
+
+Every agent's LLM is wrapped in a ScheduledLLM, so all requests in the
+process pass through one LLMScheduler:
+
+    - a token bucket keeps the request rate under the API quota
+    - a semaphore bounds the number of requests in flight
+    - waiting requests are admitted by lane, live in-match questions first,
+      then interactive chat, then background work such as summarization
+    - transient failures (quota, overload, timeouts) are retried with
+      jittered exponential backoff
+
+Queue depth, wait times, retries and failures are available from metrics().
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import AsyncGenerator, Generator
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.llms import (ChatMessage, ChatResponse, ChatResponseAsyncGen, ChatResponseGen,
+                                   CompletionResponse, CompletionResponseAsyncGen, CompletionResponseGen,
+                                   LLM, LLMMetadata)
+
+from .summary_memory import CHARS_PER_TOKEN, count_tokens
+from ..tracing import annotate, span
+
+logger = logging.getLogger(__name__)
+
+# Lanes in admission order
+LIVE = "live"
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+LANES = (LIVE, INTERACTIVE, BACKGROUND)
+
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_BURST = 5
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 4
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+
+# Waits longer than this are logged
+SLOW_WAIT_SECONDS = 1.0
+
+# Error class names and status codes worth retrying
+TRANSIENT_ERRORS = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+                    "DeadlineExceeded", "GatewayTimeout", "TimeoutError", "ConnectionError"}
+TRANSIENT_CODES = ("429", "500", "502", "503", "504")
+
+# Lane of the requests made by the current task, see lane()
+_current_lane = contextvars.ContextVar("llm_lane", default=None)
+
+
+def is_transient(error: Exception) -> bool:
+    """Return True if a failed request is worth retrying"""
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if names & TRANSIENT_ERRORS:
+        return True
+    text = str(error)
+    return any(code in text for code in TRANSIENT_CODES) or "quota" in text.lower()
+
+
+def record_usage(current, response) -> None:
+    """
+    Set the token counts of a response on its span
+
+    Gemini reports prompt, completion and cached tokens; for other models the
+    completion is estimated and the prompt estimate is kept.
+    """
+    raw = response.raw if isinstance(response.raw, dict) else {}
+    usage = raw.get("usage_metadata")
+    if usage:
+        cached = usage.get("cached_content_token_count") or 0
+        current.set(prompt_tokens=usage.get("prompt_token_count") or 0,
+                    completion_tokens=usage.get("candidates_token_count") or 0,
+                    cached_tokens=cached, cache_hit=cached > 0, tokens_estimated=False)
+        return
+    text = response.message.content if isinstance(response, ChatResponse) else response.text
+    current.set(completion_tokens=count_tokens(text or ""), tokens_estimated=True)
+
+
+@contextmanager
+def lane(name: str):
+    """
+    Run the LLM requests made inside the block in a lane
+
+    Example:
+        >>> with lane(LIVE):
+        ...     coordinator.agent.chat("We're 1-0 down at half-time, what do we change?")
+    """
+    if name not in LANES:
+        raise ValueError(f"Unknown lane: {name}. Use one of {', '.join(LANES)}")
+    token = _current_lane.set(name)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+class LLMScheduler:
+    """
+    Rate-limit, prioritize and retry LLM requests
+
+    Example:
+        >>> scheduler = LLMScheduler(requests_per_minute=60, max_concurrency=4)
+        >>> scheduler.run(llm.chat, messages, lane=LIVE)
+    """
+
+    def __init__(self, requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE, burst: int = DEFAULT_BURST,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, max_retries: int = DEFAULT_MAX_RETRIES,
+                 base_backoff: float = BASE_BACKOFF, max_backoff: float = MAX_BACKOFF):
+        """
+        Args:
+            requests_per_minute: Sustained request rate
+            burst: Requests allowed at once after an idle period
+            max_concurrency: Requests in flight at once
+            max_retries: Retries of a request after a transient failure
+            base_backoff, max_backoff: Bounds of the backoff delay, in seconds
+        """
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._waiting = []  # heap of (lane rank, sequence number)
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._metrics = {
+            "in_flight": 0,
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "lanes": {name: {"queued": 0, "max_queued": 0, "admitted": 0,
+                             "wait_seconds": 0.0, "max_wait_seconds": 0.0} for name in LANES}
+        }
+
+    def run(self, fn: Callable, *args, lane: Optional[str] = None, **kwargs) -> Any:
+        """
+        Make a request once it is admitted, retrying transient failures
+
+        Args:
+            fn: The request, e.g. llm.chat
+            lane: Lane of the request; defaults to the current lane(), or
+                INTERACTIVE
+
+        Returns:
+            The result of fn
+        """
+        lane = lane or _current_lane.get() or INTERACTIVE
+        waited = 0.0
+        for attempt in range(self.max_retries + 1):
+            waited += self._acquire(lane)
+            annotate(lane=lane, queue_wait_ms=waited * 1000, retries=attempt)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+            finally:
+                self._release()
+            time.sleep(delay)
+
+    def stream(self, fn: Callable, *args, lane: Optional[str] = None, **kwargs) -> "HeldStream":
+        """
+        Open a stream once admitted, retrying transient failures to open it
+
+        The stream keeps its slot until it is used up or closed, so streams
+        count against max_concurrency for as long as they run.
+
+        Args:
+            fn: The request, e.g. llm.stream_chat
+            lane: Lane of the request; defaults to the current lane(), or
+                INTERACTIVE
+
+        Returns:
+            HeldStream: The responses of the stream
+        """
+        lane = lane or _current_lane.get() or INTERACTIVE
+        waited = 0.0
+        for attempt in range(self.max_retries + 1):
+            waited += self._acquire(lane)
+            annotate(lane=lane, queue_wait_ms=waited * 1000, retries=attempt)
+            try:
+                responses = fn(*args, **kwargs)
+            except BaseException as e:
+                self._release()
+                delay = self._retry_delay(attempt, e) if isinstance(e, Exception) else None
+                if delay is None:
+                    raise
+            else:
+                return HeldStream(responses, self._release)
+            time.sleep(delay)
+
+    async def astream(self, fn: Callable, *args, lane: Optional[str] = None, **kwargs) -> "HeldAsyncStream":
+        """
+        Open an async stream once admitted, like stream()
+
+        Admission blocks, so it waits in a worker thread rather than in the
+        event loop.
+
+        Args:
+            fn: The request, e.g. llm.astream_chat
+
+        Returns:
+            HeldAsyncStream: The responses of the stream
+        """
+        lane = lane or _current_lane.get() or INTERACTIVE
+        waited = 0.0
+        for attempt in range(self.max_retries + 1):
+            waited += await asyncio.to_thread(self._acquire, lane)
+            annotate(lane=lane, queue_wait_ms=waited * 1000, retries=attempt)
+            try:
+                responses = await fn(*args, **kwargs)
+            except BaseException as e:
+                self._release()
+                delay = self._retry_delay(attempt, e) if isinstance(e, Exception) else None
+                if delay is None:
+                    raise
+            else:
+                return HeldAsyncStream(responses, self._release)
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, attempt, error):
+        """Seconds to wait before retrying a failed request, or None to give up"""
+        if attempt == self.max_retries or not is_transient(error):
+            with self._cond:
+                self._metrics["failures"] += 1
+            return None
+        delay = self.backoff(attempt)
+        logger.warning(f"LLM request failed ({type(error).__name__}), retry {attempt + 1} "
+                       f"of {self.max_retries} in {delay:.1f}s: {str(error)[:120]}")
+        with self._cond:
+            self._metrics["retries"] += 1
+        return delay
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before a retry: exponential, capped, with jitter so clients spread out"""
+        return random.uniform(0.5, 1.0) * min(self.max_backoff, self.base_backoff * 2 ** attempt)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, requests in flight, wait times, retries and failures"""
+        with self._cond:
+            snapshot = dict(self._metrics)
+            snapshot["lanes"] = {name: dict(values) for name, values in self._metrics["lanes"].items()}
+        for values in snapshot["lanes"].values():
+            values["mean_wait_seconds"] = values["wait_seconds"] / values["admitted"] if values["admitted"] else 0.0
+        return snapshot
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _acquire(self, lane):
+        """
+        Wait until the request is first in line, a slot is free and the bucket has a token
+
+        Returns:
+            float: Seconds waited
+        """
+        entry = (LANES.index(lane), next(self._sequence))
+        stats = self._metrics["lanes"][lane]
+        start = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            stats["queued"] += 1
+            stats["max_queued"] = max(stats["max_queued"], stats["queued"])
+            try:
+                while True:
+                    timeout = None
+                    if self._waiting[0] == entry and self._in_flight < self.max_concurrency:
+                        self._refill()
+                        if self._tokens >= 1:
+                            break
+                        timeout = (1 - self._tokens) / self.rate
+                    self._cond.wait(timeout)
+            except BaseException:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                stats["queued"] -= 1
+                self._cond.notify_all()
+                raise
+
+            heapq.heappop(self._waiting)
+            self._tokens -= 1
+            self._in_flight += 1
+            waited = time.monotonic() - start
+            stats["queued"] -= 1
+            stats["admitted"] += 1
+            stats["wait_seconds"] += waited
+            stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+            self._metrics["requests"] += 1
+            self._metrics["in_flight"] = self._in_flight
+            # The next request in line may be admitted too
+            self._cond.notify_all()
+
+        if waited > SLOW_WAIT_SECONDS:
+            logger.info(f"LLM request in lane {lane} waited {waited:.1f}s "
+                        f"({len(self._waiting)} still queued)")
+        return waited
+
+    def _release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._metrics["in_flight"] = self._in_flight
+            self._cond.notify_all()
+
+
+class _Slot:
+    """A scheduler slot released exactly once"""
+
+    def __init__(self, release):
+        self._release = release
+        self._lock = threading.Lock()
+
+    def release(self):
+        with self._lock:
+            release, self._release = self._release, None
+        if release is not None:
+            release()
+
+
+class HeldStream(Generator):
+    """
+    A stream of responses holding its scheduler slot until it ends
+
+    The slot is released when the stream is used up, fails, is closed or is
+    garbage collected.
+    """
+
+    def __init__(self, responses, release):
+        self._responses = iter(responses)
+        self._slot = _Slot(release)
+
+    def send(self, value):
+        try:
+            return next(self._responses)
+        except BaseException:
+            self.close()
+            raise
+
+    def throw(self, typ, value=None, traceback=None):
+        self.close()
+        return super().throw(typ, value, traceback)
+
+    def close(self):
+        self._slot.release()
+        close = getattr(self._responses, "close", None)
+        if close is not None:
+            close()
+
+    def __del__(self):
+        self._slot.release()
+
+
+class HeldAsyncStream(AsyncGenerator):
+    """The async counterpart of HeldStream"""
+
+    def __init__(self, responses, release):
+        self._responses = responses.__aiter__()
+        self._slot = _Slot(release)
+
+    async def asend(self, value):
+        try:
+            return await self._responses.__anext__()
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def athrow(self, typ, value=None, traceback=None):
+        await self.aclose()
+        return await super().athrow(typ, value, traceback)
+
+    async def aclose(self):
+        self._slot.release()
+        aclose = getattr(self._responses, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    def __del__(self):
+        self._slot.release()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """
+    The process-wide scheduler, configured from the environment on first use
+
+    COACH_LLM_RPM, COACH_LLM_BURST and COACH_LLM_CONCURRENCY override the
+    request rate, burst and concurrency limits.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(
+                requests_per_minute=float(os.getenv("COACH_LLM_RPM", DEFAULT_REQUESTS_PER_MINUTE)),
+                burst=int(os.getenv("COACH_LLM_BURST", DEFAULT_BURST)),
+                max_concurrency=int(os.getenv("COACH_LLM_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+            )
+        return _scheduler
+
+
+class ScheduledLLM(LLM):
+    """
+    An LLM whose requests go through the scheduler
+
+    Streaming calls are admitted when the stream is opened and hold their
+    slot until the stream is used up or closed.
+    """
+
+    llm: Any = Field(description="The wrapped LLM")
+    default_lane: str = Field(default=INTERACTIVE, description="Lane when no lane() is active")
+
+    _scheduler: LLMScheduler = PrivateAttr()
+
+    def __init__(self, llm: Any, default_lane: str = INTERACTIVE,
+                 scheduler: Optional[LLMScheduler] = None, **kwargs: Any):
+        super().__init__(llm=llm, default_lane=default_lane, **kwargs)
+        self._scheduler = scheduler or get_scheduler()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "ScheduledLLM"
+
+    @property
+    def scheduler(self) -> LLMScheduler:
+        return self._scheduler
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return self.llm.metadata
+
+    def with_lane(self, default_lane: str) -> "ScheduledLLM":
+        """The same LLM and scheduler with another default lane"""
+        return ScheduledLLM(self.llm, default_lane=default_lane, scheduler=self._scheduler)
+
+    def _lane(self):
+        return _current_lane.get() or self.default_lane
+
+    def _run(self, fn, *args, **kwargs):
+        return self._scheduler.run(fn, *args, lane=self._lane(), **kwargs)
+
+    @contextmanager
+    def _span(self, name, prompt_chars):
+        with span(f"llm.{name}", "llm", model=self.llm.metadata.model_name,
+                  prompt_tokens=prompt_chars // CHARS_PER_TOKEN + 1) as current:
+            yield current
+
+    def _traced(self, name, prompt_chars, fn, *args, **kwargs):
+        """Run a request in an "llm" span with its token counts and cache hits"""
+        with self._span(name, prompt_chars) as current:
+            response = self._run(fn, *args, **kwargs)
+            if isinstance(response, (ChatResponse, CompletionResponse)):
+                record_usage(current, response)
+            return response
+
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        return self._traced("chat", sum(len(m.content or "") for m in messages),
+                            self.llm.chat, messages, **kwargs)
+
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        return self._traced("complete", len(prompt), self.llm.complete, prompt, formatted=formatted, **kwargs)
+
+    # The spans of streaming calls cover opening the stream
+
+    def stream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseGen:
+        with self._span("stream_chat", sum(len(m.content or "") for m in messages)):
+            return self._scheduler.stream(self.llm.stream_chat, messages, lane=self._lane(), **kwargs)
+
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        with self._span("stream_complete", len(prompt)):
+            return self._scheduler.stream(self.llm.stream_complete, prompt, lane=self._lane(),
+                                          formatted=formatted, **kwargs)
+
+    async def achat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        # to_thread carries the current lane over to the worker thread
+        return await asyncio.to_thread(self.chat, messages, **kwargs)
+
+    async def acomplete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        return await asyncio.to_thread(self.complete, prompt, formatted=formatted, **kwargs)
+
+    async def astream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseAsyncGen:
+        with self._span("astream_chat", sum(len(m.content or "") for m in messages)):
+            return await self._scheduler.astream(self.llm.astream_chat, messages, lane=self._lane(), **kwargs)
+
+    async def astream_complete(self, prompt: str, formatted: bool = False,
+                               **kwargs: Any) -> CompletionResponseAsyncGen:
+        with self._span("astream_complete", len(prompt)):
+            return await self._scheduler.astream(self.llm.astream_complete, prompt, lane=self._lane(),
+                                                 formatted=formatted, **kwargs)
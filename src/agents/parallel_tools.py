@@ -0,0 +1,130 @@
+"""
+Parallel tool execution for the coordinator
+
+A ReAct step runs one tool, so a request that needs data, analysis and a plan
+costs one LLM round-trip per tool. The "run_tools_parallel" tool lets the
+coordinator issue several independent calls in a single step: they run
+concurrently on a thread pool and their outputs come back as one observation.
+Calls to the same tool run one after another, since the tools keep state
+(caches, plotting) that is not meant to be shared across threads.
+"""
+
+import contextvars
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from llama_index.core.tools import BaseTool, FunctionTool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+PARALLEL_TOOL_NAME = "run_tools_parallel"
+
+PARALLEL_PROMPT = f"""
+    **Parallel Tool Calls:** When a request needs several tool calls that do not depend on each other's results (e.g. fetching match data and retrieving coaching documents), make them in a single step with the '{PARALLEL_TOOL_NAME}' tool instead of one step per tool. Only call tools one at a time when a call needs the output of another.
+    """
+
+
+class ParallelToolRunner:
+    """
+    Run independent tool calls concurrently and merge their outputs
+
+    Example:
+        >>> runner = ParallelToolRunner(tools)
+        >>> runner.run('[{"tool": "planning_tool", "input": {"strategy_type": "tactics"}}]')
+        '[1] planning_tool:\\nTactical Approach Recommendations: ...'
+    """
+
+    def __init__(self, tools: List[BaseTool], max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Args:
+            tools: Tools that may be called, looked up by name
+            max_workers: Maximum number of calls running at once
+        """
+        self.tools: Dict[str, BaseTool] = {t.metadata.name: t for t in tools}
+        self.max_workers = max_workers
+        self._locks = {name: threading.Lock() for name in self.tools}
+        self._pool = None
+
+        self.name = PARALLEL_TOOL_NAME
+        self.description = (
+            "Run several independent tool calls at once and get all their results in one "
+            "observation. calls is a JSON list of {\"tool\": <tool name>, \"input\": {<arguments>}}, "
+            f"e.g. [{{\"tool\": \"planning_tool\", \"input\": {{\"strategy_type\": \"tactics\"}}}}]. "
+            f"Available tools: {', '.join(self.tools)}."
+        )
+        self.tool = FunctionTool.from_defaults(
+            name=self.name,
+            description=self.description,
+            fn=self.run
+        )
+
+    def run(self, calls) -> str:
+        """
+        Run tool calls concurrently
+
+        Args:
+            calls (str | list): JSON list of {"tool": name, "input": {arguments}}
+
+        Returns:
+            str: The output of every call, in the order given
+        """
+        try:
+            if isinstance(calls, str):
+                calls = json.loads(calls)
+            if isinstance(calls, dict):
+                calls = [calls]
+            if not isinstance(calls, list) or not calls:
+                return "Error running tools: calls must be a non-empty JSON list of {\"tool\", \"input\"}."
+        except json.JSONDecodeError as e:
+            return f"Error running tools: calls is not valid JSON ({str(e)})"
+
+        if len(calls) == 1:
+            outputs = [self._call(calls[0])]
+        else:
+            # Each call keeps the caller's context, e.g. its LLM lane
+            contexts = [contextvars.copy_context() for _ in calls]
+            outputs = list(self._get_pool().map(lambda context, call: context.run(self._call, call),
+                                                contexts, calls))
+
+        return "\n\n".join(f"[{i + 1}] {call.get('tool', '?') if isinstance(call, dict) else '?'}:\n{output}"
+                           for i, (call, output) in enumerate(zip(calls, outputs)))
+
+    def _call(self, call) -> str:
+        """Run one call, returning its output or the error as text"""
+        if not isinstance(call, dict) or call.get("tool") not in self.tools:
+            name = call.get("tool") if isinstance(call, dict) else call
+            return f"Error: unknown tool {name}. Available tools: {', '.join(self.tools)}"
+
+        name = call["tool"]
+        arguments = call.get("input") or {}
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments)
+            except json.JSONDecodeError:
+                arguments = {"input": arguments}
+
+        logger.info(f"Running {name} in parallel batch with {arguments}")
+        try:
+            with self._locks[name]:
+                return self.tools[name].call(**arguments).content
+        except Exception as e:
+            logger.error(f"Error running {name}: {str(e)}")
+            return f"Error running {name}: {str(e)}"
+
+    def _get_pool(self):
+        """Return the thread pool, starting it on first use"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="coach-tool")
+        return self._pool
+
+    def close(self):
+        """Shut down the thread pool, if one was started"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
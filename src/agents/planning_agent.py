@@ -3,8 +3,8 @@ from ..tools.planning_tool import PlanningTool
 
 
 class PlanningAgent(BaseAgent):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, model_tier=None):
+        super().__init__(model_tier)
         self.role = "Planning Agent"
         self.goal = "Design effective football strategies and tactics"
         self.system_prompt = """
@@ -13,7 +13,7 @@ class PlanningAgent(BaseAgent):
     1.  **Formation Design:** Recommending or designing team formations suited for specific objectives (e.g., attacking, defending, controlling midfield) using the 'planning_tool'.
     2.  **Tactical Recommendations:** Suggesting specific tactical approaches (e.g., high press, low block, counter-attack, possession play) and detailing their implementation using the 'planning_tool'.
     3.  **Set-Piece Design:** Outlining set-piece routines (corners, free kicks) using the 'planning_tool'.
-    4.  **Training Session Plans:** Creating structured training drills and sessions focused on specific skills or tactical elements (if requested and tool supports).
+    4.  **Training Session Plans:** Scheduling drills into sessions, or a whole week for several squads, within duration, equipment and load limits using the 'planning_tool' with strategy_type 'training_session'.
 
     Provide practical, well-reasoned plans and recommendations to the Coordinator Agent. Your output should be directly usable by a coach.
     """
@@ -0,0 +1,152 @@
+"""
+Prompt assembly for the ReAct agents
+
+Every ReAct step sends a system header made of the agent's instructions and
+the tool manifest, followed by the conversation and the reasoning so far.
+The header only changes when the tool set does, so it is split off as a
+static prefix: the manifest is compacted (duplicate tools dropped, whitespace
+collapsed, argument schemas reduced to one line), rendered once per tool set
+and reused byte for byte. An unchanged prefix is what Gemini's implicit
+context caching matches on; explicit cached contents are not exposed by the
+llama-index Gemini client and need a longer prefix than ours anyway.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from llama_index.core.agent.react.formatter import ReActChatFormatter, get_react_tool_descriptions
+from llama_index.core.agent.react.prompts import CONTEXT_REACT_CHAT_SYSTEM_HEADER, REACT_CHAT_SYSTEM_HEADER
+from llama_index.core.agent.react.types import BaseReasoningStep, ObservationReasoningStep
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.llms import ChatMessage, MessageRole
+from llama_index.core.tools import BaseTool
+
+from .summary_memory import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def unique_tools(tools: Sequence[BaseTool]) -> List[BaseTool]:
+    """Tools with duplicate names removed, first one kept"""
+    seen = set()
+    unique = []
+    for tool in tools:
+        if tool.metadata.name not in seen:
+            seen.add(tool.metadata.name)
+            unique.append(tool)
+    return unique
+
+
+def compact_args(tool: BaseTool) -> str:
+    """One-line argument list of a tool, e.g. 'match_id (optional), team_name (optional)'"""
+    schema = tool.metadata.get_parameters_dict()
+    required = set(schema.get("required", []))
+    args = []
+    for name, spec in schema.get("properties", {}).items():
+        kind = spec.get("type")
+        if not kind and "anyOf" in spec:
+            kinds = [s.get("type") for s in spec["anyOf"] if s.get("type") not in (None, "null")]
+            kind = "|".join(kinds)
+        arg = f"{name}: {kind}" if kind else name
+        if name not in required:
+            default = spec.get("default")
+            arg += f" = {default!r}" if default is not None else " (optional)"
+        args.append(arg)
+    return ", ".join(args) or "none"
+
+
+def compact_manifest(tools: Sequence[BaseTool]) -> str:
+    """Tool manifest with one entry per tool name and no redundant whitespace"""
+    return "\n".join(
+        f"> {tool.metadata.name}: {' '.join(tool.metadata.description.split())}\n"
+        f"  Args: {compact_args(tool)}"
+        for tool in unique_tools(tools)
+    )
+
+
+class PromptAssembler(ReActChatFormatter):
+    """
+    ReAct formatter with a static prefix rendered once per tool set
+
+    The prefix is the ReAct header with the agent's instructions as context
+    and the compact tool manifest; the suffix is the conversation and the
+    current reasoning steps.
+    """
+
+    _prefixes: Dict[tuple, str] = PrivateAttr(default_factory=dict)
+    _prefix_tokens: Dict[tuple, int] = PrivateAttr(default_factory=dict)
+
+    @classmethod
+    def from_system_prompt(cls, system_prompt: Optional[str] = None) -> "PromptAssembler":
+        """
+        Args:
+            system_prompt: The agent's instructions, placed in the header's context
+        """
+        context = " ".join(system_prompt.split()) if system_prompt else ""
+        return cls(system_header=CONTEXT_REACT_CHAT_SYSTEM_HEADER if context else REACT_CHAT_SYSTEM_HEADER,
+                   context=context)
+
+    def static_prefix(self, tools: Sequence[BaseTool]) -> str:
+        """The system header for a tool set, rendered on first use"""
+        key = tuple(tool.metadata.name for tool in tools)
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            unique = unique_tools(tools)
+            format_args = {"tool_desc": compact_manifest(unique),
+                           "tool_names": ", ".join(tool.metadata.name for tool in unique)}
+            if self.context:
+                format_args["context"] = self.context
+            prefix = self.system_header.format(**format_args)
+            self._prefixes[key] = prefix
+            self._prefix_tokens[key] = count_tokens(prefix)
+        return prefix
+
+    def prefix_tokens(self, tools: Sequence[BaseTool]) -> int:
+        """Approximate token count of the static prefix of a tool set"""
+        self.static_prefix(tools)
+        return self._prefix_tokens[tuple(tool.metadata.name for tool in tools)]
+
+    def format(
+        self,
+        tools: Sequence[BaseTool],
+        chat_history: List[ChatMessage],
+        current_reasoning: Optional[List[BaseReasoningStep]] = None,
+    ) -> List[ChatMessage]:
+        """Static prefix, then the conversation and the reasoning so far"""
+        reasoning = [
+            ChatMessage(role=self.observation_role if isinstance(step, ObservationReasoningStep)
+                        else MessageRole.ASSISTANT, content=step.get_content())
+            for step in current_reasoning or []
+        ]
+        return [ChatMessage(role=MessageRole.SYSTEM, content=self.static_prefix(tools)),
+                *chat_history, *reasoning]
+
+
+def token_report(tools: Sequence[BaseTool], system_prompt: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Compare the per-step system header before and after prompt assembly
+
+    "before" is the stock ReAct header with every tool as given, including
+    duplicates, and the instructions as written.
+
+    Returns:
+        dict: tools, unique_tools, before and after token counts, and the
+            tokens saved per step
+    """
+    if system_prompt:
+        before = CONTEXT_REACT_CHAT_SYSTEM_HEADER.format(
+            tool_desc="\n".join(get_react_tool_descriptions(tools)),
+            tool_names=", ".join(tool.metadata.name for tool in tools), context=system_prompt)
+    else:
+        before = REACT_CHAT_SYSTEM_HEADER.format(
+            tool_desc="\n".join(get_react_tool_descriptions(tools)),
+            tool_names=", ".join(tool.metadata.name for tool in tools))
+    after = PromptAssembler.from_system_prompt(system_prompt).prefix_tokens(tools)
+    before = count_tokens(before)
+    return {
+        "tools": len(tools),
+        "unique_tools": len(unique_tools(tools)),
+        "before": before,
+        "after": after,
+        "saved_per_step": before - after
+    }
@@ -0,0 +1,252 @@
+"""
+Token-budgeted chat memory that summarizes older turns
+
+The coordinator's prompt gets a running summary of the early conversation
+plus the most recent turns verbatim, within a token budget, instead of the
+whole history. Older turns are folded into the summary incrementally on a
+background thread, so a turn never waits for summarization. The summary and
+how many messages it covers can be saved next to the conversation and
+restored on reload, so a long conversation is not summarized again.
+"""
+
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.llms import ChatMessage, MessageRole
+from llama_index.core.memory.types import BaseMemory
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_LIMIT = 3000
+DEFAULT_KEEP_TURNS = 6
+
+# Longest summary kept, in tokens
+SUMMARY_TOKEN_LIMIT = 600
+
+# Rough token count: about four characters per token for English text
+CHARS_PER_TOKEN = 4
+
+SUMMARIZE_PROMPT = """Update the summary of a conversation between a football coach and their assistant.
+Keep the facts that later questions may refer to: teams, matches, scores, formations, tactics,
+players and decisions. Answer with the new summary only, in at most {words} words.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}
+"""
+
+
+def count_tokens(text: str) -> int:
+    """Approximate number of tokens in a text"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def digest(messages: List[ChatMessage]) -> str:
+    """Fingerprint of a list of messages, to check a saved summary still applies"""
+    h = hashlib.sha1()
+    for message in messages:
+        h.update(f"{message.role.value}\0{message.content or ''}\0".encode("utf-8"))
+    return h.hexdigest()
+
+
+class SummarizingMemory(BaseMemory):
+    """
+    Chat memory with a running summary and a verbatim window of recent turns
+
+    get_all() returns the full history, for saving; get() returns what goes in
+    the prompt: the summary and as many recent messages as fit the budget.
+    """
+
+    token_limit: int = DEFAULT_TOKEN_LIMIT
+    keep_turns: int = DEFAULT_KEEP_TURNS
+    llm: Optional[Any] = Field(default=None, exclude=True)
+
+    _messages: List[ChatMessage] = PrivateAttr(default_factory=list)
+    _summary: str = PrivateAttr(default="")
+    _summarized: int = PrivateAttr(default=0)
+    _generation: int = PrivateAttr(default=0)
+    _pending: Any = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _executor: Any = PrivateAttr(default=None)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "SummarizingMemory"
+
+    @classmethod
+    def from_defaults(cls, llm=None, token_limit: int = DEFAULT_TOKEN_LIMIT,
+                      keep_turns: int = DEFAULT_KEEP_TURNS, **kwargs: Any) -> "SummarizingMemory":
+        """
+        Args:
+            llm: Model used to write summaries; without one, summaries are
+                extracted from the messages
+            token_limit: Token budget of the summary and recent messages
+            keep_turns: Number of recent turns kept verbatim
+        """
+        return cls(llm=llm, token_limit=token_limit, keep_turns=keep_turns)
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    def get(self, input: Optional[str] = None, **kwargs: Any) -> List[ChatMessage]:
+        """Summary and recent messages for the prompt, within the token budget"""
+        with self._lock:
+            summary = self._summary
+            recent = self._messages[self._summarized:]
+
+        budget = self.token_limit
+        prompt = []
+        if summary:
+            prompt.append(ChatMessage(role=MessageRole.SYSTEM,
+                                      content=f"Summary of the earlier conversation:\n{summary}"))
+            budget -= count_tokens(summary)
+
+        # Newest first, until the budget runs out; the last message always fits
+        kept = []
+        for message in reversed(recent):
+            cost = count_tokens(message.content or "")
+            if kept and cost > budget:
+                break
+            kept.append(message)
+            budget -= cost
+        # A window must not open on an assistant reply or a tool result
+        while len(kept) > 1 and kept[-1].role != MessageRole.USER:
+            kept.pop()
+        return prompt + kept[::-1]
+
+    def get_all(self) -> List[ChatMessage]:
+        with self._lock:
+            return list(self._messages)
+
+    def put(self, message: ChatMessage) -> None:
+        with self._lock:
+            self._messages.append(message)
+        self._schedule_summary()
+
+    def set(self, messages: List[ChatMessage]) -> None:
+        """Replace the history, keeping the summary if the history only grew"""
+        with self._lock:
+            covered = self._summarized
+            if len(messages) < covered or messages[covered - 1:covered] != self._messages[covered - 1:covered]:
+                self._clear()
+            self._messages = list(messages)
+        self._schedule_summary()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clear()
+            self._messages = []
+
+    def _clear(self):
+        """Drop the summary and ignore the summaries still being written"""
+        self._summary = ""
+        self._summarized = 0
+        self._generation += 1
+
+    def state(self) -> Dict[str, Any]:
+        """Summary state to save alongside the conversation"""
+        with self._lock:
+            return {
+                "summary": self._summary,
+                "summarized": self._summarized,
+                "digest": digest(self._messages[:self._summarized])
+            }
+
+    def restore(self, messages: List[ChatMessage], state: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Load a conversation in one step, reusing its saved summary if it still applies
+
+        Args:
+            messages: The full conversation
+            state: Output of state() saved with the conversation
+        """
+        with self._lock:
+            self._clear()
+            self._messages = list(messages)
+            if state and 0 < state.get("summarized", 0) <= len(messages) \
+                    and digest(messages[:state["summarized"]]) == state.get("digest"):
+                self._summary = state["summary"]
+                self._summarized = state["summarized"]
+        logger.info(f"Restored {len(messages)} messages, {self._summarized} of them summarized")
+        self._schedule_summary()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until pending summarization finishes"""
+        while True:
+            pending = self._pending
+            if pending is None:
+                return
+            pending.result(timeout=timeout)
+            if self._pending is pending:
+                return
+
+    def _window_start(self):
+        """Index of the first message of the last keep_turns turns"""
+        users = [i for i, m in enumerate(self._messages) if m.role == MessageRole.USER]
+        if len(users) <= self.keep_turns:
+            return 0
+        return users[-self.keep_turns]
+
+    def _schedule_summary(self):
+        """Fold the turns that left the verbatim window into the summary, in the background"""
+        with self._lock:
+            if self._pending is not None and not self._pending.done():
+                return
+            end = self._window_start()
+            if end <= self._summarized:
+                return
+            job = (self._generation, self._summary, self._messages[self._summarized:end], end)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="coach-memory")
+            self._pending = self._executor.submit(self._summarize, *job)
+
+    def _summarize(self, generation, summary, messages, end):
+        try:
+            new_summary = self._write_summary(summary, messages)
+        except Exception as e:
+            # The next message retries
+            logger.error(f"Error summarizing conversation: {str(e)}")
+            with self._lock:
+                self._pending = None
+            return
+
+        with self._lock:
+            self._pending = None
+            if generation == self._generation:
+                self._summary = new_summary
+                self._summarized = end
+                logger.info(f"Summarized {len(messages)} older messages ({count_tokens(new_summary)} tokens)")
+        # Turns may have left the window, or the history changed, meanwhile
+        self._schedule_summary()
+
+    def _write_summary(self, summary, messages):
+        if self.llm is not None:
+            try:
+                text = "\n".join(f"{m.role.value}: {m.content}" for m in messages)
+                prompt = SUMMARIZE_PROMPT.format(words=SUMMARY_TOKEN_LIMIT * 3 // 4,
+                                                 summary=summary or "(none)", messages=text)
+                return str(self.llm.complete(prompt)).strip()
+            except Exception as e:
+                logger.warning(f"Summarizing with the LLM failed, extracting instead: {str(e)}")
+        return self._extract_summary(summary, messages)
+
+    def _extract_summary(self, summary, messages):
+        """Summary made of the first sentence of each message, oldest lines dropped first"""
+        lines = summary.splitlines() if summary else []
+        for message in messages:
+            content = " ".join((message.content or "").split())
+            if not content or message.role not in (MessageRole.USER, MessageRole.ASSISTANT):
+                continue
+            first = content.split(". ")[0][:160]
+            who = "Coach" if message.role == MessageRole.USER else "Assistant"
+            lines.append(f"- {who}: {first}")
+        while len(lines) > 1 and count_tokens("\n".join(lines)) > SUMMARY_TOKEN_LIMIT:
+            lines.pop(0)
+        return "\n".join(lines)
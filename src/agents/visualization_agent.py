@@ -1,26 +1,31 @@
 from .base_agent import BaseAgent
 from ..tools.planning_tool import PlanningTool
+from ..visualization import VisualizationTool
 
 
 class VisualizationAgent(BaseAgent):
-    def __init__(self):
-        super().__init__()
+    model_tier = "fast"
+
+    def __init__(self, model_tier=None):
+        super().__init__(model_tier)
         self.role = "Visualization Agent"
         self.goal = "Create visual representations of football concepts"
         self.system_prompt = """
     You are a specialized Visualization Description Agent within the Coach Intelligence System.
-    Your function is to describe how football concepts, data, or plans could be visually represented, aiding coach understanding. Based on information from the Coordinator Agent, you can:
-    1.  **Describe Formation Diagrams:** Explain how a specific formation (e.g., 4-3-3) would look on a pitch diagram, including player positioning.
-    2.  **Describe Tactical Movements:** Explain how tactical instructions (e.g., a high press, an overlapping run) could be illustrated using arrows and player paths on a diagram.
-    3.  **Suggest Data Visualizations:** Recommend appropriate chart types (e.g., bar chart for possession stats, heatmap for player positioning) to represent analytical data effectively.
+    Your function is to represent football concepts, data, or plans visually, aiding coach understanding. Based on information from the Coordinator Agent, you can:
+    1.  **Draw Formation Diagrams:** Use 'visualization_tool' with visualization_type "formation" to show a specific formation (e.g., 4-3-3) on a pitch.
+    2.  **Chart Match Data:** Use 'visualization_tool' with "stats", "match_events", "momentum" or "shot_map" for a match, or "season" for many matches, passing the match data as JSON.
+    3.  **Describe Tactical Movements:** Explain how tactical instructions (e.g., a high press, an overlapping run) could be illustrated using arrows and player paths on a diagram.
 
-    Currently, you provide textual descriptions suitable for understanding or creating visualizations. Use the available tools (like 'planning_tool' which contains formation/tactic details) to inform your descriptions. Focus on clarity and accuracy in your visual explanations provided to the Coordinator Agent.
+    Charts from 'visualization_tool' are shown to the coach directly, so do not describe them at length; a one-line pointer to what the chart shows is enough. Use 'planning_tool' for formation/tactic details. Focus on clarity and accuracy in your visual explanations provided to the Coordinator Agent.
     """
 
-        # Initialize tools - using planning tool for now as it has visualization capabilities
+        # Initialize tools
         self.planning_tool = PlanningTool()
+        self.visualization_tool = VisualizationTool()
 
         # Add tools to the agent's tool list
         self.tools = [
-            self.planning_tool.tool
+            self.planning_tool.tool,
+            self.visualization_tool.tool
         ]
@@ -0,0 +1,67 @@
+"""
+Synthetic squads and seasons for tests and benchmarks of the Coach Intelligence System
+
+Every generator takes a seed, so the same arguments always give the same data.
+"""
+
+import numpy as np
+
+# Primary roles of a squad, and the secondary roles each tends to cover
+SQUAD_ROLES = (["GK"] * 3 + ["CB"] * 5 + ["LB", "LB", "RB", "RB"] + ["DM"] * 3 + ["CM"] * 4
+               + ["LM", "RM", "CAM", "CAM"] + ["LW", "RW", "ST", "ST", "ST", "LW", "RW"])
+SECONDARY_ROLES = {"CB": ["DM"], "LB": ["LWB", "LM"], "RB": ["RWB", "RM"], "DM": ["CM", "CB"],
+                   "CM": ["DM", "CAM"], "LM": ["LW", "LWB"], "RM": ["RW", "RWB"],
+                   "CAM": ["AM", "CM"], "LW": ["LM", "ST"], "RW": ["RM", "ST"], "ST": ["CAM"]}
+
+EVENT_TYPES = ["shot", "shot", "shot", "corner", "corner", "goal",
+               "yellow_card", "substitution", "penalty", "red_card"]
+
+
+def synthetic_squad(n_players=30, seed=0):
+    """
+    Generate a squad with ratings for each player's primary and secondary roles
+
+    Returns:
+        list: Player dicts in the format accepted by LineupOptimizer
+    """
+    rng = np.random.default_rng(seed)
+    squad = []
+    for i in range(n_players):
+        role = SQUAD_ROLES[i % len(SQUAD_ROLES)]
+        rating = float(rng.normal(75, 6))
+        ratings = {role: round(rating)}
+        for secondary in SECONDARY_ROLES.get(role, []):
+            ratings[secondary] = round(rating - rng.uniform(3, 12))
+        squad.append({"name": f"Player {i + 1}", "ratings": ratings,
+                      "fitness": int(rng.integers(60, 101)), "suspended": bool(rng.random() < 0.05)})
+    return squad
+
+
+def synthetic_season(n_matches=38, events_per_match=40, seed=0):
+    """
+    Generate a season of matches with random events
+
+    Returns:
+        list: Match dicts in the format accepted by VisualizationTool
+    """
+    rng = np.random.default_rng(seed)
+    matches = []
+    for i in range(n_matches):
+        home, away = f"Team {i % 20}", f"Team {(i + 7) % 20}"
+        events = []
+        for _ in range(events_per_match):
+            event_type = EVENT_TYPES[rng.integers(len(EVENT_TYPES))]
+            event = {
+                "minute": int(rng.integers(1, 91)),
+                "type": event_type,
+                "team": home if rng.random() < 0.5 else away,
+                "player": f"Player {rng.integers(1, 12)}"
+            }
+            if event_type in ("shot", "goal", "penalty"):
+                event.update(x=float(rng.uniform(75, 104)), y=float(rng.uniform(14, 54)),
+                             xg=float(rng.uniform(0.02, 0.6)),
+                             on_target=bool(rng.random() < 0.4))
+            events.append(event)
+        matches.append({"match_id": str(i), "minute": 90, "home_team": {"name": home},
+                        "away_team": {"name": away}, "events": events})
+    return matches
@@ -0,0 +1,200 @@
+"""
+Formation layout engine for the Coach Intelligence System
+
+Parses formation shapes such as "4-4-2", "3-4-2-1" or "4-1-2-1-2" into
+coordinate tables with role labels. Layouts are immutable and cached, so each
+shape is computed once and shared by the diagram renderers and the planning
+tool.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# Pitch dimensions in metres; the team attacks from left to right
+PITCH_LENGTH = 105
+PITCH_WIDTH = 68
+
+# x positions of the goalkeeper and of the deepest and highest outfield lines
+GOALKEEPER_X = 5
+DEFENCE_X = 20
+ATTACK_X = 80
+
+# Widest spread of a line across the pitch, and the gap between neighbours
+MAX_LINE_SPAN = PITCH_WIDTH - 20
+PLAYER_SPACING = 16
+
+OUTFIELD_PLAYERS = 10
+MAX_LINES = 6
+
+ROLE_COLORS = {
+    "goalkeeper": "red",
+    "defence": "blue",
+    "defensive_midfield": "green",
+    "midfield": "green",
+    "attacking_midfield": "purple",
+    "attack": "orange"
+}
+
+COMMON_FORMATIONS = ["4-4-2", "4-3-3", "3-5-2", "5-3-2", "4-2-3-1", "3-4-3",
+                     "4-1-4-1", "3-4-2-1", "4-1-2-1-2", "3-2-4-1", "4-4-1-1", "5-4-1"]
+
+PlayerSlot = namedtuple("PlayerSlot", ["x", "y", "role", "group", "line"])
+
+
+class FormationLayout:
+    """
+    The positions and roles of the eleven players in a formation
+
+    Attributes:
+        shape (str): Normalized shape, e.g. "4-2-3-1"
+        lines (tuple): Number of players in each outfield line, deepest first
+        players (tuple): PlayerSlot for the goalkeeper and every outfield player
+        coordinates (numpy.ndarray): Read-only (11, 2) table of x, y positions
+    """
+
+    def __init__(self, lines):
+        self.lines = tuple(lines)
+        self.shape = "-".join(str(n) for n in self.lines)
+
+        players = [PlayerSlot(GOALKEEPER_X, PITCH_WIDTH / 2, "GK", "goalkeeper", 0)]
+        line_xs = np.linspace(DEFENCE_X, ATTACK_X, len(self.lines))
+        for index, (count, x) in enumerate(zip(self.lines, line_xs)):
+            group = _line_group(index, self.lines)
+            span = min(MAX_LINE_SPAN, PLAYER_SPACING * (count - 1))
+            # Facing the opponent's goal at high x, the left flank is at high y
+            ys = np.linspace(PITCH_WIDTH / 2 + span / 2, PITCH_WIDTH / 2 - span / 2, count)
+            for y, role in zip(ys, _line_roles(group, count)):
+                players.append(PlayerSlot(round(float(x), 2), round(float(y), 2),
+                                          role, group, index + 1))
+
+        self.players = tuple(players)
+        self.coordinates = np.array([(p.x, p.y) for p in players])
+        self.coordinates.flags.writeable = False
+
+    @property
+    def roles(self):
+        return tuple(p.role for p in self.players)
+
+    def line_roles(self):
+        """Return the roles of each line, goalkeeper first"""
+        lines = [[] for _ in range(len(self.lines) + 1)]
+        for player in self.players:
+            lines[player.line].append(player.role)
+        return lines
+
+    def describe(self):
+        """Describe the shape line by line, e.g. "GK | LB CB CB RB | ..." """
+        return " | ".join(" ".join(roles) for roles in self.line_roles())
+
+    def __repr__(self):
+        return f"FormationLayout({self.shape!r})"
+
+
+def parse_formation(shape):
+    """
+    Parse a formation shape into its outfield lines
+
+    Accepts dashes or other separators ("4-2-3-1", "4 2 3 1") and compact
+    digit strings ("433").
+
+    Returns:
+        tuple: Players per line, deepest first
+
+    Raises:
+        ValueError: If the shape is not a valid eleven-player formation
+    """
+    text = str(shape).strip()
+    if re.fullmatch(r"\d{2,6}", text):
+        parts = list(text)
+    else:
+        parts = [p for p in re.split(r"[^0-9]+", text) if p]
+
+    if not parts or not re.fullmatch(r"[\d\s\-–/.,]+", text):
+        raise ValueError(f"'{shape}' is not a formation such as 4-4-2")
+
+    lines = tuple(int(p) for p in parts)
+    if len(lines) < 2 or len(lines) > MAX_LINES:
+        raise ValueError(f"A formation needs between 2 and {MAX_LINES} lines, got {len(lines)}")
+    if any(n < 1 for n in lines):
+        raise ValueError("Every line of a formation needs at least one player")
+    if sum(lines) != OUTFIELD_PLAYERS:
+        raise ValueError(f"A formation needs {OUTFIELD_PLAYERS} outfield players, "
+                         f"'{shape}' has {sum(lines)}")
+    return lines
+
+
+@lru_cache(maxsize=256)
+def _layout_for_lines(lines):
+    return FormationLayout(lines)
+
+
+def get_layout(shape):
+    """
+    Return the cached layout of a formation
+
+    Raises:
+        ValueError: If the shape is not a valid eleven-player formation
+    """
+    return _layout_for_lines(parse_formation(shape))
+
+
+def _line_group(index, lines):
+    """Classify an outfield line by its position in the formation"""
+    if index == 0:
+        return "defence"
+    if index == len(lines) - 1:
+        return "attack"
+
+    n_midfield = len(lines) - 2
+    if n_midfield == 1:
+        return "midfield"
+    if index == 1 and lines[index] <= 2:
+        return "defensive_midfield"
+    if index == len(lines) - 2:
+        return "attacking_midfield"
+    return "midfield"
+
+
+def _spread(count, wide, central):
+    """Label a line with its wide players on the outside, e.g. LB CB CB RB"""
+    if count < 4:
+        return [central] * count
+    return [wide[0]] + [central] * (count - 2) + [wide[1]]
+
+
+def _line_roles(group, count):
+    """Role labels for the players of a line, from left to right"""
+    if group == "defence":
+        return _spread(count, ("LWB", "RWB") if count >= 5 else ("LB", "RB"), "CB")
+    if group == "defensive_midfield":
+        return ["DM"] * count
+    if group == "attacking_midfield":
+        if count == 1:
+            return ["CAM"]
+        if count == 3:
+            return ["LAM", "CAM", "RAM"]
+        if count >= 4:
+            # A band of four or more is a midfield line behind a lone striker
+            return _spread(count, ("LM", "RM"), "CM")
+        return ["AM"] * count
+    if group == "attack":
+        if count == 3:
+            return ["LW", "ST", "RW"]
+        if count >= 4:
+            return _spread(count, ("LW", "RW"), "ST")
+        return ["ST"] * count
+    # Central midfield; a five-man line is flanked by wing-backs
+    return _spread(count, ("LWB", "RWB") if count >= 5 else ("LM", "RM"), "CM")
+
+
+def role_color(group):
+    return ROLE_COLORS.get(group, "gray")
+
+
+# Precompute the common shapes so the first diagram of each is as fast as the rest
+for _shape in COMMON_FORMATIONS:
+    get_layout(_shape)
+del _shape
@@ -20,10 +20,14 @@ from src.agents import (
 
 # Import utilities
 from src.utils import setup_logging, format_dict, ConversationManager
+from src.visualization import collect_images, to_chat_message
 
 # Initialize conversation manager
 conversation_manager = ConversationManager()
 
+# Seconds to wait for the visualizations of a chat turn
+RENDER_TIMEOUT = 60
+
 
 def load_environment():
     """Load environment variables from .env file"""
@@ -31,6 +35,9 @@ def load_environment():
 
     # Check if essential API keys are present
     required_keys = ['GEMINI_API_KEY', 'SERPAPI_API_KEY']
+    # The local LLM stand-in runs without a Gemini key
+    if os.getenv("COACH_LLM_PROVIDER") == "local":
+        required_keys.remove('GEMINI_API_KEY')
     missing_keys = [key for key in required_keys if not os.getenv(key)]
 
     if missing_keys:
@@ -87,19 +94,17 @@ def create_agent_system(agents, logger):
     logger.info("Creating agent system...")
 
     try:
-        # Extract all tools from specialized agents
-        all_tools = []
+        # The specialized agents run as delegated workers on their own model tiers
+        sub_agents = []
         for name, agent in agents.items():
             if name != "coordinator":
-                agent_tools = agent.get_tools()
-                if agent_tools:
-                    all_tools.extend(agent_tools)
-                    logger.info(f"Added tools from {name} agent")
+                sub_agents.append(agent)
+                logger.info(f"Added {name} agent as a delegate ({agent.model_name})")
 
-        # Create coordinator agent with all tools and internal engine
+        # Create coordinator agent with the delegates and internal engine
         coordinator = agents["coordinator"]
         # Coordinator now creates and stores its engine
-        coordinator.create(all_tools)
+        coordinator.create(sub_agents=sub_agents)
 
         logger.info("Agent system created successfully")
         return coordinator  # Return the coordinator instance
@@ -158,25 +163,24 @@ def create_ui(coordinator: CoordinatorAgent, agents: Dict[str, Any], logger):
                     f"Could not find conversation ID for display name: {display_name}")
                 return [], None
 
-            conversation = conversation_manager.load_conversation(
-                conversation_id)
+            # Read the conversation only if its memory is not warm
+            loaded = {}
 
-            # Convert to message format
-            messages = []
-            for msg in conversation["messages"]:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
+            def load():
+                conversation = conversation_manager.load_conversation(
+                    conversation_id)
+                loaded["messages"] = [{"role": msg["role"], "content": msg["content"]}
+                                      for msg in conversation["messages"]]
+                return loaded["messages"], conversation_manager.load_memory(conversation_id)
 
-            # Reset chat engine memory via coordinator
-            # No need to reset engine here, load_history handles it
-            coordinator.load_history(messages)
+            warm = coordinator.switch_conversation(conversation_id, load)
+            messages = loaded.get("messages") or [
+                {"role": msg.role.value, "content": msg.content}
+                for msg in coordinator.memory.get_all()]
 
             # Log the loaded conversation
             logger.info(
-                f"Loaded conversation: {conversation['title']} ({conversation_id})")
-            logger.debug(f"Messages loaded from file: {messages}")
+                f"Loaded conversation {conversation_id} ({'warm memory' if warm else 'from disk'})")
 
             return messages, conversation_id
         except Exception as e:
@@ -199,9 +203,15 @@ def create_ui(coordinator: CoordinatorAgent, agents: Dict[str, Any], logger):
         return [welcome_message], None
 
     def process_chat(message: str, history: List[Dict[str, str]], conversation_id: str = None):
-        """Process chat messages through the agent system"""
+        """
+        Process chat messages through the agent system
+
+        Yields the reply as soon as the agent has answered, then again once
+        the visualizations queued during the turn have finished rendering.
+        """
         if not message.strip():
-            return "", history, conversation_id
+            yield "", history, conversation_id
+            return
 
         logger.info(f"Processing message via Coordinator: {message}")
 
@@ -216,8 +226,10 @@ def create_ui(coordinator: CoordinatorAgent, agents: Dict[str, Any], logger):
                 logger.debug(
                     "Memory BEFORE chat processing: Agent not yet initialized.")
 
-            # Process the message through the coordinator's chat method
-            response = coordinator.chat(message)
+            # Process the message through the coordinator's chat method,
+            # collecting any visualizations rendered during the turn in memory
+            with collect_images() as outbox:
+                response = coordinator.chat(message)
             logger.info("Message processed successfully by coordinator")
 
             # Retrieve the full history from the agent's memory
@@ -225,21 +237,44 @@ def create_ui(coordinator: CoordinatorAgent, agents: Dict[str, Any], logger):
             logger.debug(
                 f"Memory AFTER chat processing ({len(full_history_msgs)} messages): {[(m.role.value, m.content[:50] + '...') for m in full_history_msgs]}")
 
-            # Convert ChatMessage objects to the dict format for saving and display
-            history_to_save_and_display = [
+            # Convert ChatMessage objects to the dict format for saving
+            history_to_save = [
                 {"role": msg.role.value, "content": msg.content}
                 for msg in full_history_msgs
             ]
 
             # Save the complete, updated conversation history
+            # Images are only displayed, so saved conversations stay text-only
             conversation_id = conversation_manager.save_conversation(
-                messages=history_to_save_and_display,  # Save the full history
+                messages=history_to_save,  # Save the full history
                 conversation_id=conversation_id
             )
+            # Keep the summary of older turns so reloading does not redo it,
+            # and the memory itself warm for switching back
+            conversation_manager.save_memory(
+                conversation_id, coordinator.memory_state())
+            coordinator.remember(conversation_id)
+
+            # Show the new turn after the current display, which keeps the
+            # images embedded in earlier turns, followed by this turn's images
+            history_to_display = history + [
+                {"role": "user", "content": message},
+                {"role": "assistant", "content": str(response)}
+            ]
 
             # Return updated history and conversation ID for Gradio UI
-            # Use the full history to update the chatbot display
-            return "", history_to_save_and_display, conversation_id
+            yield "", history_to_display + [
+                to_chat_message(image) for image in outbox.images], conversation_id
+
+            # Add the images still rendering in the background once they finish
+            if outbox.pending:
+                images = outbox.wait(timeout=RENDER_TIMEOUT)
+                failed = sum(1 for f in outbox.pending if not f.done() or f.exception())
+                if failed:
+                    logger.warning(f"{failed} visualization(s) failed or timed out")
+                logger.info(f"Embedded {len(images)} visualization(s) in the chat")
+                yield "", history_to_display + [
+                    to_chat_message(image) for image in images], conversation_id
 
         except Exception as e:
             error_msg = f"Error processing message: {str(e)}"
@@ -249,7 +284,7 @@ def create_ui(coordinator: CoordinatorAgent, agents: Dict[str, Any], logger):
             history.append(
                 {"role": "assistant", "content": f"Sorry, an error occurred: {str(e)}"})
             # Return the history with the error appended, but don't save over the last good state
-            return "", history, conversation_id
+            yield "", history, conversation_id
 
     with gr.Blocks(title="Coach Intelligence System") as interface:
         with gr.Row():
@@ -0,0 +1,348 @@
+import os
+import csv
+import json
+import sqlite3
+import threading
+
+from .search_cache import SearchCache
+
+DEFAULT_SNAPSHOT_PATH = "src/data/knowledge/snapshot.db"
+DEFAULT_SEED_PATH = "src/data/knowledge/football_snapshot.json"
+
+# Words that carry no meaning for entity lookups
+STOPWORDS = {
+    "a", "an", "and", "are", "about", "at", "by", "did", "do", "does", "for", "from",
+    "how", "in", "is", "it", "me", "of", "on", "or", "show", "tell", "the", "their",
+    "to", "was", "what", "when", "where", "which", "who", "with"
+}
+
+# Words and phrases asking for something time-dependent; the snapshot is static,
+# so queries containing them always go to the network providers
+RECENCY_TERMS = {
+    "latest", "recent", "recently", "yesterday", "today", "tonight", "tomorrow", "now",
+    "current", "currently", "news", "injury", "injuries", "injured", "result", "results",
+    "score", "scores", "live", "won", "lost", "beat", "fixture", "fixtures", "transfer",
+    "transfers", "rumours", "this season", "this week", "last night", "real time"
+}
+
+# Single-word aliases that are ordinary English words; indexing them would
+# match unrelated queries ("real time stats" is not about Real Madrid)
+COMMON_WORDS = {
+    "real", "city", "united", "town", "athletic", "sporting", "club", "inter", "rovers",
+    "wanderers", "rangers", "blues", "reds", "villa", "forest", "palace", "wolves"
+}
+
+
+class KnowledgeSnapshot:
+    """
+    Offline football knowledge base backed by a SQLite full-text index
+
+    Team, player and competition dumps are bulk-imported into a regular table
+    and indexed with FTS5, so factual lookups resolve locally in milliseconds.
+    If the SQLite build lacks FTS5, lookups fall back to LIKE scans.
+    """
+
+    def __init__(self, db_path=DEFAULT_SNAPSHOT_PATH, seed_path=DEFAULT_SEED_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.has_fts = self._create_schema()
+
+        if seed_path and os.path.exists(seed_path):
+            self._import_seed(seed_path)
+
+    def _create_schema(self):
+        """Create the entries table and, when available, its FTS5 index"""
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                name TEXT NOT NULL,
+                aliases TEXT NOT NULL DEFAULT '',
+                content TEXT NOT NULL,
+                source TEXT,
+                UNIQUE (kind, name)
+            )"""
+        )
+        # Snapshots created before entries recorded the dump they came from
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(entries)")]
+        if "source" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN source TEXT")
+        # Exact name/alias index used to resolve entity lookups without a scan
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS names (
+                normalized TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                name TEXT NOT NULL,
+                PRIMARY KEY (normalized, kind, name)
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS names_entry ON names (kind, name)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        try:
+            self._conn.execute(
+                """CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+                    name, aliases, content,
+                    content='entries', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )"""
+            )
+            has_fts = True
+        except sqlite3.OperationalError:
+            print("SQLite FTS5 not available, knowledge snapshot will use LIKE scans")
+            has_fts = False
+        self._conn.commit()
+        return has_fts
+
+    def _import_seed(self, seed_path):
+        """
+        Import the seed dump unless the same version is already imported
+
+        A new version replaces everything the seed imported before, so entries
+        dropped from the seed file are removed too. Entries imported from other
+        dumps are kept.
+        """
+        version = None
+        if os.path.splitext(seed_path)[1].lower() == ".json":
+            with open(seed_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                version = data.get("version")
+        # Dumps without a version are reimported whenever the file changes
+        if version is None:
+            version = os.path.getmtime(seed_path)
+        source = os.path.abspath(seed_path)
+        version = f"{source}:{version}"
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'seed_version'").fetchone()
+        if row is not None and row[0] == version and self.count() > 0:
+            return
+
+        rows, names = self._prepare(self._read_dump(seed_path), source)
+        with self._lock:
+            try:
+                self._conn.execute(
+                    """DELETE FROM names WHERE (kind, name) IN
+                       (SELECT kind, name FROM entries WHERE source = ?)""", (source,))
+                self._conn.execute("DELETE FROM entries WHERE source = ?", (source,))
+                self._store(rows, names)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('seed_version', ?)", (version,))
+                self._conn.commit()
+            except sqlite3.Error:
+                self._conn.rollback()
+                raise
+
+    def count(self):
+        """Return the number of entries in the snapshot"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @staticmethod
+    def _render(kind, record):
+        """Render a record as the text returned to the agent"""
+        lines = [f"{record['name']} ({kind})"]
+        for key, value in record.items():
+            if key in ("name", "aliases", "kind"):
+                continue
+            if isinstance(value, (list, tuple)):
+                value = ", ".join(str(v) for v in value)
+            lines.append(f"- {key.replace('_', ' ').capitalize()}: {value}")
+        return "\n".join(lines)
+
+    def import_records(self, records, kind=None):
+        """
+        Bulk import records into the snapshot
+
+        Args:
+            records (iterable): Dicts with at least a "name" key. "aliases" may be a
+                list or a "|"-separated string; every other key becomes a fact line.
+            kind (str, optional): Entry kind (team, player, competition, ...) used
+                when a record has no "kind" key of its own
+
+        Returns:
+            int: Number of records imported
+        """
+        rows, names = self._prepare([(records, kind)])
+        with self._lock:
+            self._store(rows, names)
+            self._conn.commit()
+        return len(rows)
+
+    def import_file(self, path, kind=None):
+        """
+        Bulk import a dump file
+
+        Supports JSON (a list of records, or an object mapping plural kinds such as
+        "teams" to lists), JSON Lines and CSV.
+
+        Returns:
+            int: Number of records imported
+        """
+        rows, names = self._prepare(self._read_dump(path, kind))
+        with self._lock:
+            self._store(rows, names)
+            self._conn.commit()
+        return len(rows)
+
+    @staticmethod
+    def _read_dump(path, kind=None):
+        """Read a dump file as (records, kind) batches"""
+        extension = os.path.splitext(path)[1].lower()
+        with open(path, 'r', encoding='utf-8') as f:
+            if extension == ".jsonl":
+                return [([json.loads(line) for line in f if line.strip()], kind)]
+            if extension == ".csv":
+                return [(list(csv.DictReader(f)), kind)]
+
+            data = json.load(f)
+
+        if isinstance(data, list):
+            return [(data, kind)]
+        return [(records, key[:-1] if key.endswith("s") else key)
+                for key, records in data.items() if isinstance(records, list)]
+
+    def _prepare(self, batches, source=None):
+        """Turn (records, kind) batches into entry rows and name index rows"""
+        rows = []
+        names = []
+        for records, kind in batches:
+            for record in records:
+                if not record.get("name"):
+                    continue
+                record_kind = record.get("kind") or kind or "entry"
+                aliases = record.get("aliases") or []
+                if isinstance(aliases, str):
+                    aliases = [a.strip() for a in aliases.split("|") if a.strip()]
+                rows.append((record_kind, record["name"], " | ".join(aliases),
+                             self._render(record_kind, record), source))
+                normalized_names = [SearchCache.normalize(record["name"])]
+                normalized_names += [a for a in map(SearchCache.normalize, aliases)
+                                     if a not in COMMON_WORDS]
+                for normalized in normalized_names:
+                    if len(normalized) > 1:
+                        names.append((normalized, record_kind, record["name"]))
+        return rows, names
+
+    def _store(self, rows, names):
+        """Upsert entries and their names; the caller holds the lock and commits"""
+        self._conn.executemany(
+            """INSERT INTO entries (kind, name, aliases, content, source) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT (kind, name) DO UPDATE SET
+                   aliases = excluded.aliases, content = excluded.content,
+                   source = excluded.source""",
+            rows
+        )
+        self._conn.executemany(
+            "DELETE FROM names WHERE kind = ? AND name = ?",
+            [(kind, name) for kind, name, _, _, _ in rows]
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO names (normalized, kind, name) VALUES (?, ?, ?)",
+            names
+        )
+        if self.has_fts:
+            # Rebuilding once after the bulk insert is much cheaper than
+            # maintaining the index row by row
+            self._conn.execute(
+                "INSERT INTO entries_fts(entries_fts) VALUES ('rebuild')")
+
+    def _query_terms(self, query):
+        return [t for t in SearchCache.normalize(query).split()
+                if len(t) > 1 and t not in STOPWORDS]
+
+    def search(self, query, limit=3, match_all=True):
+        """
+        Full-text search over the snapshot
+
+        Args:
+            query (str): Free-text query
+            limit (int): Maximum number of entries to return
+            match_all (bool): Require every query term (AND) rather than any (OR)
+
+        Returns:
+            list: Matching entries as dicts (kind, name, aliases, content), best first
+        """
+        terms = self._query_terms(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            if self.has_fts:
+                joiner = " AND " if match_all else " OR "
+                match = joiner.join('"' + t.replace('"', '') + '"' for t in terms)
+                rows = self._conn.execute(
+                    """SELECT e.kind, e.name, e.aliases, e.content
+                       FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid
+                       WHERE entries_fts MATCH ?
+                       ORDER BY bm25(entries_fts, 10.0, 5.0, 1.0)
+                       LIMIT ?""",
+                    (match, limit)
+                ).fetchall()
+            else:
+                term_clause = "(name LIKE ? OR aliases LIKE ? OR content LIKE ?)"
+                joiner = " AND " if match_all else " OR "
+                clause = joiner.join(term_clause for _ in terms)
+                params = [f"%{t}%" for t in terms for _ in range(3)]
+                rows = self._conn.execute(
+                    f"SELECT kind, name, aliases, content FROM entries WHERE {clause} LIMIT ?",
+                    params + [limit]
+                ).fetchall()
+
+        return [{"kind": k, "name": n, "aliases": a, "content": c} for k, n, a, c in rows]
+
+    @staticmethod
+    def is_time_sensitive(query):
+        """Check whether a query asks for recent information the snapshot cannot have"""
+        words = SearchCache.normalize(query).split()
+        phrases = set(words) | {" ".join(pair) for pair in zip(words, words[1:])}
+        return not RECENCY_TERMS.isdisjoint(phrases)
+
+    def lookup(self, query, limit=3, max_name_words=6):
+        """
+        Resolve a factual lookup locally
+
+        Entities whose name or alias appears in the query are found through the
+        exact name index; otherwise every meaningful query term must match the
+        full-text index. Queries asking for anything recent (results, news,
+        injuries, this season) are never answered, since the snapshot is static.
+
+        Returns:
+            list: Matching entries, best first (empty when the snapshot has no answer)
+        """
+        if self.is_time_sensitive(query):
+            return []
+
+        words = SearchCache.normalize(query).split()
+        candidates = set()
+        for size in range(1, max_name_words + 1):
+            for i in range(len(words) - size + 1):
+                phrase = " ".join(words[i:i + size])
+                if size > 1 or phrase not in STOPWORDS:
+                    candidates.add(phrase)
+
+        if candidates:
+            placeholders = ", ".join("?" for _ in candidates)
+            with self._lock:
+                rows = self._conn.execute(
+                    f"""SELECT e.kind, e.name, e.aliases, e.content, MAX(LENGTH(n.normalized)) AS matched
+                        FROM names n JOIN entries e ON e.kind = n.kind AND e.name = n.name
+                        WHERE n.normalized IN ({placeholders})
+                        GROUP BY e.id
+                        ORDER BY matched DESC
+                        LIMIT ?""",
+                    list(candidates) + [limit]
+                ).fetchall()
+            if rows:
+                return [{"kind": k, "name": n, "aliases": a, "content": c}
+                        for k, n, a, c, _ in rows]
+
+        return self.search(query, limit=limit, match_all=True)
@@ -0,0 +1,203 @@
+"""
+Squad selection and lineup optimization
+
+Picking the best eleven for a formation is an assignment problem: every slot
+of the formation needs one player and every player can fill at most one slot.
+The optimizer rates every available player for every role once, then solves
+the assignment for each formation with the Hungarian algorithm, using SciPy's
+implementation when it is installed and a NumPy one otherwise.
+"""
+
+import numpy as np
+
+from ..formation_layout import get_layout
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+# Roles a player can cover when they have no rating for a slot's own role,
+# closest first
+ROLE_FALLBACKS = {
+    "GK": [],
+    "CB": ["DM"],
+    "LB": ["LWB", "CB"],
+    "RB": ["RWB", "CB"],
+    "LWB": ["LB", "LM"],
+    "RWB": ["RB", "RM"],
+    "DM": ["CM", "CB"],
+    "CM": ["DM", "CAM", "AM"],
+    "LM": ["LW", "LWB", "CM"],
+    "RM": ["RW", "RWB", "CM"],
+    "CAM": ["AM", "CM"],
+    "AM": ["CAM", "CM"],
+    "LAM": ["AM", "CAM", "LW"],
+    "RAM": ["AM", "CAM", "RW"],
+    "LW": ["LM", "LAM", "ST"],
+    "RW": ["RM", "RAM", "ST"],
+    "ST": ["CF", "CAM"]
+}
+
+# Share of the rating kept for each step down a role's fallback list
+FALLBACK_PENALTY = 0.9
+
+# Share of the rating lost by a player with no fitness left
+FITNESS_WEIGHT = 0.5
+
+BENCH_SIZE = 7
+TEAM_SIZE = 11
+
+
+def _hungarian(cost):
+    """
+    Solve a rectangular assignment problem with the Hungarian algorithm
+
+    Args:
+        cost (numpy.ndarray): (n, m) costs with n <= m
+
+    Returns:
+        tuple: (rows, cols) arrays giving the column assigned to each row
+    """
+    n, m = cost.shape
+    # Potentials and matching are 1-based; column 0 is a virtual start
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    match = np.zeros(m + 1, dtype=int)
+    way = np.zeros(m + 1, dtype=int)
+
+    for row in range(1, n + 1):
+        match[0] = row
+        col = 0
+        min_slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[col] = True
+            slack = cost[match[col] - 1] - u[match[col]] - v[1:]
+            free = ~used[1:]
+            better = free & (slack < min_slack[1:])
+            min_slack[1:][better] = slack[better]
+            way[1:][better] = col
+
+            candidates = np.where(free, min_slack[1:], np.inf)
+            next_col = int(np.argmin(candidates)) + 1
+            delta = candidates[next_col - 1]
+            u[match[used]] += delta
+            v[used] -= delta
+            min_slack[1:][free] -= delta
+
+            col = next_col
+            if match[col] == 0:
+                break
+
+        # Flip the augmenting path
+        while col:
+            previous = way[col]
+            match[col] = match[previous]
+            col = previous
+
+    cols = np.nonzero(match[1:])[0]
+    rows = match[1:][cols] - 1
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def solve_assignment(cost):
+    """Minimum-cost assignment of every row to a distinct column"""
+    if linear_sum_assignment is not None:
+        return linear_sum_assignment(cost)
+    return _hungarian(np.asarray(cost, dtype=float))
+
+
+class LineupOptimizer:
+    """
+    Select the best eleven and bench from a squad
+
+    A squad is a list of player dicts:
+        {"name": "Smith", "ratings": {"CB": 78, "DM": 70}, "fitness": 90,
+         "suspended": False, "injured": False}
+
+    Ratings are keyed by the roles of formation_layout (GK, CB, LB, CM, ST, ...).
+    A player without a rating for a role is rated from its fallbacks, at a
+    discount per step.
+    """
+
+    def __init__(self, bench_size=BENCH_SIZE):
+        self.bench_size = bench_size
+
+    def available(self, squad):
+        """Players who are neither suspended nor injured"""
+        return [p for p in squad if not p.get("suspended") and not p.get("injured")]
+
+    def rating_matrix(self, players, roles):
+        """
+        Rate every player for every role, accounting for fitness
+
+        Returns:
+            numpy.ndarray: (n_players, n_roles) effective ratings
+        """
+        ratings = np.zeros((len(players), len(roles)))
+        for i, player in enumerate(players):
+            own = player.get("ratings", {})
+            for j, role in enumerate(roles):
+                for step, candidate in enumerate([role] + ROLE_FALLBACKS.get(role, [])):
+                    if candidate in own:
+                        ratings[i, j] = own[candidate] * FALLBACK_PENALTY ** step
+                        break
+
+        fitness = np.array([p.get("fitness", 100) for p in players], dtype=float)
+        return ratings * (1 - FITNESS_WEIGHT * (1 - np.clip(fitness, 0, 100) / 100))[:, None]
+
+    def optimize(self, squad, formations):
+        """
+        Pick the best eleven and bench for each formation
+
+        Args:
+            squad (list): Player dicts
+            formations (list): Formation shapes, e.g. ["4-4-2", "4-3-3"]
+
+        Returns:
+            list: One result per formation, best total rating first, each with
+                formation, total, average, lineup ([{"role", "name", "rating"}])
+                and bench (names)
+
+        Raises:
+            ValueError: If fewer than eleven players are available
+        """
+        players = self.available(squad)
+        if len(players) < TEAM_SIZE:
+            raise ValueError(f"Only {len(players)} players are available; {TEAM_SIZE} are needed")
+
+        layouts = [get_layout(f) for f in formations]
+        roles = sorted({role for layout in layouts for role in layout.roles})
+        ratings = self.rating_matrix(players, roles)
+        column = {role: j for j, role in enumerate(roles)}
+
+        results = []
+        for formation, layout in zip(formations, layouts):
+            # Slots are rows and players columns, so each slot gets a player
+            slot_ratings = ratings[:, [column[role] for role in layout.roles]].T
+            slots, chosen = solve_assignment(-slot_ratings)
+            total = float(slot_ratings[slots, chosen].sum())
+            results.append({
+                "formation": formation,
+                "total": total,
+                "average": total / TEAM_SIZE,
+                "lineup": [{"role": layout.roles[s], "name": players[p].get("name", f"Player {p + 1}"),
+                            "rating": float(slot_ratings[s, p])} for s, p in zip(slots, chosen)],
+                "bench": self._bench(players, ratings, column, set(chosen.tolist()))
+            })
+
+        return sorted(results, key=lambda r: -r["total"])
+
+    def _bench(self, players, ratings, column, starters):
+        """Back-up goalkeeper first, then the best remaining players by their best role"""
+        remaining = [i for i in range(len(players)) if i not in starters]
+        best = ratings.max(axis=1)
+        bench = []
+        if "GK" in column and remaining:
+            keeper = max(remaining, key=lambda i: ratings[i, column["GK"]])
+            if ratings[keeper, column["GK"]] > 0:
+                bench.append(keeper)
+        bench += sorted((i for i in remaining if i not in bench), key=lambda i: -best[i])
+        return [players[i].get("name", f"Player {i + 1}") for i in bench[:self.bench_size]]
@@ -0,0 +1,296 @@
+"""
+Monte Carlo match simulator for evaluating in-game changes
+
+From the live state of a match (minute, score, xG or shots on target, red
+cards) each team's scoring rate is estimated as a Gamma posterior around a
+league-average prior. Every simulation draws a rate from that posterior and
+the remaining goals from a Poisson distribution, so the win, draw and loss
+probabilities reflect both the randomness of goals and the uncertainty in
+how well each side is playing.
+
+A scenario is a change the coach could make now: a formation switch, a
+substitution, or keeping things as they are. All scenarios share the same
+random numbers: each simulation draws one scoring rate and one uniform per
+side, and every scenario turns that uniform into goals through the inverse
+Poisson CDF at its own mean. Identical scenarios therefore give identical
+results, and differences between scenarios are not noise from separate
+samples. Large runs are split across a process pool.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .planning_knowledge import KNOWLEDGE
+
+# Attack and defence ratings of the formations, from the planning knowledge file
+FORMATION_FEATURES = KNOWLEDGE.features("formations")
+
+# League-average goals per team per match, and how many minutes of evidence
+# the prior is worth
+PRIOR_GOALS = 1.4
+PRIOR_MINUTES = 90
+
+MATCH_MINUTES = 90
+ADDED_TIME = 4
+
+# Expected goals of a shot on target when a feed reports no xG
+XG_PER_SHOT_ON_TARGET = 0.3
+
+# Effect of a formation change on scoring and conceding, per unit of change
+# in the formation's attack and defence features
+ATTACK_EFFECT = 0.5
+DEFENCE_EFFECT = 0.4
+
+# Multipliers on (goals scored, goals conceded) per substitution type
+SUBSTITUTION_EFFECTS = {
+    "attacking": (1.10, 1.03),
+    "defensive": (0.95, 0.90),
+    "fresh legs": (1.05, 0.97)
+}
+
+# Multipliers on (goals scored, goals conceded) per red card
+RED_CARD_EFFECT = (0.8, 1.25)
+
+DEFAULT_FORMATION = "4-4-2"
+DEFAULT_SIMULATIONS = 20000
+
+# Below this many simulations a run stays in-process, since it finishes
+# faster than a worker process can be reached
+PARALLEL_MIN_SIMULATIONS = 50000
+
+# Final scores are tallied up to this many goals per side
+MAX_GOALS = 9
+
+
+def _simulate_chunk(shapes, scales, exposure, n_sims, seed):
+    """
+    Simulate the rest of a match under every scenario
+
+    Args:
+        shapes, scales (numpy.ndarray): Gamma posterior of each side's goals per minute
+        exposure (numpy.ndarray): (n_scenarios, 2) minutes left, weighted by each
+            scenario's multipliers
+        n_sims (int): Number of simulations
+        seed: Seed for numpy's random generator
+
+    Returns:
+        numpy.ndarray: (n_scenarios, MAX_GOALS + 1, MAX_GOALS + 1) counts of
+            goals added by each side
+    """
+    rng = np.random.default_rng(seed)
+    rates = rng.gamma(shapes, scales, size=(n_sims, 2))
+    uniforms = rng.random((n_sims, 2))
+    goals = _poisson_quantiles(uniforms, rates[None, :, :] * exposure[:, None, :])
+
+    size = MAX_GOALS + 1
+    cells = goals[..., 0] * size + goals[..., 1]
+    offsets = np.arange(len(exposure))[:, None] * size * size
+    counts = np.bincount((cells + offsets).ravel(), minlength=len(exposure) * size * size)
+    return counts.reshape(len(exposure), size, size)
+
+
+def _poisson_quantiles(uniforms, means):
+    """
+    Poisson goals at the given means for shared uniforms, by inverse CDF
+
+    The goals grow with the mean for a fixed uniform, so a scenario that
+    scores more does so in the same simulations. Counts are capped at
+    MAX_GOALS.
+    """
+    pmf = np.exp(-means)
+    cdf = pmf.copy()
+    goals = np.zeros(means.shape, dtype=np.int64)
+    for k in range(1, MAX_GOALS + 1):
+        goals += uniforms > cdf
+        pmf = pmf * means / k
+        cdf += pmf
+    return goals
+
+
+def is_live(state):
+    """Return True if the data describes a match in progress"""
+    return (isinstance(state, dict) and isinstance(state.get("home_team"), dict)
+            and isinstance(state.get("away_team"), dict) and "score" in state["home_team"]
+            and "minute" in state)
+
+
+class MatchSimulator:
+    """
+    Estimate outcome probabilities for alternative in-game decisions
+
+    Example:
+        >>> simulator = MatchSimulator()
+        >>> results = simulator.simulate(live_match, team="Manchester United")
+        >>> results["scenarios"][0]["win"]
+        0.71
+    """
+
+    def __init__(self, max_workers=None):
+        """
+        Args:
+            max_workers (int, optional): Worker processes for large runs;
+                defaults to the number of CPUs
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool = None
+
+    def default_scenarios(self, current_formation=DEFAULT_FORMATION):
+        """
+        Keeping the current shape, every known formation and each substitution type
+
+        An unknown current formation is modelled as DEFAULT_FORMATION, so
+        switching to that would change nothing and is left out.
+        """
+        if current_formation not in FORMATION_FEATURES:
+            current_formation = DEFAULT_FORMATION
+        scenarios = [{"name": "Keep current shape"}]
+        scenarios += [{"name": f"Switch to {f}", "formation": f}
+                      for f in FORMATION_FEATURES if f != current_formation]
+        scenarios += [{"name": f"{kind.capitalize()} substitution", "substitution": kind}
+                      for kind in SUBSTITUTION_EFFECTS]
+        return scenarios
+
+    def simulate(self, state, scenarios=None, team=None, n_sims=DEFAULT_SIMULATIONS, seed=None):
+        """
+        Simulate the rest of a live match under alternative decisions
+
+        Args:
+            state (dict): Live match data in the MatchDataFetcher format;
+                "xg" and "formation" are used when a team reports them
+            scenarios (list, optional): Dicts with "name" and optionally
+                "formation", "substitution" (a SUBSTITUTION_EFFECTS key) and
+                "from_minute" (when the change takes effect)
+            team (str, optional): Side to evaluate for; defaults to the home team
+            n_sims (int): Number of simulations per scenario
+            seed (int, optional): Seed for reproducible results
+
+        Returns:
+            dict: team, opponent, minute, score, the current formation and
+                whether it is known, and one result per scenario with
+                win/draw/loss probabilities, expected points, expected final
+                goals and the most likely final score. Formation switches from
+                an unknown formation are measured against DEFAULT_FORMATION
+        """
+        if not is_live(state):
+            raise ValueError("Simulation needs live match data with a minute and a score")
+
+        own, other = state["home_team"], state["away_team"]
+        if team and team == other.get("name"):
+            own, other = other, own
+
+        minute = min(max(float(state["minute"]), 0), MATCH_MINUTES + ADDED_TIME)
+        remaining = MATCH_MINUTES + ADDED_TIME - minute
+        current = own.get("formation") or state.get("formation") or DEFAULT_FORMATION
+        scenarios = scenarios or self.default_scenarios(current)
+
+        shapes, scales = self._posteriors(own, other, minute)
+        exposure = np.array([self._exposure(s, current, minute, remaining) for s in scenarios])
+        exposure *= self._red_card_factors(own, other)
+
+        counts = self._run(shapes, scales, exposure, n_sims, seed)
+        return {
+            "team": own.get("name", "Home Team"),
+            "opponent": other.get("name", "Away Team"),
+            "minute": int(minute),
+            "score": (own.get("score", 0), other.get("score", 0)),
+            "formation": current,
+            "formation_known": current in FORMATION_FEATURES,
+            "simulations": n_sims,
+            "scenarios": self._summarize(scenarios, counts, own.get("score", 0),
+                                         other.get("score", 0))
+        }
+
+    def _posteriors(self, own, other, minute):
+        """Gamma posterior of each side's goals per minute"""
+        evidence = []
+        for side in (own, other):
+            xg = side.get("xg")
+            if xg is None:
+                xg = side.get("shots_on_target", 0) * XG_PER_SHOT_ON_TARGET
+            evidence.append(float(xg))
+        shapes = PRIOR_GOALS * PRIOR_MINUTES / MATCH_MINUTES + np.array(evidence)
+        scales = np.full(2, 1.0 / (PRIOR_MINUTES + minute))
+        return shapes, scales
+
+    def _exposure(self, scenario, current, minute, remaining):
+        """Minutes left for each side to score, weighted by the scenario's effects"""
+        scoring, conceding = 1.0, 1.0
+        formation = scenario.get("formation")
+        if formation:
+            if formation not in FORMATION_FEATURES:
+                raise ValueError(f"Unknown formation: {formation}")
+            base = FORMATION_FEATURES.get(current, FORMATION_FEATURES[DEFAULT_FORMATION])
+            new = FORMATION_FEATURES[formation]
+            scoring *= np.exp(ATTACK_EFFECT * (new.get("attack", 0) - base.get("attack", 0)))
+            conceding *= np.exp(-DEFENCE_EFFECT * (new.get("defence", 0) - base.get("defence", 0)))
+
+        substitution = scenario.get("substitution")
+        if substitution:
+            if substitution not in SUBSTITUTION_EFFECTS:
+                raise ValueError(f"Unknown substitution type: {substitution}")
+            scoring *= SUBSTITUTION_EFFECTS[substitution][0]
+            conceding *= SUBSTITUTION_EFFECTS[substitution][1]
+
+        # The change only applies from the minute it is made
+        before = min(max(scenario.get("from_minute", minute) - minute, 0), remaining)
+        after = remaining - before
+        return (before + after * scoring, before + after * conceding)
+
+    def _red_card_factors(self, own, other):
+        own_reds = own.get("cards", {}).get("red", 0)
+        other_reds = other.get("cards", {}).get("red", 0)
+        return np.array([
+            RED_CARD_EFFECT[0] ** own_reds * RED_CARD_EFFECT[1] ** other_reds,
+            RED_CARD_EFFECT[1] ** own_reds * RED_CARD_EFFECT[0] ** other_reds
+        ])
+
+    def _run(self, shapes, scales, exposure, n_sims, seed):
+        """Run the simulations in-process or split across the pool"""
+        seeds = np.random.SeedSequence(seed)
+        if n_sims < PARALLEL_MIN_SIMULATIONS or self.max_workers <= 1:
+            return _simulate_chunk(shapes, scales, exposure, n_sims, seeds)
+
+        sizes = [len(c) for c in np.array_split(np.arange(n_sims), self.max_workers)]
+        children = seeds.spawn(len(sizes))
+        pool = self._get_pool()
+        chunks = pool.map(_simulate_chunk, [shapes] * len(sizes), [scales] * len(sizes),
+                          [exposure] * len(sizes), sizes, children)
+        return sum(chunks)
+
+    def _summarize(self, scenarios, counts, goals_for, goals_against):
+        size = MAX_GOALS + 1
+        added = np.arange(size)
+        # Goal difference of every cell of the (goals for, goals against) table
+        diff = (goals_for + added)[:, None] - (goals_against + added)[None, :]
+        probabilities = counts / counts.sum(axis=(1, 2), keepdims=True)
+
+        results = []
+        for scenario, p in zip(scenarios, probabilities):
+            win, draw = float(p[diff > 0].sum()), float(p[diff == 0].sum())
+            loss = 1.0 - win - draw
+            likely = np.unravel_index(np.argmax(p), p.shape)
+            results.append({
+                "name": scenario["name"],
+                "win": win,
+                "draw": draw,
+                "loss": loss,
+                "expected_points": 3 * win + draw,
+                "expected_goals_for": goals_for + float(p.sum(axis=1) @ added),
+                "expected_goals_against": goals_against + float(p.sum(axis=0) @ added),
+                "likely_score": (goals_for + int(likely[0]), goals_against + int(likely[1]))
+            })
+        return results
+
+    def _get_pool(self):
+        """Return the simulation pool, starting it on first use"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def close(self):
+        """Shut down the simulation pool, if one was started"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,217 @@
+"""
+Compiled planning knowledge: formations, tactics and set pieces
+
+The knowledge lives in a versioned JSON file and is compiled once, when this
+module is imported, into read-only structures shared by every PlanningTool:
+
+    - entries: category -> name -> entry, as mapping proxies and tuples
+    - text blocks rendered up front, so a recommendation is a lookup
+    - an inverted index over every attribute, for lookups such as
+      find("formations", "suitable_for", "need goals")
+    - the feature vector of every entry over FEATURES, which the tactics
+      recommender and the match simulator score candidates with
+"""
+
+import json
+import os
+import re
+from types import MappingProxyType
+
+from ..formation_layout import get_layout
+
+KNOWLEDGE_VERSION = 2
+
+DEFAULT_KNOWLEDGE_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "knowledge",
+                                      "planning_knowledge.json")
+
+CATEGORIES = ("formations", "tactics", "set_pieces")
+
+# Axes of the entries' feature vectors; an axis an entry leaves out is 0
+FEATURES = ("attack", "defence", "midfield", "width", "pressing", "counter", "possession",
+            "directness", "physical", "balance", "corner", "free_kick", "aerial",
+            "delivery_pace", "shooting", "rehearsed")
+
+# Strategy types of PlanningTool.generate_strategy and their categories
+STRATEGY_CATEGORIES = {"formation": "formations", "tactics": "tactics", "set_piece": "set_pieces"}
+
+GENERAL_TITLES = {
+    "formations": "Formation Recommendations",
+    "tactics": "Tactical Approach Recommendations",
+    "set_pieces": "Set Piece Recommendations"
+}
+
+# Words that carry no meaning for attribute lookups
+STOPWORDS = {"a", "an", "and", "are", "be", "for", "in", "is", "of", "on", "or", "the", "to",
+             "we", "when", "with", "our", "more"}
+
+
+def _stem(word):
+    """Crude stemming so that "goals", "needed" and "need" share a term"""
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def terms(text):
+    """Normalized search terms of a piece of text"""
+    return {_stem(w) for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in STOPWORDS}
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class PlanningKnowledge:
+    """
+    Read-only planning knowledge with prerendered text and attribute indexes
+
+    Attributes:
+        version (int): Version of the knowledge file
+        formations, tactics, set_pieces (mappingproxy): Name -> entry
+    """
+
+    def __init__(self, data):
+        version = data.get("version")
+        if version != KNOWLEDGE_VERSION:
+            raise ValueError(f"Unsupported planning knowledge version {version}; "
+                             f"expected {KNOWLEDGE_VERSION}")
+        self.version = version
+
+        self._entries = {}
+        self._blocks = {}
+        self._general = {}
+        self._index = {}
+        for category in CATEGORIES:
+            entries = _freeze(data.get(category, {}))
+            self._check_features(category, entries)
+            self._entries[category] = entries
+            self._blocks[category] = MappingProxyType(
+                {name: self._render_block(category, name, entry) for name, entry in entries.items()})
+            self._general[category] = self._render_general(category, entries)
+            self._index[category] = self._build_index(entries)
+
+        self.formations = self._entries["formations"]
+        self.tactics = self._entries["tactics"]
+        self.set_pieces = self._entries["set_pieces"]
+
+    @classmethod
+    def load(cls, path=DEFAULT_KNOWLEDGE_PATH):
+        """Load and compile a knowledge file"""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def _check_features(category, entries):
+        """Every entry needs a non-empty feature vector over known axes"""
+        for name, entry in entries.items():
+            features = entry.get("features")
+            if not features:
+                raise ValueError(f"Planning knowledge entry {category}/{name} has no feature vector")
+            unknown = set(features) - set(FEATURES)
+            if unknown:
+                raise ValueError(f"Planning knowledge entry {category}/{name} has unknown "
+                                 f"features: {', '.join(sorted(unknown))}")
+
+    def _render_block(self, category, name, entry):
+        """Reasoning lines of a recommendation, up to the implementation tips"""
+        block = f"Reasoning: {entry['description']}\n"
+        block += f"• Strengths: {', '.join(entry['strengths'])}\n"
+        if category == "formations":
+            block += f"• Shape: {get_layout(name).describe()}\n"
+        if category == "set_pieces":
+            block += f"• Setup: {entry['setup']}\n\n"
+        else:
+            kind = "formation" if category == "formations" else "tactic"
+            block += f"• This {kind} is ideal when {', '.join(entry['suitable_for']).lower()}\n\n"
+        block += "Implementation Tips:\n"
+        block += "".join(f"• {tip}\n" for tip in entry.get("tips", ()))
+        return block
+
+    def _render_general(self, category, entries):
+        """Overview of every entry of a category"""
+        items = []
+        for name, entry in entries.items():
+            item = f"• {name}: {entry['description']}\n"
+            if category == "formations":
+                item += f"  Shape: {get_layout(name).describe()}\n"
+            item += f"  Strengths: {', '.join(entry['strengths'])}\n"
+            if category == "set_pieces":
+                item += f"  Setup: {entry['setup']}"
+            else:
+                item += f"  Suitable for: {', '.join(entry['suitable_for'])}"
+            items.append(item)
+        return f"{GENERAL_TITLES[category]}:\n\n" + "\n\n".join(items)
+
+    def _build_index(self, entries):
+        """attribute -> term -> names of the entries mentioning the term"""
+        index = {}
+        for name, entry in entries.items():
+            for attribute, value in entry.items():
+                if attribute == "features":
+                    continue
+                texts = value if isinstance(value, tuple) else (value,)
+                postings = index.setdefault(attribute, {})
+                for term in terms(" ".join(texts)):
+                    postings.setdefault(term, set()).add(name)
+        return MappingProxyType({
+            attribute: MappingProxyType({t: frozenset(n) for t, n in postings.items()})
+            for attribute, postings in index.items()
+        })
+
+    def entries(self, category):
+        return self._entries[category]
+
+    def features(self, category):
+        """Name -> feature vector (feature -> weight) of every entry of a category"""
+        return MappingProxyType({name: entry["features"]
+                                 for name, entry in self._entries[category].items()})
+
+    def block(self, category, name):
+        """Prerendered reasoning and tips of an entry"""
+        return self._blocks[category][name]
+
+    def general(self, category):
+        """Prerendered overview of a category"""
+        return self._general[category]
+
+    def find(self, category, attribute, query):
+        """
+        Find the entries whose attribute matches a query
+
+        Args:
+            category (str): "formations", "tactics" or "set_pieces"
+            attribute (str): Entry attribute, e.g. "suitable_for" or "strengths"
+            query (str): Free text, e.g. "need goals"
+
+        Returns:
+            list: Names of the matching entries, most matching terms first
+        """
+        postings = self._index[category].get(attribute, {})
+        hits = {}
+        for term in terms(query):
+            for name in postings.get(term, ()):
+                hits[name] = hits.get(name, 0) + 1
+        order = list(self._entries[category])
+        return sorted(hits, key=lambda name: (-hits[name], order.index(name)))
+
+    def lookup(self, query):
+        """
+        Find entries with an "attribute: text" query
+
+        Example:
+            >>> KNOWLEDGE.lookup("suitable_for: need goals")
+            {'formations': ['4-3-3', '4-4-2'], 'tactics': [], 'set_pieces': []}
+        """
+        attribute, _, text = query.partition(":")
+        if not text:
+            raise ValueError("A lookup has the form 'attribute: text', e.g. 'suitable_for: need goals'")
+        attribute = attribute.strip().replace(" ", "_")
+        return {category: self.find(category, attribute, text) for category in CATEGORIES}
+
+
+KNOWLEDGE = PlanningKnowledge.load()
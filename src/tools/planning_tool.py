@@ -1,6 +1,12 @@
 from llama_index.core.tools import FunctionTool
 import json
 
+from .planning_knowledge import KNOWLEDGE, STRATEGY_CATEGORIES
+from .tactics_recommender import TacticsRecommender
+from .match_simulator import DEFAULT_FORMATION, MatchSimulator, is_live
+from .lineup_optimizer import LineupOptimizer
+from .training_planner import TrainingPlanner, focus_from_text
+
 
 class PlanningTool:
     def __init__(self):
@@ -8,6 +14,13 @@ class PlanningTool:
         self.description = """
         Use this tool to generate strategic recommendations like formations, tactics, and set pieces.
         This is useful for creating game plans based on team stats and match context.
+        With live match data as context, strategy_type "simulation" estimates win, draw and loss
+        probabilities for formation changes and substitutions. With a squad as context
+        ({"squad": [{"name", "ratings": {role: rating}, "fitness", "suspended"}], "formation"}),
+        strategy_type "lineup" picks the best starting eleven and bench. strategy_type
+        "training_session" plans drills for the focus areas in team_situation, or a whole week
+        for several squads with context {"squads": [{"name", "sessions": {day: {"duration",
+        "focus", "players", "max_load"}}, "weekly_load"}], "equipment": [...]}.
         """
 
         # Create the tool
@@ -17,97 +30,23 @@ class PlanningTool:
             fn=self.generate_strategy
         )
 
-        # Define common formations and their characteristics
-        self.formations = {
-            "4-4-2": {
-                "description": "Traditional balanced formation with two strikers",
-                "strengths": ["Balanced defense and attack", "Good width", "Simple to understand"],
-                "weaknesses": ["Can be overrun in midfield", "Less flexibility"],
-                "suitable_for": ["Teams with strong strikers", "When balance is needed"]
-            },
-            "4-3-3": {
-                "description": "Attack-oriented formation with three forwards",
-                "strengths": ["Strong attacking presence", "Wingers provide width", "Control in midfield"],
-                "weaknesses": ["Wingers must track back", "Can leave fullbacks exposed"],
-                "suitable_for": ["Teams with strong wingers", "Possession-based teams", "When goals are needed"]
-            },
-            "3-5-2": {
-                "description": "Formation with three center-backs and wing-backs",
-                "strengths": ["Strong central defense", "Numerical advantage in midfield", "Wing-backs provide width"],
-                "weaknesses": ["Wing-backs must be very fit", "Can be vulnerable to quick transitions"],
-                "suitable_for": ["Teams facing superior opponents", "When midfield control is crucial"]
-            },
-            "5-3-2": {
-                "description": "Very defensive formation with five defenders",
-                "strengths": ["Very solid defense", "Good for counterattacking", "Protects a lead"],
-                "weaknesses": ["Limited attacking options", "Can invite pressure"],
-                "suitable_for": ["Protecting a lead", "Against stronger attacking teams"]
-            },
-            "4-2-3-1": {
-                "description": "Modern formation with two defensive midfielders",
-                "strengths": ["Balanced attack and defense", "Strong central midfield", "Flexible in attack"],
-                "weaknesses": ["Relies on strong no. 10 player", "Single striker can get isolated"],
-                "suitable_for": ["Teams with a strong attacking midfielder", "Modern possession-based approach"]
-            }
-        }
-
-        # Define tactical approaches
-        self.tactics = {
-            "High Press": {
-                "description": "Aggressively pressure opponents in their own half",
-                "strengths": ["Forces turnovers in dangerous areas", "Disrupts opponent buildup"],
-                "weaknesses": ["Physically demanding", "Can leave spaces behind"],
-                "suitable_for": ["Fit teams", "Against teams that build from the back"]
-            },
-            "Counter Attack": {
-                "description": "Defend deep and strike quickly when possession is won",
-                "strengths": ["Exploits spaces left by attacking teams", "Effective against possession teams"],
-                "weaknesses": ["Requires fast players", "Less possession", "Can invite pressure"],
-                "suitable_for": ["Teams with pace in attack", "Against possession-heavy opponents"]
-            },
-            "Possession": {
-                "description": "Keep the ball and patiently build attacks",
-                "strengths": ["Controls the game tempo", "Tires opponents", "Creates chances through combinations"],
-                "weaknesses": ["Can be predictable", "Requires technical players"],
-                "suitable_for": ["Technically skilled teams", "When controlling the game is important"]
-            },
-            "Direct Play": {
-                "description": "Move the ball forward quickly, often with long passes",
-                "strengths": ["Bypasses opponent press", "Creates quick chances", "Unpredictable"],
-                "weaknesses": ["Lower possession", "Less control", "Requires target forwards"],
-                "suitable_for": ["Teams with strong target forwards", "Against high-pressing teams"]
-            },
-            "Low Block": {
-                "description": "Defend deep in a compact shape",
-                "strengths": ["Very solid defensively", "Difficult to break down", "Good for protecting leads"],
-                "weaknesses": ["Limited attacking opportunities", "Invites pressure"],
-                "suitable_for": ["Defensive focus", "Against stronger teams", "Protecting a lead"]
-            }
-        }
-
-        # Define set piece strategies
-        self.set_pieces = {
-            "Corner Kick - Near Post": {
-                "description": "Aim for the near post with runners attacking that area",
-                "strengths": ["Difficult for goalkeepers to defend", "Creates flick-on opportunities"],
-                "setup": "Position strong headers at near post and far post. Deliver with pace and curve."
-            },
-            "Corner Kick - Far Post": {
-                "description": "Aim for the far post with tall players attacking that area",
-                "strengths": ["Can exploit height advantage", "Keeper struggles to reach far post"],
-                "setup": "Position tall players at far post. Deliver with height to back post area."
-            },
-            "Free Kick - Direct": {
-                "description": "Shoot directly at goal",
-                "strengths": ["Can score directly", "Unpredictable"],
-                "setup": "Specialist free kick taker with good technique. Others provide dummy runs."
-            },
-            "Free Kick - Training Ground": {
-                "description": "Rehearsed routine with multiple movements and passes",
-                "strengths": ["Can surprise opponents", "Creates open chances"],
-                "setup": "Requires practiced movements and timing. Use dummy runners to create space."
-            }
-        }
+        # Formations, tactics and set pieces, compiled once and shared read-only
+        self.knowledge = KNOWLEDGE
+        self.formations = KNOWLEDGE.formations
+        self.tactics = KNOWLEDGE.tactics
+        self.set_pieces = KNOWLEDGE.set_pieces
+
+        # Scores the options above against the team's needs
+        self.recommender = TacticsRecommender()
+
+        # Quantifies in-game decisions from live match data
+        self.simulator = MatchSimulator()
+
+        # Picks the best eleven from a squad
+        self.lineup_optimizer = LineupOptimizer()
+
+        # Schedules drills into training sessions
+        self.training_planner = TrainingPlanner()
 
     def generate_strategy(self, context_json=None, strategy_type="formation", team_situation=None):
         """
@@ -115,7 +54,7 @@ class PlanningTool:
 
         Args:
             context_json (str, optional): JSON string containing match context, team data, etc.
-            strategy_type (str): Type of strategy to generate (formation, tactics, set_piece)
+            strategy_type (str): Type of strategy to generate (formation, tactics, set_piece, simulation, lineup, training_session)
             team_situation (str, optional): Brief description of team's current situation
 
         Returns:
@@ -141,103 +80,58 @@ class PlanningTool:
                 return self._recommend_tactics(context, team_situation)
             elif strategy_type.lower() == "set_piece":
                 return self._recommend_set_piece(context, team_situation)
+            elif strategy_type.lower() == "simulation":
+                return self._simulate_options(context)
+            elif strategy_type.lower() == "lineup":
+                return self._recommend_lineup(context)
+            elif strategy_type.lower() == "training_session":
+                return self._plan_training(context, team_situation)
             else:
-                return f"Unknown strategy type: {strategy_type}. Please use formation, tactics, or set_piece."
+                return f"Unknown strategy type: {strategy_type}. Please use formation, tactics, set_piece, simulation, lineup, or training_session."
 
         except Exception as e:
             return f"Error generating strategy: {str(e)}"
 
     def _generate_general_recommendation(self, strategy_type):
         """Generate a general recommendation without specific context"""
-        if strategy_type.lower() == "formation":
-            formations_info = []
-            for formation, details in self.formations.items():
-                formations_info.append(
-                    f"• {formation}: {details['description']}\n  Strengths: {', '.join(details['strengths'])}\n  Suitable for: {', '.join(details['suitable_for'])}")
-
-            return "Formation Recommendations:\n\n" + "\n\n".join(formations_info)
+        if strategy_type.lower() in STRATEGY_CATEGORIES:
+            return self.knowledge.general(STRATEGY_CATEGORIES[strategy_type.lower()])
 
-        elif strategy_type.lower() == "tactics":
-            tactics_info = []
-            for tactic, details in self.tactics.items():
-                tactics_info.append(
-                    f"• {tactic}: {details['description']}\n  Strengths: {', '.join(details['strengths'])}\n  Suitable for: {', '.join(details['suitable_for'])}")
+        elif strategy_type.lower() == "simulation":
+            return "Match simulation needs live match data (minute, score, shots) as context."
 
-            return "Tactical Approach Recommendations:\n\n" + "\n\n".join(tactics_info)
+        elif strategy_type.lower() == "lineup":
+            return "Lineup selection needs the squad, with each player's ratings per position, as context."
 
-        elif strategy_type.lower() == "set_piece":
-            set_pieces_info = []
-            for set_piece, details in self.set_pieces.items():
-                set_pieces_info.append(
-                    f"• {set_piece}: {details['description']}\n  Strengths: {', '.join(details['strengths'])}\n  Setup: {details['setup']}")
-
-            return "Set Piece Recommendations:\n\n" + "\n\n".join(set_pieces_info)
+        elif strategy_type.lower() == "training_session":
+            return self._plan_training(None, None)
 
         else:
-            return f"Unknown strategy type: {strategy_type}. Please use formation, tactics, or set_piece."
+            return f"Unknown strategy type: {strategy_type}. Please use formation, tactics, set_piece, simulation, lineup, or training_session."
 
     def _recommend_formation(self, context, team_situation):
-        """
-        Recommend a formation based on the team situation
-
-        This is a simplified rule-based recommendation for the prototype
-        In a real implementation, this would use more sophisticated logic
-        """
+        """Recommend the formation that best matches the team's needs"""
         recommendation = "Formation Recommendation:\n\n"
-
-        # Check for keywords in the situation to make recommendations
-        if team_situation:
-            situation_lower = team_situation.lower()
-
-            if "defensive" in situation_lower or "protect lead" in situation_lower:
-                recommendation += f"Recommended Formation: 5-3-2\n\n"
-                recommendation += f"Reasoning: {self.formations['5-3-2']['description']}\n"
-                recommendation += f"• Strengths: {', '.join(self.formations['5-3-2']['strengths'])}\n"
-                recommendation += f"• This formation is ideal when {', '.join(self.formations['5-3-2']['suitable_for']).lower()}\n\n"
-                recommendation += "Implementation Tips:\n"
-                recommendation += "• Ensure center-backs maintain tight spacing and communicate well\n"
-                recommendation += "• Wing-backs should focus more on defensive duties than attacking\n"
-                recommendation += "• Central midfielders should prioritize screening the defense\n"
-
-            elif "attacking" in situation_lower or "need goals" in situation_lower:
-                recommendation += f"Recommended Formation: 4-3-3\n\n"
-                recommendation += f"Reasoning: {self.formations['4-3-3']['description']}\n"
-                recommendation += f"• Strengths: {', '.join(self.formations['4-3-3']['strengths'])}\n"
-                recommendation += f"• This formation is ideal when {', '.join(self.formations['4-3-3']['suitable_for']).lower()}\n\n"
-                recommendation += "Implementation Tips:\n"
-                recommendation += "• Position wingers high and wide to stretch the defense\n"
-                recommendation += "• Full-backs should provide overlapping runs\n"
-                recommendation += "• Central midfielders should focus on quick forward passes\n"
-
-            elif "midfield control" in situation_lower or "possession" in situation_lower:
-                recommendation += f"Recommended Formation: 4-2-3-1\n\n"
-                recommendation += f"Reasoning: {self.formations['4-2-3-1']['description']}\n"
-                recommendation += f"• Strengths: {', '.join(self.formations['4-2-3-1']['strengths'])}\n"
-                recommendation += f"• This formation is ideal when {', '.join(self.formations['4-2-3-1']['suitable_for']).lower()}\n\n"
-                recommendation += "Implementation Tips:\n"
-                recommendation += "• The two defensive midfielders should stay disciplined and protect the backline\n"
-                recommendation += "• The attacking midfielder is the key creative force\n"
-                recommendation += "• Wide attackers should move inside to create overloads\n"
-
-            elif "balanced" in situation_lower or "versatile" in situation_lower:
-                recommendation += f"Recommended Formation: 4-4-2\n\n"
-                recommendation += f"Reasoning: {self.formations['4-4-2']['description']}\n"
-                recommendation += f"• Strengths: {', '.join(self.formations['4-4-2']['strengths'])}\n"
-                recommendation += f"• This formation is ideal when {', '.join(self.formations['4-4-2']['suitable_for']).lower()}\n\n"
-                recommendation += "Implementation Tips:\n"
-                recommendation += "• Ensure the midfield stays compact both horizontally and vertically\n"
-                recommendation += "• The two strikers should work together, with one possibly dropping deeper\n"
-                recommendation += "• Wide midfielders must contribute both offensively and defensively\n"
-
-            else:
-                # Default recommendation when keywords don't match
-                recommendation += "Based on the situation described, I recommend analyzing the opponent's formation first.\n\n"
-                recommendation += "Without specific details about your team's strengths or the opposition, "
-                recommendation += "a balanced 4-4-2 formation provides solid defensive structure while maintaining attacking options.\n\n"
-                recommendation += "Alternative options to consider:\n"
-                recommendation += "• 4-2-3-1: For more midfield control\n"
-                recommendation += "• 4-3-3: If you have strong wingers and need more attacking power\n"
-                recommendation += "• 3-5-2: If you need extra midfield presence against strong opponents\n"
+        need = self.recommender.need_vector(team_situation, context)
+        ranking = self.recommender.rank("formation", need)
+
+        if ranking:
+            best = ranking[0]["name"]
+            recommendation += f"Recommended Formation: {best} ({ranking[0]['confidence']:.0%} confidence)\n\n"
+            recommendation += self.knowledge.block("formations", best)
+            recommendation += self._ranking_notes(ranking, need)
+            if is_live(context):
+                recommendation += self._simulated_switch(context, best)
+
+        elif team_situation:
+            # Default recommendation when the situation carries no signal
+            recommendation += "Based on the situation described, I recommend analyzing the opponent's formation first.\n\n"
+            recommendation += "Without specific details about your team's strengths or the opposition, "
+            recommendation += "a balanced 4-4-2 formation provides solid defensive structure while maintaining attacking options.\n\n"
+            recommendation += "Alternative options to consider:\n"
+            recommendation += "• 4-2-3-1: For more midfield control\n"
+            recommendation += "• 4-3-3: If you have strong wingers and need more attacking power\n"
+            recommendation += "• 3-5-2: If you need extra midfield presence against strong opponents\n"
         else:
             # No situation provided, give general advice
             recommendation += "Without specific match context, I recommend a balanced 4-3-3 formation.\n\n"
@@ -251,64 +145,28 @@ class PlanningTool:
         return recommendation
 
     def _recommend_tactics(self, context, team_situation):
-        """Recommend tactics based on the team situation"""
+        """Recommend the tactical approach that best matches the team's needs"""
         recommendation = "Tactical Approach Recommendation:\n\n"
-
-        # Check for keywords in the situation to make recommendations
-        if team_situation:
-            situation_lower = team_situation.lower()
-
-            if "stronger opponent" in situation_lower or "defensive" in situation_lower:
-                recommendation += f"Recommended Tactic: Counter Attack\n\n"
-                recommendation += f"Reasoning: {self.tactics['Counter Attack']['description']}\n"
-                recommendation += f"• Strengths: {', '.join(self.tactics['Counter Attack']['strengths'])}\n"
-                recommendation += f"• This tactic is ideal when {', '.join(self.tactics['Counter Attack']['suitable_for']).lower()}\n\n"
-                recommendation += "Implementation Tips:\n"
-                recommendation += "• Maintain a compact shape when defending\n"
-                recommendation += "• Position fast attackers ready to break forward\n"
-                recommendation += "• Practice quick transitions from defense to attack\n"
-
-            elif "possession" in situation_lower or "control" in situation_lower:
-                recommendation += f"Recommended Tactic: Possession\n\n"
-                recommendation += f"Reasoning: {self.tactics['Possession']['description']}\n"
-                recommendation += f"• Strengths: {', '.join(self.tactics['Possession']['strengths'])}\n"
-                recommendation += f"• This tactic is ideal when {', '.join(self.tactics['Possession']['suitable_for']).lower()}\n\n"
-                recommendation += "Implementation Tips:\n"
-                recommendation += "• Focus on short, accurate passing\n"
-                recommendation += "• Create triangles all over the pitch\n"
-                recommendation += "• Be patient - not every pass needs to be forward\n"
-
-            elif "pressing" in situation_lower or "aggressive" in situation_lower:
-                recommendation += f"Recommended Tactic: High Press\n\n"
-                recommendation += f"Reasoning: {self.tactics['High Press']['description']}\n"
-                recommendation += f"• Strengths: {', '.join(self.tactics['High Press']['strengths'])}\n"
-                recommendation += f"• This tactic is ideal when {', '.join(self.tactics['High Press']['suitable_for']).lower()}\n\n"
-                recommendation += "Implementation Tips:\n"
-                recommendation += "• Press as a unit - timing and coordination are essential\n"
-                recommendation += "• Focus on cutting passing lanes\n"
-                recommendation += "• Have a clear trigger for when to press\n"
-
-            elif "direct" in situation_lower or "long ball" in situation_lower:
-                recommendation += f"Recommended Tactic: Direct Play\n\n"
-                recommendation += f"Reasoning: {self.tactics['Direct Play']['description']}\n"
-                recommendation += f"• Strengths: {', '.join(self.tactics['Direct Play']['strengths'])}\n"
-                recommendation += f"• This tactic is ideal when {', '.join(self.tactics['Direct Play']['suitable_for']).lower()}\n\n"
-                recommendation += "Implementation Tips:\n"
-                recommendation += "• Position players to win second balls\n"
-                recommendation += "• Target forwards should be skilled at holding up play\n"
-                recommendation += "• Midfielders should make forward runs to support\n"
-
-            else:
-                # Default recommendation
-                recommendation += "Based on the limited information provided, a balanced approach combining elements of possession and counter-attacking is recommended.\n\n"
-                recommendation += "Adapt your tactical approach based on:\n"
-                recommendation += "• The opponent's strengths and weaknesses\n"
-                recommendation += "• Your team's technical abilities\n"
-                recommendation += "• Match situation (score, time remaining)\n\n"
-                recommendation += "Consider these tactical options:\n"
-                recommendation += "• High Press: If opponent struggles under pressure\n"
-                recommendation += "• Counter Attack: If opponent commits players forward\n"
-                recommendation += "• Possession: If your team is technically superior\n"
+        need = self.recommender.need_vector(team_situation, context)
+        ranking = self.recommender.rank("tactics", need)
+
+        if ranking:
+            best = ranking[0]["name"]
+            recommendation += f"Recommended Tactic: {best} ({ranking[0]['confidence']:.0%} confidence)\n\n"
+            recommendation += self.knowledge.block("tactics", best)
+            recommendation += self._ranking_notes(ranking, need)
+
+        elif team_situation:
+            # Default recommendation
+            recommendation += "Based on the limited information provided, a balanced approach combining elements of possession and counter-attacking is recommended.\n\n"
+            recommendation += "Adapt your tactical approach based on:\n"
+            recommendation += "• The opponent's strengths and weaknesses\n"
+            recommendation += "• Your team's technical abilities\n"
+            recommendation += "• Match situation (score, time remaining)\n\n"
+            recommendation += "Consider these tactical options:\n"
+            recommendation += "• High Press: If opponent struggles under pressure\n"
+            recommendation += "• Counter Attack: If opponent commits players forward\n"
+            recommendation += "• Possession: If your team is technically superior\n"
         else:
             # No situation provided
             recommendation += "Without specific match context, I recommend a flexible approach combining possession with direct counter-attacks when opportunities arise.\n\n"
@@ -321,67 +179,29 @@ class PlanningTool:
         return recommendation
 
     def _recommend_set_piece(self, context, team_situation):
-        """Recommend set piece strategies based on the team situation"""
+        """Recommend the set piece routine that best matches the situation"""
         recommendation = "Set Piece Recommendation:\n\n"
-
-        # Check for keywords in the situation to make recommendations
-        if team_situation:
-            situation_lower = team_situation.lower()
-
-            if "corner" in situation_lower and "attacking" in situation_lower:
-                # Recommend corner kick strategy
-                if "tall players" in situation_lower or "height advantage" in situation_lower:
-                    recommendation += f"Recommended Set Piece: Corner Kick - Far Post\n\n"
-                    recommendation += f"Reasoning: {self.set_pieces['Corner Kick - Far Post']['description']}\n"
-                    recommendation += f"• Strengths: {', '.join(self.set_pieces['Corner Kick - Far Post']['strengths'])}\n"
-                    recommendation += f"• Setup: {self.set_pieces['Corner Kick - Far Post']['setup']}\n\n"
-                    recommendation += "Implementation Tips:\n"
-                    recommendation += "• Deliver the ball with height to the far post area\n"
-                    recommendation += "• Position 2-3 tall players to attack this area\n"
-                    recommendation += "• Have players ready for rebounds\n"
-                else:
-                    recommendation += f"Recommended Set Piece: Corner Kick - Near Post\n\n"
-                    recommendation += f"Reasoning: {self.set_pieces['Corner Kick - Near Post']['description']}\n"
-                    recommendation += f"• Strengths: {', '.join(self.set_pieces['Corner Kick - Near Post']['strengths'])}\n"
-                    recommendation += f"• Setup: {self.set_pieces['Corner Kick - Near Post']['setup']}\n\n"
-                    recommendation += "Implementation Tips:\n"
-                    recommendation += "• Deliver the ball with pace to the near post\n"
-                    recommendation += "• Have a player attacking the near post for a flick-on\n"
-                    recommendation += "• Position players at the far post and penalty spot\n"
-
-            elif "free kick" in situation_lower and ("shooting" in situation_lower or "goal" in situation_lower):
-                # Direct free kick near goal
-                recommendation += f"Recommended Set Piece: Free Kick - Direct\n\n"
-                recommendation += f"Reasoning: {self.set_pieces['Free Kick - Direct']['description']}\n"
-                recommendation += f"• Strengths: {', '.join(self.set_pieces['Free Kick - Direct']['strengths'])}\n"
-                recommendation += f"• Setup: {self.set_pieces['Free Kick - Direct']['setup']}\n\n"
-                recommendation += "Implementation Tips:\n"
-                recommendation += "• Have your best free kick taker as the primary option\n"
-                recommendation += "• Position 1-2 additional players as decoys\n"
-                recommendation += "• Consider shot placement based on wall and goalkeeper position\n"
-
-            elif "free kick" in situation_lower and "wide" in situation_lower:
-                # Free kick in wide position
-                recommendation += f"Recommended Set Piece: Free Kick - Training Ground\n\n"
-                recommendation += f"Reasoning: {self.set_pieces['Free Kick - Training Ground']['description']}\n"
-                recommendation += f"• Strengths: {', '.join(self.set_pieces['Free Kick - Training Ground']['strengths'])}\n"
-                recommendation += f"• Setup: {self.set_pieces['Free Kick - Training Ground']['setup']}\n\n"
-                recommendation += "Implementation Tips:\n"
-                recommendation += "• Use dummy runners to create space\n"
-                recommendation += "• Consider a short pass to create a better crossing angle\n"
-                recommendation += "• Position players at both posts and the penalty spot\n"
-
-            else:
-                # Default recommendation
-                recommendation += "Based on the situation described, here are general set piece recommendations:\n\n"
-                recommendation += "For Corners:\n"
-                recommendation += "• Mix up delivery between near and far post\n"
-                recommendation += "• Consider short corners to create different angles\n"
-                recommendation += "• Position your best headers in the best scoring positions\n\n"
-                recommendation += "For Free Kicks:\n"
-                recommendation += "• In shooting range: Consider direct shots or training ground routines\n"
-                recommendation += "• Wide positions: Create crossing opportunities or rehearsed movements\n"
-                recommendation += "• Defensive half: Consider quick restarts to counter-attack\n"
+        # Set pieces depend on the situation described, not on team profiles
+        need = self.recommender.situation_vector(team_situation)
+        ranking = self.recommender.rank("set_piece", need)
+
+        if ranking:
+            best = ranking[0]["name"]
+            recommendation += f"Recommended Set Piece: {best} ({ranking[0]['confidence']:.0%} confidence)\n\n"
+            recommendation += self.knowledge.block("set_pieces", best)
+            recommendation += self._ranking_notes(ranking, need)
+
+        elif team_situation:
+            # Default recommendation
+            recommendation += "Based on the situation described, here are general set piece recommendations:\n\n"
+            recommendation += "For Corners:\n"
+            recommendation += "• Mix up delivery between near and far post\n"
+            recommendation += "• Consider short corners to create different angles\n"
+            recommendation += "• Position your best headers in the best scoring positions\n\n"
+            recommendation += "For Free Kicks:\n"
+            recommendation += "• In shooting range: Consider direct shots or training ground routines\n"
+            recommendation += "• Wide positions: Create crossing opportunities or rehearsed movements\n"
+            recommendation += "• Defensive half: Consider quick restarts to counter-attack\n"
         else:
             # No situation provided
             recommendation += "Without specific match context, here are general set piece recommendations:\n\n"
@@ -395,3 +215,134 @@ class PlanningTool:
             recommendation += "• Defensive third: Safe clearance and shape maintenance\n"
 
         return recommendation
+
+    def _ranking_notes(self, ranking, need):
+        """Format the deciding factors and the runners-up"""
+        notes = ""
+        factors = self.recommender.key_factors(need)
+        if factors:
+            notes += f"\nKey factors: {', '.join(factors)}\n"
+
+        if len(ranking) > 1:
+            notes += "\nAlternatives:\n"
+            for option in ranking[1:3]:
+                notes += f"• {option['name']} ({option['confidence']:.0%} confidence)\n"
+        return notes
+
+    def _simulate_options(self, context):
+        """Estimate the outcome of each in-game option for a live match"""
+        if not is_live(context):
+            return "Match simulation needs live match data (minute, score, shots) as context."
+
+        result = self.simulator.simulate(context, team=context.get("team"))
+        team, opponent = result["team"], result["opponent"]
+        goals_for, goals_against = result["score"]
+        baseline = result["scenarios"][0]
+
+        recommendation = f"Match Simulation: {team} vs {opponent} "
+        recommendation += f"(Minute {result['minute']}, {goals_for}-{goals_against})\n\n"
+        if not result["formation_known"]:
+            recommendation += (f"Current shape {result['formation']} is unknown; formation switches "
+                               f"are measured against a {DEFAULT_FORMATION}.\n\n")
+        recommendation += f"Simulated {result['simulations']:,} finishes per option for {team}:\n"
+        for option in result["scenarios"]:
+            recommendation += f"• {option['name']}: {self._outcome_text(option)}\n"
+
+        best = max(result["scenarios"], key=lambda option: option["expected_points"])
+        gain = best["expected_points"] - baseline["expected_points"]
+        if best is baseline or gain < 0.01:
+            recommendation += "\nRecommendation: Keep the current shape; no change improves the expected result.\n"
+        else:
+            recommendation += f"\nRecommendation: {best['name']} (+{gain:.2f} expected points)\n"
+        return recommendation
+
+    def _simulated_switch(self, context, formation):
+        """Quantify switching to a formation in a live match"""
+        result = self.simulator.simulate(
+            context, team=context.get("team"),
+            scenarios=[{"name": "Keep current shape"},
+                       {"name": f"Switch to {formation}", "formation": formation}])
+        notes = f"\nSimulated outcome ({result['simulations']:,} finishes):\n"
+        for option in result["scenarios"]:
+            notes += f"• {option['name']}: {self._outcome_text(option)}\n"
+        return notes
+
+    def _outcome_text(self, option):
+        return (f"Win {option['win']:.0%} | Draw {option['draw']:.0%} | Loss {option['loss']:.0%} | "
+                f"Expected points {option['expected_points']:.2f} | "
+                f"Most likely {option['likely_score'][0]}-{option['likely_score'][1]}")
+
+    def _recommend_lineup(self, context):
+        """Pick the best eleven and bench, comparing every known formation"""
+        squad = (context or {}).get("squad")
+        if not squad:
+            return "Lineup selection needs the squad, with each player's ratings per position, as context."
+
+        requested = context.get("formation")
+        formations = list(self.formations)
+        if requested and requested not in formations:
+            formations.append(requested)
+        results = self.lineup_optimizer.optimize(squad, formations)
+        best = results[0]
+        chosen = next((r for r in results if r["formation"] == requested), best)
+
+        recommendation = "Lineup Recommendation:\n\n"
+        if chosen is best:
+            recommendation += f"Best formation for this squad: {best['formation']} "
+            recommendation += f"(average rating {best['average']:.1f})\n\n"
+        else:
+            recommendation += f"Requested formation: {chosen['formation']} (average rating {chosen['average']:.1f}). "
+            recommendation += f"The squad fits {best['formation']} best (average rating {best['average']:.1f}).\n\n"
+
+        recommendation += f"Starting XI ({chosen['formation']}):\n"
+        for slot in chosen["lineup"]:
+            recommendation += f"• {slot['role']}: {slot['name']} ({slot['rating']:.0f})\n"
+        recommendation += f"\nBench: {', '.join(chosen['bench']) or 'none'}\n"
+
+        unavailable = [f"{p.get('name')} ({'suspended' if p.get('suspended') else 'injured'})"
+                       for p in squad if p.get("suspended") or p.get("injured")]
+        if unavailable:
+            recommendation += f"Unavailable: {', '.join(unavailable)}\n"
+
+        recommendation += "\nFormation comparison:\n"
+        for result in results:
+            recommendation += f"• {result['formation']}: average rating {result['average']:.1f}\n"
+        return recommendation
+
+    def _plan_training(self, context, team_situation):
+        """Plan a training session, or a week of sessions for several squads"""
+        context = context or {}
+        if "squads" in context:
+            week = self.training_planner.plan_week(context)
+        else:
+            focus, minutes = focus_from_text(team_situation)
+            session = self.training_planner.plan_session(
+                duration=context.get("duration") or minutes or 90,
+                focus=context.get("focus") or focus,
+                equipment=context.get("equipment"),
+                players=context.get("players", 20),
+                max_load=context.get("max_load"))
+            week = {"squads": [{"name": None, "sessions": [session], "load": session.get("load", 0)}]}
+
+        recommendation = "Training Session Plan:\n"
+        for squad in week["squads"]:
+            for session in squad["sessions"]:
+                heading = " - ".join(str(part) for part in (squad["name"], session.get("day"))
+                                     if part and part != "Session")
+                recommendation += f"\n{heading}:\n" if heading else "\n"
+                if "error" in session:
+                    recommendation += f"• Could not plan this session: {session['error']}\n"
+                    continue
+                recommendation += f"{session['minutes']} minutes, load {session['load']}\n"
+                for drill in session["drills"]:
+                    phase = {"warm_up": " (warm-up)", "cool_down": " (cool-down)"}.get(drill["phase"], "")
+                    recommendation += (f"• {drill['minutes']}' {drill['name']}{phase} - "
+                                       f"{', '.join(f.replace('_', ' ') for f in drill['focus'])}\n")
+            if squad["name"] and len(squad["sessions"]) > 1:
+                recommendation += f"\nWeekly load for {squad['name']}: {squad['load']}\n"
+            if squad.get("focus_shortfall"):
+                missing = ", ".join(f"{area.replace('_', ' ')} {minutes} minutes short"
+                                    for area, minutes in squad["focus_shortfall"].items())
+                label = f" for {squad['name']}" if squad["name"] else ""
+                recommendation += f"\nWeekly focus targets not met{label}: {missing}\n"
+        return recommendation
@@ -5,9 +5,19 @@ from llama_index.llms.gemini import Gemini
 from llama_index.embeddings.gemini import GeminiEmbedding
 import os
 
+from ..tracing import span
+
 
 class RAGTool:
-    def __init__(self):
+    def __init__(self, docs_path="src/data/coaching_docs", embed_model=None):
+        """
+        Args:
+            docs_path (str): Directory of the coaching documents
+            embed_model (optional): Embedding model for the index. Defaults to
+                Gemini embeddings when a key is available.
+        """
+        self.docs_path = docs_path
+        self.embed_model = embed_model
         self.name = "retrieve_coaching_data"
         self.description = """
         Use this tool to retrieve information from internal coaching documents.
@@ -27,7 +37,7 @@ class RAGTool:
         In the prototype, we'll use mock data. In production, this would use real documents.
         """
         # Ensure the data directory exists
-        os.makedirs("src/data/coaching_docs", exist_ok=True)
+        os.makedirs(self.docs_path, exist_ok=True)
 
         # Create some mock documents for testing
         mock_docs = [
@@ -65,24 +75,23 @@ class RAGTool:
 
         # Write mock documents to files if they don't exist
         for doc in mock_docs:
-            doc_path = f"src/data/coaching_docs/{doc['filename']}"
+            doc_path = os.path.join(self.docs_path, doc['filename'])
             if not os.path.exists(doc_path):
                 with open(doc_path, 'w') as f:
                     f.write(doc['content'])
 
-        # Set up LlamaIndex components
-        self.docs_path = "src/data/coaching_docs"
-
         try:
             # Load documents
             documents = SimpleDirectoryReader(self.docs_path).load_data()
 
             # Create embeddings and index
-            # Use GeminiEmbedding for embedding if API key is available, otherwise use default
+            # Use the given embedding model, or GeminiEmbedding if API key is available, otherwise use default
             api_key = os.getenv("GEMINI_API_KEY")
-            if api_key:
+            embed_model = self.embed_model
+            if embed_model is None and api_key:
                 embed_model = GeminiEmbedding(
                     model_name="models/embedding-001", api_key=api_key)
+            if embed_model is not None:
                 self.index = VectorStoreIndex.from_documents(
                     documents,
                     embed_model=embed_model
@@ -113,10 +122,13 @@ class RAGTool:
         try:
             if self.index is None:
                 # Fallback to simple file search if index creation failed
-                return self._simple_file_search(query)
+                with span("rag.file_search", "rag", query_chars=len(query)):
+                    return self._simple_file_search(query)
 
             # Use LlamaIndex retriever
-            nodes = self.retriever.retrieve(query)
+            with span("rag.retrieve", "rag", query_chars=len(query)) as current:
+                nodes = self.retriever.retrieve(query)
+                current.set(nodes=len(nodes), result_chars=sum(len(node.text) for node in nodes))
 
             if nodes:
                 results = []
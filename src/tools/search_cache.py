@@ -0,0 +1,91 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+
+
+class SearchCache:
+    """
+    Persistent cache of search results keyed on a normalized query
+
+    Results are stored in a small SQLite database so they survive restarts
+    and can be shared by every SearchTool instance in the process.
+    """
+
+    def __init__(self, db_path="src/data/search_cache.db", ttl_seconds=6 * 3600):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                source TEXT,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+        self.prune()
+
+    @staticmethod
+    def normalize(query):
+        """Normalize a query so trivially different phrasings share a cache entry"""
+        query = re.sub(r"[^\w\s-]", " ", str(query).lower())
+        return " ".join(query.split())
+
+    def get(self, query, namespace=""):
+        """
+        Look up a cached result
+
+        Args:
+            query (str): The raw search query
+            namespace (str): Optional namespace (e.g. the fan-out mode)
+
+        Returns:
+            str or None: The cached result, or None on a miss or expired entry
+        """
+        key = f"{namespace}:{self.normalize(query)}"
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        result, created_at = row
+        if time.time() - created_at > self.ttl_seconds:
+            return None
+        return result
+
+    def set(self, query, result, source=None, namespace=""):
+        """Store a search result for the normalized query"""
+        key = f"{namespace}:{self.normalize(query)}"
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, query, source, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, query, source, result, time.time())
+            )
+            self._conn.commit()
+
+    def prune(self):
+        """Remove expired entries"""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE created_at < ?", (cutoff,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
@@ -0,0 +1,164 @@
+import re
+import json
+import time
+
+
+class SearchProvider:
+    """
+    Base class for a search backend used by SearchTool
+
+    Providers return a result string, or None when they have no good answer.
+    search() must give up after `timeout` seconds: SearchTool stops waiting at
+    the deadline but cannot stop a call that is already running, so a provider
+    that hangs keeps a worker thread busy.
+    """
+
+    name = "provider"
+
+    def __init__(self, timeout=5.0):
+        self.timeout = timeout
+
+    def search(self, query):
+        raise NotImplementedError
+
+    def is_good_result(self, result):
+        """Check whether a result is worth returning to the agent"""
+        return bool(result and str(result).strip())
+
+
+class SerpAPIProvider(SearchProvider):
+    """Google web search through the SerpAPI client"""
+
+    name = "SerpAPI"
+
+    # Returned when a response holds nothing worth passing to the agent
+    EMPTY_RESULT = "No good search result found"
+
+    # Result sections with football answers, most direct first
+    ANSWER_SECTIONS = ("sports_results", "top_stories", "news_results")
+
+    def __init__(self, api_key, timeout=8.0):
+        super().__init__(timeout=timeout)
+        from serpapi import SerpApiClient
+        self._client_class = SerpApiClient
+        self.api_key = api_key
+
+    def search(self, query):
+        params = {"api_key": self.api_key, "q": query, "google_domain": "google.com",
+                  "gl": "us", "hl": "en"}
+        # The client's own default request timeout is 60000s
+        client = self._client_class(params, engine="google", timeout=self.timeout)
+        return self.format_response(client.get_dict())
+
+    @classmethod
+    def format_response(cls, response):
+        """
+        Turn a SerpAPI response into the result string returned to the agent
+
+        Raises:
+            ValueError: If SerpAPI reports an error
+        """
+        if "error" in response:
+            raise ValueError(f"Got error from SerpAPI: {response['error']}")
+
+        answer_box = response.get("answer_box_list") or response.get("answer_box")
+        if isinstance(answer_box, list):
+            answer_box = answer_box[0] if answer_box else None
+        if isinstance(answer_box, dict):
+            for key in ("result", "answer", "snippet", "snippet_highlighted_words"):
+                if answer_box.get(key):
+                    return str(answer_box[key])
+
+        for section in cls.ANSWER_SECTIONS:
+            if response.get(section):
+                return json.dumps(response[section])
+
+        snippets = []
+        knowledge_graph = response.get("knowledge_graph") or {}
+        if knowledge_graph.get("description"):
+            snippets.append(knowledge_graph["description"])
+        for result in response.get("organic_results", []):
+            snippet = result.get("snippet") or result.get("snippet_highlighted_words")
+            if snippet:
+                snippets.append(str(snippet))
+        return "\n".join(snippets) if snippets else cls.EMPTY_RESULT
+
+    def is_good_result(self, result):
+        return super().is_good_result(result) and result != self.EMPTY_RESULT
+
+
+class MockSearchProvider(SearchProvider):
+    """
+    Local stub provider with canned football results
+
+    Used when no SerpAPI key is available and as a stand-in for testing.
+    An optional artificial delay makes it possible to simulate slow providers.
+    """
+
+    name = "Mock Search Engine"
+
+    MOCK_DATA = {
+        "formation": """
+            Common Football Formations:
+            1. 4-4-2: Traditional formation with solid defensive and offensive balance
+            2. 4-3-3: Attacking formation with width in the final third
+            3. 3-5-2: Formation with wingbacks providing width and solid midfield presence
+            4. 4-2-3-1: Modern formation with defensive midfielders and attacking midfield trio
+            5. 5-3-2: Defensive formation with five at the back
+            """,
+        "manchester united": """
+            Manchester United F.C. is an English professional football club based in Old Trafford, Greater Manchester.
+            - Founded: 1878 (as Newton Heath LYR F.C.)
+            - Stadium: Old Trafford (capacity: 74,140)
+            - Current Manager: Erik ten Hag
+            - League: Premier League
+            - Recent Form: Mixed results in recent matches
+            - Key Players: Bruno Fernandes, Marcus Rashford, Alejandro Garnacho
+            """,
+        "premier league": """
+            The Premier League is the top tier of English football.
+            - Founded: 1992
+            - Teams: 20
+            - Current Champion: Manchester City
+            - Most Championships: Manchester United (13)
+            - Top Scorers: Erling Haaland, Cole Palmer, Alexander Isak
+            - Recent Matches: Various results across the league
+            """,
+        "tactics": """
+            Modern Football Tactics:
+            1. Gegenpressing: High-intensity pressing to win the ball back quickly after losing possession
+            2. Tiki-Taka: Possession-based approach with short passing and movement
+            3. Counter-attacking: Defending deep and attacking quickly on transition
+            4. Positional Play: Structured approach to manipulating space and creating passing lanes
+            5. Fluid Attack: Flexible forward movement with interchanging positions
+            """,
+        "default": """
+            Football (Soccer) Information:
+            - Most popular sport globally with an estimated 3.5 billion fans
+            - Governed by FIFA internationally
+            - Major competitions include the FIFA World Cup, UEFA Champions League, and domestic leagues
+            - Top leagues: Premier League (England), La Liga (Spain), Bundesliga (Germany), Serie A (Italy)
+            - Modern game continues to evolve with tactical innovations and technological advancements
+            """
+    }
+
+    def __init__(self, timeout=2.0, delay=0.0, data=None):
+        super().__init__(timeout=timeout)
+        self.delay = delay
+        self.data = data if data is not None else self.MOCK_DATA
+        # A single alternation scans the query once instead of once per keyword
+        self._keyword_pattern = re.compile(
+            "|".join(re.escape(k) for k in self.data if k != "default"))
+
+    def search(self, query):
+        if self.delay:
+            time.sleep(self.delay)
+
+        match = self._keyword_pattern.search(query.lower())
+        keyword = match.group(0) if match else "default"
+
+        return json.dumps({
+            "query": query,
+            "source": self.name,
+            "results": self.data.get(keyword, self.data.get("default", ""))
+        }, indent=2)
@@ -1,107 +1,165 @@
 from llama_index.core.tools import FunctionTool
-from langchain_community.utilities import SerpAPIWrapper
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import os
 import json
+import time
+
+from ..tracing import span
+from .search_cache import SearchCache
+from .knowledge_snapshot import KnowledgeSnapshot
+from .search_providers import SerpAPIProvider, MockSearchProvider
 
 
 class SearchTool:
-    def __init__(self):
+    def __init__(self, providers=None, mode="first", cache=None, cache_path="src/data/search_cache.db",
+                 cache_ttl=6 * 3600, snapshot=None, use_snapshot=True):
+        """
+        Args:
+            providers (list, optional): Search providers to fan out to. Defaults to
+                SerpAPI when a key is available, otherwise the local mock provider.
+            mode (str): "first" returns the first good answer, "merge" combines
+                every good answer that arrives within the provider timeouts
+            cache (SearchCache, optional): Result cache to use instead of creating one
+            cache_path (str): Location of the persistent result cache
+            cache_ttl (int): Seconds a cached result stays valid
+            snapshot (KnowledgeSnapshot, optional): Offline knowledge base queried
+                before any network provider. Defaults to the bundled snapshot.
+            use_snapshot (bool): Set to False to skip the offline knowledge base
+        """
         self.name = "search_web"
         self.description = """
         Use this tool to search the web for information not available in internal documents.
         This is useful for finding recent match results, news about teams, or player statistics.
         """
+        self.mode = mode
+
         # Initialize SerpAPI for web search
         self.serpapi_key = os.getenv("SERPAPI_API_KEY")
-        self.search = self._initialize_search_engine()
+        self.providers = providers if providers is not None else self._initialize_providers()
+        self.cache = cache if cache is not None else SearchCache(
+            cache_path, ttl_seconds=cache_ttl)
+        # Cached results belong to the providers that produced them, so adding
+        # a SerpAPI key does not keep serving mock results
+        self.cache_namespace = f"{mode}:{','.join(sorted(p.name for p in self.providers))}"
+        self.snapshot = None
+        if use_snapshot:
+            self.snapshot = snapshot if snapshot is not None else self._initialize_snapshot()
+        # Thread pool for the provider fan-out, created on first use
+        self._executor = None
+
         self.tool = FunctionTool.from_defaults(
             name=self.name,
             description=self.description,
             fn=self.search_web
         )
 
-    def _initialize_search_engine(self):
+    def _initialize_providers(self):
         """
-        Initialize the search engine using SerpAPI
-        Returns a mock search function if no API key is available
+        Build the default provider list
+        Falls back to the mock provider if no API key is available
         """
         if self.serpapi_key:
             try:
                 # Use LangChain's SerpAPIWrapper as it's well-tested
-                return SerpAPIWrapper(serpapi_api_key=self.serpapi_key)
+                return [SerpAPIProvider(self.serpapi_key)]
             except Exception as e:
                 print(f"Error initializing SerpAPI: {str(e)}")
-                return None
-        else:
-            print("No SerpAPI key found, using mock search results")
+
+        print("No SerpAPI key found, using mock search results")
+        return [MockSearchProvider()]
+
+    def _initialize_snapshot(self):
+        """Open the offline knowledge snapshot, or return None if it is unavailable"""
+        try:
+            return KnowledgeSnapshot()
+        except Exception as e:
+            print(f"Error opening knowledge snapshot: {str(e)}")
+            return None
+
+    def _local_lookup(self, query):
+        """Answer the query from the offline knowledge snapshot if possible"""
+        if not self.snapshot:
             return None
 
-    def _mock_search(self, query):
+        hits = self.snapshot.lookup(query)
+        if not hits:
+            return None
+
+        return json.dumps({
+            "query": query,
+            "source": "Local Knowledge Snapshot",
+            "results": "\n\n".join(hit["content"] for hit in hits)
+        }, indent=2)
+
+    def _get_executor(self):
+        """Return the fan-out thread pool, starting it on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(2, 2 * len(self.providers)),
+                thread_name_prefix="search"
+            )
+        return self._executor
+
+    def close(self):
+        """Shut down the fan-out thread pool, if one was started"""
+        if self._executor is not None:
+            # A provider past its timeout cannot be stopped, so do not wait for it
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _fan_out(self, query):
         """
-        Provide mock search results when no API key is available
+        Query all providers concurrently, each bounded by its own timeout
+
+        Returns:
+            list: (provider, result) pairs for every good answer, in arrival order
         """
-        # Mock data for common football-related queries
-        mock_data = {
-            "formation": """
-            Common Football Formations:
-            1. 4-4-2: Traditional formation with solid defensive and offensive balance
-            2. 4-3-3: Attacking formation with width in the final third
-            3. 3-5-2: Formation with wingbacks providing width and solid midfield presence
-            4. 4-2-3-1: Modern formation with defensive midfielders and attacking midfield trio
-            5. 5-3-2: Defensive formation with five at the back
-            """,
-            "manchester united": """
-            Manchester United F.C. is an English professional football club based in Old Trafford, Greater Manchester.
-            - Founded: 1878 (as Newton Heath LYR F.C.)
-            - Stadium: Old Trafford (capacity: 74,140)
-            - Current Manager: Erik ten Hag
-            - League: Premier League
-            - Recent Form: Mixed results in recent matches
-            - Key Players: Bruno Fernandes, Marcus Rashford, Alejandro Garnacho
-            """,
-            "premier league": """
-            The Premier League is the top tier of English football.
-            - Founded: 1992
-            - Teams: 20
-            - Current Champion: Manchester City
-            - Most Championships: Manchester United (13)
-            - Top Scorers: Erling Haaland, Cole Palmer, Alexander Isak
-            - Recent Matches: Various results across the league
-            """,
-            "tactics": """
-            Modern Football Tactics:
-            1. Gegenpressing: High-intensity pressing to win the ball back quickly after losing possession
-            2. Tiki-Taka: Possession-based approach with short passing and movement
-            3. Counter-attacking: Defending deep and attacking quickly on transition
-            4. Positional Play: Structured approach to manipulating space and creating passing lanes
-            5. Fluid Attack: Flexible forward movement with interchanging positions
-            """,
-            "default": """
-            Football (Soccer) Information:
-            - Most popular sport globally with an estimated 3.5 billion fans
-            - Governed by FIFA internationally
-            - Major competitions include the FIFA World Cup, UEFA Champions League, and domestic leagues
-            - Top leagues: Premier League (England), La Liga (Spain), Bundesliga (Germany), Serie A (Italy)
-            - Modern game continues to evolve with tactical innovations and technological advancements
-            """
+        start = time.monotonic()
+        pending = {
+            self._get_executor().submit(provider.search, query): provider
+            for provider in self.providers
         }
+        deadlines = {future: start + provider.timeout
+                     for future, provider in pending.items()}
+        answers = []
+
+        while pending:
+            now = time.monotonic()
+            # Drop providers that have exceeded their own timeout
+            for future in [f for f in pending if deadlines[f] <= now]:
+                print(f"Search provider {pending[future].name} timed out")
+                future.cancel()
+                del pending[future]
+            if not pending:
+                break
+
+            done, _ = wait(pending, timeout=min(deadlines[f] for f in pending) - now,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Search provider {provider.name} failed: {str(e)}")
+                    continue
 
-        # Find the most relevant mock data based on keywords in the query
-        query_lower = query.lower()
-        for keyword, data in mock_data.items():
-            if keyword in query_lower:
-                return {
-                    "query": query,
-                    "source": "Mock Search Engine",
-                    "results": data
-                }
-
-        # Return default data if no matches
-        return {
+                if provider.is_good_result(result):
+                    answers.append((provider, result))
+                    if self.mode == "first":
+                        return answers
+
+        return answers
+
+    def _merge_results(self, query, answers):
+        """Combine answers from several providers into a single JSON document"""
+        return json.dumps({
             "query": query,
-            "source": "Mock Search Engine",
-            "results": mock_data["default"]
-        }
+            "sources": [provider.name for provider, _ in answers],
+            "results": [
+                {"source": provider.name, "results": result}
+                for provider, result in answers
+            ]
+        }, indent=2)
 
     def search_web(self, query):
         """
@@ -114,14 +172,32 @@ class SearchTool:
             str: Search results from the web
         """
         try:
-            if self.search:
-                # Use SerpAPI if available
-                results = self.search.run(query)
-                return results
+            with span("search.lookup", "search", query_chars=len(query)) as current:
+                cached = self.cache.get(query, namespace=self.cache_namespace)
+                current.set(cache_hit=cached is not None)
+                if cached is not None:
+                    return cached
+
+                # Factual lookups resolve locally before any network round-trip
+                local = self._local_lookup(query)
+                current.set(snapshot_hit=local is not None)
+                if local is not None:
+                    return local
+
+            with span("search.providers", "search_api", providers=len(self.providers)) as current:
+                answers = self._fan_out(query)
+                current.set(answers=len(answers), result_chars=sum(len(str(a[1])) for a in answers))
+            if not answers:
+                return f"No search results found for: {query}"
+
+            if self.mode == "merge" and len(answers) > 1:
+                results = self._merge_results(query, answers)
             else:
-                # Use mock search if no API key
-                mock_results = self._mock_search(query)
-                return json.dumps(mock_results, indent=2)
+                results = answers[0][1]
+
+            self.cache.set(query, results, source=answers[0][0].name,
+                           namespace=self.cache_namespace)
+            return results
         except Exception as e:
             error_msg = f"Error searching the web: {str(e)}"
             print(error_msg)
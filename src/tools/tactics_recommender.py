@@ -0,0 +1,287 @@
+"""
+Data-driven recommender for formations, tactics and set pieces
+
+Every candidate is a feature vector over the axes in FEATURES, stored with
+its entry in the planning knowledge file. A coach's request is turned into a
+vector of needs from three sources: keywords in the situation text, the
+team's and the opponent's profiles computed from recent results, and the live
+score. Candidates are ranked by cosine similarity to
+that vector with a single matrix product, and a softmax over the scores gives
+each option a confidence.
+"""
+
+import re
+import numpy as np
+
+from .planning_knowledge import FEATURES, KNOWLEDGE
+
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+
+# Feature vectors of the candidates, from the planning knowledge file
+FORMATION_FEATURES = KNOWLEDGE.features("formations")
+TACTIC_FEATURES = KNOWLEDGE.features("tactics")
+SET_PIECE_FEATURES = KNOWLEDGE.features("set_pieces")
+
+# Phrases in the coach's description of the situation and the needs they signal
+KEYWORD_FEATURES = [
+    (r"defen[cs]\w*|defend\w*|solid", {"defence": 1.0}),
+    (r"protect\w*(?: the| a)? lead|hold on|see (?:it|the game) out", {"defence": 1.0, "counter": .5}),
+    (r"attack\w*|offensive", {"attack": 1.0}),
+    (r"goals?|scor\w*|chances", {"attack": 1.0}),
+    (r"balanc\w*|versatil\w*|flexib\w*", {"balance": 1.0}),
+    (r"midfield", {"midfield": 1.0}),
+    (r"control\w*", {"possession": .6, "midfield": .6}),
+    (r"possession|keep the ball", {"possession": 1.0}),
+    (r"press\w*|aggressive\w*|win the ball high", {"pressing": 1.0}),
+    (r"counter\w*|transition\w*|on the break", {"counter": 1.0}),
+    (r"direct|long ball\w*|route one", {"directness": 1.0}),
+    (r"stronger (?:opponent|team|side)\w*|underdogs?|superior", {"defence": .5, "counter": .8}),
+    (r"wing\w*|width|wide", {"width": 1.0}),
+    (r"fit|fitness|energy|stamina", {"physical": .6}),
+    (r"tired|fatigue\w*|legs", {"physical": -.6}),
+    (r"corners?", {"corner": 1.0}),
+    (r"free[ -]kicks?", {"free_kick": 1.0}),
+    (r"tall\w*|height|aerial|head\w*", {"aerial": 1.0}),
+    (r"pace|quick|fast|speed", {"delivery_pace": .5, "counter": .4}),
+    (r"shoot\w*|shot\w*", {"shooting": 1.0}),
+    (r"routine\w*|rehears\w*|training ground|surprise", {"rehearsed": 1.0})
+]
+
+# Profile statistics computed from recent results, and their league averages
+PROFILE_STATS = ("possession", "goals_for", "goals_against", "win_rate")
+LEAGUE_AVERAGE = np.array([50.0, 1.4, 1.4, 0.4])
+PROFILE_SCALE = np.array([10.0, 1.0, 1.0, 0.3])
+
+# How deviations from the league average in the team's own profile translate
+# into needs: a team plays to its strengths
+TEAM_WEIGHTS = {
+    "possession": {"possession": .5, "midfield": .3, "counter": -.3},
+    "goals_for": {"attack": .4},
+    "goals_against": {"defence": .5},
+    "win_rate": {"balance": .2}
+}
+
+# ... and how the opponent's profile does: a team counters the opponent's
+OPPONENT_WEIGHTS = {
+    "possession": {"counter": .6, "defence": .3, "possession": -.3},
+    "goals_for": {"defence": .6},
+    "goals_against": {"attack": .5, "pressing": .3},
+    "win_rate": {"defence": .3, "counter": .3}
+}
+
+# Softmax temperature turning cosine scores into confidences
+TEMPERATURE = 0.2
+
+
+def _vector(weights):
+    vector = np.zeros(len(FEATURES))
+    for name, value in weights.items():
+        vector[FEATURE_INDEX[name]] = value
+    return vector
+
+
+def _weight_matrix(weights):
+    return np.array([_vector(weights.get(stat, {})) for stat in PROFILE_STATS])
+
+
+def _unit_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _parse_result(result):
+    """Parse a result such as "W 2-1" into (goals for, goals against, won)"""
+    match = re.search(r"(\d+)\s*-\s*(\d+)", str(result))
+    if not match:
+        return None
+    goals_for, goals_against = int(match.group(1)), int(match.group(2))
+    return goals_for, goals_against, float(goals_for > goals_against)
+
+
+def profile_stats(matches):
+    """
+    Compute a profile from recent matches in the MatchDataFetcher format
+
+    Args:
+        matches (list): Match dicts with "result" (e.g. "W 2-1") and "possession"
+
+    Returns:
+        numpy.ndarray: Mean possession, goals for, goals against and win rate,
+            or the league average if no match has a result
+    """
+    rows = []
+    for match in matches or []:
+        parsed = _parse_result(match.get("result"))
+        if parsed:
+            rows.append((match.get("possession", LEAGUE_AVERAGE[0]),) + parsed)
+    if not rows:
+        return LEAGUE_AVERAGE.copy()
+    return np.asarray(rows, dtype=float).mean(axis=0)
+
+
+class Catalog:
+    """Candidates of one kind, as a matrix of unit feature vectors"""
+
+    def __init__(self, features):
+        self.names = tuple(features)
+        self.matrix = _unit_rows(np.array([_vector(features[name]) for name in self.names]))
+        self.matrix.flags.writeable = False
+
+
+class TacticsRecommender:
+    """
+    Rank formations, tactics and set pieces against a team's needs
+
+    Example:
+        >>> recommender = TacticsRecommender()
+        >>> need = recommender.need_vector("We need goals")
+        >>> recommender.rank("formation", need)[0]["name"]
+        '4-3-3'
+    """
+
+    def __init__(self, formations=FORMATION_FEATURES, tactics=TACTIC_FEATURES,
+                 set_pieces=SET_PIECE_FEATURES):
+        self.catalogs = {
+            "formation": Catalog(formations),
+            "tactics": Catalog(tactics),
+            "set_piece": Catalog(set_pieces)
+        }
+        self._keywords = [re.compile(rf"\b(?:{pattern})\b") for pattern, _ in KEYWORD_FEATURES]
+        self._keyword_matrix = np.array([_vector(weights) for _, weights in KEYWORD_FEATURES])
+        self._team_weights = _weight_matrix(TEAM_WEIGHTS)
+        self._opponent_weights = _weight_matrix(OPPONENT_WEIGHTS)
+
+    def situation_vector(self, team_situation):
+        """Turn the coach's description of the situation into needs"""
+        if not team_situation:
+            return np.zeros(len(FEATURES))
+        text = team_situation.lower()
+        present = np.array([1.0 if pattern.search(text) else 0.0 for pattern in self._keywords])
+        return present @ self._keyword_matrix
+
+    def profile_vector(self, team_matches=None, opponent_matches=None):
+        """
+        Turn team and opponent profiles into needs
+
+        Either argument may be a single list of matches or a list of lists, in
+        which case one row of needs is returned per history.
+        """
+        needs = 0
+        if team_matches:
+            needs = needs + self._profile_needs(team_matches, self._team_weights)
+        if opponent_matches:
+            needs = needs + self._profile_needs(opponent_matches, self._opponent_weights)
+        return needs if isinstance(needs, np.ndarray) else np.zeros(len(FEATURES))
+
+    def _profile_needs(self, histories, weights):
+        if isinstance(histories[0], dict):
+            stats = profile_stats(histories)
+        else:
+            stats = np.array([profile_stats(matches) for matches in histories])
+        return ((stats - LEAGUE_AVERAGE) / PROFILE_SCALE) @ weights
+
+    def match_state_vector(self, context):
+        """Needs implied by the score of a live match, from the home side's view
+        unless context["team"] names the away side"""
+        home, away = context.get("home_team"), context.get("away_team")
+        if not isinstance(home, dict) or not isinstance(away, dict) or "score" not in home:
+            return np.zeros(len(FEATURES))
+
+        lead = home.get("score", 0) - away.get("score", 0)
+        if context.get("team") and context["team"] == away.get("name"):
+            lead = -lead
+        # The score matters more the less time there is to change it
+        urgency = min(max(context.get("minute", 45), 0), 90) / 90
+        if lead > 0:
+            return urgency * _vector({"defence": 1.0, "counter": .5})
+        if lead < 0:
+            return urgency * _vector({"attack": 1.0, "pressing": .5})
+        return np.zeros(len(FEATURES))
+
+    def need_vector(self, team_situation=None, context=None):
+        """
+        Combine every available signal into one vector of needs
+
+        Args:
+            team_situation (str, optional): The coach's description of the situation
+            context (dict, optional): May contain "recent_matches" (the team's),
+                "opponent" ({"recent_matches": [...]}) or "opponent_matches", and
+                live match fields (minute, home_team, away_team)
+
+        Returns:
+            numpy.ndarray: Needs over FEATURES; all zeros if nothing is known
+        """
+        need = self.situation_vector(team_situation)
+        if context:
+            opponent = context.get("opponent")
+            opponent_matches = context.get("opponent_matches")
+            if opponent_matches is None and isinstance(opponent, dict):
+                opponent_matches = opponent.get("recent_matches")
+            need = need + self.profile_vector(context.get("recent_matches"), opponent_matches)
+            need = need + self.match_state_vector(context)
+        return need
+
+    def scores(self, kind, needs):
+        """
+        Score every candidate of a kind against one or many need vectors
+
+        Args:
+            kind (str): "formation", "tactics" or "set_piece"
+            needs (numpy.ndarray): Needs of shape (n_features,) or (n, n_features)
+
+        Returns:
+            tuple: (scores, confidences), each with one column per candidate
+        """
+        catalog = self.catalogs[kind]
+        scores = _unit_rows(np.asarray(needs, dtype=float)) @ catalog.matrix.T
+        exp = np.exp((scores - scores.max(axis=-1, keepdims=True)) / TEMPERATURE)
+        return scores, exp / exp.sum(axis=-1, keepdims=True)
+
+    def rank(self, kind, need, top=None):
+        """
+        Rank the candidates of a kind for one vector of needs
+
+        Returns:
+            list: Dicts with name, score and confidence, best first; empty if
+                the needs carry no signal
+        """
+        if not np.any(need):
+            return []
+        names = self.catalogs[kind].names
+        scores, confidences = self.scores(kind, need)
+        order = np.argsort(-scores, kind="stable")[:top]
+        return [{"name": names[i], "score": float(scores[i]), "confidence": float(confidences[i])}
+                for i in order]
+
+    def rank_league(self, kind, opponents, team_matches=None, team_situation=None):
+        """
+        Pick the best candidate of a kind against every opponent in a league
+
+        Args:
+            opponents (dict): Opponent name -> list of its recent matches
+            team_matches (list, optional): The team's own recent matches
+            team_situation (str, optional): The coach's description of the situation
+
+        Returns:
+            dict: Opponent name -> {"name", "score", "confidence"} of the best
+                option; opponents whose needs carry no signal are left out, as
+                with rank()
+        """
+        names = list(opponents)
+        if not names:
+            return {}
+        needs = self.profile_vector(opponent_matches=[opponents[n] for n in names])
+        needs = needs + self.need_vector(team_situation, {"recent_matches": team_matches})
+        scores, confidences = self.scores(kind, needs)
+        best = scores.argmax(axis=1)
+        candidates = self.catalogs[kind].names
+        return {
+            name: {"name": candidates[b], "score": float(scores[i, b]),
+                   "confidence": float(confidences[i, b])}
+            for i, (name, b) in enumerate(zip(names, best)) if np.any(needs[i])
+        }
+
+    def key_factors(self, need, top=3):
+        """Return the strongest needs, for explaining a recommendation"""
+        order = np.argsort(-need)[:top]
+        return [FEATURES[i].replace("_", " ") for i in order if need[i] > 0]
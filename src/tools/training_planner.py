@@ -0,0 +1,391 @@
+"""
+Constraint-based training session planner
+
+A session is one warm-up, a set of main drills and one cool-down drawn from
+DRILL_LIBRARY. The main drills are chosen by branch and bound to cover the
+session's focus areas as well as possible within its constraints:
+
+    - duration: total minutes, with a few minutes of slack
+    - equipment: only drills whose equipment is available
+    - players: only drills the squad has enough players for
+    - max_load: session load (intensity x minutes) cap
+
+A week plan covers the sessions of several squads in one request, with
+constraints that span sessions: a weekly load cap per squad, a limit on how
+often a main drill is repeated, and equipment shared between squads (e.g.
+one set of mannequins per day).
+
+The week is not solved jointly. Sessions are planned greedily, day by day
+and squad by squad, each solved exactly against what the earlier sessions
+left over and its share of the remaining weekly load. An early session can
+therefore take a drill or equipment a later one would have used better.
+For the same reason minimum weekly minutes per focus area are targets
+rather than hard constraints: areas behind on theirs are weighted up in
+later sessions, and any area still short at the end of the week is
+reported in the plan's focus_shortfall. Identical requests are answered
+from a cache.
+"""
+
+import copy
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+
+LIBRARY_VERSION = 1
+
+# name, phase, minutes, intensity (RPE 1-10), focus areas, equipment, minimum players
+DRILL_LIBRARY = [
+    ("Dynamic warm-up", "warm_up", 15, 3, ["fitness"], ["cones"], 1),
+    ("Rondo 5v2", "warm_up", 15, 4, ["possession", "passing"], ["balls", "cones", "bibs"], 7),
+    ("Ball activation", "warm_up", 10, 3, ["passing"], ["balls", "cones"], 2),
+    ("Positional game 7v7+3", "main", 20, 6, ["possession", "pressing"], ["balls", "bibs", "cones"], 17),
+    ("Counter-pressing game 6v6", "main", 20, 8, ["pressing", "transition"], ["balls", "bibs", "mini_goals"], 12),
+    ("Shadow pressing patterns", "main", 15, 5, ["pressing", "tactical_shape"], ["cones", "mannequins"], 11),
+    ("Finishing circuit", "main", 20, 5, ["finishing"], ["balls", "goals", "mannequins"], 6),
+    ("Crossing and finishing", "main", 20, 5, ["finishing", "crossing"], ["balls", "goals"], 8),
+    ("Defensive shape 8v6", "main", 25, 6, ["defending", "tactical_shape"], ["balls", "bibs", "goals"], 14),
+    ("1v1 defending", "main", 15, 7, ["defending"], ["balls", "cones", "mini_goals"], 4),
+    ("Transition game 4v4+4", "main", 20, 8, ["transition", "fitness"], ["balls", "bibs", "mini_goals"], 12),
+    ("Passing patterns", "main", 15, 4, ["passing"], ["balls", "cones"], 6),
+    ("Set-piece rehearsal", "main", 20, 3, ["set_pieces"], ["balls", "goals", "mannequins"], 11),
+    ("Small-sided games 4v4", "main", 20, 9, ["fitness", "transition"], ["balls", "bibs", "mini_goals"], 8),
+    ("Build-up from the back", "main", 20, 5, ["possession", "tactical_shape"], ["balls", "bibs", "goals", "cones"], 14),
+    ("Repeated sprint training", "main", 15, 9, ["fitness"], ["cones"], 1),
+    ("Shooting from distance", "main", 15, 4, ["finishing"], ["balls", "goals"], 4),
+    ("Cool-down jog and stretch", "cool_down", 10, 2, ["recovery"], [], 1),
+    ("Recovery mobility", "cool_down", 15, 1, ["recovery"], [], 1)
+]
+
+FOCUS_AREAS = sorted({focus for drill in DRILL_LIBRARY for focus in drill[4]})
+
+ALL_EQUIPMENT = sorted({item for drill in DRILL_LIBRARY for item in drill[5]})
+
+# Phrases in a coach's request and the focus areas they ask for
+FOCUS_KEYWORDS = [
+    (r"press\w*", "pressing"),
+    (r"finish\w*|shoot\w*|shot\w*|scor\w*", "finishing"),
+    (r"pass\w*", "passing"),
+    (r"defen[cds]\w*", "defending"),
+    (r"set[ -]pieces?|corners?|free[ -]kicks?", "set_pieces"),
+    (r"fitness|condition\w*|sprint\w*", "fitness"),
+    (r"possession|build[ -]?up", "possession"),
+    (r"transition\w*|counter\w*", "transition"),
+    (r"shape|organi[sz]\w*|tactical", "tactical_shape"),
+    (r"cross\w*", "crossing"),
+    (r"recover\w*|regenerat\w*", "recovery")
+]
+
+DEFAULT_SESSION = {"duration": 90, "players": 20, "max_load": 550, "focus": []}
+
+# Minutes a session may fall short of its duration
+DURATION_SLACK = 5
+
+# Weight of the first focus area of a session; each following one counts for
+# FOCUS_DECAY less, and a drill outside the focus areas still counts a little
+FOCUS_DECAY = 0.2
+OFF_FOCUS_WEIGHT = 0.1
+# Extra weight for focus areas that are behind on their weekly minimum
+COVERAGE_BONUS = 0.5
+
+MAX_REPEATS = 2
+
+# Nodes explored per session before the best plan found so far is returned
+SEARCH_BUDGET = 20000
+
+
+def focus_from_text(text):
+    """
+    Read the focus areas and duration of a session from a request
+
+    Returns:
+        tuple: (focus areas in the order they are mentioned, minutes or None)
+    """
+    text = (text or "").lower()
+    found = []
+    for pattern, focus in FOCUS_KEYWORDS:
+        match = re.search(rf"\b(?:{pattern})", text)
+        if match and focus not in (f for _, f in found):
+            found.append((match.start(), focus))
+    minutes = re.search(r"(\d+)\s*(?:-\s*)?min", text)
+    return [focus for _, focus in sorted(found)], int(minutes.group(1)) if minutes else None
+
+
+class Drill:
+    """A drill of the library"""
+
+    __slots__ = ("name", "phase", "minutes", "intensity", "focus", "equipment", "min_players")
+
+    def __init__(self, name, phase, minutes, intensity, focus, equipment, min_players):
+        self.name = name
+        self.phase = phase
+        self.minutes = minutes
+        self.intensity = intensity
+        self.focus = tuple(focus)
+        self.equipment = frozenset(equipment)
+        self.min_players = min_players
+
+    @property
+    def load(self):
+        return self.minutes * self.intensity
+
+
+DRILLS = tuple(Drill(*entry) for entry in DRILL_LIBRARY)
+
+
+class TrainingPlanner:
+    """
+    Plan training sessions and weeks from the drill library
+
+    Example:
+        >>> planner = TrainingPlanner()
+        >>> plan = planner.plan_session(duration=90, focus=["pressing"])
+        >>> [d["name"] for d in plan["drills"]]
+        ['Dynamic warm-up', 'Counter-pressing game 6v6', ...]
+    """
+
+    def __init__(self, drills=DRILLS, cache_size=128):
+        self.drills = drills
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(request):
+        """Hash a request into a cache key"""
+        canonical = json.dumps({"request": request, "library": LIBRARY_VERSION},
+                               sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def plan_session(self, duration=90, focus=None, equipment=None, players=20, max_load=None):
+        """
+        Plan a single session
+
+        Args:
+            duration (int): Session length in minutes
+            focus (list, optional): Focus areas, most important first
+            equipment (list, optional): Available equipment; defaults to everything
+            players (int): Players taking part
+            max_load (int, optional): Load cap (intensity x minutes)
+
+        Returns:
+            dict: Session plan (see plan_week)
+        """
+        session = {"duration": duration, "focus": focus or [], "players": players}
+        if max_load is not None:
+            session["max_load"] = max_load
+        week = self.plan_week({"squads": [{"name": "Squad", "sessions": {"Session": session}}],
+                               "equipment": equipment})
+        return week["squads"][0]["sessions"][0]
+
+    def plan_week(self, request):
+        """
+        Plan the sessions of one or more squads, day by day
+
+        Each session is solved in turn against the week's remaining load,
+        drill repeats and shared equipment; see the module docstring.
+
+        Args:
+            request (dict):
+                squads: [{"name", "sessions": {day: session}, "weekly_load",
+                          "weekly_focus": {focus: minutes}}], where a session has
+                          duration, focus, players and max_load
+                equipment (list, optional): Available equipment; defaults to everything
+                shared_equipment (dict, optional): Item -> number of squads that
+                    can use it on the same day
+                max_repeats (int, optional): Times a main drill may be used per squad
+
+        Returns:
+            dict: {"squads": [{"name", "sessions": [session plan], "load",
+                  "focus_minutes", "focus_shortfall"}]}, where focus_shortfall
+                  maps each weekly_focus area that was not met to the missing
+                  minutes; a session plan has day, drills, minutes, load and
+                  focus_minutes, or an error if it is infeasible
+
+        Raises:
+            ValueError: If the request names unknown focus areas or equipment
+        """
+        self._validate(request)
+        key = self.key(request)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return copy.deepcopy(self._cache[key])
+
+        plan = self._solve_week(request)
+
+        with self._lock:
+            self._cache[key] = plan
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return copy.deepcopy(plan)
+
+    def _validate(self, request):
+        squads = request.get("squads")
+        if not squads:
+            raise ValueError("A training plan needs at least one squad with sessions")
+        for squad in squads:
+            focus_areas = set(squad.get("weekly_focus", {}))
+            for session in squad.get("sessions", {}).values():
+                focus_areas.update(session.get("focus", []))
+                unknown = focus_areas - set(FOCUS_AREAS)
+                if unknown:
+                    raise ValueError(f"Unknown focus areas: {', '.join(sorted(unknown))}. "
+                                     f"Choose from: {', '.join(FOCUS_AREAS)}")
+        unknown = set(request.get("equipment") or []) - set(ALL_EQUIPMENT)
+        if unknown:
+            raise ValueError(f"Unknown equipment: {', '.join(sorted(unknown))}")
+
+    def _solve_week(self, request):
+        """Solve the sessions greedily in day order, carrying the weekly constraints forward"""
+        equipment = frozenset(request.get("equipment") or ALL_EQUIPMENT)
+        shared = request.get("shared_equipment", {})
+        max_repeats = request.get("max_repeats", MAX_REPEATS)
+
+        squads = []
+        for squad in request["squads"]:
+            squads.append({
+                "name": squad.get("name", f"Squad {len(squads) + 1}"),
+                "sessions": [],
+                "load": 0,
+                "focus_minutes": {},
+                "_load_left": squad.get("weekly_load", float("inf")),
+                "_minutes_left": sum(dict(DEFAULT_SESSION, **session)["duration"]
+                                     for session in squad.get("sessions", {}).values()),
+                "_weekly_focus": squad.get("weekly_focus", {}),
+                "_uses": {}
+            })
+
+        # Days in the order they first appear; squads keep their list order
+        days = []
+        for squad in request["squads"]:
+            for day in squad.get("sessions", {}):
+                if day not in days:
+                    days.append(day)
+
+        for day in days:
+            shared_use = {}
+            for squad, state in zip(request["squads"], squads):
+                if day not in squad.get("sessions", {}):
+                    continue
+                session = dict(DEFAULT_SESSION, **squad["sessions"][day])
+                blocked = {item for item, limit in shared.items() if shared_use.get(item, 0) >= limit}
+                plan = self._solve_session(session, equipment - blocked, state, max_repeats)
+                plan["day"] = day
+                state["sessions"].append(plan)
+                state["_minutes_left"] -= session["duration"]
+                if "error" in plan:
+                    continue
+
+                used = set().union(*(d.equipment for d in plan.pop("_drills")))
+                for item in used & set(shared):
+                    shared_use[item] = shared_use.get(item, 0) + 1
+                state["load"] += plan["load"]
+                state["_load_left"] -= plan["load"]
+                for focus, minutes in plan["focus_minutes"].items():
+                    state["focus_minutes"][focus] = state["focus_minutes"].get(focus, 0) + minutes
+                for drill in plan["drills"]:
+                    state["_uses"][drill["name"]] = state["_uses"].get(drill["name"], 0) + 1
+
+        for state in squads:
+            state["focus_shortfall"] = {
+                area: target - state["focus_minutes"].get(area, 0)
+                for area, target in state["_weekly_focus"].items()
+                if state["focus_minutes"].get(area, 0) < target
+            }
+            for name in [k for k in state if k.startswith("_")]:
+                del state[name]
+        return {"squads": squads}
+
+    def _solve_session(self, session, equipment, state, max_repeats):
+        """Pick the drills of one session by branch and bound"""
+        duration, players = session["duration"], session["players"]
+        # Each session may use its share of the weekly load still left, so
+        # early sessions cannot starve later ones
+        share = state["_load_left"] * duration / max(state["_minutes_left"], duration)
+        max_load = min(session["max_load"], share)
+        weights = self._focus_weights(session["focus"], state)
+
+        def usable(drill):
+            return (drill.equipment <= equipment and drill.min_players <= players
+                    and (drill.phase != "main" or state["_uses"].get(drill.name, 0) < max_repeats))
+
+        candidates = [d for d in self.drills if usable(d)]
+        warm_ups = [d for d in candidates if d.phase == "warm_up"]
+        cool_downs = [d for d in candidates if d.phase == "cool_down"]
+        mains = [d for d in candidates if d.phase == "main"]
+        if not warm_ups or not cool_downs:
+            return {"error": "No warm-up or cool-down fits the available equipment and players"}
+
+        def value(drill):
+            return drill.minutes * max((weights.get(f, OFF_FOCUS_WEIGHT) for f in drill.focus),
+                                       default=OFF_FOCUS_WEIGHT)
+
+        # Best value per minute first, so the fractional bound is tight early
+        mains.sort(key=lambda d: -value(d) / d.minutes)
+        values = [value(d) for d in mains]
+        best = {"value": -1, "drills": None}
+        budget = [SEARCH_BUDGET]
+
+        def search(index, minutes_left, load_left, chosen, total):
+            budget[0] -= 1
+            if minutes_left <= DURATION_SLACK and total > best["value"]:
+                best["value"], best["drills"] = total, list(chosen)
+            if index == len(mains) or budget[0] <= 0:
+                return
+            # Fractional knapsack bound on what the remaining drills could add
+            bound, room = total, minutes_left
+            for drill, v in zip(mains[index:], values[index:]):
+                if room <= 0:
+                    break
+                bound += v * min(1.0, room / drill.minutes)
+                room -= drill.minutes
+            if bound <= best["value"]:
+                return
+
+            drill = mains[index]
+            if drill.minutes <= minutes_left and drill.load <= load_left:
+                chosen.append(drill)
+                search(index + 1, minutes_left - drill.minutes, load_left - drill.load,
+                       chosen, total + values[index])
+                chosen.pop()
+            search(index + 1, minutes_left, load_left, chosen, total)
+
+        for warm_up in sorted(warm_ups, key=lambda d: -value(d)):
+            for cool_down in sorted(cool_downs, key=lambda d: d.load):
+                minutes = duration - warm_up.minutes - cool_down.minutes
+                load = max_load - warm_up.load - cool_down.load
+                if minutes < 0 or load < 0:
+                    continue
+                before = best["drills"]
+                search(0, minutes, load, [], value(warm_up) + value(cool_down))
+                if best["drills"] is not before:
+                    best["frame"] = (warm_up, cool_down)
+
+        if best["drills"] is None:
+            return {"error": f"No combination of drills fills {duration} minutes within a load of "
+                             f"{max_load:.0f} with the available equipment and players"}
+
+        warm_up, cool_down = best["frame"]
+        drills = [warm_up] + best["drills"] + [cool_down]
+        focus_minutes = {}
+        for drill in drills:
+            for focus in drill.focus:
+                focus_minutes[focus] = focus_minutes.get(focus, 0) + drill.minutes
+        return {
+            "drills": [{"name": d.name, "phase": d.phase, "minutes": d.minutes,
+                        "intensity": d.intensity, "focus": list(d.focus)} for d in drills],
+            "minutes": sum(d.minutes for d in drills),
+            "load": sum(d.load for d in drills),
+            "focus_minutes": focus_minutes,
+            "_drills": drills
+        }
+
+    def _focus_weights(self, focus, state):
+        """Weight of each focus area in a session, boosted when behind on the week's target"""
+        weights = {f: max(1.0 - FOCUS_DECAY * i, OFF_FOCUS_WEIGHT * 2) for i, f in enumerate(focus)}
+        for area, target in state["_weekly_focus"].items():
+            if state["focus_minutes"].get(area, 0) < target:
+                weights[area] = weights.get(area, OFF_FOCUS_WEIGHT) + COVERAGE_BONUS
+        return weights
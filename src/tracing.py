@@ -0,0 +1,368 @@
+"""
+Per-turn tracing of the agents and tools
+
+Every coordinator turn opens a root span; LLM calls, tool calls, searches,
+document retrieval, chart renders and conversation saves open child spans
+under whatever span is current, also across the worker threads that copy
+the caller's context. Spans carry their duration, the time spent in the span
+itself rather than its children, and attributes such as token counts, cache
+hits and payload sizes.
+
+Finished spans are kept in memory for summary() and, if COACH_TRACE_FILE is
+set, appended to that file as OTLP/JSON lines, the format of the
+OpenTelemetry collector's file exporter. Summarize a trace file with:
+
+    python -m src.tracing traces.jsonl [--by name]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional
+
+from llama_index.core.tools import AsyncBaseTool, BaseTool, ToolOutput
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "coach-intelligence"
+
+# Finished spans kept in memory for summaries
+MAX_SPANS = 10000
+
+# OTLP span kind and status codes
+SPAN_KIND_INTERNAL = 1
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span = ContextVar("coach_span", default=None)
+
+
+class Span:
+    """A timed operation with attributes, inside a trace"""
+
+    __slots__ = ("name", "component", "trace_id", "span_id", "parent", "start_ns", "end_ns",
+                 "child_ns", "attributes", "error")
+
+    def __init__(self, name: str, component: str, parent: Optional["Span"] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.component = component
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.child_ns = 0
+        self.attributes = dict(attributes or {})
+        self.error = None
+
+    def set(self, **attributes: Any) -> None:
+        """Add or replace attributes"""
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    @property
+    def self_ms(self) -> float:
+        """Duration minus the time of the children that finished inside it"""
+        return max(0.0, self.duration_ms - self.child_ns / 1e6)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """The span in OTLP/JSON form"""
+        attributes = {"component": self.component, "self_ms": round(self.self_ms, 3), **self.attributes}
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()],
+            "status": {"code": STATUS_ERROR, "message": self.error} if self.error else {"code": STATUS_OK}
+        }
+        if self.parent:
+            span["parentSpanId"] = self.parent.span_id
+        return span
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _plain_value(value):
+    if "boolValue" in value:
+        return value["boolValue"]
+    if "intValue" in value:
+        return int(value["intValue"])
+    if "doubleValue" in value:
+        return value["doubleValue"]
+    return value.get("stringValue")
+
+
+class Tracer:
+    """
+    Collect finished spans in memory and optionally in an OTLP/JSON file
+
+    Example:
+        >>> tracer = Tracer(path="traces.jsonl")
+        >>> with tracer.span("rag.retrieve", component="rag") as span:
+        ...     span.set(nodes=2)
+    """
+
+    def __init__(self, path: Optional[str] = None, max_spans: int = MAX_SPANS,
+                 service_name: str = SERVICE_NAME):
+        """
+        Args:
+            path: File the spans are appended to, one OTLP/JSON request per line
+            max_spans: Finished spans kept in memory
+            service_name: service.name of the exported resource
+        """
+        self.path = path
+        self.service_name = service_name
+        self.spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        self._file = None
+
+    @contextmanager
+    def span(self, name: str, component: Optional[str] = None, **attributes: Any):
+        """
+        Time a block as a child of the current span, or as a new trace
+
+        Args:
+            name: Operation name, e.g. "llm.chat"
+            component: Group for summaries, e.g. "llm"; defaults to the name's
+                first part
+            **attributes: Initial attributes
+
+        Yields:
+            Span: The open span, for adding attributes
+        """
+        span = Span(name, component or name.split(".")[0], _current_span.get(), attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {str(e)[:200]}"
+            raise
+        finally:
+            _current_span.reset(token)
+            self.finish(span)
+
+    def finish(self, span: Span) -> None:
+        """End a span and record it"""
+        span.end_ns = time.time_ns()
+        with self._lock:
+            # Children on other threads may finish after their parent
+            if span.parent is not None and span.parent.end_ns is None:
+                span.parent.child_ns += span.end_ns - span.start_ns
+            self.spans.append(span)
+            if self.path:
+                try:
+                    if self._file is None:
+                        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                        self._file = open(self.path, "a", encoding="utf-8")
+                    self._file.write(json.dumps(self.export_request([span])) + "\n")
+                    self._file.flush()
+                except OSError as e:
+                    logger.error(f"Error writing trace file {self.path}: {str(e)}")
+                    self.path = None
+
+    def export_request(self, spans: Iterable[Span]) -> Dict[str, Any]:
+        """An OTLP/JSON ExportTraceServiceRequest holding spans"""
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp() for span in spans]}]
+        }]}
+
+    def finished(self, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Finished spans as plain dicts, all of them or those of one trace"""
+        with self._lock:
+            spans = [span for span in self.spans if trace_id is None or span.trace_id == trace_id]
+        return [{"name": span.name, "component": span.component, "trace_id": span.trace_id,
+                 "duration_ms": span.duration_ms, "self_ms": span.self_ms,
+                 "error": span.error is not None, "attributes": dict(span.attributes)} for span in spans]
+
+    def summary(self, by: str = "component") -> Dict[str, Dict[str, Any]]:
+        """Latency percentiles of the spans in memory, see summarize()"""
+        return summarize(self.finished(), by)
+
+    def breakdown(self, trace_id: str) -> Dict[str, float]:
+        """Milliseconds spent in each component during one trace, children excluded"""
+        totals = {}
+        for span in self.finished(trace_id):
+            totals[span["component"]] = totals.get(span["component"], 0.0) + span["self_ms"]
+        return totals
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer, exporting to COACH_TRACE_FILE if it is set"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(path=os.getenv("COACH_TRACE_FILE") or None)
+        return _tracer
+
+
+def set_tracer(tracer: Tracer) -> Optional[Tracer]:
+    """Replace the process-wide tracer; returns the previous one"""
+    global _tracer
+    with _tracer_lock:
+        previous, _tracer = _tracer, tracer
+        return previous
+
+
+def span(name: str, component: Optional[str] = None, **attributes: Any):
+    """Open a span on the process-wide tracer, see Tracer.span"""
+    return get_tracer().span(name, component, **attributes)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def annotate(**attributes: Any) -> None:
+    """Add attributes to the current span, if there is one"""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+class TracedTool(AsyncBaseTool):
+    """A tool whose calls are recorded as spans"""
+
+    def __init__(self, tool: BaseTool, component: str = "tool"):
+        self.tool = tool
+        self.component = component
+
+    @property
+    def metadata(self):
+        return self.tool.metadata
+
+    def call(self, *args: Any, **kwargs: Any) -> ToolOutput:
+        name = self.tool.metadata.name
+        with span(f"{self.component}.{name}", self.component, tool=name,
+                  input_chars=len(json.dumps([args, kwargs], default=str))) as current:
+            output = self.tool(*args, **kwargs)
+            current.set(output_chars=len(output.content or ""), tool_error=bool(output.is_error))
+            return output
+
+    async def acall(self, *args: Any, **kwargs: Any) -> ToolOutput:
+        return await asyncio.to_thread(self.call, *args, **kwargs)
+
+
+def traced_tools(tools: Iterable[BaseTool], component: str = "tool") -> List[BaseTool]:
+    """Wrap tools in TracedTool, leaving tools that are already traced as they are"""
+    return [tool if isinstance(tool, TracedTool) else TracedTool(tool, component) for tool in tools]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))] if ordered else 0.0
+
+
+def summarize(spans: Iterable[Dict[str, Any]], by: str = "component") -> Dict[str, Dict[str, Any]]:
+    """
+    Latency percentiles of spans, grouped by component or by name
+
+    Args:
+        spans: Span dicts, from Tracer.finished() or load_spans()
+        by: "component" or "name"
+
+    Returns:
+        dict: Group -> count, errors, p50_ms, p95_ms, max_ms and total_ms
+    """
+    groups = {}
+    for span in spans:
+        groups.setdefault(span[by], []).append(span)
+    summary = {}
+    for group, members in sorted(groups.items()):
+        durations = [span["duration_ms"] for span in members]
+        summary[group] = {
+            "count": len(members),
+            "errors": sum(1 for span in members if span["error"]),
+            "p50_ms": percentile(durations, 50),
+            "p95_ms": percentile(durations, 95),
+            "max_ms": max(durations),
+            "total_ms": sum(durations)
+        }
+    return summary
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    """Read the spans of an OTLP/JSON lines file as span dicts"""
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource in json.loads(line).get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    for raw in scope.get("spans", []):
+                        attributes = {a["key"]: _plain_value(a["value"]) for a in raw.get("attributes", [])}
+                        duration = (int(raw["endTimeUnixNano"]) - int(raw["startTimeUnixNano"])) / 1e6
+                        spans.append({
+                            "name": raw["name"],
+                            "component": attributes.pop("component", raw["name"].split(".")[0]),
+                            "trace_id": raw["traceId"],
+                            "duration_ms": duration,
+                            "self_ms": attributes.pop("self_ms", duration),
+                            "error": raw.get("status", {}).get("code") == STATUS_ERROR,
+                            "attributes": attributes
+                        })
+    return spans
+
+
+def format_summary(summary: Dict[str, Dict[str, Any]]) -> str:
+    """The output of summarize() as a table"""
+    lines = [f"{'':<28} {'count':>7} {'errors':>7} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10} {'total s':>9}"]
+    for group, stats in summary.items():
+        lines.append(f"{group:<28} {stats['count']:>7} {stats['errors']:>7} {stats['p50_ms']:>10.1f} "
+                     f"{stats['p95_ms']:>10.1f} {stats['max_ms']:>10.1f} {stats['total_ms'] / 1000:>9.2f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a trace file by component")
+    parser.add_argument("path", nargs="?", default=os.getenv("COACH_TRACE_FILE"),
+                        help="OTLP/JSON lines file; defaults to COACH_TRACE_FILE")
+    parser.add_argument("--by", choices=("component", "name"), default="component",
+                        help="Group spans by component or by operation name")
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("no trace file given and COACH_TRACE_FILE is not set")
+
+    spans = load_spans(args.path)
+    print(f"{len(spans)} spans in {len({span['trace_id'] for span in spans})} traces")
+    print(format_summary(summarize(spans, args.by)))
+
+
+if __name__ == "__main__":
+    main()
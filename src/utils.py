@@ -6,8 +6,11 @@ import os
 import logging
 import datetime
 import json
+import uuid
 from typing import List, Dict, Any
 
+from .tracing import span
+
 # Setup logging
 
 
@@ -115,6 +118,10 @@ class ConversationManager:
         if not os.listdir(storage_dir):
             self._create_example_conversations()
 
+        # ID -> id, title and created_at of every conversation, kept up to date
+        # by save and delete so listing does not read every file
+        self._index = None
+
     def _create_example_conversations(self):
         """Create example conversations for demonstration purposes"""
         example_conversations = [
@@ -209,7 +216,8 @@ class ConversationManager:
 
         # Use existing conversation_id or create new one
         if not conversation_id:
-            conversation_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            # The suffix keeps conversations started in the same second apart
+            conversation_id = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
 
         # Create conversation data
         conversation_data = {
@@ -221,8 +229,14 @@ class ConversationManager:
 
         # Save to file
         file_path = os.path.join(self.storage_dir, f"{conversation_id}.json")
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(conversation_data, f, ensure_ascii=False, indent=2)
+        with span("conversations.save", "store", messages=len(messages)) as current:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(conversation_data, f, ensure_ascii=False, indent=2)
+                current.set(bytes=f.tell())
+
+        if self._index is not None:
+            self._index[conversation_id] = {"id": conversation_id, "title": title,
+                                            "created_at": conversation_data["created_at"]}
 
         return conversation_id
 
@@ -236,29 +250,53 @@ class ConversationManager:
         with open(file_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
+    def _memory_path(self, conversation_id: str) -> str:
+        return os.path.join(self.storage_dir, "memory", f"{conversation_id}.json")
+
+    def save_memory(self, conversation_id: str, state: Dict[str, Any]) -> None:
+        """Save the chat memory summary of a conversation"""
+        if not state:
+            return
+        os.makedirs(os.path.join(self.storage_dir, "memory"), exist_ok=True)
+        with open(self._memory_path(conversation_id), 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+
+    def load_memory(self, conversation_id: str) -> Dict[str, Any]:
+        """Load the chat memory summary of a conversation, or None if there is none"""
+        try:
+            with open(self._memory_path(conversation_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
     def list_conversations(self) -> List[Dict[str, Any]]:
         """List all saved conversations with formatted titles"""
-        conversations = []
-        for filename in os.listdir(self.storage_dir):
-            if filename.endswith('.json'):
-                file_path = os.path.join(self.storage_dir, filename)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Format the title for display
-                    display_title = data["title"]
-                    conversations.append({
-                        "id": data["id"],
-                        "title": display_title,
-                        "created_at": data["created_at"]
-                    })
+        if self._index is None:
+            self._index = {}
+            for filename in os.listdir(self.storage_dir):
+                if filename.endswith('.json'):
+                    file_path = os.path.join(self.storage_dir, filename)
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                        # Format the title for display
+                        display_title = data["title"]
+                        self._index[data["id"]] = {
+                            "id": data["id"],
+                            "title": display_title,
+                            "created_at": data["created_at"]
+                        }
 
         # Sort by creation date, newest first
-        return sorted(conversations, key=lambda x: x["created_at"], reverse=True)
+        return sorted(self._index.values(), key=lambda x: x["created_at"], reverse=True)
 
     def delete_conversation(self, conversation_id: str) -> bool:
         """Delete a conversation by ID"""
         file_path = os.path.join(self.storage_dir, f"{conversation_id}.json")
         if os.path.exists(file_path):
             os.remove(file_path)
+            if self._index is not None:
+                self._index.pop(conversation_id, None)
+            if os.path.exists(self._memory_path(conversation_id)):
+                os.remove(self._memory_path(conversation_id))
             return True
         return False
@@ -3,7 +3,10 @@ Visualization modules for the Coach Intelligence System
 """
 
 from .visualization_tool import VisualizationTool
+from .delivery import collect_images, to_chat_message
 
 __all__ = [
-    'VisualizationTool'
+    'VisualizationTool',
+    'collect_images',
+    'to_chat_message'
 ]
@@ -0,0 +1,146 @@
+"""
+In-memory delivery of rendered images to the chat interface
+
+While a chat turn is being processed, the UI opens an outbox with
+collect_images(). Visualizations rendered during the turn are published to
+that outbox as encoded bytes instead of being written to disk, and the UI
+embeds them in the chat. Renders queued in the background are tracked by the
+outbox too, so the UI can show the reply first and add the images as soon as
+they finish.
+"""
+
+import base64
+import threading
+from concurrent.futures import wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+MIME_TYPES = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "svg": "image/svg+xml",
+    "pdf": "application/pdf",
+    "json": "application/vnd.plotly.v1+json",
+    "html": "text/html"
+}
+
+# Outbox of the current chat turn, or None outside of a turn
+_outbox = ContextVar("image_outbox", default=None)
+
+
+class ImageOutbox:
+    """Images delivered to one chat turn, plus the renders still in flight"""
+
+    def __init__(self):
+        self.images = []
+        self.pending = []
+        self._lock = threading.Lock()
+
+    def publish(self, payload):
+        with self._lock:
+            self.images.append(payload)
+
+    def track(self, future):
+        """Track a background render whose result will be published here"""
+        with self._lock:
+            self.pending.append(future)
+
+    def wait(self, timeout=None):
+        """
+        Wait for the tracked renders to finish
+
+        Returns:
+            list: Every image published so far
+        """
+        with self._lock:
+            pending = list(self.pending)
+        wait(pending, timeout=timeout)
+        with self._lock:
+            return list(self.images)
+
+
+def image_payload(data, fmt, label, title=None):
+    """
+    Build the payload for an encoded image
+
+    Args:
+        data (bytes): Encoded image
+        fmt (str): Image format, e.g. "webp"
+        label (str): Human-readable name of the visualization
+        title (str, optional): Title shown as alt text
+
+    Returns:
+        dict: label, title, format, mime_type and data
+    """
+    return {
+        "label": label,
+        "title": title or label,
+        "format": fmt,
+        "mime_type": MIME_TYPES.get(fmt, "application/octet-stream"),
+        "data": data
+    }
+
+
+@contextmanager
+def collect_images():
+    """
+    Open an outbox for the images rendered during a chat turn
+
+    Yields:
+        ImageOutbox: Receives the payloads published while the context is active
+    """
+    outbox = ImageOutbox()
+    token = _outbox.set(outbox)
+    try:
+        yield outbox
+    finally:
+        _outbox.reset(token)
+
+
+def current_outbox():
+    """Return the outbox of the current chat turn, or None"""
+    return _outbox.get()
+
+
+def is_collecting():
+    """Return True if a chat turn is collecting images"""
+    return _outbox.get() is not None
+
+
+def publish_image(payload):
+    """
+    Hand an image to the current chat turn
+
+    Returns:
+        bool: True if the image was delivered, False if no turn is collecting
+    """
+    outbox = _outbox.get()
+    if outbox is None:
+        return False
+    outbox.publish(payload)
+    return True
+
+
+def to_data_uri(payload):
+    """Encode a payload as a data URI"""
+    encoded = base64.b64encode(payload["data"]).decode("ascii")
+    return f"data:{payload['mime_type']};base64,{encoded}"
+
+
+def to_chat_message(payload):
+    """Convert a payload into an assistant message that displays the image inline"""
+    if payload["format"] == "json":
+        # Plotly specs are drawn by plotly.js in the browser
+        import gradio as gr
+        import plotly.io as pio
+        return {
+            "role": "assistant",
+            "content": gr.Plot(pio.from_json(payload["data"].decode("utf-8"), skip_invalid=True))
+        }
+
+    return {
+        "role": "assistant",
+        "content": f"![{payload['title']}]({to_data_uri(payload)})"
+    }
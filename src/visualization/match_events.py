@@ -0,0 +1,408 @@
+"""
+Vectorized drawing of match events, momentum and shots
+
+Events are flattened into NumPy arrays so that a timeline needs one scatter per
+event type and one PathCollection per team for its labels, however many events
+or matches are drawn. The same arrays feed single-match charts, season-wide
+charts and the frame-by-frame match replay.
+"""
+
+import math
+import numpy as np
+from matplotlib.collections import PathCollection
+from matplotlib.transforms import Affine2D
+
+from .pitch_template import draw_pitch, label_path, PITCH_LENGTH, PITCH_WIDTH
+
+EVENT_PROPS = {
+    "goal": {"marker": "o", "color": "green", "size": 150, "label": "Goal"},
+    "yellow_card": {"marker": "s", "color": "yellow", "size": 100, "label": "Yellow Card"},
+    "red_card": {"marker": "s", "color": "red", "size": 100, "label": "Red Card"},
+    "substitution": {"marker": "^", "color": "blue", "size": 100, "label": "Substitution"},
+    "penalty": {"marker": "P", "color": "purple", "size": 150, "label": "Penalty"},
+    "shot": {"marker": "D", "color": "lightgray", "size": 60, "label": "Shot"},
+    "corner": {"marker": "v", "color": "orange", "size": 60, "label": "Corner"}
+}
+OTHER_EVENT = {"marker": "o", "color": "gray", "size": 100, "label": "Other"}
+
+# Contribution of each event to the attacking team's momentum
+MOMENTUM_WEIGHTS = {
+    "goal": 1.0,
+    "penalty": 0.8,
+    "shot": 0.4,
+    "corner": 0.2,
+    "yellow_card": -0.1,
+    "red_card": -0.6
+}
+# Minutes for an event's contribution to momentum to halve
+MOMENTUM_HALF_LIFE = 5.0
+
+SHOT_TYPES = ("shot", "goal", "penalty")
+SHOT_OUTCOMES = {
+    "goal": {"color": "green", "label": "Goal"},
+    "on_target": {"color": "gold", "label": "On target"},
+    "off_target": {"color": "lightgray", "label": "Off target"}
+}
+
+HOME_COLOR = "blue"
+AWAY_COLOR = "red"
+
+
+def parse_minute(value):
+    """
+    Parse an event minute
+
+    Accepts numbers and strings such as "67", "45+2" or "90+3'".
+
+    Returns:
+        tuple: (minute, stoppage) where minute includes any added time and
+            stoppage is True if the minute was given as added time
+    """
+    if isinstance(value, (int, float)):
+        return float(value), False
+
+    text = str(value).strip().rstrip("'")
+    try:
+        if "+" in text:
+            base, added = text.split("+", 1)
+            return float(base) + float(added), True
+        return float(text), False
+    except ValueError:
+        return 0.0, False
+
+
+def match_length(match):
+    """
+    Work out how many minutes a match timeline should span
+
+    Extra time is shown when the match says so, or when an event falls after
+    the 90th minute without being stoppage time. Stoppage time only stretches
+    the axis as far as it goes.
+    """
+    extra_time = bool(match.get("extra_time"))
+    latest = float(match.get("minute", 90) or 90)
+    for event in match.get("events", []):
+        minute, stoppage = parse_minute(event.get("minute", 0))
+        latest = max(latest, minute)
+        if minute > 90 and not stoppage:
+            extra_time = True
+
+    length = 120 if extra_time else 90
+    return max(length, int(math.ceil(latest)))
+
+
+def event_arrays(matches):
+    """
+    Flatten the events of one or more matches into parallel arrays
+
+    Args:
+        matches (list): Match dicts with home_team, away_team and events
+
+    Returns:
+        dict: match (index), minute, type, side (+1 home, -1 away), player,
+            x, y, xg and on_target arrays, one entry per event
+    """
+    rows = []
+    for index, match in enumerate(matches):
+        home_team = match.get("home_team", {}).get("name", "Home Team")
+        for event in match.get("events", []):
+            minute, _ = parse_minute(event.get("minute", 0))
+            rows.append((
+                index,
+                minute,
+                str(event.get("type", "")).lower(),
+                1 if event.get("team", "") == home_team else -1,
+                str(event.get("player", "")),
+                event.get("x", np.nan),
+                event.get("y", np.nan),
+                event.get("xg", np.nan),
+                bool(event.get("on_target", False)),
+                event.get("team", "")
+            ))
+
+    columns = list(zip(*rows)) if rows else [()] * 10
+    return {
+        "match": np.array(columns[0], dtype=int),
+        "minute": np.array(columns[1], dtype=float),
+        "type": np.array(columns[2], dtype=object),
+        "side": np.array(columns[3], dtype=int),
+        "player": np.array(columns[4], dtype=object),
+        "x": np.array(columns[5], dtype=float),
+        "y": np.array(columns[6], dtype=float),
+        "xg": np.array(columns[7], dtype=float),
+        "on_target": np.array(columns[8], dtype=bool),
+        "team": np.array(columns[9], dtype=object)
+    }
+
+
+def event_groups(types):
+    """
+    Group event indices by their drawing properties
+
+    Returns:
+        list: (props, indices) pairs, known event types first
+    """
+    groups = []
+    known = np.zeros(len(types), dtype=bool)
+    for event_type, props in EVENT_PROPS.items():
+        indices = np.flatnonzero(types == event_type)
+        known[indices] = True
+        if len(indices):
+            groups.append((props, indices))
+
+    other = np.flatnonzero(~known)
+    if len(other):
+        groups.append((OTHER_EVENT, other))
+    return groups
+
+
+def momentum_matrix(arrays, n_matches, length):
+    """
+    Compute per-minute momentum for every match at once
+
+    Each event adds its weight to its team's side of the curve (home positive,
+    away negative) and decays with MOMENTUM_HALF_LIFE.
+
+    Returns:
+        numpy.ndarray: (n_matches, length + 1) momentum values
+    """
+    momentum = np.zeros((n_matches, length + 1))
+    weights = np.array([MOMENTUM_WEIGHTS.get(t, 0.0) for t in arrays["type"]])
+    minutes = np.clip(arrays["minute"].astype(int), 0, length)
+    np.add.at(momentum, (arrays["match"], minutes), weights * arrays["side"])
+
+    # Exponential decay, stepped over minutes and vectorized over matches
+    decay = 0.5 ** (1.0 / MOMENTUM_HALF_LIFE)
+    for minute in range(1, length + 1):
+        momentum[:, minute] += decay * momentum[:, minute - 1]
+    return momentum
+
+
+def label_paths(labels, fontsize=9, rotation=0, anchor="bottom"):
+    """
+    Build rotated label outlines anchored above or below their position
+
+    Returns:
+        list: Paths in points, one per label
+    """
+    rotate = Affine2D().rotate_deg(rotation)
+    paths = []
+    for label in labels:
+        path = label_path(label or " ", fontsize).transformed(rotate)
+        extents = path.get_extents()
+        shift = -extents.y0 if anchor == "bottom" else -extents.y1
+        paths.append(path.transformed(Affine2D().translate(0, shift)))
+    return paths
+
+
+def label_collection(ax, xs, ys, paths, color="black"):
+    """Draw many labels as one PathCollection of glyph outlines"""
+    collection = PathCollection(
+        paths,
+        offsets=np.column_stack([xs, ys]) if len(paths) else np.empty((0, 2)),
+        offset_transform=ax.transData,
+        transform=Affine2D().scale(1 / 72) + ax.figure.dpi_scale_trans,
+        facecolors=color,
+        edgecolors='none',
+        zorder=4
+    )
+    ax.add_collection(collection, autolim=False)
+    return collection
+
+
+def minute_ticks(length):
+    ticks = list(range(0, length + 1, 15))
+    return ticks, [f"{t}'" for t in ticks]
+
+
+def draw_event_timeline(ax, match, labels=True):
+    """
+    Draw the event timeline of a single match
+
+    Returns:
+        dict: The created artists, keyed by event type, plus "labels" and
+            "current" (the current-minute line)
+    """
+    home_team = match.get("home_team", {}).get("name", "Home Team")
+    away_team = match.get("away_team", {}).get("name", "Away Team")
+    current_minute = match.get("minute", 90)
+    length = match_length(match)
+    arrays = event_arrays([match])
+
+    # Draw a timeline across the whole match, including any extra time
+    ax.plot([0, length], [1, 1], color='gray', linestyle='-', alpha=0.5)
+
+    # Mark current minute
+    artists = {"current": ax.axvline(x=current_minute, color='red', linestyle='--',
+                                     label=f"Current Minute: {current_minute}")}
+
+    # Home events sit above the line, away events below
+    y_pos = np.where(arrays["side"] > 0, 1.1, 0.9)
+    for props, indices in event_groups(arrays["type"]):
+        artists[props["label"]] = ax.scatter(
+            arrays["minute"][indices], y_pos[indices], marker=props["marker"],
+            color=props["color"], s=props["size"], label=props["label"],
+            edgecolor='black', linewidth=1, zorder=3)
+
+    if labels:
+        artists["labels"] = []
+        for side, rotation, anchor, offset in [(1, 45, "bottom", 0.05), (-1, -45, "top", -0.05)]:
+            indices = np.flatnonzero(arrays["side"] == side)
+            paths = label_paths(arrays["player"][indices], rotation=rotation, anchor=anchor)
+            artists["labels"].append(label_collection(
+                ax, arrays["minute"][indices], y_pos[indices] + offset, paths))
+
+    # Set axis limits
+    ax.set_xlim(0, length)
+    ax.set_ylim(0.7, 1.3)
+
+    # Set y-axis labels for teams
+    ax.set_yticks([0.9, 1.1])
+    ax.set_yticklabels([away_team, home_team])
+
+    # Add x-axis ticks for minutes
+    ticks, tick_labels = minute_ticks(length)
+    ax.set_xticks(ticks)
+    ax.set_xticklabels(tick_labels)
+    return artists
+
+
+def draw_momentum(ax, match):
+    """Draw the momentum curve of a single match"""
+    home_team = match.get("home_team", {}).get("name", "Home Team")
+    away_team = match.get("away_team", {}).get("name", "Away Team")
+    length = match_length(match)
+    curve = momentum_matrix(event_arrays([match]), 1, length)[0]
+    minutes = np.arange(length + 1)
+
+    ax.fill_between(minutes, curve, 0, where=curve >= 0, color=HOME_COLOR,
+                    alpha=0.6, interpolate=True, label=home_team)
+    ax.fill_between(minutes, curve, 0, where=curve < 0, color=AWAY_COLOR,
+                    alpha=0.6, interpolate=True, label=away_team)
+    ax.axhline(0, color='gray', linewidth=0.8)
+
+    limit = max(0.5, float(np.abs(curve).max()) * 1.1)
+    ax.set_xlim(0, length)
+    ax.set_ylim(-limit, limit)
+    ticks, tick_labels = minute_ticks(length)
+    ax.set_xticks(ticks)
+    ax.set_xticklabels(tick_labels)
+    ax.set_ylabel("Momentum")
+    ax.legend(loc='upper right')
+
+
+def shot_outcomes(arrays):
+    """Return a mask per shot outcome"""
+    goal = arrays["type"] == "goal"
+    return {
+        "goal": goal,
+        "on_target": ~goal & arrays["on_target"],
+        "off_target": ~goal & ~arrays["on_target"]
+    }
+
+
+def draw_shot_map(ax, arrays, mirror_away=True, style="classic"):
+    """
+    Draw shots with pitch coordinates on a pitch, one scatter per outcome
+
+    Coordinates are in metres from each team's own perspective, attacking to
+    the right. With mirror_away, away shots are mirrored to attack left.
+    Markers are sized by expected goals where available.
+
+    Returns:
+        int: Number of shots drawn
+    """
+    draw_pitch(ax, style)
+    ax.axis('off')
+
+    shots = np.isin(arrays["type"], SHOT_TYPES) & ~np.isnan(arrays["x"]) & ~np.isnan(arrays["y"])
+    x, y = arrays["x"].copy(), arrays["y"].copy()
+    if mirror_away:
+        away = arrays["side"] < 0
+        x[away] = PITCH_LENGTH - x[away]
+        y[away] = PITCH_WIDTH - y[away]
+    sizes = 40 + 400 * np.nan_to_num(arrays["xg"], nan=0.1)
+
+    for outcome, mask in shot_outcomes(arrays).items():
+        selected = shots & mask
+        if selected.any():
+            ax.scatter(x[selected], y[selected], s=sizes[selected],
+                       color=SHOT_OUTCOMES[outcome]["color"], label=SHOT_OUTCOMES[outcome]["label"],
+                       edgecolor='black', linewidth=0.8, alpha=0.85, zorder=3)
+
+    if shots.any():
+        ax.legend(loc='upper center', bbox_to_anchor=(0.5, 0.0), ncol=3)
+    return int(shots.sum())
+
+
+def match_names(matches):
+    return [f"{m.get('home_team', {}).get('name', 'Home Team')} v "
+            f"{m.get('away_team', {}).get('name', 'Away Team')}" for m in matches]
+
+
+def draw_season_timeline(ax, matches):
+    """
+    Draw the events of many matches on one axes, one row per match
+
+    Every event type is a single scatter across the whole season.
+    """
+    arrays = event_arrays(matches)
+    lengths = [match_length(m) for m in matches]
+    length = max(lengths or [90])
+
+    rows = np.arange(len(matches))
+    ax.hlines(rows, 0, lengths, color='gray', alpha=0.3)
+
+    # Home events just above each row, away events just below
+    y_pos = arrays["match"] + np.where(arrays["side"] > 0, -0.18, 0.18)
+    for props, indices in event_groups(arrays["type"]):
+        ax.scatter(arrays["minute"][indices], y_pos[indices], marker=props["marker"],
+                   color=props["color"], s=props["size"] / 4, label=props["label"],
+                   edgecolor='black', linewidth=0.5)
+
+    ax.set_xlim(0, length)
+    ax.set_ylim(len(matches) - 0.5, -0.5)
+    ax.set_yticks(rows)
+    ax.set_yticklabels(match_names(matches), fontsize=8)
+    ticks, tick_labels = minute_ticks(length)
+    ax.set_xticks(ticks)
+    ax.set_xticklabels(tick_labels)
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.04), ncol=4)
+
+
+def draw_season_momentum(ax, matches):
+    """Draw the momentum of many matches as a single heat map, one row per match"""
+    lengths = np.array([match_length(m) for m in matches] or [90])
+    length = int(lengths.max())
+    momentum = momentum_matrix(event_arrays(matches), len(matches), length)
+    limit = max(0.5, float(np.abs(momentum).max()))
+
+    # Leave the minutes after each match ended blank
+    momentum[np.arange(length + 1)[None, :] > lengths[:, None]] = np.nan
+
+    image = ax.imshow(momentum, aspect='auto', cmap='RdBu', vmin=-limit, vmax=limit,
+                      extent=(0, length, len(matches) - 0.5, -0.5), interpolation='nearest')
+    ax.set_yticks(np.arange(len(matches)))
+    ax.set_yticklabels(match_names(matches), fontsize=8)
+    ticks, tick_labels = minute_ticks(length)
+    ax.set_xticks(ticks)
+    ax.set_xticklabels(tick_labels)
+    colorbar = ax.figure.colorbar(image, ax=ax, pad=0.01)
+    colorbar.set_label("Momentum (blue: home, red: away)")
+
+
+def draw_season_shots(ax, matches, team=None, style="classic"):
+    """
+    Draw the shots of many matches on one pitch
+
+    Args:
+        team (str, optional): Only include this team's shots
+
+    Returns:
+        int: Number of shots drawn
+    """
+    arrays = event_arrays(matches)
+    if team:
+        keep = arrays["team"] == team
+        arrays = {key: values[keep] for key, values in arrays.items()}
+    return draw_shot_map(ax, arrays, mirror_away=False, style=style)
@@ -0,0 +1,170 @@
+"""
+Animated replay of a match, rendered frame by frame
+
+A replay figure is built once per worker and every frame only updates the
+data of its artists (event offsets, label paths, the momentum curve and the
+current-minute line) before the canvas is redrawn. Frames are rendered in
+chunks across a process pool and encoded to GIF with Pillow, or to MP4 when
+ffmpeg is available.
+"""
+
+import shutil
+import subprocess
+import numpy as np
+from PIL import Image
+
+from .visualization_tool import new_figure
+from .match_events import (event_arrays, event_groups, label_collection, label_paths,
+                           match_length, momentum_matrix, minute_ticks, HOME_COLOR, AWAY_COLOR)
+
+REPLAY_FORMATS = ("gif", "mp4")
+
+
+class MatchReplay:
+    """A two-panel replay figure: event timeline above, momentum below"""
+
+    def __init__(self, match, dpi=80, figsize=(8, 5)):
+        self.match = match
+        self.length = match_length(match)
+        self.arrays = event_arrays([match])
+        self.momentum = momentum_matrix(self.arrays, 1, self.length)[0]
+
+        home_team = match.get("home_team", {}).get("name", "Home Team")
+        away_team = match.get("away_team", {}).get("name", "Away Team")
+
+        self.fig, (self.timeline, self.curve) = new_figure(figsize=figsize, nrows=2)
+        self.fig.set_dpi(dpi)
+        self.fig.suptitle(f"{home_team} vs {away_team}", fontsize=12)
+        ticks, tick_labels = minute_ticks(self.length)
+
+        # Event markers, one scatter per event type, start empty
+        self.timeline.plot([0, self.length], [1, 1], color='gray', alpha=0.5)
+        y_pos = np.where(self.arrays["side"] > 0, 1.1, 0.9)
+        self.points = np.column_stack([self.arrays["minute"], y_pos])
+        self.groups = []
+        for props, indices in event_groups(self.arrays["type"]):
+            scatter = self.timeline.scatter([], [], marker=props["marker"], color=props["color"],
+                                            s=props["size"] / 2, label=props["label"],
+                                            edgecolor='black', linewidth=1, zorder=3)
+            self.groups.append((scatter, indices))
+
+        self.label_paths = np.empty(len(self.points), dtype=object)
+        for side, rotation, anchor in [(1, 45, "bottom"), (-1, -45, "top")]:
+            indices = np.flatnonzero(self.arrays["side"] == side)
+            for index, path in zip(indices, label_paths(
+                    self.arrays["player"][indices], fontsize=7, rotation=rotation, anchor=anchor)):
+                self.label_paths[index] = path
+        self.label_offsets = self.points + np.column_stack(
+            [np.zeros(len(self.points)), 0.05 * self.arrays["side"]])
+
+        self.labels = label_collection(self.timeline, [], [], [])
+
+        self.timeline.set_xlim(0, self.length)
+        self.timeline.set_ylim(0.7, 1.3)
+        self.timeline.set_yticks([0.9, 1.1])
+        self.timeline.set_yticklabels([away_team, home_team])
+        self.timeline.set_xticks(ticks)
+        self.timeline.set_xticklabels(tick_labels)
+        if self.groups:
+            self.timeline.legend(loc='upper left', fontsize=7, ncol=len(self.groups))
+
+        # Momentum curve, revealed minute by minute
+        limit = max(0.5, float(np.abs(self.momentum).max()) * 1.1)
+        self.curve.axhline(0, color='gray', linewidth=0.8)
+        self.home_line, = self.curve.plot([], [], color=HOME_COLOR)
+        self.away_line, = self.curve.plot([], [], color=AWAY_COLOR)
+        self.curve.set_xlim(0, self.length)
+        self.curve.set_ylim(-limit, limit)
+        self.curve.set_xticks(ticks)
+        self.curve.set_xticklabels(tick_labels)
+        self.curve.set_ylabel("Momentum")
+
+        self.cursors = [ax.axvline(0, color='red', linestyle='--')
+                        for ax in (self.timeline, self.curve)]
+        self.fig.tight_layout()
+
+    def frame(self, minute):
+        """
+        Render the match as it stood at the given minute
+
+        Returns:
+            numpy.ndarray: RGB pixels of the frame
+        """
+        visible = self.arrays["minute"] <= minute
+        for scatter, indices in self.groups:
+            scatter.set_offsets(self.points[indices[visible[indices]]].reshape(-1, 2))
+
+        shown = np.flatnonzero(visible)
+        self.labels.set_paths(list(self.label_paths[shown]))
+        self.labels.set_offsets(self.label_offsets[shown].reshape(-1, 2))
+
+        minutes = np.arange(int(minute) + 1)
+        values = self.momentum[:len(minutes)]
+        self.home_line.set_data(minutes, np.maximum(values, 0))
+        self.away_line.set_data(minutes, np.minimum(values, 0))
+        for cursor in self.cursors:
+            cursor.set_xdata([minute, minute])
+
+        self.fig.canvas.draw()
+        return np.asarray(self.fig.canvas.buffer_rgba())[:, :, :3].copy()
+
+    def close(self):
+        self.fig.clear()
+
+
+def render_frames(match, minutes, dpi=80, palette=False):
+    """
+    Render a chunk of replay frames inside a worker process
+
+    Args:
+        match (dict): Match data
+        minutes (list): Minutes to render, one frame each
+        dpi (int): Frame resolution
+        palette (bool): Quantize frames to a 256-colour palette, ready for GIF
+
+    Returns:
+        list: PIL images (palette mode) or RGB arrays
+    """
+    replay = MatchReplay(match, dpi=dpi)
+    try:
+        frames = [replay.frame(minute) for minute in minutes]
+    finally:
+        replay.close()
+    if palette:
+        return [Image.fromarray(frame).quantize(colors=256) for frame in frames]
+    return frames
+
+
+def encode_gif(frames, path, fps):
+    """Write palette frames to an animated GIF"""
+    first, rest = frames[0], frames[1:]
+    first.save(path, format="GIF", save_all=True, append_images=rest,
+               duration=int(1000 / fps), loop=0, optimize=False)
+
+
+def encode_mp4(frames, path, fps):
+    """
+    Pipe RGB frames through ffmpeg into an H.264 MP4
+
+    Raises:
+        ValueError: If ffmpeg is not installed
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise ValueError("MP4 replays require ffmpeg; use format 'gif' instead")
+
+    height, width = frames[0].shape[:2]
+    command = [
+        ffmpeg, "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps),
+        "-i", "-",
+        # H.264 needs even dimensions
+        "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+        "-c:v", "libx264", "-pix_fmt", "yuv420p", "-f", "mp4", path
+    ]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE)
+    for frame in frames:
+        process.stdin.write(frame.tobytes())
+    process.stdin.close()
+    if process.wait() != 0:
+        raise ValueError("ffmpeg failed to encode the replay")
@@ -0,0 +1,226 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import matplotlib.patches as patches
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PathCollection
+from matplotlib.font_manager import FontProperties
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D
+from functools import lru_cache
+from PIL import Image
+
+# Pitch dimensions in metres and the data limits of every pitch diagram
+PITCH_LENGTH = 105
+PITCH_WIDTH = 68
+PITCH_EXTENT = (-5, PITCH_LENGTH + 5, -5, PITCH_WIDTH + 5)
+
+PITCH_STYLES = {
+    "classic": {"grass": "#3A9648", "lines": "white"},
+    "dark": {"grass": "#1E3B2A", "lines": "#D8D8D8"},
+    "print": {"grass": "white", "lines": "black"}
+}
+
+# Radius of a player marker in pitch metres
+PLAYER_RADIUS = 2.5
+
+# Templates are not shared between threads, since blitting mutates the canvas
+_templates = threading.local()
+
+# Templates kept per thread; requests may pick any dpi or figure size, so
+# the least recently used ones are dropped
+MAX_TEMPLATES = 8
+
+
+def draw_pitch(ax, style="classic"):
+    """Draw a football pitch from individual patches"""
+    colors = PITCH_STYLES.get(style, PITCH_STYLES["classic"])
+    grass, lines = colors["grass"], colors["lines"]
+    pitch_length = PITCH_LENGTH
+    pitch_width = PITCH_WIDTH
+
+    # Draw pitch outline
+    rect = patches.Rectangle((0, 0), pitch_length, pitch_width, linewidth=2,
+                             edgecolor=lines, facecolor=grass)
+    ax.add_patch(rect)
+
+    # Draw halfway line
+    ax.plot([pitch_length/2, pitch_length/2], [0, pitch_width], color=lines)
+
+    # Draw center circle
+    center_circle = patches.Circle(
+        (pitch_length/2, pitch_width/2), 9.15, fill=False, color=lines)
+    ax.add_patch(center_circle)
+
+    # Draw center spot
+    center_spot = patches.Circle(
+        (pitch_length/2, pitch_width/2), 0.8, color=lines)
+    ax.add_patch(center_spot)
+
+    # Draw penalty areas
+    # Left penalty area
+    left_pen = patches.Rectangle((0, pitch_width/2 - 20.16), 16.5, 40.32,
+                                 linewidth=2, edgecolor=lines, facecolor='none')
+    ax.add_patch(left_pen)
+
+    # Right penalty area
+    right_pen = patches.Rectangle((pitch_length - 16.5, pitch_width/2 - 20.16), 16.5, 40.32,
+                                  linewidth=2, edgecolor=lines, facecolor='none')
+    ax.add_patch(right_pen)
+
+    # Draw goal areas
+    # Left goal area
+    left_goal = patches.Rectangle((0, pitch_width/2 - 9.16), 5.5, 18.32,
+                                  linewidth=2, edgecolor=lines, facecolor='none')
+    ax.add_patch(left_goal)
+
+    # Right goal area
+    right_goal = patches.Rectangle((pitch_length - 5.5, pitch_width/2 - 9.16), 5.5, 18.32,
+                                   linewidth=2, edgecolor=lines, facecolor='none')
+    ax.add_patch(right_goal)
+
+    # Draw penalty spots
+    left_pen_spot = patches.Circle((11, pitch_width/2), 0.8, color=lines)
+    ax.add_patch(left_pen_spot)
+
+    right_pen_spot = patches.Circle(
+        (pitch_length - 11, pitch_width/2), 0.8, color=lines)
+    ax.add_patch(right_pen_spot)
+
+    # Set axis limits
+    ax.set_xlim(PITCH_EXTENT[0], PITCH_EXTENT[1])
+    ax.set_ylim(PITCH_EXTENT[2], PITCH_EXTENT[3])
+
+
+@lru_cache(maxsize=256)
+def label_path(label, size):
+    """Return the outline of a bold text label, centred on the origin, in points"""
+    path = TextPath((0, 0), label, size=size, prop=FontProperties(weight='bold'))
+    extents = path.get_extents()
+    return path.transformed(Affine2D().translate(
+        -(extents.x0 + extents.x1) / 2, -(extents.y0 + extents.y1) / 2))
+
+
+def player_artists(ax, players, fontsize=10):
+    """
+    Create the artists for a list of players in two batches
+
+    Players are drawn with a single scatter, and their labels with a single
+    PathCollection of glyph outlines, instead of one patch and one text artist
+    per player.
+
+    Args:
+        ax: Axes showing a pitch with PITCH_EXTENT limits
+        players (list): (x, y, label, color) tuples
+
+    Returns:
+        list: The created artists
+    """
+    if not players:
+        return []
+
+    xs, ys, labels, colors = zip(*players)
+    fig = ax.figure
+
+    # Convert the marker radius from pitch metres to points
+    width_in = ax.get_position().width * fig.get_size_inches()[0]
+    radius_pt = PLAYER_RADIUS * width_in * 72 / (PITCH_EXTENT[1] - PITCH_EXTENT[0])
+    markers = ax.scatter(xs, ys, s=(2 * radius_pt) ** 2, c=list(colors),
+                         linewidths=0, zorder=3)
+
+    # Labels are glyph outlines in points, offset to each player's position
+    text = PathCollection(
+        [label_path(label, fontsize) for label in labels],
+        offsets=np.column_stack([xs, ys]),
+        offset_transform=ax.transData,
+        transform=Affine2D().scale(1 / 72) + fig.dpi_scale_trans,
+        facecolors='white',
+        edgecolors='none',
+        zorder=4
+    )
+    ax.add_collection(text, autolim=False)
+    return [markers, text]
+
+
+class PitchTemplate:
+    """
+    A pitch rendered once into an Agg canvas and reused as a blitted background
+
+    Each diagram restores the saved background, draws only its own artists on
+    top, crops to the content and removes the artists again, so the pitch is
+    never rebuilt.
+    """
+
+    def __init__(self, figsize=(10, 7), dpi=300, style="classic", pad_inches=0.1):
+        self.dpi = dpi
+        self.pad = int(round(pad_inches * dpi))
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.subplots()
+        draw_pitch(self.ax, style)
+        self.ax.axis('off')
+
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.renderer = self.canvas.get_renderer()
+
+    def render(self, players, title=None, title_fontsize=16, notes=None):
+        """
+        Render a diagram on top of the cached pitch
+
+        Args:
+            players (list): (x, y, label, color) tuples
+            title (str, optional): Diagram title
+            notes (list, optional): (x, y, text, color) annotations in pitch coordinates
+
+        Returns:
+            PIL.Image.Image: The cropped RGBA diagram
+        """
+        self.canvas.restore_region(self.background)
+
+        note_artists = [self.ax.text(x, y, text, ha='center', color=color)
+                        for x, y, text, color in notes or []]
+        artists = player_artists(self.ax, players) + note_artists
+
+        title_artist = self.ax.set_title(title or "", fontsize=title_fontsize)
+        try:
+            for artist in artists + [title_artist]:
+                self.ax.draw_artist(artist)
+
+            # Crop like bbox_inches='tight': the pitch plus the title and notes
+            boxes = [self.ax.get_window_extent(self.renderer)]
+            boxes += [a.get_window_extent(self.renderer)
+                      for a in [title_artist] + note_artists if a.get_text()]
+            x0 = min(b.x0 for b in boxes) - self.pad
+            x1 = max(b.x1 for b in boxes) + self.pad
+            y0 = min(b.y0 for b in boxes) - self.pad
+            y1 = max(b.y1 for b in boxes) + self.pad
+
+            buffer = np.asarray(self.canvas.buffer_rgba())
+            height, width = buffer.shape[:2]
+            # Display coordinates start at the bottom, image rows at the top
+            crop = buffer[max(0, int(height - y1)):min(height, int(height - y0)),
+                          max(0, int(x0)):min(width, int(x1))]
+            return Image.fromarray(crop.copy(), "RGBA")
+        finally:
+            for artist in artists:
+                artist.remove()
+            title_artist.set_text("")
+
+
+def get_pitch_template(figsize=(10, 7), dpi=300, style="classic"):
+    """Return this thread's cached template for the given size, resolution and style"""
+    cache = getattr(_templates, "cache", None)
+    if cache is None:
+        cache = _templates.cache = OrderedDict()
+
+    key = (tuple(figsize), dpi, style)
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+
+    template = cache[key] = PitchTemplate(figsize=figsize, dpi=dpi, style=style)
+    while len(cache) > MAX_TEMPLATES:
+        cache.popitem(last=False)
+    return template
@@ -0,0 +1,223 @@
+"""
+Plotly figure specs for client-side rendering
+
+Charts are built directly as plain Plotly JSON dicts ({"data": [...],
+"layout": {...}}) and rendered by plotly.js in the browser, so the server
+does no rasterization at all and never constructs plotly.graph_objects
+figures. Coordinates are rounded to keep the payloads compact.
+"""
+
+import json
+import numpy as np
+
+from .pitch_template import PITCH_LENGTH, PITCH_WIDTH, PITCH_EXTENT, PITCH_STYLES
+from .match_events import event_arrays, event_groups, match_length, minute_ticks
+
+PLOTLY_FORMATS = ("json", "html")
+PLOTLY_MIME_TYPE = "application/vnd.plotly.v1+json"
+PLOTLY_JS = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+
+# Matplotlib marker codes used by EVENT_PROPS, as Plotly symbols
+MARKER_SYMBOLS = {
+    "o": "circle",
+    "s": "square",
+    "^": "triangle-up",
+    "v": "triangle-down",
+    "P": "cross",
+    "D": "diamond"
+}
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<script src="{plotly_js}"></script></head>
+<body><div id="chart"></div>
+<script>var spec = {spec}; Plotly.newPlot("chart", spec.data, spec.layout, {{responsive: true}});</script>
+</body></html>
+"""
+
+
+def _round(values, digits=2):
+    return [round(float(v), digits) for v in values]
+
+
+def _pitch_shapes(style="classic"):
+    """Pitch markings as layout shapes, mirroring draw_pitch"""
+    colors = PITCH_STYLES.get(style, PITCH_STYLES["classic"])
+    line = {"color": colors["lines"], "width": 2}
+    mid_y = PITCH_WIDTH / 2
+
+    def rect(x0, y0, x1, y1, fill=None):
+        shape = {"type": "rect", "x0": x0, "y0": y0, "x1": x1, "y1": y1, "line": line,
+                 "layer": "below"}
+        if fill:
+            shape["fillcolor"] = fill
+        return shape
+
+    def circle(x, y, r, fill=False):
+        shape = {"type": "circle", "x0": x - r, "y0": y - r, "x1": x + r, "y1": y + r,
+                 "line": line, "layer": "below"}
+        if fill:
+            shape["fillcolor"] = colors["lines"]
+        return shape
+
+    return [
+        rect(0, 0, PITCH_LENGTH, PITCH_WIDTH, fill=colors["grass"]),
+        {"type": "line", "x0": PITCH_LENGTH / 2, "y0": 0, "x1": PITCH_LENGTH / 2,
+         "y1": PITCH_WIDTH, "line": line, "layer": "below"},
+        circle(PITCH_LENGTH / 2, mid_y, 9.15),
+        circle(PITCH_LENGTH / 2, mid_y, 0.8, fill=True),
+        rect(0, mid_y - 20.16, 16.5, mid_y + 20.16),
+        rect(PITCH_LENGTH - 16.5, mid_y - 20.16, PITCH_LENGTH, mid_y + 20.16),
+        rect(0, mid_y - 9.16, 5.5, mid_y + 9.16),
+        rect(PITCH_LENGTH - 5.5, mid_y - 9.16, PITCH_LENGTH, mid_y + 9.16),
+        circle(11, mid_y, 0.8, fill=True),
+        circle(PITCH_LENGTH - 11, mid_y, 0.8, fill=True)
+    ]
+
+
+def formation_spec(players, notes, title, style="classic"):
+    """
+    Build a formation diagram
+
+    Args:
+        players (list): (x, y, label, color) tuples in pitch metres
+        notes (list): (x, y, text, color) annotations
+        title (str): Diagram title
+
+    Returns:
+        dict: Plotly figure spec
+    """
+    xs, ys, labels, colors = zip(*players) if players else ([], [], [], [])
+    axis = {"visible": False, "fixedrange": True}
+    return {
+        "data": [{
+            "type": "scatter",
+            "mode": "markers+text",
+            "x": _round(xs),
+            "y": _round(ys),
+            "text": list(labels),
+            "textfont": {"color": "white", "size": 10},
+            "marker": {"size": 26, "color": list(colors)},
+            "hoverinfo": "text",
+            "showlegend": False
+        }],
+        "layout": {
+            "title": {"text": title},
+            "xaxis": dict(axis, range=list(PITCH_EXTENT[:2])),
+            "yaxis": dict(axis, range=list(PITCH_EXTENT[2:]), scaleanchor="x"),
+            "shapes": _pitch_shapes(style),
+            "annotations": [
+                {"x": x, "y": y, "text": text, "showarrow": False, "font": {"color": color}}
+                for x, y, text, color in notes
+            ],
+            "plot_bgcolor": "white",
+            "margin": {"l": 10, "r": 10, "t": 50, "b": 10}
+        }
+    }
+
+
+def stats_spec(home_team, away_team, stats, title):
+    """
+    Build a comparison of match statistics, one row of bars per statistic
+
+    Args:
+        stats (dict): Statistic name -> [home value, away value]
+
+    Returns:
+        dict: Plotly figure spec
+    """
+    traces = []
+    layout = {
+        "title": {"text": title},
+        "barmode": "group",
+        "legend": {"orientation": "h"},
+        "annotations": [],
+        "margin": {"l": 140, "r": 20, "t": 80, "b": 30},
+        "height": 160 * len(stats) + 80
+    }
+
+    # Each statistic gets its own axes so their scales stay independent
+    row_height = 1.0 / len(stats)
+    for i, (name, values) in enumerate(stats.items()):
+        suffix = "" if i == 0 else str(i + 1)
+        for team, value, color in [(home_team, values[0], "blue"), (away_team, values[1], "red")]:
+            traces.append({
+                "type": "bar", "orientation": "h", "name": team, "legendgroup": team,
+                "showlegend": i == 0, "x": [value], "y": [team], "text": [value],
+                "textposition": "auto", "marker": {"color": color},
+                "xaxis": f"x{suffix}", "yaxis": f"y{suffix}"
+            })
+
+        top = 1.0 - i * row_height
+        domain = [round(top - row_height + 0.06, 3), round(top - 0.04, 3)]
+        layout[f"xaxis{suffix}"] = {"anchor": f"y{suffix}", "rangemode": "tozero"}
+        layout[f"yaxis{suffix}"] = {"anchor": f"x{suffix}", "domain": domain,
+                                    "autorange": "reversed"}
+        layout["annotations"].append({
+            "text": name, "x": 0.5, "y": domain[1], "xref": "paper", "yref": "paper",
+            "xanchor": "center", "yanchor": "bottom", "showarrow": False
+        })
+
+    return {"data": traces, "layout": layout}
+
+
+def match_events_spec(match, title):
+    """
+    Build a match event timeline, one trace per event type
+
+    Returns:
+        dict: Plotly figure spec
+    """
+    home_team = match.get("home_team", {}).get("name", "Home Team")
+    away_team = match.get("away_team", {}).get("name", "Away Team")
+    current_minute = match.get("minute", 90)
+    length = match_length(match)
+    arrays = event_arrays([match])
+    y_pos = np.where(arrays["side"] > 0, 1.1, 0.9)
+
+    traces = []
+    for props, indices in event_groups(arrays["type"]):
+        traces.append({
+            "type": "scatter",
+            "mode": "markers",
+            "name": props["label"],
+            "x": _round(arrays["minute"][indices], 1),
+            "y": _round(y_pos[indices], 1),
+            "text": list(arrays["player"][indices]),
+            "hovertemplate": "%{text} %{x}'",
+            "marker": {
+                "symbol": MARKER_SYMBOLS.get(props["marker"], "circle"),
+                "color": props["color"],
+                "size": round(float(np.sqrt(props["size"])), 1),
+                "line": {"color": "black", "width": 1}
+            }
+        })
+
+    ticks, tick_labels = minute_ticks(length)
+    return {
+        "data": traces,
+        "layout": {
+            "title": {"text": title},
+            "xaxis": {"range": [0, length], "tickvals": ticks, "ticktext": tick_labels},
+            "yaxis": {"range": [0.7, 1.3], "tickvals": [0.9, 1.1],
+                      "ticktext": [away_team, home_team]},
+            "shapes": [
+                {"type": "line", "x0": 0, "x1": length, "y0": 1, "y1": 1,
+                 "line": {"color": "gray"}, "opacity": 0.5},
+                {"type": "line", "x0": current_minute, "x1": current_minute, "y0": 0.7,
+                 "y1": 1.3, "line": {"color": "red", "dash": "dash"}}
+            ],
+            "legend": {"orientation": "h"},
+            "margin": {"l": 120, "r": 20, "t": 60, "b": 30}
+        }
+    }
+
+
+def dumps(spec):
+    """Serialize a spec as compact JSON"""
+    return json.dumps(spec, separators=(",", ":"))
+
+
+def to_html(spec, title=""):
+    """Wrap a spec in a standalone page that renders it with plotly.js"""
+    return HTML_TEMPLATE.format(title=title, plotly_js=PLOTLY_JS, spec=dumps(spec))
@@ -0,0 +1,160 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Names of the files the cache writes, <type>_<key prefix>.<format>; anything
+# else in the directory is left alone
+CACHE_FILE_PATTERN = re.compile(r"^[a-z0-9_]+_[0-9a-f]{24}\.[a-z0-9]+$")
+
+
+class RenderCache:
+    """
+    Content-addressed cache of rendered visualizations on disk
+
+    Files are named after a hash of the input data, chart type and render
+    options, so identical requests share one file and different requests never
+    overwrite each other. The directory is kept under a size bound by evicting
+    the least recently used files; only files named like cache entries are
+    counted or evicted, so the directory can be shared with other files.
+
+    The index is per process. Processes sharing a directory, such as the
+    workers of VisualizationTool.visualize_many, each bound only the files
+    they know of; refresh() re-scans the directory and enforces the bound
+    over all of them.
+    """
+
+    def __init__(self, cache_dir="src/visualization/output", max_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # filename -> size in bytes, least recently used first
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    def _load_index(self):
+        """Index cache files already on disk, oldest access first"""
+        files = []
+        for filename in os.listdir(self.cache_dir):
+            if not CACHE_FILE_PATTERN.match(filename):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, filename, stat.st_size))
+
+        for _, filename, size in sorted(files):
+            self._entries[filename] = size
+            self._total_bytes += size
+
+    def refresh(self):
+        """Re-scan the directory for files written by other processes and evict down to the bound"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            self._load_index()
+            self._evict()
+
+    @staticmethod
+    def key(data, visualization_type, title=None, options=None):
+        """
+        Hash the inputs of a render into a cache key
+
+        JSON strings are parsed first so that formatting differences in the
+        payload do not produce different keys.
+        """
+        if isinstance(data, str):
+            try:
+                data = json.loads(data)
+            except (json.JSONDecodeError, TypeError):
+                pass
+
+        canonical = json.dumps({
+            "data": data,
+            "type": visualization_type.lower(),
+            "title": title,
+            "options": options or {}
+        }, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def filename(self, key, visualization_type, fmt):
+        return f"{visualization_type.lower()}_{key[:24]}.{fmt}"
+
+    def path(self, key, visualization_type, fmt):
+        return os.path.join(self.cache_dir, self.filename(key, visualization_type, fmt))
+
+    def get(self, key, visualization_type, fmt):
+        """
+        Look up a rendered file
+
+        Another thread or process may still evict the file once this returns,
+        so callers treat a FileNotFoundError on the path as a miss.
+
+        Returns:
+            str or None: Path of the cached file, or None on a miss
+        """
+        filename = self.filename(key, visualization_type, fmt)
+        path = os.path.join(self.cache_dir, filename)
+        with self._lock:
+            if filename not in self._entries:
+                return None
+            try:
+                # Touch the file so the LRU order survives restarts
+                os.utime(path)
+            except FileNotFoundError:
+                self._total_bytes -= self._entries.pop(filename)
+                return None
+            self._entries.move_to_end(filename)
+        return path
+
+    def put(self, key, visualization_type, fmt, write):
+        """
+        Store a render in the cache
+
+        Args:
+            write (callable): Called with a temporary path to write the file to
+
+        Returns:
+            str: Path of the cached file
+        """
+        filename = self.filename(key, visualization_type, fmt)
+        path = os.path.join(self.cache_dir, filename)
+        # Batch workers are separate processes writing to the same directory
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            # Left behind only if the write failed; temporary files are never evicted
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        size = os.path.getsize(path)
+
+        with self._lock:
+            if filename in self._entries:
+                self._total_bytes -= self._entries.pop(filename)
+            self._entries[filename] = size
+            self._total_bytes += size
+            self._evict()
+
+        return path
+
+    def _evict(self):
+        """Remove least recently used files until the cache fits its size bound"""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            filename, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(os.path.join(self.cache_dir, filename))
+            except FileNotFoundError:
+                pass
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
@@ -0,0 +1,84 @@
+import contextvars
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .delivery import current_outbox
+
+logger = logging.getLogger(__name__)
+
+
+class RenderHandle:
+    """A queued render: its id, what it is, and the future of its payload"""
+
+    def __init__(self, render_id, label, future):
+        self.id = render_id
+        self.label = label
+        self.future = future
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """
+        Wait for the render to finish
+
+        Returns:
+            dict: Image payload (see delivery.image_payload)
+        """
+        return self.future.result(timeout=timeout)
+
+
+class RenderQueue:
+    """
+    Background worker queue for chart rendering
+
+    Renders are submitted from the chat thread and run on a small pool of
+    worker threads, so the agent can answer straight away. Each finished
+    image is published to the outbox of the chat turn that requested it.
+    """
+
+    def __init__(self, tool, max_workers=2):
+        """
+        Args:
+            tool (VisualizationTool): Tool whose render_image() does the work
+            max_workers (int): Number of render threads
+        """
+        self.tool = tool
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="render")
+
+    def submit(self, label, **request):
+        """
+        Queue a render for the current chat turn
+
+        Args:
+            label (str): Human-readable name of the visualization
+            **request: Keyword arguments for VisualizationTool.render_image()
+
+        Returns:
+            RenderHandle: Handle whose result is the image payload
+        """
+        outbox = current_outbox()
+        render_id = uuid.uuid4().hex[:8]
+        # The render's spans stay in the trace of the turn that queued it
+        context = contextvars.copy_context()
+        future = self._executor.submit(context.run, self._render, render_id, outbox, request)
+        if outbox is not None:
+            outbox.track(future)
+        return RenderHandle(render_id, label, future)
+
+    def _render(self, render_id, outbox, request):
+        try:
+            payload = self.tool.render_image(**request)
+        except Exception as e:
+            logger.error(f"Render {render_id} failed: {str(e)}")
+            raise
+
+        payload["render_id"] = render_id
+        if outbox is not None:
+            outbox.publish(payload)
+        return payload
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -1,33 +1,168 @@
 import os
 import json
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from langchain.tools import Tool
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from concurrent.futures import ProcessPoolExecutor
+from llama_index.core.tools import FunctionTool
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
 import numpy as np
 import io
-import base64
+import shutil
+
+from ..formation_layout import get_layout, role_color
+from ..tracing import span
+from .pitch_template import (draw_pitch, get_pitch_template, PLAYER_RADIUS, PITCH_LENGTH,
+                             PITCH_WIDTH)
+from .render_cache import RenderCache
+from .delivery import image_payload, is_collecting, publish_image
+from .render_queue import RenderQueue
+from . import plotly_backend
+from .plotly_backend import PLOTLY_FORMATS
+from .match_events import (draw_event_timeline, draw_momentum, draw_shot_map, event_arrays,
+                           draw_season_timeline, draw_season_momentum, draw_season_shots,
+                           match_length)
+
+# Render settings for the two ways a chart is consumed: small previews in the
+# chat window and full-resolution exports
+RENDER_PRESETS = {
+    "preview": {"format": "webp", "dpi": 100},
+    "export": {"format": "png", "dpi": 300}
+}
+
+BACKENDS = ("matplotlib", "plotly")
+
+DEFAULT_FORMATION = "4-4-2"
+
+# Formats that can be written from an already rasterized PIL image
+RASTER_FORMATS = {"png": "PNG", "webp": "WEBP", "jpg": "JPEG", "jpeg": "JPEG"}
+
+VISUALIZATION_LABELS = {
+    "formation": "Formation",
+    "stats": "Statistics",
+    "match_events": "Match events",
+    "momentum": "Momentum",
+    "shot_map": "Shot map",
+    "season": "Season"
+}
+
+
+class VisualizationRequest(BaseModel):
+    """Arguments of the visualization tool, as shown to the agent"""
+    data: str = Field(
+        description="What to draw: a formation such as '4-3-3', or match data as a JSON "
+                    "string (team names, statistics and events)")
+    visualization_type: Literal["formation", "stats", "match_events", "momentum",
+                                "shot_map", "season"] = Field(
+        default="formation", description="Kind of chart to draw")
+    title: Optional[str] = Field(default=None, description="Optional chart title")
+    backend: Literal["matplotlib", "plotly"] = Field(
+        default="matplotlib",
+        description="'matplotlib' for an image, 'plotly' for an interactive chart "
+                    "(formation, stats and match_events only)")
+
+
+# One tool per worker process, created by _init_worker
+_worker_tool = None
+
+
+def _init_worker(output_dir, use_pitch_cache, pitch_style):
+    """Create the worker process's tool with the same settings as its parent"""
+    global _worker_tool
+    _worker_tool = VisualizationTool(use_pitch_cache=use_pitch_cache,
+                                     pitch_style=pitch_style, output_dir=output_dir)
+
+
+def _render_job(job):
+    """Render a single visualization job inside a worker process"""
+    global _worker_tool
+    if _worker_tool is None:
+        _worker_tool = VisualizationTool()
+    return _worker_tool.visualize(**job)
+
+
+def new_figure(figsize, nrows=1, ncols=1):
+    """
+    Create a figure bound to its own Agg canvas, without touching pyplot
+
+    Figures created this way are not registered in pyplot's global figure
+    manager, so they share no state between threads and are released as soon
+    as they are cleared and dereferenced.
+
+    Returns:
+        tuple: (Figure, axes)
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(nrows, ncols)
+    return fig, axes
 
 
 class VisualizationTool:
-    def __init__(self):
+    def __init__(self, use_pitch_cache=True, pitch_style="classic",
+                 output_dir="src/visualization/output", cache_max_bytes=256 * 1024 * 1024,
+                 backend="matplotlib"):
+        """
+        Args:
+            use_pitch_cache (bool): Draw formation diagrams on a cached pitch background
+            pitch_style (str): Colour scheme of the pitch (classic, dark, print)
+            output_dir (str): Directory holding the content-addressed render cache
+            cache_max_bytes (int): Size bound of the render cache
+            backend (str): Default backend, "matplotlib" for server-rendered images
+                or "plotly" for JSON figure specs rendered in the browser
+        """
         self.name = "visualization_tool"
         self.description = """
         Use this tool to generate visual representations of football data, formations, and strategies.
-        This is useful for creating formation diagrams, heat maps, and other visual aids.
+        This is useful for creating formation diagrams, match statistics charts, event timelines,
+        momentum curves and shot maps. The chart is shown to the coach directly, so there is no
+        need to describe it in words.
         """
 
-        # Create the tool
-        self.tool = Tool.from_function(
-            func=self.visualize,
+        # Create the tool with a typed argument schema
+        self.tool = FunctionTool.from_defaults(
+            fn=self.request_visualization,
             name=self.name,
-            description=self.description
+            description=self.description,
+            fn_schema=VisualizationRequest
         )
 
-        # Create directory for saving visualizations
-        os.makedirs("src/visualization/output", exist_ok=True)
-        self.output_dir = "src/visualization/output"
+        # Renders requested during a chat turn run off the chat thread
+        self.queue = RenderQueue(self)
+
+        # Rendered files are stored under a hash of their inputs, so identical
+        # requests are served from disk and different requests never collide
+        self.output_dir = output_dir
+        self.cache = RenderCache(output_dir, max_bytes=cache_max_bytes)
+
+        # Process pool for batch rendering, created on first use
+        self._pool = None
+        self._pool_workers = 0
+
+        # Draw formation diagrams on a cached, blitted pitch background
+        self.use_pitch_cache = use_pitch_cache
+        self.pitch_style = pitch_style
+        self.dpi = RENDER_PRESETS["export"]["dpi"]
+        self.format = RENDER_PRESETS["export"]["format"]
+
+        self._renderers = {
+            "formation": self._render_formation,
+            "stats": self._render_stats,
+            "match_events": self._render_match_events,
+            "momentum": self._render_momentum,
+            "shot_map": self._render_shot_map,
+            "season": self._render_season
+        }
+        self.backend = backend
+        self._plotly_renderers = {
+            "formation": self._plotly_formation,
+            "stats": self._plotly_stats,
+            "match_events": self._plotly_match_events
+        }
 
-    def visualize(self, data, visualization_type="formation", title=None, save_path=None):
+    def visualize(self, data, visualization_type="formation", title=None, save_path=None,
+                  dpi=None, fmt=None, preset=None, backend=None):
         """
         Generate visualizations based on the provided data
 
@@ -36,25 +171,274 @@ class VisualizationTool:
             visualization_type (str): Type of visualization (formation, stats, etc.)
             title (str, optional): Title for the visualization
             save_path (str, optional): Path to save the visualization
+            dpi (int, optional): Output resolution
+            fmt (str, optional): Output format (png, webp, svg, jpg, pdf). Defaults
+                to the extension of save_path, or png.
+            preset (str, optional): Named settings from RENDER_PRESETS, e.g. "preview"
+                for a small WebP in the chat or "export" for a 300 dpi PNG
+            backend (str, optional): "matplotlib" or "plotly". The plotly backend
+                writes a JSON figure spec (or an HTML page with fmt="html") for
+                formation, stats and match_events.
 
         Returns:
             str: Description of the visualization and/or path to the saved image
         """
         try:
-            if visualization_type.lower() == "formation":
-                return self._visualize_formation(data, title, save_path)
-            elif visualization_type.lower() == "stats":
-                return self._visualize_stats(data, title, save_path)
-            elif visualization_type.lower() == "match_events":
-                return self._visualize_match_events(data, title, save_path)
-            else:
+            backend = (backend or self.backend).lower()
+            if backend not in BACKENDS:
+                return f"Unsupported visualization backend: {backend}"
+            renderer = self._renderer(visualization_type, backend)
+            if renderer is None:
                 return f"Unsupported visualization type: {visualization_type}"
+            visualization_type = visualization_type.lower()
+            label = VISUALIZATION_LABELS[visualization_type]
+
+            # During a chat turn the image goes straight to the chat, in memory
+            if not save_path and is_collecting():
+                try:
+                    payload = self.render_image(data, visualization_type, title, dpi=dpi,
+                                                fmt=fmt, preset=preset or "preview", backend=backend)
+                except ValueError as e:
+                    return f"Error: {str(e)}"
+                publish_image(payload)
+                return f"{label} visualization created and shown in the chat"
+
+            options = self._render_options(dpi, fmt, preset, save_path, backend)
+            key = self._cache_key(data, visualization_type, title, options)
+
+            # A hit is served straight from disk without touching matplotlib
+            with span("render.file", "render", type=visualization_type, format=options["format"]) as current:
+                path = self.cache.get(key, visualization_type, options["format"])
+                size = None
+                if path is not None:
+                    try:
+                        size = os.path.getsize(path)
+                    except FileNotFoundError:
+                        # Evicted by another render since the lookup
+                        path = None
+                current.set(cache_hit=path is not None)
+                if path is None:
+                    try:
+                        rendered = renderer(data, title, options)
+                    except ValueError as e:
+                        return f"Error: {str(e)}"
+                    path = self._store(rendered, key, visualization_type, options)
+                    size = os.path.getsize(path)
+                current.set(bytes=size)
+
+            if save_path:
+                shutil.copyfile(path, save_path)
+                return f"{label} visualization saved to {save_path}"
+
+            # For prototype purposes, return the path to the saved image
+            # In a real implementation, this might return a web URL or encoded image
+            return f"{label} visualization created:\n{path}"
 
         except Exception as e:
             return f"Error generating visualization: {str(e)}"
 
-    def _visualize_formation(self, formation_data, title=None, save_path=None):
-        """Create a football formation diagram"""
+    def request_visualization(self, data, visualization_type="formation", title=None,
+                              backend="matplotlib"):
+        """
+        Entry point of the agent tool
+
+        During a chat turn the render is queued and a handle is returned at
+        once; the image is added to the chat as soon as it is ready. Outside a
+        chat turn the chart is rendered immediately, as with visualize().
+
+        Returns:
+            str: Confirmation for the agent, or a description of the saved chart
+        """
+        if not is_collecting():
+            return self.visualize(data, visualization_type, title, backend=backend)
+
+        if self._renderer(visualization_type, backend) is None:
+            return f"Unsupported visualization type: {visualization_type}"
+        label = VISUALIZATION_LABELS[visualization_type.lower()]
+
+        handle = self.queue.submit(label, data=data, visualization_type=visualization_type,
+                                   title=title, backend=backend, preset="preview")
+        return (f"{label} visualization queued (render {handle.id}). "
+                f"It will appear in the chat as soon as it is ready.")
+
+    def render_image(self, data, visualization_type="formation", title=None,
+                     dpi=None, fmt=None, preset="preview", backend=None):
+        """
+        Render a visualization into memory
+
+        The image is encoded into a BytesIO buffer and never written to disk.
+        If the same chart is already in the render cache, its bytes are reused.
+
+        Args:
+            data: Data to visualize (formations, statistics, etc.)
+            visualization_type (str): Type of visualization (formation, stats, etc.)
+            title (str, optional): Title for the visualization
+            dpi (int, optional): Output resolution
+            fmt (str, optional): Output format (png, webp, svg, jpg)
+            preset (str, optional): Named settings from RENDER_PRESETS
+            backend (str, optional): "matplotlib" or "plotly" (a JSON figure spec)
+
+        Returns:
+            dict: Image payload (see delivery.image_payload)
+
+        Raises:
+            ValueError: If the type is unsupported or the data cannot be parsed
+        """
+        backend = (backend or self.backend).lower()
+        renderer = self._renderer(visualization_type, backend)
+        if renderer is None:
+            raise ValueError(f"Unsupported visualization type: {visualization_type}")
+        visualization_type = visualization_type.lower()
+
+        options = self._render_options(dpi, fmt, preset, backend=backend)
+        key = self._cache_key(data, visualization_type, title, options)
+        label = VISUALIZATION_LABELS[visualization_type]
+
+        with span("render.image", "render", type=visualization_type, format=options["format"]) as current:
+            path = self.cache.get(key, visualization_type, options["format"])
+            image = None
+            if path is not None:
+                try:
+                    with open(path, 'rb') as f:
+                        image = f.read()
+                except FileNotFoundError:
+                    # Evicted by another render since the lookup
+                    pass
+            current.set(cache_hit=image is not None)
+            if image is None:
+                rendered = renderer(data, title, options)
+                buffer = io.BytesIO()
+                try:
+                    self._save(rendered, buffer, options)
+                finally:
+                    if isinstance(rendered, Figure):
+                        rendered.clear()
+                image = buffer.getvalue()
+            current.set(bytes=len(image))
+        return image_payload(image, options["format"], label, title)
+
+    def _cache_key(self, data, visualization_type, title, options):
+        return self.cache.key(data, visualization_type, title,
+                              dict(options, style=self.pitch_style))
+
+    def _renderer(self, visualization_type, backend):
+        """Return the render method for a type on a backend, or None"""
+        if backend == "plotly":
+            return self._plotly_renderers.get(visualization_type.lower())
+        return self._renderers.get(visualization_type.lower())
+
+    def _render_options(self, dpi=None, fmt=None, preset=None, save_path=None,
+                        backend="matplotlib"):
+        """
+        Resolve the output format and resolution of a request
+
+        Explicit arguments win over the preset, which wins over the extension of
+        save_path and the tool defaults.
+        """
+        if preset is not None and preset not in RENDER_PRESETS:
+            raise ValueError(f"Unknown render preset: {preset}")
+
+        if backend == "plotly":
+            # Specs are resolution independent; presets only apply to images
+            if fmt is None and save_path:
+                fmt = os.path.splitext(save_path)[1].lstrip(".") or None
+            fmt = (fmt or "json").lower()
+            if fmt not in PLOTLY_FORMATS:
+                raise ValueError(f"Unsupported format for the plotly backend: {fmt}")
+            return {"format": fmt, "backend": "plotly"}
+
+        settings = RENDER_PRESETS.get(preset, {})
+
+        if fmt is None:
+            fmt = settings.get("format")
+        if fmt is None and save_path:
+            fmt = os.path.splitext(save_path)[1].lstrip(".") or None
+        fmt = (fmt or self.format).lower()
+
+        return {"format": fmt, "dpi": int(dpi or settings.get("dpi") or self.dpi)}
+
+    def visualize_many(self, jobs, max_workers=None):
+        """
+        Render many visualizations in parallel across a process pool
+
+        Each worker process renders with its own figures, so there is no shared
+        matplotlib state between charts.
+
+        Args:
+            jobs (list): Keyword-argument dicts for visualize()
+            max_workers (int, optional): Number of worker processes; defaults
+                to the running pool's size, or the number of CPUs
+
+        Returns:
+            list: Results of visualize() in the same order as jobs
+        """
+        results = list(self._get_pool(max_workers).map(_render_job, jobs))
+        # Each worker bounds only the files it knows of
+        self.cache.refresh()
+        return results
+
+    def _get_pool(self, max_workers=None):
+        """
+        Return the batch rendering pool, starting it on first use
+
+        A running pool of a different size than max_workers is shut down and
+        replaced; without max_workers the running pool is reused.
+        """
+        if self._pool is not None and max_workers and max_workers != self._pool_workers:
+            self._pool.shutdown()
+            self._pool = None
+        if self._pool is None:
+            self._pool_workers = max_workers or os.cpu_count() or 1
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._pool_workers,
+                initializer=_init_worker,
+                initargs=(self.output_dir, self.use_pitch_cache, self.pitch_style)
+            )
+        return self._pool
+
+    def close(self):
+        """Shut down the batch rendering pool, if one was started, and the render queue"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self.queue.shutdown()
+
+    def _store(self, rendered, key, visualization_type, options):
+        """
+        Write a rendered figure into the render cache and release it
+
+        Returns:
+            str: Path of the cached file
+        """
+        try:
+            return self.cache.put(key, visualization_type, options["format"],
+                                  lambda path: self._save(rendered, path, options))
+        finally:
+            # Always release the figure, whether or not the write succeeded
+            if isinstance(rendered, Figure):
+                rendered.clear()
+
+    def _save(self, fig, path, options):
+        """Write a figure, a rendered image or a Plotly spec to a path or a binary file object"""
+        if isinstance(fig, dict):
+            spec = plotly_backend.dumps(fig) if options["format"] == "json" \
+                else plotly_backend.to_html(fig, fig["layout"]["title"]["text"])
+            if hasattr(path, "write"):
+                path.write(spec.encode("utf-8"))
+            else:
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(spec)
+            return
+
+        fmt, dpi = options["format"], options["dpi"]
+        if isinstance(fig, Figure):
+            fig.savefig(path, format=fmt, dpi=dpi, bbox_inches='tight')
+        else:
+            # The diagram is opaque, so dropping alpha makes encoding cheaper
+            fig.convert("RGB").save(path, format=RASTER_FORMATS[fmt], dpi=(dpi, dpi))
+
+    def _parse_formation(self, formation_data):
+        """Extract the formation string from formation data"""
         # Parse formation data if it's a string
         if isinstance(formation_data, str):
             try:
@@ -66,203 +450,87 @@ class VisualizationTool:
                 formation_data = {"formation": formation_data}
 
         # Extract formation info
-        formation = formation_data.get("formation", "4-4-2")
+        return formation_data.get("formation", DEFAULT_FORMATION)
+
+    def _render_formation(self, formation_data, title, options):
+        """Create a football formation diagram"""
+        formation = self._parse_formation(formation_data)
+
+        # Set the title
+        title = title or f"Formation: {formation}"
+        players, notes = self._formation_players(formation)
+
+        if self.use_pitch_cache and options["format"] in RASTER_FORMATS:
+            # Only the players are drawn; the pitch is restored from the template.
+            # Vector formats such as SVG always take the figure path below.
+            return get_pitch_template((10, 7), options["dpi"], self.pitch_style).render(
+                players, title, notes=notes)
 
         # Create a blank football pitch
-        fig, ax = plt.subplots(figsize=(10, 7))
+        fig, ax = new_figure(figsize=(10, 7))
 
         # Draw the pitch
         self._draw_pitch(ax)
 
         # Place players based on formation
-        self._place_players(ax, formation)
+        for x, y, label, color in players:
+            self._draw_player(ax, x, y, label, color)
+        for x, y, text, color in notes:
+            ax.text(x, y, text, ha='center', color=color)
 
-        # Set the title
-        if title:
-            plt.title(title, fontsize=16)
-        else:
-            plt.title(f"Formation: {formation}", fontsize=16)
+        ax.set_title(title, fontsize=16)
 
         # Remove axes
-        plt.axis('off')
+        ax.axis('off')
 
-        # Save or show the visualization
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            return f"Formation visualization saved to {save_path}"
-        else:
-            # Generate a default filename
-            filename = f"{formation.replace('-', '_')}_formation.png"
-            full_path = os.path.join(self.output_dir, filename)
-            plt.savefig(full_path, dpi=300, bbox_inches='tight')
-            plt.close()
-
-            # For prototype purposes, return the path to the saved image
-            # In a real implementation, this might return a web URL or encoded image
-            return f"Formation visualization created:\n{full_path}"
+        return fig
 
     def _draw_pitch(self, ax):
         """Draw a football pitch"""
-        # Pitch dimensions
-        pitch_length = 105
-        pitch_width = 68
-
-        # Draw pitch outline
-        rect = patches.Rectangle((0, 0), pitch_length, pitch_width, linewidth=2,
-                                 edgecolor='white', facecolor='#3A9648')
-        ax.add_patch(rect)
-
-        # Draw halfway line
-        plt.plot([pitch_length/2, pitch_length/2], [0, pitch_width], 'white')
-
-        # Draw center circle
-        center_circle = plt.Circle(
-            (pitch_length/2, pitch_width/2), 9.15, fill=False, color='white')
-        ax.add_patch(center_circle)
-
-        # Draw center spot
-        center_spot = plt.Circle(
-            (pitch_length/2, pitch_width/2), 0.8, color='white')
-        ax.add_patch(center_spot)
-
-        # Draw penalty areas
-        # Left penalty area
-        left_pen = patches.Rectangle((0, pitch_width/2 - 20.16), 16.5, 40.32,
-                                     linewidth=2, edgecolor='white', facecolor='none')
-        ax.add_patch(left_pen)
-
-        # Right penalty area
-        right_pen = patches.Rectangle((pitch_length - 16.5, pitch_width/2 - 20.16), 16.5, 40.32,
-                                      linewidth=2, edgecolor='white', facecolor='none')
-        ax.add_patch(right_pen)
-
-        # Draw goal areas
-        # Left goal area
-        left_goal = patches.Rectangle((0, pitch_width/2 - 9.16), 5.5, 18.32,
-                                      linewidth=2, edgecolor='white', facecolor='none')
-        ax.add_patch(left_goal)
-
-        # Right goal area
-        right_goal = patches.Rectangle((pitch_length - 5.5, pitch_width/2 - 9.16), 5.5, 18.32,
-                                       linewidth=2, edgecolor='white', facecolor='none')
-        ax.add_patch(right_goal)
-
-        # Draw penalty spots
-        left_pen_spot = plt.Circle((11, pitch_width/2), 0.8, color='white')
-        ax.add_patch(left_pen_spot)
-
-        right_pen_spot = plt.Circle(
-            (pitch_length - 11, pitch_width/2), 0.8, color='white')
-        ax.add_patch(right_pen_spot)
-
-        # Set axis limits
-        ax.set_xlim(-5, pitch_length + 5)
-        ax.set_ylim(-5, pitch_width + 5)
-
-    def _place_players(self, ax, formation):
-        """Place players on the pitch according to the formation"""
-        # Parse formation string (e.g., "4-4-2", "4-3-3", etc.)
-        try:
-            # Handle formations with up to 5 lines (e.g., 3-4-2-1)
-            formation_parts = formation.split("-")
-            # Ensure we have at least 4 parts (defense, mid, attack)
-            while len(formation_parts) < 4:
-                formation_parts.append("0")
-
-            # Extract the numbers for each line
-            defense_num = int(formation_parts[0])
-            mid_num = int(formation_parts[1])
-
-            # For formations like 4-2-3-1, combine the additional midfield layers
-            if len(formation_parts) > 3:
-                attacking_mid_num = int(formation_parts[2])
-                forwards_num = int(formation_parts[3])
-            else:
-                attacking_mid_num = 0
-                forwards_num = int(formation_parts[2])
-
-            # Pitch dimensions
-            pitch_length = 105
-            pitch_width = 68
-
-            # Team will attack from left to right
-
-            # Place goalkeeper
-            gk_x = 5
-            gk_y = pitch_width / 2
-            self._draw_player(ax, gk_x, gk_y, "GK", "red")
-
-            # Place defenders
-            if defense_num > 0:
-                def_y_positions = np.linspace(
-                    10, pitch_width - 10, defense_num)
-                def_x = 20
-                for i, y_pos in enumerate(def_y_positions):
-                    self._draw_player(ax, def_x, y_pos, f"D{i+1}", "blue")
-
-            # Place midfielders
-            if mid_num > 0:
-                mid_y_positions = np.linspace(10, pitch_width - 10, mid_num)
-                mid_x = 40
-                for i, y_pos in enumerate(mid_y_positions):
-                    self._draw_player(ax, mid_x, y_pos, f"M{i+1}", "green")
-
-            # Place attacking midfielders if present
-            if attacking_mid_num > 0:
-                att_mid_y_positions = np.linspace(
-                    15, pitch_width - 15, attacking_mid_num)
-                att_mid_x = 60
-                for i, y_pos in enumerate(att_mid_y_positions):
-                    self._draw_player(ax, att_mid_x, y_pos,
-                                      f"AM{i+1}", "purple")
-
-            # Place forwards
-            if forwards_num > 0:
-                fw_y_positions = np.linspace(
-                    20, pitch_width - 20, forwards_num)
-                fw_x = 80
-                for i, y_pos in enumerate(fw_y_positions):
-                    self._draw_player(ax, fw_x, y_pos, f"F{i+1}", "orange")
+        draw_pitch(ax, self.pitch_style)
 
-        except Exception as e:
+    def _formation_players(self, formation):
+        """
+        Work out where players stand in a formation
+
+        Returns:
+            tuple: (players, notes) where players are (x, y, label, color) tuples
+                and notes are (x, y, text, color) annotations such as parse errors
+        """
+        notes = []
+        try:
+            layout = get_layout(formation)
+        except ValueError as e:
             # If there's an error parsing, default to 4-4-2
-            ax.text(pitch_length/2, pitch_width + 5, f"Error parsing formation '{formation}': {str(e)}",
-                    ha='center', color='red')
-
-            # Default to a simple 4-4-2
-            # Defenders
-            def_y_positions = np.linspace(10, pitch_width - 10, 4)
-            def_x = 20
-            for i, y_pos in enumerate(def_y_positions):
-                self._draw_player(ax, def_x, y_pos, f"D{i+1}", "blue")
-
-            # Midfielders
-            mid_y_positions = np.linspace(10, pitch_width - 10, 4)
-            mid_x = 50
-            for i, y_pos in enumerate(mid_y_positions):
-                self._draw_player(ax, mid_x, y_pos, f"M{i+1}", "green")
-
-            # Forwards
-            fw_y_positions = np.linspace(pitch_width/3, 2*pitch_width/3, 2)
-            fw_x = 80
-            for i, y_pos in enumerate(fw_y_positions):
-                self._draw_player(ax, fw_x, y_pos, f"F{i+1}", "orange")
+            notes.append((PITCH_LENGTH / 2, PITCH_WIDTH + 5,
+                          f"Error parsing formation '{formation}': {str(e)}", 'red'))
+            layout = get_layout(DEFAULT_FORMATION)
+
+        # Team will attack from left to right
+        players = [(p.x, p.y, p.role, role_color(p.group)) for p in layout.players]
+        return players, notes
 
     def _draw_player(self, ax, x, y, label, color):
         """Draw a player on the pitch"""
-        player = plt.Circle((x, y), 2.5, color=color)
+        player = patches.Circle((x, y), PLAYER_RADIUS, color=color)
         ax.add_patch(player)
         ax.text(x, y, label, ha='center', va='center',
                 color='white', fontweight='bold')
 
-    def _visualize_stats(self, stats_data, title=None, save_path=None):
-        """Create a visualization of match statistics"""
+    def _parse_stats(self, stats_data):
+        """
+        Extract the statistics to compare from match data
+
+        Returns:
+            tuple: (home_team, away_team, stats) where stats maps each statistic
+                to its [home, away] values
+        """
         # Parse stats data if it's a string
         if isinstance(stats_data, str):
             try:
                 stats_data = json.loads(stats_data)
             except:
-                return "Error: Stats data must be a valid JSON string"
+                raise ValueError("Stats data must be a valid JSON string")
 
         # Extract team names and stats
         home_team = stats_data.get("home_team", {}).get("name", "Home Team")
@@ -289,10 +557,15 @@ class VisualizationTool:
                     "cards", {}).get("yellow", 0)
             ]
         }
+        return home_team, away_team, stats_to_compare
+
+    def _render_stats(self, stats_data, title, options):
+        """Create a visualization of match statistics"""
+        home_team, away_team, stats_to_compare = self._parse_stats(stats_data)
 
         # Create the figure
-        fig, axes = plt.subplots(
-            len(stats_to_compare), 1, figsize=(10, 3 * len(stats_to_compare)))
+        fig, axes = new_figure(
+            figsize=(10, 3 * len(stats_to_compare)), nrows=len(stats_to_compare))
 
         # Make axes iterable even if there's only one stat
         if len(stats_to_compare) == 1:
@@ -358,141 +631,192 @@ class VisualizationTool:
                 f"Match Statistics: {home_team} vs {away_team}", fontsize=16)
 
         # Adjust layout
-        plt.tight_layout()
-        plt.subplots_adjust(top=0.9)
+        fig.tight_layout()
+        fig.subplots_adjust(top=0.9)
 
-        # Save or show the visualization
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            return f"Statistics visualization saved to {save_path}"
-        else:
-            # Generate a default filename
-            filename = f"{home_team}_vs_{away_team}_stats.png"
-            # Remove spaces and special characters
-            filename = filename.replace(" ", "_").replace("/", "_")
-            full_path = os.path.join(self.output_dir, filename)
-            plt.savefig(full_path, dpi=300, bbox_inches='tight')
-            plt.close()
+        return fig
 
-            return f"Statistics visualization created:\n{full_path}"
-
-    def _visualize_match_events(self, events_data, title=None, save_path=None):
+    def _render_match_events(self, events_data, title, options):
         """Create a visualization of match events (goals, cards, etc.)"""
-        # Parse events data if it's a string
-        if isinstance(events_data, str):
-            try:
-                events_data = json.loads(events_data)
-            except:
-                return "Error: Events data must be a valid JSON string"
+        events_data = self._parse_match(events_data)
 
         # Extract match information
-        match_id = events_data.get("match_id", "Unknown Match")
         home_team = events_data.get("home_team", {}).get("name", "Home Team")
         away_team = events_data.get("away_team", {}).get("name", "Away Team")
-        current_minute = events_data.get("minute", 90)
-
-        # Extract events
-        events = events_data.get("events", [])
 
         # Create the figure
-        fig, ax = plt.subplots(figsize=(12, 6))
-
-        # Draw a timeline
-        ax.axhline(y=1, xmin=0, xmax=90, color='gray',
-                   linestyle='-', alpha=0.5)
-
-        # Mark current minute
-        ax.axvline(x=current_minute, color='red', linestyle='--',
-                   label=f"Current Minute: {current_minute}")
-
-        # Dictionary to hold event icons and colors
-        event_props = {
-            "goal": {"marker": "o", "color": "green", "size": 150, "label": "Goal"},
-            "yellow_card": {"marker": "s", "color": "yellow", "size": 100, "label": "Yellow Card"},
-            "red_card": {"marker": "s", "color": "red", "size": 100, "label": "Red Card"},
-            "substitution": {"marker": "^", "color": "blue", "size": 100, "label": "Substitution"},
-            "penalty": {"marker": "P", "color": "purple", "size": 150, "label": "Penalty"}
-        }
-
-        # Track which event types have been added to legend
-        legend_added = set()
-
-        # Plot each event
-        for event in events:
-            minute = event.get("minute", 0)
-            event_type = event.get("type", "").lower()
-            team = event.get("team", "")
-            player = event.get("player", "")
-
-            # Determine y-position based on team
-            y_pos = 1.1 if team == home_team else 0.9
-
-            # Get event properties
-            props = event_props.get(
-                event_type, {"marker": "o", "color": "gray", "size": 100, "label": "Other"})
-
-            # Add to legend only if not already added
-            label = props["label"] if event_type not in legend_added else None
-            if label:
-                legend_added.add(event_type)
-
-            # Plot the event
-            ax.scatter(minute, y_pos, marker=props["marker"], color=props["color"],
-                       s=props["size"], label=label, edgecolor='black', linewidth=1)
-
-            # Add text label for the event
-            if event_type == "goal":
-                text = f"{player} ⚽"
-            elif event_type == "yellow_card":
-                text = f"{player} 🟨"
-            elif event_type == "red_card":
-                text = f"{player} 🟥"
-            elif event_type == "substitution":
-                text = f"{player} ↺"
-            else:
-                text = player
-
-            rotation = 45 if team == home_team else -45
-            y_offset = 0.05 if team == home_team else -0.05
-
-            ax.text(minute, y_pos + y_offset, text, rotation=rotation,
-                    ha='center', va='center' if team == home_team else 'top',
-                    fontsize=9, fontweight='bold')
-
-        # Set axis limits
-        ax.set_xlim(0, 90)
-        ax.set_ylim(0.7, 1.3)
-
-        # Set y-axis labels for teams
-        ax.set_yticks([0.9, 1.1])
-        ax.set_yticklabels([away_team, home_team])
+        fig, ax = new_figure(figsize=(12, 6))
 
-        # Add x-axis ticks for minutes
-        ax.set_xticks([0, 15, 30, 45, 60, 75, 90])
-        ax.set_xticklabels(
-            ['0\'', '15\'', '30\'', '45\'', '60\'', '75\'', '90\''])
+        # One scatter per event type and one label collection per team
+        artists = draw_event_timeline(ax, events_data)
 
         # Add title
         if title:
-            plt.title(title, fontsize=16)
+            ax.set_title(title, fontsize=16)
         else:
-            plt.title(f"Match Events: {home_team} vs {away_team}", fontsize=16)
+            ax.set_title(f"Match Events: {home_team} vs {away_team}", fontsize=16)
 
         # Add legend
-        plt.legend(loc='upper center', bbox_to_anchor=(
-            0.5, -0.05), ncol=len(legend_added) + 1)
+        n_types = len(artists) - 2
+        ax.legend(loc='upper center', bbox_to_anchor=(
+            0.5, -0.05), ncol=n_types + 1)
+
+        return fig
+
+    def _render_momentum(self, match_data, title, options):
+        """Create a momentum curve for a single match"""
+        match_data = self._parse_match(match_data)
+        home_team = match_data.get("home_team", {}).get("name", "Home Team")
+        away_team = match_data.get("away_team", {}).get("name", "Away Team")
+
+        fig, ax = new_figure(figsize=(12, 4))
+        draw_momentum(ax, match_data)
+        ax.set_title(title or f"Momentum: {home_team} vs {away_team}", fontsize=16)
+        return fig
+
+    def _render_shot_map(self, match_data, title, options):
+        """Create a shot map for a single match, home attacking to the right"""
+        match_data = self._parse_match(match_data)
+        home_team = match_data.get("home_team", {}).get("name", "Home Team")
+        away_team = match_data.get("away_team", {}).get("name", "Away Team")
+
+        fig, ax = new_figure(figsize=(10, 7))
+        draw_shot_map(ax, event_arrays([match_data]), style=self.pitch_style)
+        ax.set_title(title or f"Shots: {home_team} vs {away_team}", fontsize=16)
+        return fig
+
+    def _render_season(self, season_data, title, options):
+        """
+        Create a chart covering many matches at once
 
-        # Save or show the visualization
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            return f"Match events visualization saved to {save_path}"
+        The data holds a "matches" list and a "view": "timeline" (every event of
+        every match, one row per match), "momentum" (a heat map of momentum, one
+        row per match) or "shots" (all shots on one pitch, optionally for a
+        single "team").
+        """
+        if isinstance(season_data, str):
+            try:
+                season_data = json.loads(season_data)
+            except json.JSONDecodeError:
+                raise ValueError("Season data must be a valid JSON string")
+        if isinstance(season_data, list):
+            season_data = {"matches": season_data}
+
+        matches = season_data.get("matches", [])
+        if not matches:
+            raise ValueError("Season data must contain a list of matches")
+        view = season_data.get("view", "timeline")
+        team = season_data.get("team")
+
+        if view == "shots":
+            fig, ax = new_figure(figsize=(10, 7))
+            draw_season_shots(ax, matches, team=team, style=self.pitch_style)
+        elif view in ("timeline", "momentum"):
+            fig, ax = new_figure(figsize=(12, max(4, 0.35 * len(matches) + 2)))
+            if view == "timeline":
+                draw_season_timeline(ax, matches)
+            else:
+                draw_season_momentum(ax, matches)
         else:
-            # Generate a default filename
-            filename = f"{home_team}_vs_{away_team}_events.png"
-            # Remove spaces and special characters
-            filename = filename.replace(" ", "_").replace("/", "_")
-            full_path = os.path.join(self.output_dir, filename)
-            plt.savefig(full_path, dpi=300, bbox_inches='tight')
-            plt.close()
-
-            return f"Match events visualization created:\n{full_path}"
+            raise ValueError(f"Unsupported season view: {view}")
+
+        default_title = f"Season {view}" + (f": {team}" if team else f" ({len(matches)} matches)")
+        ax.set_title(title or default_title, fontsize=16)
+        return fig
+
+    def _parse_match(self, match_data):
+        """Parse match data given as a JSON string"""
+        if isinstance(match_data, str):
+            try:
+                match_data = json.loads(match_data)
+            except:
+                raise ValueError("Events data must be a valid JSON string")
+        return match_data
+
+    def _plotly_formation(self, formation_data, title, options):
+        """Create a formation diagram as a Plotly spec"""
+        formation = self._parse_formation(formation_data)
+        players, notes = self._formation_players(formation)
+        return plotly_backend.formation_spec(players, notes, title or f"Formation: {formation}",
+                                             self.pitch_style)
+
+    def _plotly_stats(self, stats_data, title, options):
+        """Create a comparison of match statistics as a Plotly spec"""
+        home_team, away_team, stats = self._parse_stats(stats_data)
+        return plotly_backend.stats_spec(home_team, away_team, stats,
+                                         title or f"Match Statistics: {home_team} vs {away_team}")
+
+    def _plotly_match_events(self, events_data, title, options):
+        """Create a match event timeline as a Plotly spec"""
+        match = self._parse_match(events_data)
+        home_team = match.get("home_team", {}).get("name", "Home Team")
+        away_team = match.get("away_team", {}).get("name", "Away Team")
+        return plotly_backend.match_events_spec(
+            match, title or f"Match Events: {home_team} vs {away_team}")
+
+    def animate_match(self, data, save_path=None, fmt=None, fps=8, step=1, dpi=80,
+                      max_workers=None):
+        """
+        Render an animated replay of a match
+
+        Frames are rendered in chunks across the process pool, each worker
+        reusing one figure and updating only the data of its artists.
+
+        Args:
+            data: Match data with events (dict or JSON string)
+            save_path (str, optional): Path to save the replay
+            fmt (str, optional): "gif" or "mp4" (requires ffmpeg). Defaults to
+                the extension of save_path, or gif.
+            fps (int): Frames per second
+            step (int): Match minutes between frames
+            dpi (int): Frame resolution
+            max_workers (int, optional): Number of worker processes; defaults
+                to the running pool's size, or the number of CPUs
+
+        Returns:
+            str: Description of the replay and/or path to the saved file
+        """
+        from .match_replay import render_frames, encode_gif, encode_mp4, REPLAY_FORMATS
+
+        try:
+            try:
+                match = self._parse_match(data)
+            except ValueError as e:
+                return f"Error: {str(e)}"
+
+            if fmt is None and save_path:
+                fmt = os.path.splitext(save_path)[1].lstrip(".") or None
+            fmt = (fmt or "gif").lower()
+            if fmt not in REPLAY_FORMATS:
+                return f"Error: Unsupported replay format: {fmt}"
+            if fmt == "mp4" and shutil.which("ffmpeg") is None:
+                return "Error: MP4 replays require ffmpeg; use format 'gif' instead"
+
+            options = {"format": fmt, "dpi": dpi, "fps": fps, "step": step}
+            key = self.cache.key(match, "replay", None, options)
+            path = self.cache.get(key, "replay", fmt)
+
+            if path is None:
+                minutes = list(range(0, match_length(match) + 1, max(1, int(step))))
+                pool = self._get_pool(max_workers)
+                # The pool keeps the size it was started with
+                n_chunks = min(len(minutes), 2 * self._pool_workers)
+                chunks = [minutes[i::n_chunks] for i in range(n_chunks)]
+                # Strided chunks balance the load, since later frames hold more artists
+                rendered = list(pool.map(render_frames, [match] * n_chunks, chunks,
+                                         [dpi] * n_chunks, [fmt == "gif"] * n_chunks))
+                frames = [None] * len(minutes)
+                for i, chunk in enumerate(rendered):
+                    frames[i::n_chunks] = chunk
+
+                encode = encode_gif if fmt == "gif" else encode_mp4
+                path = self.cache.put(key, "replay", fmt,
+                                      lambda tmp_path: encode(frames, tmp_path, fps))
+
+            if save_path:
+                shutil.copyfile(path, save_path)
+                return f"Match replay saved to {save_path}"
+            return f"Match replay created:\n{path}"
+
+        except Exception as e:
+            return f"Error generating visualization: {str(e)}"
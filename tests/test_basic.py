@@ -4,9 +4,30 @@ Basic tests for the Coach Intelligence System
 
 from src.visualization import VisualizationTool
 from src.tools import RAGTool, SearchTool, PlanningTool
-from src.agents import CoordinatorAgent, DataRetrievalAgent
+from src.agents import CoordinatorAgent, DataRetrievalAgent, PlanningAgent
+from src.agents.base_agent import MODEL_TIERS, model_for_tier
+from src.agents.parallel_tools import ParallelToolRunner
+from src.agents.intent_router import IntentRouter, ROUTE_THRESHOLD
+from src.agents.summary_memory import SummarizingMemory, count_tokens
+from src.agents.prompt_assembly import PromptAssembler, token_report
+from src.agents.llm_scheduler import (BACKGROUND, INTERACTIVE, LIVE, LLMScheduler, ScheduledLLM,
+                                       is_transient, lane)
+from llama_index.core.llms import MockLLM
+from src.agents.llm_providers import LocalLLM, TraceRecorder, create_llm, load_trace, parse_latency
+from llama_index.core.llms import ChatMessage, MessageRole
+from src.tools.match_data_fetcher import MatchDataFetcher
+from src.utils import ConversationManager
+from src.tracing import Tracer, annotate, load_spans, set_tracer, span, summarize, traced_tools
+from llama_index.core.tools import FunctionTool
+from src.tools.tactics_recommender import FEATURES
+from src.tools.planning_knowledge import KNOWLEDGE, KNOWLEDGE_VERSION, PlanningKnowledge
+import numpy as np
+import json
 import os
 import sys
+import tempfile
+import threading
+import time
 import unittest
 
 # Add the parent directory to the path so we can import the src package
@@ -93,6 +114,709 @@ class TestPlanningTool(unittest.TestCase):
         )
         self.assertIn("4-3-3", result)
 
+    def test_ranked_recommendations(self):
+        """Test that recommendations come with a confidence and alternatives"""
+        result = self.planning_tool.generate_strategy(
+            strategy_type="set_piece",
+            team_situation="Attacking corner with tall players"
+        )
+        self.assertIn("Corner Kick - Far Post (", result)
+        self.assertIn("Alternatives:", result)
+
+
+class TestPlanningKnowledge(unittest.TestCase):
+    """Test the compiled planning knowledge"""
+
+    def test_shared_and_read_only(self):
+        """Test that every PlanningTool shares one read-only knowledge base"""
+        first, second = PlanningTool(), PlanningTool()
+        self.assertIs(first.formations, second.formations)
+        self.assertIs(first.formations, KNOWLEDGE.formations)
+        with self.assertRaises(TypeError):
+            first.formations["4-3-3"]["description"] = "changed"
+
+    def test_prerendered_text(self):
+        """Test that general recommendations come from the compiled text"""
+        result = PlanningTool().generate_strategy(strategy_type="tactics")
+        self.assertEqual(result, KNOWLEDGE.general("tactics"))
+        self.assertIn("Shape: GK |", KNOWLEDGE.block("formations", "4-3-3"))
+
+    def test_lookup(self):
+        """Test attribute lookups through the inverted index"""
+        self.assertEqual(KNOWLEDGE.find("formations", "suitable_for", "need goals")[0], "4-3-3")
+        self.assertEqual(KNOWLEDGE.lookup("suitable_for: need goals")["formations"][0], "4-3-3")
+        with self.assertRaises(ValueError):
+            KNOWLEDGE.lookup("need goals")
+
+    def test_version_check(self):
+        """Test that an unsupported knowledge file is rejected"""
+        with self.assertRaises(ValueError):
+            PlanningKnowledge({"version": KNOWLEDGE_VERSION + 1})
+
+    def test_feature_vectors(self):
+        """Test that every entry is scored from the vector stored with it"""
+        from src.tools.tactics_recommender import TacticsRecommender
+        entry = {"description": "Five across midfield", "strengths": ["Midfield control"],
+                 "suitable_for": ["Possession-based teams"], "features": {"midfield": 1.0}}
+        knowledge = PlanningKnowledge({"version": KNOWLEDGE_VERSION, "formations": {"4-5-1": entry}})
+        recommender = TacticsRecommender(formations=knowledge.features("formations"))
+        self.assertEqual(recommender.catalogs["formation"].names, ("4-5-1",))
+        self.assertEqual(set(KNOWLEDGE.features("tactics")), set(KNOWLEDGE.tactics))
+
+        for features in (None, {"speed": 1.0}):
+            with self.assertRaises(ValueError):
+                PlanningKnowledge({"version": KNOWLEDGE_VERSION,
+                                   "formations": {"4-5-1": {**entry, "features": features}}})
+
+
+class TestParallelToolRunner(unittest.TestCase):
+    """Test running independent tool calls concurrently"""
+
+    def setUp(self):
+        def slow_upper(text: str) -> str:
+            """Upper-case text slowly"""
+            time.sleep(0.2)
+            return text.upper()
+
+        def slow_double(number: int) -> str:
+            """Double a number slowly"""
+            time.sleep(0.2)
+            return str(number * 2)
+
+        self.runner = ParallelToolRunner([
+            FunctionTool.from_defaults(fn=slow_upper, name="upper"),
+            FunctionTool.from_defaults(fn=slow_double, name="double")
+        ])
+
+    def tearDown(self):
+        self.runner.close()
+
+    def test_concurrent_merged_output(self):
+        """Test that independent calls overlap and come back in order"""
+        start = time.perf_counter()
+        result = self.runner.run(json.dumps([
+            {"tool": "upper", "input": {"text": "press"}},
+            {"tool": "double", "input": {"number": 21}}
+        ]))
+        self.assertLess(time.perf_counter() - start, 0.35)
+        self.assertEqual(result, "[1] upper:\nPRESS\n\n[2] double:\n42")
+
+    def test_errors_stay_in_observation(self):
+        """Test that a failing call does not hide the others"""
+        result = self.runner.run([{"tool": "missing"}, {"tool": "double", "input": {"number": 1}}])
+        self.assertIn("unknown tool missing", result)
+        self.assertIn("[2] double:\n2", result)
+        self.assertIn("Error running tools", self.runner.run("not json"))
+
+
+class TestIntentRouter(unittest.TestCase):
+    """Test the fast path that answers single-tool requests without the LLM"""
+
+    def setUp(self):
+        self.router = IntentRouter([MatchDataFetcher().tool, PlanningTool().tool])
+
+    def test_routes_structured_requests(self):
+        """Test intent classification and slot extraction"""
+        decision = self.router.route("Show me match 123456 stats")
+        self.assertEqual(decision["tool"], "match_data_fetcher")
+        self.assertEqual(decision["arguments"], {"match_id": "123456"})
+
+        decision = self.router.route("Set piece plan for corners with tall players")
+        self.assertEqual(decision["arguments"]["strategy_type"], "set_piece")
+
+        decision = self.router.route("recent matches of manchester united")
+        self.assertEqual(decision["arguments"], {"team_name": "Manchester United"})
+
+    def test_falls_through(self):
+        """Test that multi-step, ambiguous and unknown requests go to the LLM"""
+        self.assertIsNone(self.router.route("Analyze our last match and suggest a formation"))
+        self.assertIsNone(self.router.route("Show match 123456 formation"))
+        self.assertIsNone(self.router.route("Hello coach"))
+        # The visualization tool is not available to this router
+        self.assertIsNone(self.router.route("Draw a 4-3-3"))
+
+    def test_live_and_contextual_requests_fall_through(self):
+        """Test that live match states, earlier turns and negations are left to the LLM"""
+        for message in ["We're 0-1 down in the 70th minute, which formation should we switch to?",
+                        "2-2 at half-time, what tactics to win it",
+                        "plan a training session for Tuesday focusing on what we did wrong in the last game",
+                        "same formation as that one",
+                        "run that training session again",
+                        "don't give me a formation, just tell me how to press"]:
+            self.assertIsNone(self.router.route(message), message)
+
+    def test_planning_needs_specific_slots(self):
+        """Test that a strategy keyword alone does not skip the LLM"""
+        self.assertLess(self.router.route("Which formation is best?")["confidence"], ROUTE_THRESHOLD)
+        self.assertIsNone(self.router.handle("Plan a training session"))
+        self.assertGreaterEqual(
+            self.router.route("Which formation should we use to protect a lead")["confidence"],
+            ROUTE_THRESHOLD)
+        decision = self.router.route("Plan a 60 minute session on pressing")
+        self.assertEqual(decision["arguments"]["strategy_type"], "training_session")
+        self.assertGreaterEqual(decision["confidence"], ROUTE_THRESHOLD)
+
+    def test_templated_reply(self):
+        """Test that a routed message is answered from the tool"""
+        reply = self.router.handle("Show me match 123456 stats")
+        self.assertTrue(reply.startswith("Here is the data for match 123456"))
+        self.assertIn("Manchester United", reply)
+        self.assertIsNone(self.router.handle("Why did we lose?"))
+        self.assertEqual(self.router.stats["routed"], 1)
+        self.assertEqual(self.router.stats["fallthrough"], 1)
+
+
+class TestModelTiers(unittest.TestCase):
+    """Test the model tiers of the agents"""
+
+    def test_tiers(self):
+        """Test tier defaults and environment overrides"""
+        self.assertEqual(PlanningAgent.model_tier, "large")
+        self.assertEqual(DataRetrievalAgent.model_tier, "fast")
+        self.assertEqual(model_for_tier("large"), os.getenv("COACH_MODEL_LARGE", MODEL_TIERS["large"]))
+        with self.assertRaises(ValueError):
+            model_for_tier("medium")
+
+
+class TestSummarizingMemory(unittest.TestCase):
+    """Test the token-budgeted chat memory"""
+
+    def setUp(self):
+        self.messages = []
+        for i in range(100):
+            self.messages.append(ChatMessage(role=MessageRole.USER, content=f"Question {i} about the 4-3-3."))
+            self.messages.append(ChatMessage(role=MessageRole.ASSISTANT, content=f"Answer {i}. " + "Detail " * 60))
+
+    def test_prompt_within_budget(self):
+        """Test that older turns are summarized and recent ones kept verbatim"""
+        memory = SummarizingMemory.from_defaults(token_limit=600, keep_turns=4)
+        memory.restore(self.messages)
+        memory.wait()
+
+        prompt = memory.get()
+        self.assertEqual(prompt[0].role, MessageRole.SYSTEM)
+        self.assertIn("Question 95", prompt[0].content)
+        self.assertEqual(prompt[-1].content, self.messages[-1].content)
+        self.assertLessEqual(sum(count_tokens(m.content) for m in prompt[1:]), 600)
+        self.assertEqual(len(memory.get_all()), 200)
+
+    def test_saved_summary_is_reused(self):
+        """Test that a saved summary restores without summarizing again"""
+        memory = SummarizingMemory.from_defaults(keep_turns=4)
+        memory.restore(self.messages)
+        memory.wait()
+        state = memory.state()
+
+        restored = SummarizingMemory.from_defaults(keep_turns=4)
+        restored.restore(self.messages, state)
+        self.assertEqual(restored.summary, memory.summary)
+        self.assertIsNone(restored._pending)
+
+        # A summary of other messages is not reused
+        other = SummarizingMemory.from_defaults(keep_turns=len(self.messages))
+        other.restore(self.messages[2:], state)
+        self.assertEqual(other.summary, "")
+
+    def test_set_keeps_summary_when_history_grows(self):
+        """Test that the agent replacing the history with a longer one keeps the summary"""
+        memory = SummarizingMemory.from_defaults(keep_turns=4)
+        memory.restore(self.messages)
+        memory.wait()
+        summarized = memory.state()["summarized"]
+        memory.set(memory.get_all() + [ChatMessage(role=MessageRole.USER, content="Next question")])
+        self.assertGreaterEqual(memory.state()["summarized"], summarized)
+        memory.set(self.messages[:4])
+        self.assertEqual(memory.summary, "")
+
+
+class TestConversationManager(unittest.TestCase):
+    """Test conversation listing and saved memory"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = ConversationManager(storage_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_index_follows_saves_and_deletes(self):
+        """Test that listing reflects saves and deletes without rescanning"""
+        examples = len(self.manager.list_conversations())
+        conversation_id = self.manager.save_conversation(
+            [{"role": "user", "content": "Plan a pressing session"}], conversation_id="c1")
+        titles = {c["id"]: c["title"] for c in self.manager.list_conversations()}
+        self.assertEqual(titles["c1"], "Plan a pressing session")
+
+        self.manager.save_memory(conversation_id, {"summary": "", "summarized": 0, "digest": ""})
+        self.assertEqual(self.manager.load_memory(conversation_id)["summarized"], 0)
+        self.assertTrue(self.manager.delete_conversation(conversation_id))
+        self.assertEqual(len(self.manager.list_conversations()), examples)
+        self.assertIsNone(self.manager.load_memory(conversation_id))
+
+
+class TestPromptAssembly(unittest.TestCase):
+    """Test the static prompt prefix of the ReAct agents"""
+
+    def setUp(self):
+        self.tools = [MatchDataFetcher().tool, PlanningTool().tool, PlanningTool().tool]
+
+    def test_compact_prefix(self):
+        """Test that the prefix drops duplicates and is smaller than the stock header"""
+        assembler = PromptAssembler.from_system_prompt("You are the coordinator.")
+        prefix = assembler.static_prefix(self.tools)
+        self.assertEqual(prefix.count("> planning_tool:"), 1)
+        self.assertIn("You are the coordinator.", prefix)
+        self.assertIn("strategy_type = 'formation'", prefix)
+
+        report = token_report(self.tools, "You are the coordinator.")
+        self.assertEqual(report["unique_tools"], 2)
+        self.assertLess(report["after"], report["before"])
+
+    def test_prefix_rendered_once(self):
+        """Test that every step reuses the same prefix, followed by the conversation"""
+        assembler = PromptAssembler.from_system_prompt("You are the coordinator.")
+        history = [ChatMessage(role=MessageRole.USER, content="Which formation?")]
+        first = assembler.format(self.tools, history)
+        second = assembler.format(self.tools, history)
+        self.assertIs(first[0].content, second[0].content)
+        self.assertEqual(first[1:], history)
+
+
+class TestLLMScheduler(unittest.TestCase):
+    """Test rate limiting, priority lanes and retries of LLM requests"""
+
+    def test_live_requests_first(self):
+        """Test that waiting requests are admitted live first, background last"""
+        scheduler = LLMScheduler(requests_per_minute=6000, burst=10, max_concurrency=1)
+        release = threading.Event()
+        order = []
+
+        blocker = threading.Thread(target=scheduler.run, args=(release.wait,))
+        blocker.start()
+        while scheduler.metrics()["in_flight"] == 0:
+            time.sleep(0.001)
+
+        threads = []
+        for name in (BACKGROUND, INTERACTIVE, LIVE):
+            thread = threading.Thread(target=scheduler.run, args=(order.append, name), kwargs={"lane": name})
+            thread.start()
+            threads.append(thread)
+            while scheduler.metrics()["lanes"][name]["queued"] == 0:
+                time.sleep(0.001)
+
+        release.set()
+        for thread in [blocker] + threads:
+            thread.join(timeout=5)
+        self.assertEqual(order, [LIVE, INTERACTIVE, BACKGROUND])
+
+        metrics = scheduler.metrics()
+        self.assertEqual(metrics["requests"], 4)
+        self.assertEqual(metrics["in_flight"], 0)
+        self.assertEqual(metrics["lanes"][BACKGROUND]["max_queued"], 1)
+        self.assertGreater(metrics["lanes"][BACKGROUND]["max_wait_seconds"], 0)
+
+    def test_rate_limit(self):
+        """Test that requests beyond the burst wait for the bucket to refill"""
+        scheduler = LLMScheduler(requests_per_minute=1200, burst=2)
+        start = time.perf_counter()
+        for _ in range(4):
+            scheduler.run(lambda: None)
+        # Two requests over the burst at 20 per second
+        self.assertGreaterEqual(time.perf_counter() - start, 0.09)
+
+    def test_retry_transient(self):
+        """Test that quota errors are retried and other errors are not"""
+        scheduler = LLMScheduler(requests_per_minute=6000, burst=10, base_backoff=0.001)
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+            return "ok"
+
+        self.assertEqual(scheduler.run(flaky), "ok")
+        self.assertEqual(scheduler.metrics()["retries"], 2)
+
+        with self.assertRaises(ValueError):
+            scheduler.run(lambda: (_ for _ in ()).throw(ValueError("bad request")))
+        self.assertEqual(scheduler.metrics()["failures"], 1)
+        self.assertTrue(is_transient(TimeoutError()))
+        self.assertFalse(is_transient(ValueError("bad request")))
+
+    def test_scheduled_llm_lanes(self):
+        """Test that a wrapped LLM uses the current lane, or its default lane"""
+        scheduler = LLMScheduler(requests_per_minute=6000, burst=10)
+        llm = ScheduledLLM(MockLLM(), scheduler=scheduler)
+        llm.complete("hello")
+        with lane(LIVE):
+            llm.chat([ChatMessage(role=MessageRole.USER, content="half-time, what now?")])
+        llm.with_lane(BACKGROUND).complete("summarize")
+
+        lanes = scheduler.metrics()["lanes"]
+        self.assertEqual([lanes[name]["admitted"] for name in (LIVE, INTERACTIVE, BACKGROUND)], [1, 1, 1])
+
+    def test_streams_hold_their_slot(self):
+        """Test that sync and async streams count against the concurrency limit until they end"""
+        import asyncio
+        scheduler = LLMScheduler(requests_per_minute=6000, burst=10, max_concurrency=1)
+        llm = ScheduledLLM(MockLLM(), scheduler=scheduler)
+
+        stream = llm.stream_complete("hello world")
+        self.assertEqual(scheduler.metrics()["in_flight"], 1)
+        self.assertEqual("".join(r.delta for r in stream), "hello world")
+        self.assertEqual(scheduler.metrics()["in_flight"], 0)
+        llm.stream_complete("closed before reading").close()
+        self.assertEqual(scheduler.metrics()["in_flight"], 0)
+
+        async def consume():
+            stream = await llm.astream_chat([ChatMessage(role=MessageRole.USER, content="hello")])
+            in_flight = scheduler.metrics()["in_flight"]
+            return in_flight, [r.message.content async for r in stream]
+
+        in_flight, contents = asyncio.run(consume())
+        self.assertEqual(in_flight, 1)
+        self.assertIn("hello", contents[-1])
+        self.assertEqual(scheduler.metrics()["in_flight"], 0)
+        self.assertEqual(scheduler.metrics()["requests"], 3)
+
+
+class TestLLMProviders(unittest.TestCase):
+    """Test the local LLM stand-in and trace replay"""
+
+    def setUp(self):
+        self.tools = [MatchDataFetcher().tool, PlanningTool().tool]
+        self.header = PromptAssembler.from_system_prompt("You are the coordinator.")
+
+    def prompt(self, question, observation=None):
+        history = [ChatMessage(role=MessageRole.USER, content=question)]
+        if observation:
+            history += [ChatMessage(role=MessageRole.ASSISTANT, content="Thought: ..."),
+                        ChatMessage(role=MessageRole.USER, content=f"Observation: {observation}")]
+        return self.header.format(self.tools, history)
+
+    def test_scripted_tool_call(self):
+        """Test that the stand-in calls a matching tool, then answers with its output"""
+        llm = create_llm("models/test", provider="local")
+        self.assertIsInstance(llm, LocalLLM)
+        step = llm.chat(self.prompt("Which formation against a high press?")).message.content
+        self.assertIn("Action: planning_tool", step)
+        # Its arguments are optional, so none are filled in
+        self.assertTrue(step.endswith("Action Input: {}"))
+        answer = llm.chat(self.prompt("Which formation?", observation="Play 4-3-3")).message.content
+        self.assertTrue(answer.endswith("Answer: Play 4-3-3"))
+        self.assertEqual(llm.stats["calls"], 2)
+
+        with self.assertRaises(ValueError):
+            create_llm("models/test", provider="unknown")
+
+    def test_latency(self):
+        """Test the latency distributions"""
+        import random
+        rng = random.Random(0)
+        self.assertEqual(parse_latency("fixed:0.25")(rng), 0.25)
+        self.assertTrue(0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2)
+        self.assertGreater(parse_latency("lognormal:0.5,0.3")(rng), 0)
+        self.assertEqual(parse_latency(None)(rng), 0.0)
+        with self.assertRaises(ValueError):
+            parse_latency("gamma:1")
+
+        llm = LocalLLM(latency="fixed:0.02")
+        start = time.perf_counter()
+        llm.complete("Summarize")
+        self.assertGreaterEqual(time.perf_counter() - start, 0.02)
+        self.assertAlmostEqual(llm.stats["simulated_seconds"], 0.02)
+
+    def test_record_and_replay(self):
+        """Test that a recorded trace replays the same steps"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            recorder = TraceRecorder(llm=LocalLLM(), path=path)
+            first = recorder.chat(self.prompt("Which formation?")).message.content
+            second = recorder.chat(self.prompt("Which formation?", observation="Play 4-3-3")).message.content
+
+            replay = LocalLLM(turns=load_trace(path))
+            self.assertEqual(replay.chat(self.prompt("which  formation?")).message.content, first)
+            self.assertEqual(replay.chat(self.prompt("Which formation?", observation="x")).message.content,
+                             second)
+            # Questions not recorded replay one of the recorded turns
+            self.assertIn(replay.chat(self.prompt("Something else")).message.content, (first, second))
+
+    def test_record_async_stream(self):
+        """Test that async streams pass through the recorder and are recorded when they end"""
+        import asyncio
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            recorder = TraceRecorder(llm=LocalLLM(), path=path)
+
+            async def consume():
+                stream = await recorder.astream_chat(self.prompt("Which formation?"))
+                return [r.message.content async for r in stream]
+
+            contents = asyncio.run(consume())
+            self.assertIn("Action: planning_tool", contents[-1])
+            self.assertEqual(load_trace(path)[0]["steps"], [contents[-1]])
+
+
+class TestTracing(unittest.TestCase):
+    """Test the spans of a turn and their export"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "traces.jsonl")
+        self.tracer = Tracer(path=self.path)
+        self.previous = set_tracer(self.tracer)
+
+    def tearDown(self):
+        set_tracer(self.previous)
+        self.tracer.close()
+        self.tmp.cleanup()
+
+    def test_nested_spans(self):
+        """Test that child spans join the trace of the current span, also across threads"""
+        tools = traced_tools([FunctionTool.from_defaults(fn=lambda query: query.upper(), name="shout")])
+        runner = ParallelToolRunner(tools)
+        try:
+            with span("coordinator.turn", "turn") as turn:
+                annotate(routed=False)
+                with span("llm.chat", "llm", prompt_tokens=100):
+                    time.sleep(0.01)
+                runner.run(json.dumps([{"tool": "shout", "input": {"query": "press"}}] * 2))
+        finally:
+            runner.close()
+
+        spans = self.tracer.finished(turn.trace_id)
+        self.assertEqual(sorted(s["name"] for s in spans), ["coordinator.turn", "llm.chat", "tool.shout", "tool.shout"])
+        self.assertEqual(turn.attributes["routed"], False)
+        tool_span = next(s for s in spans if s["name"] == "tool.shout")
+        self.assertEqual(tool_span["attributes"]["output_chars"], 5)
+        # The turn's own time excludes the LLM call
+        breakdown = self.tracer.breakdown(turn.trace_id)
+        self.assertGreaterEqual(breakdown["llm"], 10)
+        self.assertLess(breakdown["turn"], turn.duration_ms - 10)
+
+    def test_export_and_summary(self):
+        """Test that exported spans read back, errors included, and summarize by component"""
+        for i in range(20):
+            with span("rag.retrieve", "rag", nodes=2, cache_hit=i % 2 == 0):
+                pass
+        with self.assertRaises(ValueError):
+            with span("search.providers", "search_api"):
+                raise ValueError("quota")
+
+        spans = load_spans(self.path)
+        self.assertEqual(len(spans), 21)
+        self.assertEqual(spans[0]["attributes"], {"nodes": 2, "cache_hit": True})
+        summary = summarize(spans)
+        self.assertEqual(summary["rag"]["count"], 20)
+        self.assertEqual(summary["search_api"]["errors"], 1)
+        self.assertLessEqual(summary["rag"]["p50_ms"], summary["rag"]["p95_ms"])
+        self.assertEqual(self.tracer.summary()["rag"]["count"], 20)
+
+
+class TestTacticsRecommender(unittest.TestCase):
+    """Test the feature-vector recommender behind the Planning Tool"""
+
+    def setUp(self):
+        from src.tools.tactics_recommender import TacticsRecommender
+        self.recommender = TacticsRecommender()
+
+    def test_live_score_drives_ranking(self):
+        """Test that a late lead favours defending and a deficit attacking"""
+        match = {"minute": 80, "home_team": {"name": "A", "score": 1},
+                 "away_team": {"name": "B", "score": 0}}
+        need = self.recommender.need_vector(context=match)
+        self.assertEqual(self.recommender.rank("formation", need)[0]["name"], "5-3-2")
+
+        need = self.recommender.need_vector(context=dict(match, team="B"))
+        self.assertEqual(self.recommender.rank("formation", need)[0]["name"], "4-3-3")
+
+    def test_rank_league(self):
+        """Test that every opponent gets a pick and confidences are probabilities"""
+        leaky = [{"result": "L 0-3", "possession": 40}] * 5
+        dominant = [{"result": "W 3-0", "possession": 68}] * 5
+        picks = self.recommender.rank_league("formation", {"Leaky": leaky, "Dominant": dominant})
+        self.assertEqual(set(picks), {"Leaky", "Dominant"})
+        self.assertIn(picks["Leaky"]["name"], ("4-3-3", "4-2-3-1"))
+        self.assertEqual(picks["Dominant"]["name"], "5-3-2")
+
+        _, confidences = self.recommender.scores("tactics", np.ones((3, len(FEATURES))))
+        np.testing.assert_allclose(confidences.sum(axis=1), 1.0)
+
+    def test_no_signal(self):
+        """Test that an uninformative situation yields no ranking"""
+        need = self.recommender.need_vector("hello there")
+        self.assertEqual(self.recommender.rank("formation", need), [])
+
+        self.assertEqual(self.recommender.rank_league("formation", {}), {})
+        unknown = [{"result": "postponed"}] * 3
+        picks = self.recommender.rank_league(
+            "formation", {"Unknown": unknown, "Dominant": [{"result": "W 3-0", "possession": 68}] * 5})
+        self.assertEqual(set(picks), {"Dominant"})
+
+
+class TestMatchSimulator(unittest.TestCase):
+    """Test Monte Carlo simulation of live matches"""
+
+    LIVE_MATCH = {"minute": 80, "home_team": {"name": "A", "score": 1, "shots_on_target": 4},
+                  "away_team": {"name": "B", "score": 0, "shots_on_target": 4}}
+
+    def setUp(self):
+        from src.tools.match_simulator import MatchSimulator
+        self.simulator = MatchSimulator(max_workers=1)
+
+    def test_probabilities(self):
+        """Test that outcomes are probabilities and favour the leading side"""
+        result = self.simulator.simulate(self.LIVE_MATCH, seed=0)
+        for option in result["scenarios"]:
+            self.assertAlmostEqual(option["win"] + option["draw"] + option["loss"], 1.0)
+        keep = result["scenarios"][0]
+        self.assertGreater(keep["win"], 0.6)
+        self.assertEqual(keep["likely_score"], (1, 0))
+
+        # The same match from the trailing side's view
+        away = self.simulator.simulate(self.LIVE_MATCH, team="B", seed=0)["scenarios"][0]
+        self.assertAlmostEqual(away["loss"], keep["win"], delta=0.02)
+
+    def test_scenarios_share_draws(self):
+        """Test that a more defensive shape concedes less with the same random draws"""
+        result = self.simulator.simulate(
+            self.LIVE_MATCH, scenarios=[{"name": "Keep"}, {"name": "5-3-2", "formation": "5-3-2"}],
+            seed=0)
+        keep, defend = result["scenarios"]
+        self.assertLess(defend["expected_goals_against"], keep["expected_goals_against"])
+        self.assertGreater(defend["win"], keep["win"])
+
+    def test_identical_scenarios(self):
+        """Test that identical scenarios give exactly the same results"""
+        result = self.simulator.simulate(
+            self.LIVE_MATCH, scenarios=[{"name": "Keep"}, {"name": "Keep again"}], seed=1)
+        first, second = result["scenarios"]
+        self.assertEqual({**first, "name": None}, {**second, "name": None})
+
+    def test_unknown_formation(self):
+        """Test that an unknown current shape is reported and not offered as a switch"""
+        state = {**self.LIVE_MATCH, "formation": "4-1-4-1"}
+        result = self.simulator.simulate(state, seed=0)
+        self.assertFalse(result["formation_known"])
+        names = [option["name"] for option in result["scenarios"]]
+        self.assertNotIn("Switch to 4-4-2", names)
+        self.assertIn("Switch to 4-3-3", names)
+
+    def test_planning_strategy(self):
+        """Test the simulation strategy type of the Planning Tool"""
+        import json
+        result = PlanningTool().generate_strategy(json.dumps(self.LIVE_MATCH), "simulation")
+        self.assertIn("Match Simulation: A vs B", result)
+        self.assertIn("Switch to 5-3-2: Win", result)
+
+
+class TestLineupOptimizer(unittest.TestCase):
+    """Test squad selection with the assignment solver"""
+
+    def setUp(self):
+        from src.data.synthetic import synthetic_squad
+        from src.tools.lineup_optimizer import LineupOptimizer
+        self.squad = synthetic_squad(30)
+        self.optimizer = LineupOptimizer()
+
+    def test_hungarian_is_optimal(self):
+        """Test the NumPy Hungarian solver against brute force"""
+        from itertools import permutations
+        from src.tools.lineup_optimizer import _hungarian
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            cost = rng.random((4, 6))
+            rows, cols = _hungarian(cost)
+            best = min(sum(cost[i, p[i]] for i in range(4)) for p in permutations(range(6), 4))
+            self.assertAlmostEqual(cost[rows, cols].sum(), best)
+            self.assertEqual(len(set(cols.tolist())), 4)
+
+    def test_lineups(self):
+        """Test that every formation gets eleven distinct, available starters"""
+        results = self.optimizer.optimize(self.squad, ["4-4-2", "4-3-3", "3-4-2-1"])
+        self.assertEqual([r["total"] for r in results],
+                         sorted((r["total"] for r in results), reverse=True))
+        suspended = {p["name"] for p in self.squad if p["suspended"]}
+        for result in results:
+            names = [slot["name"] for slot in result["lineup"]]
+            self.assertEqual(len(set(names)), 11)
+            self.assertFalse(suspended & set(names + result["bench"]))
+            self.assertEqual(result["lineup"][0]["role"], "GK")
+
+        with self.assertRaises(ValueError):
+            self.optimizer.optimize(self.squad[:10], ["4-4-2"])
+
+    def test_planning_strategy(self):
+        """Test the lineup strategy type of the Planning Tool"""
+        import json
+        result = PlanningTool().generate_strategy(
+            json.dumps({"squad": self.squad, "formation": "4-2-3-1"}), "lineup")
+        self.assertIn("Starting XI (4-2-3-1):", result)
+        self.assertIn("Formation comparison:", result)
+
+
+class TestTrainingPlanner(unittest.TestCase):
+    """Test constraint-based training session planning"""
+
+    def setUp(self):
+        from src.tools.training_planner import TrainingPlanner
+        self.planner = TrainingPlanner()
+
+    def test_session_constraints(self):
+        """Test that a session respects duration, load and equipment"""
+        plan = self.planner.plan_session(duration=75, focus=["finishing"], max_load=350,
+                                         equipment=["balls", "cones", "goals"])
+        self.assertLessEqual(plan["minutes"], 75)
+        self.assertGreaterEqual(plan["minutes"], 70)
+        self.assertLessEqual(plan["load"], 350)
+        self.assertEqual(plan["drills"][0]["phase"], "warm_up")
+        self.assertEqual(plan["drills"][-1]["phase"], "cool_down")
+        self.assertIn("finishing", plan["focus_minutes"])
+        self.assertNotIn("Finishing circuit", [d["name"] for d in plan["drills"]])
+
+    def test_week_for_several_squads(self):
+        """Test weekly load, shared equipment and the solution cache"""
+        request = {
+            "squads": [
+                {"name": "First team", "weekly_load": 800,
+                 "sessions": {day: {"focus": ["set_pieces"]} for day in ("Tue", "Thu")}},
+                {"name": "U23", "sessions": {"Tue": {"focus": ["set_pieces"]}}}
+            ],
+            "shared_equipment": {"mannequins": 1}
+        }
+        week = self.planner.plan_week(request)
+        first, u23 = week["squads"]
+        self.assertLessEqual(first["load"], 800)
+        self.assertEqual(len(first["sessions"]), 2)
+        # Only one squad may use the mannequins on Tuesday
+        self.assertIn("set_pieces", first["sessions"][0]["focus_minutes"])
+        self.assertNotIn("set_pieces", u23["sessions"][0]["focus_minutes"])
+
+        self.assertEqual(self.planner.plan_week(request), week)
+        self.assertEqual(len(self.planner._cache), 1)
+
+    def test_weekly_focus_shortfall(self):
+        """Test that unmet weekly focus minimums are reported per area"""
+        request = {"squads": [{"name": "First team", "weekly_load": 700,
+                               "weekly_focus": {"defending": 30, "pressing": 20},
+                               "sessions": {"Tue": {"focus": ["pressing"]}}}]}
+        squad = self.planner.plan_week(request)["squads"][0]
+        defending = squad["focus_minutes"].get("defending", 0)
+        self.assertEqual(squad["focus_shortfall"], {"defending": 30 - defending})
+        self.assertGreater(squad["focus_shortfall"]["defending"], 0)
+
+        result = PlanningTool().generate_strategy(strategy_type="training_session", context_json=json.dumps(request))
+        self.assertIn("Weekly focus targets not met for First team: defending", result)
+
+    def test_planning_strategy(self):
+        """Test the training_session strategy type of the Planning Tool"""
+        result = PlanningTool().generate_strategy(
+            strategy_type="training_session",
+            team_situation="60 minute session on pressing")
+        self.assertIn("Training Session Plan:", result)
+        self.assertIn("pressing", result)
+
 
 if __name__ == '__main__':
     unittest.main()
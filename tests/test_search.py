@@ -0,0 +1,206 @@
+"""
+Tests for the search layer of the Coach Intelligence System
+"""
+
+from src.tools import SearchTool
+from src.tools.search_cache import SearchCache
+from src.tools.knowledge_snapshot import KnowledgeSnapshot, DEFAULT_SEED_PATH
+from src.tools.search_providers import MockSearchProvider, SearchProvider, SerpAPIProvider
+import json
+import os
+import tempfile
+import time
+import unittest
+
+
+class CountingProvider(SearchProvider):
+    """Provider that records how often it was queried"""
+
+    def __init__(self, name, result, delay=0.0, timeout=1.0):
+        super().__init__(timeout=timeout)
+        self.name = name
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+
+    def search(self, query):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.result
+
+
+class TestSearchTool(unittest.TestCase):
+    """Test provider fan-out and result caching"""
+
+    def make_tool(self, providers, mode="first"):
+        tool = SearchTool(providers=providers, mode=mode, cache=SearchCache(":memory:"),
+                          use_snapshot=False)
+        self.addCleanup(tool.close)
+        return tool
+
+    def test_mock_provider(self):
+        """Test that the local stub provider answers keyword queries"""
+        tool = self.make_tool([MockSearchProvider()])
+        result = tool.search_web("Best formation for a cup final")
+        self.assertIn("4-4-2", result)
+
+    def test_fastest_provider_wins(self):
+        """Test that latency is bounded by the fastest healthy provider"""
+        slow = CountingProvider("slow", "slow answer", delay=0.5)
+        fast = CountingProvider("fast", "fast answer")
+        tool = self.make_tool([slow, fast])
+
+        start = time.monotonic()
+        result = tool.search_web("league table")
+        self.assertEqual(result, "fast answer")
+        self.assertLess(time.monotonic() - start, 0.4)
+
+    def test_provider_timeout(self):
+        """Test that providers exceeding their timeout are ignored"""
+        hanging = CountingProvider("hanging", "late", delay=0.5, timeout=0.1)
+        tool = self.make_tool([hanging])
+        self.assertIn("No search results", tool.search_web("anything"))
+
+    def test_merge_mode(self):
+        """Test that merge mode combines answers from every provider"""
+        tool = self.make_tool([CountingProvider("a", "first"),
+                               CountingProvider("b", "second")], mode="merge")
+        result = tool.search_web("transfer news")
+        self.assertIn("first", result)
+        self.assertIn("second", result)
+
+    def test_cache_normalized_query(self):
+        """Test that repeated queries are served from the cache"""
+        provider = CountingProvider("counting", "cached answer")
+        tool = self.make_tool([provider])
+
+        tool.search_web("Arsenal  fixtures?")
+        result = tool.search_web("arsenal fixtures")
+        self.assertEqual(result, "cached answer")
+        self.assertEqual(provider.calls, 1)
+
+    def test_cache_per_provider_set(self):
+        """Test that results cached for one provider set are not served to another"""
+        cache = SearchCache(":memory:")
+        mock = SearchTool(providers=[CountingProvider("mock", "mock answer")], cache=cache,
+                          use_snapshot=False)
+        self.addCleanup(mock.close)
+        mock.search_web("arsenal fixtures")
+
+        live = CountingProvider("live", "live answer")
+        tool = SearchTool(providers=[live], cache=cache, use_snapshot=False)
+        self.addCleanup(tool.close)
+        self.assertEqual(tool.search_web("arsenal fixtures"), "live answer")
+        self.assertEqual(live.calls, 1)
+
+
+class TestSerpAPIProvider(unittest.TestCase):
+    """Test turning SerpAPI responses into results"""
+
+    def test_format_response(self):
+        """Test that the most direct answer in a response is returned"""
+        provider = SerpAPIProvider("test-key")
+        format_response = provider.format_response
+        self.assertEqual(format_response({"answer_box": {"answer": "Old Trafford"},
+                                          "organic_results": [{"snippet": "other"}]}),
+                         "Old Trafford")
+        self.assertIn("Arsenal", format_response({"sports_results": {"title": "Arsenal"}}))
+        self.assertEqual(format_response({"organic_results": [{"snippet": "a"}, {"link": "x"},
+                                                              {"snippet": "b"}]}), "a\nb")
+        self.assertFalse(provider.is_good_result(format_response({})))
+        with self.assertRaises(ValueError):
+            format_response({"error": "Invalid API key"})
+
+
+class TestKnowledgeSnapshot(unittest.TestCase):
+    """Test the offline knowledge snapshot backend"""
+
+    def setUp(self):
+        """Set up an in-memory snapshot loaded with the bundled seed data"""
+        self.snapshot = KnowledgeSnapshot(":memory:", seed_path=DEFAULT_SEED_PATH)
+
+    def test_seed_import(self):
+        """Test that the bundled seed dump is imported"""
+        self.assertGreater(self.snapshot.count(), 0)
+
+    def test_lookup_by_alias(self):
+        """Test that entities resolve by name or alias"""
+        hits = self.snapshot.lookup("Who plays for Man Utd?")
+        self.assertEqual(hits[0]["name"], "Manchester United")
+
+    def test_recent_queries_not_answered(self):
+        """Test that queries about recent events are left to the network"""
+        for query in ("Arsenal latest match result",
+                      "recent news about Manchester United injuries",
+                      "Who won yesterday between Chelsea and Spurs",
+                      "Liverpool stats this season"):
+            self.assertEqual(self.snapshot.lookup(query), [], query)
+
+    def test_common_word_alias_ignored(self):
+        """Test that single-word aliases that are common words do not match"""
+        self.snapshot.import_records(
+            [{"name": "Real Sociedad", "aliases": ["Real", "La Real"]}], kind="team")
+        self.assertEqual(self.snapshot.lookup("real time xG stats"), [])
+        self.assertEqual(self.snapshot.lookup("La Real stadium")[0]["name"], "Real Sociedad")
+
+    def test_seed_reimported_on_version_change(self):
+        """Test that an edited seed with a new version replaces the imported entries"""
+        with tempfile.TemporaryDirectory() as tmp:
+            seed = os.path.join(tmp, "seed.json")
+            db = os.path.join(tmp, "snapshot.db")
+            for version, stadium in ((1, "Goldstone Ground"), (2, "Amex Stadium")):
+                with open(seed, "w") as f:
+                    json.dump({"version": version,
+                               "teams": [{"name": "Brighton", "stadium": stadium}]}, f)
+                snapshot = KnowledgeSnapshot(db, seed_path=seed)
+                self.assertIn(stadium, snapshot.lookup("Brighton stadium")[0]["content"])
+                snapshot._conn.close()
+
+    def test_seed_drops_entries(self):
+        """Test that entries removed from the seed are removed from the snapshot"""
+        with tempfile.TemporaryDirectory() as tmp:
+            seed = os.path.join(tmp, "seed.json")
+            db = os.path.join(tmp, "snapshot.db")
+            teams = [{"name": "Brighton", "aliases": ["Seagulls"], "stadium": "Amex"},
+                     {"name": "Luton Town", "aliases": ["Hatters"], "stadium": "Kenilworth Road"}]
+            for version in (1, 2):
+                with open(seed, "w") as f:
+                    json.dump({"version": version, "teams": teams}, f)
+                snapshot = KnowledgeSnapshot(db, seed_path=seed)
+                if version == 1:
+                    snapshot.import_records([{"name": "Wrexham", "stadium": "Racecourse"}], kind="team")
+                    snapshot._conn.close()
+                    teams = teams[:1]
+
+            self.assertEqual(snapshot.lookup("Hatters stadium"), [])
+            self.assertEqual(snapshot.search("Kenilworth"), [])
+            self.assertEqual(snapshot.lookup("Seagulls stadium")[0]["name"], "Brighton")
+            # Entries imported from elsewhere are kept
+            self.assertEqual(snapshot.lookup("Wrexham stadium")[0]["name"], "Wrexham")
+            snapshot._conn.close()
+
+    def test_bulk_import_records(self):
+        """Test that imported records become searchable and can be updated"""
+        self.snapshot.import_records(
+            [{"name": "Brighton", "aliases": "Seagulls", "stadium": "Amex"}], kind="team")
+        self.snapshot.import_records(
+            [{"name": "Brighton", "aliases": "Seagulls", "stadium": "Amex Stadium"}], kind="team")
+        hits = self.snapshot.lookup("seagulls stadium")
+        self.assertEqual(len(hits), 1)
+        self.assertIn("Amex Stadium", hits[0]["content"])
+
+    def test_search_tool_prefers_snapshot(self):
+        """Test that factual lookups never reach the network providers"""
+        provider = CountingProvider("network", "network answer")
+        tool = SearchTool(providers=[provider], cache=SearchCache(":memory:"),
+                          snapshot=self.snapshot)
+        self.addCleanup(tool.close)
+        result = tool.search_web("Liverpool stadium capacity")
+        self.assertIn("Anfield", result)
+        self.assertEqual(provider.calls, 0)
+
+        self.assertEqual(tool.search_web("latest transfer rumours"), "network answer")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,428 @@
+"""
+Tests for the visualization engine of the Coach Intelligence System
+"""
+
+from src.visualization import VisualizationTool, collect_images, to_chat_message
+from src.visualization.render_cache import RenderCache
+from concurrent.futures import ThreadPoolExecutor
+import json
+import numpy as np
+import os
+import sys
+import tempfile
+import unittest
+
+MATCH_DATA = {
+    "match_id": "123456",
+    "minute": 65,
+    "home_team": {"name": "Manchester United", "score": 2, "possession": 48,
+                  "shots_on_target": 5, "corners": 4, "cards": {"yellow": 2, "red": 0}},
+    "away_team": {"name": "Liverpool", "score": 1, "possession": 52,
+                  "shots_on_target": 3, "corners": 6, "cards": {"yellow": 1, "red": 0}},
+    "events": [
+        {"minute": 12, "type": "goal", "team": "Manchester United", "player": "Bruno Fernandes"},
+        {"minute": 37, "type": "goal", "team": "Liverpool", "player": "Mohamed Salah"}
+    ]
+}
+
+
+class TestVisualizationTool(unittest.TestCase):
+    """Test rendering through the object-oriented matplotlib path"""
+
+    def setUp(self):
+        """Set up a tool writing into a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tool = VisualizationTool(output_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tool.close()
+        self.tmp.cleanup()
+
+    def test_render_all_types(self):
+        """Test that every visualization type renders to disk"""
+        for vis_type, data in [("formation", "4-3-3"),
+                               ("stats", json.dumps(MATCH_DATA)),
+                               ("match_events", json.dumps(MATCH_DATA))]:
+            path = os.path.join(self.tmp.name, f"{vis_type}.png")
+            result = self.tool.visualize(data, visualization_type=vis_type, save_path=path)
+            self.assertIn("saved to", result)
+            self.assertTrue(os.path.exists(path))
+
+    def test_no_pyplot_state(self):
+        """Test that concurrent renders never create pyplot figures"""
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(
+                lambda f: self.tool.visualize(f),
+                ["4-4-2", "4-3-3", "3-5-2", "5-3-2", "4-2-3-1"] * 2))
+
+        self.assertTrue(all("created" in r for r in results))
+        pyplot = sys.modules.get("matplotlib.pyplot")
+        if pyplot is not None:
+            self.assertEqual(pyplot.get_fignums(), [])
+
+    def test_pitch_template_matches_vector_path(self):
+        """Test that the cached pitch produces the same diagram size as the vector path"""
+        from PIL import Image
+        cached = os.path.join(self.tmp.name, "cached.png")
+        vector = os.path.join(self.tmp.name, "vector.png")
+        self.tool.visualize("4-2-3-1", save_path=cached)
+        VisualizationTool(use_pitch_cache=False, output_dir=self.tmp.name).visualize(
+            "4-2-3-1", title="Vector", save_path=vector)
+
+        with Image.open(cached) as a, Image.open(vector) as b:
+            self.assertLessEqual(abs(a.size[0] - b.size[0]), 2)
+            self.assertLessEqual(abs(a.size[1] - b.size[1]), 2)
+
+    def test_pitch_template_cache_bounded(self):
+        """Test that per-request resolutions do not grow the template cache without bound"""
+        from src.visualization.pitch_template import MAX_TEMPLATES, _templates, get_pitch_template
+        first = get_pitch_template(figsize=(2, 1.5), dpi=10)
+        for dpi in range(11, 11 + MAX_TEMPLATES + 4):
+            get_pitch_template(figsize=(2, 1.5), dpi=dpi)
+        self.assertEqual(len(_templates.cache), MAX_TEMPLATES)
+        self.assertIsNot(get_pitch_template(figsize=(2, 1.5), dpi=10), first)
+
+    def test_visualize_many(self):
+        """Test rendering a batch of charts across a process pool"""
+        jobs = [{"data": formation, "save_path": os.path.join(self.tmp.name, f"{i}.png")}
+                for i, formation in enumerate(["4-4-2", "4-3-3", "3-5-2"])]
+        results = self.tool.visualize_many(jobs, max_workers=2)
+        self.assertEqual(len(results), 3)
+        for job in jobs:
+            self.assertTrue(os.path.exists(job["save_path"]))
+
+        # A different size replaces the running pool
+        self.tool.visualize_many(jobs[:1], max_workers=1)
+        self.assertEqual(self.tool._pool_workers, 1)
+        self.assertEqual(self.tool._pool._max_workers, 1)
+
+
+class TestAgentTool(unittest.TestCase):
+    """Test the visualization tool as the agent sees it"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tool = VisualizationTool(output_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tool.close()
+        self.tmp.cleanup()
+
+    def test_schema(self):
+        """Test that the tool exposes typed arguments"""
+        parameters = self.tool.tool.metadata.get_parameters_dict()
+        self.assertEqual(parameters["required"], ["data"])
+        self.assertIn("match_events", parameters["properties"]["visualization_type"]["enum"])
+
+    def test_queued_during_chat_turn(self):
+        """Test that the tool returns a handle at once and the image follows"""
+        with collect_images() as outbox:
+            result = self.tool.tool(data="4-3-3").content
+        self.assertIn("queued (render", result)
+        self.assertEqual(len(outbox.pending), 1)
+
+        images = outbox.wait(timeout=60)
+        self.assertEqual(len(images), 1)
+        self.assertIn(images[0]["render_id"], result)
+
+    def test_synchronous_outside_chat_turn(self):
+        """Test that the tool renders straight away when no chat turn is collecting"""
+        result = self.tool.tool(data="4-3-3", visualization_type="formation").content
+        self.assertTrue(result.startswith("Formation visualization created:"))
+
+
+class TestRenderCache(unittest.TestCase):
+    """Test the content-addressed render cache"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tool = VisualizationTool(output_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tool.close()
+        self.tmp.cleanup()
+
+    def test_hit_skips_rendering(self):
+        """Test that an identical request is served without rendering again"""
+        first = self.tool.visualize(json.dumps(MATCH_DATA), visualization_type="stats")
+
+        def fail(*args):
+            raise AssertionError("cache hit should not render")
+        self.tool._renderers["stats"] = fail
+
+        # Key order and whitespace in the JSON payload do not change the key
+        second = self.tool.visualize(json.dumps(MATCH_DATA, indent=2, sort_keys=True),
+                                     visualization_type="stats")
+        self.assertEqual(first, second)
+
+    def test_options_change_key(self):
+        """Test that different render options never share a file"""
+        paths = {self.tool.visualize("4-4-2", dpi=dpi, fmt=fmt).split("\n")[-1]
+                 for dpi, fmt in [(100, "png"), (300, "png"), (100, "webp")]}
+        self.assertEqual(len(paths), 3)
+
+    def test_preview_formats(self):
+        """Test WebP and SVG previews"""
+        webp = self.tool.visualize("4-3-3", preset="preview").split("\n")[-1]
+        svg = self.tool.visualize("4-3-3", fmt="svg").split("\n")[-1]
+        self.assertTrue(webp.endswith(".webp") and os.path.exists(webp))
+        with open(svg) as f:
+            self.assertIn("<svg", f.read())
+
+    def test_eviction(self):
+        """Test that the cache stays within its size bound"""
+        tool = VisualizationTool(output_dir=self.tmp.name, cache_max_bytes=1)
+        self.addCleanup(tool.close)
+        for formation in ["4-4-2", "4-3-3", "3-5-2"]:
+            path = tool.visualize(formation, preset="preview").split("\n")[-1]
+        self.assertEqual(os.listdir(self.tmp.name), [os.path.basename(path)])
+
+    def test_eviction_spares_other_files(self):
+        """Test that files the cache did not write are never indexed or evicted"""
+        for filename in ["notes.txt", "formation_report.png", "stats_0123.png.77.tmp"]:
+            with open(os.path.join(self.tmp.name, filename), "w") as f:
+                f.write("x" * 100)
+        tool = VisualizationTool(output_dir=self.tmp.name, cache_max_bytes=1)
+        self.addCleanup(tool.close)
+        self.assertEqual(tool.cache.total_bytes, 0)
+        for formation in ["4-4-2", "4-3-3"]:
+            path = tool.visualize(formation, preset="preview").split("\n")[-1]
+        self.assertEqual(sorted(os.listdir(self.tmp.name)),
+                         sorted([os.path.basename(path), "notes.txt", "formation_report.png",
+                                 "stats_0123.png.77.tmp"]))
+
+    def test_evicted_hit_renders_again(self):
+        """Test that a file evicted after the lookup is treated as a miss"""
+        path = self.tool.visualize("4-4-2", preset="preview").split("\n")[-1]
+        image = self.tool.render_image("4-4-2")
+        lookup = self.tool.cache.get
+
+        def evicting_get(*args):
+            found = lookup(*args)
+            if found:
+                os.remove(found)
+            return found
+        self.tool.cache.get = evicting_get
+        self.assertEqual(self.tool.render_image("4-4-2"), image)
+        self.assertEqual(self.tool.visualize("4-4-2", preset="preview").split("\n")[-1], path)
+        self.assertTrue(os.path.exists(path))
+
+    def test_failed_write_leaves_no_temp_file(self):
+        """Test that a render that fails to write leaves nothing behind"""
+        def fail(tmp_path):
+            with open(tmp_path, "w") as f:
+                f.write("partial")
+            raise OSError("disk full")
+        with self.assertRaises(OSError):
+            self.tool.cache.put("0" * 64, "stats", "png", fail)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_refresh_bounds_other_processes_files(self):
+        """Test that refresh() counts files written by other processes"""
+        def write(tmp_path):
+            with open(tmp_path, "w") as f:
+                f.write("x" * 100)
+        cache = RenderCache(self.tmp.name, max_bytes=150)
+        other = RenderCache(self.tmp.name, max_bytes=150)
+        cache.put("a" * 64, "stats", "png", write)
+        other.put("b" * 64, "stats", "png", write)
+        self.assertEqual(len(os.listdir(self.tmp.name)), 2)
+        cache.refresh()
+        self.assertEqual(len(os.listdir(self.tmp.name)), 1)
+        self.assertEqual(cache.total_bytes, 100)
+
+    def test_invalid_data(self):
+        """Test that invalid data is reported and not cached"""
+        result = self.tool.visualize("not json", visualization_type="stats")
+        self.assertEqual(result, "Error: Stats data must be a valid JSON string")
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+
+class TestInMemoryDelivery(unittest.TestCase):
+    """Test rendering into memory and handing images to the chat"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tool = VisualizationTool(output_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_render_image(self):
+        """Test that an in-memory render never touches the output directory"""
+        payload = self.tool.render_image("4-4-2")
+        self.assertEqual(payload["mime_type"], "image/webp")
+        self.assertTrue(payload["data"].startswith(b"RIFF"))
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_chat_turn_collects_images(self):
+        """Test that visualize() publishes images during a chat turn"""
+        with collect_images() as outbox:
+            result = self.tool.visualize(json.dumps(MATCH_DATA), visualization_type="stats")
+        self.assertEqual(result, "Statistics visualization created and shown in the chat")
+        self.assertEqual(len(outbox.images), 1)
+
+        message = to_chat_message(outbox.images[0])
+        self.assertEqual(message["role"], "assistant")
+        self.assertIn("](data:image/webp;base64,", message["content"])
+
+        # Outside a chat turn the tool falls back to files
+        self.assertIn("created:\n", self.tool.visualize("4-4-2"))
+
+
+class TestMatchEvents(unittest.TestCase):
+    """Test match event timelines, season charts and replays"""
+
+    def setUp(self):
+        from src.data.synthetic import synthetic_season
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tool = VisualizationTool(output_dir=self.tmp.name)
+        self.season = synthetic_season(n_matches=6, events_per_match=20)
+
+    def tearDown(self):
+        self.tool.close()
+        self.tmp.cleanup()
+
+    def test_match_length(self):
+        """Test that extra time widens the timeline but stoppage time does not"""
+        from src.visualization.match_events import match_length
+        self.assertEqual(match_length(MATCH_DATA), 90)
+        self.assertEqual(match_length({"events": [{"minute": "90+4"}]}), 94)
+        self.assertEqual(match_length({"events": [{"minute": 105}]}), 120)
+
+    def test_momentum_matrix(self):
+        """Test that season momentum matches the per-match computation"""
+        from src.visualization.match_events import event_arrays, momentum_matrix
+        season = momentum_matrix(event_arrays(self.season), len(self.season), 90)
+        for i, match in enumerate(self.season):
+            single = momentum_matrix(event_arrays([match]), 1, 90)[0]
+            self.assertTrue(np.allclose(season[i], single))
+
+    def test_single_match_types(self):
+        """Test the timeline, momentum and shot map of one match"""
+        for vis_type in ["match_events", "momentum", "shot_map"]:
+            result = self.tool.visualize(self.season[0], visualization_type=vis_type,
+                                         preset="preview")
+            self.assertIn("visualization created", result)
+
+    def test_season_views(self):
+        """Test every season view and an unsupported one"""
+        for view in ["timeline", "momentum", "shots"]:
+            result = self.tool.visualize({"matches": self.season, "view": view},
+                                         visualization_type="season", preset="preview")
+            self.assertTrue(result.startswith("Season visualization created"), result)
+
+        result = self.tool.visualize({"matches": self.season, "view": "radar"},
+                                     visualization_type="season")
+        self.assertEqual(result, "Error: Unsupported season view: radar")
+
+    def test_replay_gif(self):
+        """Test an animated replay rendered in the worker pool"""
+        from PIL import Image
+        path = os.path.join(self.tmp.name, "replay.gif")
+        result = self.tool.animate_match(self.season[0], save_path=path, step=15, max_workers=1)
+        self.assertEqual(result, f"Match replay saved to {path}")
+        with Image.open(path) as image:
+            self.assertEqual(image.n_frames, 7)
+
+
+class TestPlotlyBackend(unittest.TestCase):
+    """Test JSON figure specs for client-side rendering"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tool = VisualizationTool(output_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_specs_are_valid_and_small(self):
+        """Test that every supported type emits a valid spec smaller than its PNG"""
+        import plotly.io as pio
+        for vis_type, data in [("formation", "4-3-3"),
+                               ("stats", json.dumps(MATCH_DATA)),
+                               ("match_events", json.dumps(MATCH_DATA))]:
+            spec_path = self.tool.visualize(data, vis_type, backend="plotly").split("\n")[-1]
+            png_path = self.tool.visualize(data, vis_type).split("\n")[-1]
+            self.assertTrue(spec_path.endswith(".json"))
+            with open(spec_path) as f:
+                pio.from_json(f.read())
+            self.assertLess(os.path.getsize(spec_path), os.path.getsize(png_path))
+
+    def test_backend_selection(self):
+        """Test the backend argument, HTML output and unsupported combinations"""
+        path = os.path.join(self.tmp.name, "formation.html")
+        tool = VisualizationTool(output_dir=self.tmp.name, backend="plotly")
+        self.assertEqual(tool.visualize("4-4-2", save_path=path),
+                         f"Formation visualization saved to {path}")
+        with open(path) as f:
+            self.assertIn("Plotly.newPlot", f.read())
+
+        self.assertEqual(tool.visualize({"matches": []}, "season"),
+                         "Unsupported visualization type: season")
+        self.assertEqual(self.tool.visualize("4-4-2", backend="bokeh"),
+                         "Unsupported visualization backend: bokeh")
+
+    def test_spec_in_memory(self):
+        """Test that a chat turn receives the spec as a Plotly payload"""
+        with collect_images() as outbox:
+            self.tool.visualize("4-4-2", backend="plotly")
+        self.assertEqual(outbox.images[0]["mime_type"], "application/vnd.plotly.v1+json")
+        self.assertEqual(json.loads(outbox.images[0]["data"])["data"][0]["type"], "scatter")
+
+
+class TestFormationLayout(unittest.TestCase):
+    """Test the shared formation layout engine"""
+
+    def test_arbitrary_shapes(self):
+        """Test that multi-line shapes get one slot and one role per player"""
+        from src.formation_layout import get_layout
+        for shape, roles in [("3-4-2-1", "GK | CB CB CB | LM CM CM RM | AM AM | ST"),
+                             ("4-1-2-1-2", "GK | LB CB CB RB | DM | CM CM | CAM | ST ST"),
+                             ("3-2-4-1", "GK | CB CB CB | DM DM | LM CM CM RM | ST")]:
+            layout = get_layout(shape)
+            self.assertEqual(layout.describe(), roles)
+            self.assertEqual(layout.coordinates.shape, (11, 2))
+            self.assertFalse(layout.coordinates.flags.writeable)
+            # Lines move up the pitch from defence to attack
+            xs = [layout.coordinates[layout.roles.index(r)][0] for r in ("GK", "CB", "ST")]
+            self.assertEqual(xs, sorted(xs))
+
+    def test_left_flank(self):
+        """Test that left-sided roles sit on the team's left while attacking to high x"""
+        from src.formation_layout import get_layout
+        layout = get_layout("4-4-2")
+        y = dict(zip(layout.roles, layout.coordinates[:, 1]))
+        self.assertGreater(y["LB"], y["RB"])
+        self.assertGreater(y["LM"], y["RM"])
+
+    def test_layouts_are_cached(self):
+        """Test that equivalent spellings share one layout"""
+        from src.formation_layout import get_layout
+        self.assertIs(get_layout("4-3-3"), get_layout("433"))
+        for shape in ["4-4-3", "4-0-6", "four"]:
+            with self.assertRaises(ValueError):
+                get_layout(shape)
+
+    def test_renderers_share_layout(self):
+        """Test that both backends place players from the same table"""
+        from src.formation_layout import get_layout
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        tool = VisualizationTool(output_dir=tmp.name)
+        self.addCleanup(tool.close)
+        players, notes = tool._formation_players("4-2-3-1")
+        self.assertEqual(notes, [])
+        self.assertEqual([p[:2] for p in players],
+                         [tuple(xy) for xy in get_layout("4-2-3-1").coordinates])
+
+        spec = tool._plotly_formation("4-2-3-1", None, {})
+        self.assertEqual(spec["data"][0]["text"], list(get_layout("4-2-3-1").roles))
+
+        players, notes = tool._formation_players("4-4-3")
+        self.assertEqual(len(players), 11)
+        self.assertIn("Error parsing formation", notes[0][2])
+
+
+if __name__ == '__main__':
+    unittest.main()